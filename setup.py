@@ -86,6 +86,9 @@ extensions = [
               include_dirs=[np.get_include()]),
     Extension("skbio.diversity._phylogenetic",
               ["skbio/diversity/_phylogenetic" + ext],
+              include_dirs=[np.get_include()]),
+    Extension("skbio.tree._cutils",
+              ["skbio/tree/_cutils" + ext],
               include_dirs=[np.get_include()])
 ]
 
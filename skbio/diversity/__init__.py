@@ -44,7 +44,10 @@ columns represent OTUs.
 Some diversity metrics incorporate relationships between the OTUs in their
 computation through reference to a phylogenetic tree. These metrics
 additionally take a ``skbio.TreeNode`` object and a list of OTU identifiers
-mapping the values in the counts vector to tips in the tree.
+mapping the values in the counts vector to tips in the tree. When the same
+tree is used for many calls, it can be wrapped in a ``PreparedTree`` and passed
+in place of the ``TreeNode``, so that the array representation of the tree is
+computed (and the tree is validated) only once.
 
 The driver functions are optimized so that computing a diversity metric more
 than one time (i.e., for more than one sample for alpha diversity metrics, or
@@ -167,6 +170,14 @@ Functions
     get_alpha_diversity_metrics
     get_beta_diversity_metrics
 
+Classes
+-------
+
+.. autosummary::
+   :toctree: generated/
+
+    PreparedTree
+
 Examples
 --------
 
@@ -404,9 +415,10 @@ from skbio.util import TestRunner
 from ._driver import (alpha_diversity, beta_diversity, partial_beta_diversity,
                       get_alpha_diversity_metrics, get_beta_diversity_metrics)
 from ._block import block_beta_diversity
+from ._prepared_tree import PreparedTree
 
 __all__ = ["alpha_diversity", "beta_diversity", "get_alpha_diversity_metrics",
            "get_beta_diversity_metrics", "partial_beta_diversity",
-           "block_beta_diversity"]
+           "block_beta_diversity", "PreparedTree"]
 
 test = TestRunner(__file__).test
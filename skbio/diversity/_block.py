@@ -6,12 +6,20 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import functools
+import itertools
+import multiprocessing
+import multiprocessing.pool
+
 import numpy as np
+import scipy.sparse
 
 from skbio.util._decorator import experimental
 from skbio.diversity._driver import partial_beta_diversity
 from skbio.stats.distance import DistanceMatrix
 from skbio.diversity._util import _validate_counts_matrix
+from skbio.diversity._prepared_tree import PreparedTree
+from skbio.diversity._shared import _share, _attach, _unlink
 
 
 def _generate_id_blocks(ids, k=64):
@@ -97,7 +105,11 @@ def _block_party(counts=None, row_ids=None, col_ids=None, **kwargs):
 
     # remove from the block any empty observations
     # NOTE: this will perform an implicit copy
-    nonzero_cols = (counts_block != 0).any(axis=0)
+    if scipy.sparse.issparse(counts_block):
+        nonzero_cols = np.asarray(
+            (counts_block != 0).sum(axis=0)).ravel() > 0
+    else:
+        nonzero_cols = (counts_block != 0).any(axis=0)
     counts_block = counts_block[:, nonzero_cols]
 
     kwargs['counts'] = counts_block
@@ -105,7 +117,10 @@ def _block_party(counts=None, row_ids=None, col_ids=None, **kwargs):
 
     if 'tree' in kwargs and 'otu_ids' in kwargs:
         kwargs['otu_ids'] = np.asarray(kwargs['otu_ids'])[nonzero_cols]
-        kwargs['tree'] = kwargs['tree'].shear(kwargs['otu_ids'])
+        # a prepared tree is reused as is, as it is faster to ignore its
+        # unobserved tips than to prepare a sheared tree for every block
+        if not isinstance(kwargs['tree'], PreparedTree):
+            kwargs['tree'] = kwargs['tree'].shear(kwargs['otu_ids'])
 
     return kwargs
 
@@ -189,14 +204,149 @@ def _map(func, kw_gen):
     ----
     builtin map does not allow for mapping with kwargs.
 
-    Parallel uses of block decomposition will likely replace this method with
-    one which can distribute compute.
+    See ``_pool_map`` for a variant which distributes compute over a pool of
+    processes or threads.
     """
     for kwargs in kw_gen:
         yield func(**kwargs)
 
 
-def _reduce(blocks):
+# Keyword arguments which are common to every block (e.g., the full counts
+# matrix and the tree). When a process pool is used, these are stored in
+# memory-mapped files which each worker attaches to once through the pool
+# initializer, rather than being pickled for every block.
+_shared_kwargs = {}
+_shareable_keys = frozenset(['counts', 'tree', 'otu_ids', 'metric'])
+
+
+def _set_shared_kwargs(shared):
+    """Attach to the block-invariant keyword arguments within a worker"""
+    _shared_kwargs.clear()
+    _shared_kwargs.update({k: _attach(v) for k, v in shared.items()})
+
+
+def _call_with_shared_kwargs(func, kwargs):
+    """Call a function with the block kwargs merged over the shared kwargs"""
+    kw = _shared_kwargs.copy()
+    kw.update(kwargs)
+    return func(**kw)
+
+
+def _call_with_kwargs(func, kwargs):
+    """Call a function with kwargs; a picklable stand-in for a lambda"""
+    return func(**kwargs)
+
+
+def _pool_map(func, kw_gen, n_jobs=None, backend='process', share=True,
+              chunksize=1):
+    """Map a function over arguments using a pool of workers
+
+    Parameters
+    ----------
+    func : callable
+        The function to apply, typically ``_block_compute``. If using the
+        ``'process'`` backend, ``func`` must be picklable.
+    kw_gen : Iterable of dict
+        The keyword arguments for each call of ``func``.
+    n_jobs : int, optional
+        The number of workers. If ``None`` or ``-1``, the number of CPUs
+        available is used.
+    backend : {'process', 'thread'}, optional
+        Whether to use a pool of processes or a pool of threads. Threads share
+        memory, but only help when the metric releases the GIL.
+    share : bool, optional
+        If ``True`` and a process pool is used, the keyword arguments which
+        are identical for every block (``counts``, ``tree``, ``otu_ids`` and
+        ``metric``) are sent to each worker once when the pool starts, and
+        are not pickled with every block. Numeric ``counts`` (dense or
+        sparse) and the tree are written once to memory-mapped files. The
+        workers map the counts, and the arrays of a ``PreparedTree``, without
+        copying them. A ``TreeNode`` is sent as flat arrays rather than
+        pickled recursively, and is rebuilt by each worker. Only applies to
+        the ``'process'`` backend as threads already share memory.
+    chunksize : int, optional
+        The number of blocks sent to a worker at a time.
+
+    Notes
+    -----
+    Results are yielded as they complete and are not guaranteed to follow the
+    order of ``kw_gen``. The default ``_reduce`` is insensitive to order.
+
+    Raises
+    ------
+    ValueError
+        If ``backend`` or ``n_jobs`` is not valid.
+    """
+    if n_jobs is None or n_jobs == -1:
+        n_jobs = multiprocessing.cpu_count()
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive integer, -1 or None.")
+
+    if backend == 'thread':
+        pool = multiprocessing.pool.ThreadPool(n_jobs)
+        tasks = kw_gen
+        call = functools.partial(_call_with_kwargs, func)
+    elif backend == 'process':
+        if share:
+            kw_gen = iter(kw_gen)
+            try:
+                first = next(kw_gen)
+            except StopIteration:
+                return
+
+            shared = {k: _share(v) for k, v in first.items()
+                      if k in _shareable_keys}
+            try:
+                pool = multiprocessing.Pool(n_jobs,
+                                            initializer=_set_shared_kwargs,
+                                            initargs=(shared, ))
+            except BaseException:
+                for handle in shared.values():
+                    _unlink(handle)
+                raise
+            tasks = ({k: v for k, v in kw.items() if k not in shared}
+                     for kw in itertools.chain([first], kw_gen))
+            call = functools.partial(_call_with_shared_kwargs, func)
+        else:
+            pool = multiprocessing.Pool(n_jobs)
+            tasks = kw_gen
+            call = functools.partial(_call_with_kwargs, func)
+    else:
+        raise ValueError("Unknown backend: %r. Must be one of 'process' or "
+                         "'thread'." % backend)
+
+    try:
+        with pool:
+            for result in pool.imap_unordered(call, tasks, chunksize):
+                yield result
+    finally:
+        # workers attach to the shared values when they start, and the pool
+        # is terminated by now
+        if backend == 'process' and share:
+            for handle in shared.values():
+                _unlink(handle)
+
+
+def _condensed_index(n, i, j):
+    """Map upper triangle coordinates to positions within a condensed matrix
+
+    Parameters
+    ----------
+    n : int
+        The number of rows (and columns) in the redundant form.
+    i, j : np.ndarray of int
+        Row and column coordinates where each ``i`` is less than its ``j``.
+
+    Returns
+    -------
+    np.ndarray of int
+        The index of each ``(i, j)`` pair in the condensed form, as defined by
+        ``scipy.spatial.distance.squareform``.
+    """
+    return n * i - (i * (i + 1)) // 2 + (j - i - 1)
+
+
+def _reduce(blocks, n=None, out=None, condensed=False):
     """Reduce an iterable of partial distance matrices into a full matrix
 
     Note, the reduce doesn't actually care about what pairs are computed
@@ -204,38 +354,90 @@ def _reduce(blocks):
     added. as such, this reduction is only safe to perform if by
     the block_beta_diversity method which assures that distances are not
     computed multiple times.
-    """
-    all_blocks = list(blocks)
 
-    # Determine the maximum integer ID observed in the blocks. There exists a
-    # 1-1 mapping between the integer ID and a sample ID. We increment by 1
-    # as the integer ID space begins with zero, and we'll be using this value
-    # to determine the size of the resulting full distance matrix.
-    n_ids = max(map(lambda x: max(x.ids), all_blocks)) + 1
+    Parameters
+    ----------
+    blocks : Iterable of DistanceMatrix
+        The partial distance matrices, whose IDs are the integer positions of
+        their samples within the full matrix. The blocks are consumed one at
+        a time and are not retained.
+    n : int, optional
+        The number of samples in the full matrix. If not provided, it is
+        inferred from ``out`` or, failing that, from the largest ID across all
+        blocks (which requires holding every block in memory).
+    out : 1D np.ndarray of float, optional
+        A preallocated condensed distance vector of length ``n * (n - 1) / 2``
+        to accumulate into, such as a ``numpy.memmap``. If not provided, a
+        zeroed array is allocated.
+    condensed : bool, optional
+        If ``True``, the full distance matrix stores only the condensed
+        distances.
 
-    mat = np.zeros((n_ids, n_ids), dtype=float)
+    Returns
+    -------
+    DistanceMatrix
+        The full distance matrix. If ``condensed`` is ``True``, the
+        accumulated vector (``out``, if provided) is stored without a copy,
+        so that it is never expanded into a redundant ``n x n`` array.
 
-    # TODO: something smarter.
-    for block in all_blocks:
+    Raises
+    ------
+    ValueError
+        If ``out`` is not of the length implied by ``n``.
+    """
+    if n is None and out is not None:
+        # solve len(out) == n * (n - 1) / 2 for n
+        n = int(round((1 + np.sqrt(1 + 8 * len(out))) / 2))
+
+    if n is None:
+        # Determine the maximum integer ID observed in the blocks. There
+        # exists a 1-1 mapping between the integer ID and a sample ID. We
+        # increment by 1 as the integer ID space begins with zero, and we'll
+        # be using this value to determine the size of the resulting full
+        # distance matrix.
+        blocks = list(blocks)
+        n = max(map(lambda x: max(x.ids), blocks)) + 1
+
+    if out is None:
+        out = np.zeros(n * (n - 1) // 2, dtype=float)
+    elif len(out) != n * (n - 1) // 2:
+        raise ValueError("``out`` must be a condensed vector of length %d."
+                         % (n * (n - 1) // 2))
+
+    # the upper triangle coordinates of a block only depend on its size, and
+    # most blocks share the same size
+    triu_cache = {}
+    for block in blocks:
         n_blk_ids = len(block.ids)
+        if n_blk_ids < 2:
+            continue
+
+        if n_blk_ids not in triu_cache:
+            triu_cache[n_blk_ids] = np.triu_indices(n_blk_ids, k=1)
+        blk_i, blk_j = triu_cache[n_blk_ids]
 
-        # get the corresponding coordinates in the master matrix
-        master_idx = [(i, j) for row, i in enumerate(block.ids)
-                      for j in block.ids[row+1:]]
+        # get the corresponding coordinates in the master matrix. IDs must be
+        # increasing so that each pair remains in the upper triangle, which
+        # is already the case for blocks created by _block_party.
+        ids = np.asarray(block.ids, dtype=np.intp)
+        data = block.data
+        if (np.diff(ids) < 0).any():
+            order = np.argsort(ids)
+            ids = ids[order]
+            data = data[np.ix_(order, order)]
 
-        # get the corresponding coordinates within the current block
-        block_idx = [(i, j) for row, i in enumerate(range(n_blk_ids))
-                     for j in range(row+1, n_blk_ids)]
+        idx = _condensed_index(n, ids[blk_i], ids[blk_j])
 
-        for (m_i, m_j), (b_i, b_j) in zip(master_idx, block_idx):
-            mat[m_i, m_j] += block.data[b_i, b_j]
+        # indices are unique within a block, so a buffered add is safe
+        out[idx] += data[blk_i, blk_j]
 
-    return DistanceMatrix(mat + mat.T, list(range(n_ids)))
+    return DistanceMatrix(out, list(range(n)), condensed=condensed)
 
 
 @experimental(as_of="0.5.1")
 def block_beta_diversity(metric, counts, ids, validate=True, k=64,
-                         reduce_f=None, map_f=None, **kwargs):
+                         reduce_f=None, map_f=None, n_jobs=1,
+                         backend='process', condensed=False, **kwargs):
     """Perform a block-decomposition beta diversity calculation
 
     Parameters
@@ -267,6 +469,22 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
         able to pass around `**kwargs``.
     k : int, optional
         The blocksize used when computing distances
+    n_jobs : int, optional
+        The number of workers used to compute blocks when ``map_f`` is not
+        provided. If ``None`` or ``-1``, all available CPUs are used. By
+        default, blocks are computed serially.
+    backend : {'process', 'thread'}, optional
+        The type of worker pool used if ``n_jobs`` is not 1. With the
+        ``'process'`` backend, the counts matrix, tree and OTU IDs are sent to
+        each worker a single time rather than with every block, and the
+        counts matrix and tree are shared through memory-mapped files. A
+        ``PreparedTree`` is used by the workers without being copied or
+        prepared again, while a ``TreeNode`` is rebuilt by each worker.
+    condensed : bool, optional
+        If ``True``, the returned distance matrix stores only the condensed
+        form of the distances, into which the blocks are reduced, and never
+        creates the redundant ``n x n`` form unless it is requested (see
+        ``skbio.DistanceMatrix``). Ignored if ``reduce_f`` is provided.
     kwargs : kwargs, optional
         Metric-specific parameters.
 
@@ -298,14 +516,19 @@ def block_beta_diversity(metric, counts, ids, validate=True, k=64,
         counts = _validate_counts_matrix(counts, ids=ids)
 
     if reduce_f is None:
-        reduce_f = _reduce
+        reduce_f = functools.partial(_reduce, n=counts.shape[0],
+                                     condensed=condensed)
 
     if map_f is None:
-        map_f = _map
+        if n_jobs == 1:
+            map_f = _map
+        else:
+            map_f = functools.partial(_pool_map, n_jobs=n_jobs,
+                                      backend=backend)
 
     # The block method uses numeric IDs to take advantage of fancy indexing
     # with numpy.
-    tmp_ids = np.arange(len(counts))
+    tmp_ids = np.arange(counts.shape[0])
     kwargs['ids'] = tmp_ids
 
     kwargs['metric'] = metric
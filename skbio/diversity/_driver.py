@@ -10,17 +10,21 @@ import functools
 import itertools
 
 import numpy as np
+import scipy.sparse
 import scipy.spatial.distance
 import pandas as pd
 
 import skbio
-from skbio.diversity.alpha._faith_pd import _faith_pd, _setup_faith_pd
+from skbio.diversity.alpha._faith_pd import _faith_pd
+from skbio.diversity.alpha._vectorized import _vectorized_alpha_metrics
 from skbio.diversity.beta._unifrac import (
     _setup_multiple_unweighted_unifrac, _setup_multiple_weighted_unifrac,
-    _normalize_weighted_unifrac_by_default)
+    _normalize_weighted_unifrac_by_default, _unifrac_all_pairs)
+from skbio.diversity.beta._sparse import _sparse_pdist
 from skbio.util._decorator import experimental, deprecated
 from skbio.stats.distance import DistanceMatrix
 from skbio.diversity._util import (_validate_counts_matrix,
+                                   _validate_otu_ids_and_tree,
                                    _get_phylogenetic_kwargs)
 
 
@@ -59,6 +63,17 @@ def _get_alpha_diversity_metric_map():
         'lladser_ci': skbio.diversity.alpha.lladser_ci}
 
 
+# Alpha diversity metrics whose value does not depend on the OTUs which were
+# not observed. For sparse input, these are passed only the nonzero counts of
+# each sample.
+_zero_invariant_alpha_metrics = frozenset([
+    'ace', 'berger_parker_d', 'brillouin_d', 'chao1', 'chao1_ci',
+    'dominance', 'doubles', 'enspie', 'esty_ci', 'fisher_alpha',
+    'goods_coverage', 'heip_e', 'margalef', 'mcintosh_d', 'mcintosh_e',
+    'menhinick', 'observed_otus', 'osd', 'pielou_e', 'robbins', 'shannon',
+    'simpson', 'simpson_e', 'singles'])
+
+
 @experimental(as_of="0.4.1")
 def get_alpha_diversity_metrics():
     """ List scikit-bio's alpha diversity metrics
@@ -120,10 +135,16 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
     metric : str, callable
         The alpha diversity metric to apply to the sample(s). Passing metric as
         a string is preferable as this often results in an optimized version of
-        the metric being used.
-    counts : 1D or 2D array_like of ints or floats
+        the metric being used. Many metrics (e.g., ``shannon``, ``simpson``,
+        ``observed_otus`` and ``chao1``) are computed for all samples at once
+        when passed by name.
+    counts : 1D or 2D array_like of ints or floats, or scipy.sparse matrix
         Vector or matrix containing count/abundance data. If a matrix, each row
-        should contain counts of OTUs in a given sample.
+        should contain counts of OTUs in a given sample. A ``scipy.sparse``
+        matrix is never converted to a dense matrix. Metrics which only depend
+        on the observed OTUs (and ``faith_pd``) are computed from each
+        sample's nonzero counts, while other metrics receive each sample as
+        a dense vector, one sample at a time.
     ids : iterable of strs, optional
         Identifiers for each sample in ``counts``. By default, samples will be
         assigned integer identifiers in the order that they were provided.
@@ -166,10 +187,25 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
 
     if metric == 'faith_pd':
         otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
-        counts_by_node, branch_lengths = _setup_faith_pd(
-            counts, otu_ids, tree, validate, single_sample=False)
-        counts = counts_by_node
-        metric = functools.partial(_faith_pd, branch_lengths=branch_lengths)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments for faith_pd: %s"
+                            % ', '.join(sorted(kwargs)))
+        if not scipy.sparse.issparse(counts):
+            counts = np.atleast_2d(np.asarray(counts))
+        # counts have already been validated if necessary
+        if validate:
+            _validate_otu_ids_and_tree(counts[0], otu_ids, tree)
+        return pd.Series(_faith_pd(counts, otu_ids, tree), index=ids)
+
+    if scipy.sparse.issparse(counts):
+        return _sparse_alpha_diversity(metric, counts, ids, **kwargs)
+
+    if metric in _vectorized_alpha_metrics:
+        # computed for all samples at once; kwargs is provided here so an
+        # error is raised on extra kwargs
+        counts = np.atleast_2d(np.asarray(counts))
+        results = _vectorized_alpha_metrics[metric](counts, **kwargs)
+        return pd.Series(results, index=ids)
     elif callable(metric):
         metric = functools.partial(metric, **kwargs)
     elif metric in metric_map:
@@ -182,6 +218,28 @@ def alpha_diversity(metric, counts, ids=None, validate=True, **kwargs):
     return pd.Series(results, index=ids)
 
 
+def _sparse_alpha_diversity(metric, counts, ids, **kwargs):
+    """alpha_diversity for a scipy.sparse counts matrix"""
+    metric_map = _get_alpha_diversity_metric_map()
+    counts = counts.tocsr()
+
+    if callable(metric):
+        f = metric
+    elif metric in metric_map:
+        f = metric_map[metric]
+    else:
+        raise ValueError('Unknown metric provided: %r.' % metric)
+
+    if metric in _zero_invariant_alpha_metrics:
+        rows = (counts.data[counts.indptr[i]:counts.indptr[i + 1]]
+                for i in range(counts.shape[0]))
+    else:
+        rows = (counts[i].toarray().ravel() for i in range(counts.shape[0]))
+
+    results = [f(c, **kwargs) for c in rows]
+    return pd.Series(results, index=ids)
+
+
 @deprecated(as_of='0.5.0', until='0.5.2',
             reason=('The return type is unstable. Developer caution is '
                     'advised. The resulting DistanceMatrix object will '
@@ -291,9 +349,14 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         and the scikit-bio functions linked under *See Also* for available
         metrics. Passing metrics as a strings is preferable as this often
         results in an optimized version of the metric being used.
-    counts : 2D array_like of ints or floats
+    counts : 2D array_like of ints or floats, or scipy.sparse matrix
         Matrix containing count/abundance data where each row contains counts
-        of OTUs in a given sample.
+        of OTUs in a given sample. A ``scipy.sparse`` matrix is never
+        converted to a dense matrix, and is supported for
+        ``'unweighted_unifrac'``, ``'weighted_unifrac'``, ``'braycurtis'``,
+        ``'cityblock'``, ``'cosine'``, ``'euclidean'``, ``'jaccard'`` and
+        ``'sqeuclidean'``, or for any metric if ``pairwise_func`` accepts
+        sparse input.
     ids : iterable of strs, optional
         Identifiers for each sample in ``counts``. By default, samples will be
         assigned integer identifiers in the order that they were provided
@@ -312,9 +375,15 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
         ``numpy.ndarray`` of dissimilarities (floats). Examples of functions
         that can be provided are ``scipy.spatial.distance.pdist`` and
         ``sklearn.metrics.pairwise_distances``. By default,
-        ``scipy.spatial.distance.pdist`` will be used.
+        ``scipy.spatial.distance.pdist`` will be used. Not applicable to
+        ``'unweighted_unifrac'`` and ``'weighted_unifrac'``, which are
+        computed for all pairs at once by an optimized implementation unless
+        ``pairwise_func`` is provided.
     kwargs : kwargs, optional
-        Metric-specific parameters.
+        Metric-specific parameters. For ``'unweighted_unifrac'`` and
+        ``'weighted_unifrac'``, ``dtype`` may be set to ``np.float32`` to
+        halve the memory used during the computation, at the cost of
+        precision.
 
     Returns
     -------
@@ -342,7 +411,31 @@ def beta_diversity(metric, counts, ids=None, validate=True, pairwise_func=None,
     if validate:
         counts = _validate_counts_matrix(counts, ids=ids)
 
-    if metric == 'unweighted_unifrac':
+    if metric in ('unweighted_unifrac', 'weighted_unifrac') and \
+            pairwise_func is None:
+        # compute all pairs in a single pass over the tree
+        weighted = metric == 'weighted_unifrac'
+        # normalized only applies to weighted UniFrac, so that it is an
+        # unexpected keyword argument for unweighted UniFrac
+        normalized = False
+        if weighted:
+            normalized = kwargs.pop('normalized',
+                                    _normalize_weighted_unifrac_by_default)
+        dtype = kwargs.pop('dtype', np.float64)
+        otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments for %s: %s"
+                            % (metric, ', '.join(sorted(kwargs))))
+        distances = _unifrac_all_pairs(
+            counts, otu_ids=otu_ids, tree=tree, validate=validate,
+            weighted=weighted, normalized=normalized, dtype=dtype)
+        return DistanceMatrix(distances, ids)
+    elif scipy.sparse.issparse(counts) and pairwise_func is None:
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments for %s: %s"
+                            % (metric, ', '.join(sorted(kwargs))))
+        return DistanceMatrix(_sparse_pdist(counts, metric), ids)
+    elif metric == 'unweighted_unifrac':
         otu_ids, tree, kwargs = _get_phylogenetic_kwargs(counts, **kwargs)
         metric, counts_by_node = _setup_multiple_unweighted_unifrac(
                 counts, otu_ids=otu_ids, tree=tree, validate=validate)
@@ -65,7 +65,7 @@ def _tip_distances(np.ndarray[np.double_t, ndim=1] a, object t,
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef _traverse_reduce(np.ndarray[DTYPE_t, ndim=2] child_index,
+cpdef _traverse_reduce(np.ndarray[DTYPE_t, ndim=2] child_index,
                       np.ndarray[DTYPE_t, ndim=2] a):
     """Apply a[k] = sum[i:j]
 
@@ -213,3 +213,189 @@ def _nodes_by_counts(np.ndarray counts,
     _traverse_reduce(indexed['child_index'], count_array)
 
     return count_array
+
+
+ctypedef fused FLOAT_t:
+    np.float32_t
+    np.float64_t
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline void _stripe_update(FLOAT_t *num, FLOAT_t *den, FLOAT_t *u,
+                                FLOAT_t *v, Py_ssize_t n, FLOAT_t length,
+                                FLOAT_t correction, bint unweighted) nogil:
+    """Accumulate the terms of one node for ``n`` consecutive pairs"""
+    cdef:
+        Py_ssize_t k
+        FLOAT_t diff
+
+    for k in range(n):
+        diff = u[k] - v[k]
+        if diff < 0:
+            diff = -diff
+        num[k] += length * diff
+
+    if unweighted:
+        # u and v are either 0 or 1, so this is their logical or
+        for k in range(n):
+            den[k] += length * (u[k] + v[k] - u[k] * v[k])
+    elif correction != 0:
+        for k in range(n):
+            den[k] += correction * (u[k] + v[k])
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _unifrac_stripes(FLOAT_t[:, ::1] node_values,
+                     FLOAT_t[::1] branch_lengths,
+                     FLOAT_t[::1] correction_lengths,
+                     bint unweighted):
+    """Accumulate UniFrac numerators and denominators over all sample pairs
+
+    Parameters
+    ----------
+    node_values : 2D np.ndarray of float32 or float64
+        A matrix in which each row corresponds to a node in a tree and each
+        column corresponds to a sample. For unweighted UniFrac, values are
+        ``1`` where the node is observed in the sample and ``0`` otherwise.
+        For weighted UniFrac, values are the proportional abundance of the
+        node in the sample.
+    branch_lengths : 1D np.ndarray of float32 or float64
+        The branch length of each node in ``node_values``.
+    correction_lengths : 1D np.ndarray of float32 or float64
+        Only used for weighted UniFrac, in which case the denominator of a
+        pair accumulates ``correction_lengths[node] * (u + v)``. For
+        normalized weighted UniFrac, these are the distances from each tip to
+        the root (and zero for internal nodes). May be empty, in which case
+        the denominators are not accumulated.
+    unweighted : bool
+        Whether to compute unweighted or weighted UniFrac terms.
+
+    Returns
+    -------
+    np.ndarray
+        The numerator stripes, of shape ``(n_samples // 2, n_samples)``.
+    np.ndarray
+        The denominator stripes, of the same shape.
+
+    Notes
+    -----
+    The all-pairs computation is organized into stripes as described for
+    Striped UniFrac [1]_. Stripe ``s`` holds the terms relating sample ``k``
+    to sample ``(k + s + 1) % n_samples`` for every ``k``, so that a single
+    pass over the nodes updates each stripe with two contiguous sweeps over
+    the samples. When ``n_samples`` is even, the second half of the final
+    stripe duplicates the first half.
+
+    The tree is traversed once, and only rows of ``node_values`` and stripes
+    are touched, which keeps memory access sequential. The GIL is released
+    while accumulating.
+
+    References
+    ----------
+    .. [1] McDonald, D. et al. Striped UniFrac: enabling microbiome analysis
+       at unprecedented scale. Nature Methods 15, 847-848 (2018).
+    """
+    cdef:
+        Py_ssize_t n_nodes = node_values.shape[0]
+        Py_ssize_t n_samples = node_values.shape[1]
+        Py_ssize_t n_stripes = n_samples // 2
+        Py_ssize_t node, s, offset
+        bint correct = correction_lengths.shape[0] > 0
+        FLOAT_t length, correction
+        FLOAT_t *row
+        FLOAT_t[:, ::1] num_view
+        FLOAT_t[:, ::1] den_view
+
+    if FLOAT_t is np.float32_t:
+        dtype = np.float32
+    else:
+        dtype = np.float64
+
+    num = np.zeros((n_stripes, n_samples), dtype=dtype)
+    den = np.zeros((n_stripes, n_samples), dtype=dtype)
+    num_view = num
+    den_view = den
+
+    with nogil:
+        for node in range(n_nodes):
+            length = branch_lengths[node]
+            correction = 0
+            if correct:
+                correction = correction_lengths[node]
+            if length == 0 and correction == 0:
+                continue
+
+            row = &node_values[node, 0]
+            for s in range(n_stripes):
+                offset = s + 1
+
+                # the partner of sample k is k + offset, wrapping around to
+                # the start of the row for the last offset samples
+                _stripe_update(&num_view[s, 0], &den_view[s, 0], row,
+                               row + offset, n_samples - offset, length,
+                               correction, unweighted)
+                _stripe_update(&num_view[s, n_samples - offset],
+                               &den_view[s, n_samples - offset],
+                               row + n_samples - offset, row, offset, length,
+                               correction, unweighted)
+
+    return num, den
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _faith_pd_observed(DTYPE_t[::1] indptr, DTYPE_t[::1] tips,
+                       DTYPE_t[::1] parents, double[::1] branch_lengths):
+    """Compute Faith PD for samples described by their observed tips
+
+    Parameters
+    ----------
+    indptr : np.ndarray of int
+        The observed tips of sample ``i`` are
+        ``tips[indptr[i]:indptr[i + 1]]``, as in a compressed sparse row
+        matrix.
+    tips : np.ndarray of int
+        The positions of the observed tips in ``parents`` and
+        ``branch_lengths``.
+    parents : np.ndarray of int
+        The position of the parent of each node. The parent of the root is
+        the root itself.
+    branch_lengths : np.ndarray of double
+        The branch length of each node.
+
+    Returns
+    -------
+    np.ndarray of double
+        The Faith PD of each sample.
+
+    Notes
+    -----
+    Each sample walks from its observed tips toward the root, marking nodes
+    with the sample's position and stopping at nodes which the sample has
+    already marked. Each node on the union of the paths is therefore visited
+    once per sample, and only a single array of marks is allocated for all
+    samples. The GIL is released while walking.
+    """
+    cdef:
+        Py_ssize_t n_samples = indptr.shape[0] - 1
+        Py_ssize_t i, k
+        DTYPE_t node
+        double total
+        DTYPE_t[::1] marks = np.full(parents.shape[0], -1, dtype=DTYPE)
+        double[::1] results = np.zeros(n_samples)
+
+    with nogil:
+        for i in range(n_samples):
+            total = 0
+            for k in range(indptr[i], indptr[i + 1]):
+                node = tips[k]
+                while marks[node] != i:
+                    marks[node] = i
+                    total += branch_lengths[node]
+                    node = parents[node]
+            results[i] = total
+
+    return np.asarray(results)
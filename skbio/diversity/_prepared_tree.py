@@ -0,0 +1,218 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+
+from skbio.tree import DuplicateNodeError, MissingNodeError
+from skbio.util._decorator import experimental
+from skbio.diversity._phylogenetic import _tip_distances
+
+
+class PreparedTree:
+    """A phylogenetic tree indexed for repeated diversity calculations
+
+    Phylogenetic diversity metrics convert the tree into an array
+    representation before computing anything, which requires a traversal of
+    the entire tree. A ``PreparedTree`` performs this work once, so that it
+    can be passed in place of a ``TreeNode`` as the ``tree`` of any number of
+    calls to ``skbio.diversity.alpha_diversity``,
+    ``skbio.diversity.beta_diversity``, ``skbio.diversity.alpha.faith_pd``,
+    ``skbio.diversity.beta.unweighted_unifrac`` or
+    ``skbio.diversity.beta.weighted_unifrac``.
+
+    Parameters
+    ----------
+    tree : skbio.TreeNode
+        The tree to prepare. Its nodes are assigned ids, as done by
+        ``TreeNode.index_tree``.
+    validate : bool, optional
+        If ``True``, check that the tree is rooted, has unique tip names and
+        has a branch length on every node except the root. Otherwise these
+        checks are deferred to the first call which validates its input.
+
+    Attributes
+    ----------
+    tree : skbio.TreeNode
+        The prepared tree.
+    tree_index : dict
+        The array representation of the tree, as returned by
+        ``tree.to_array(nan_length_value=0.0)``.
+    branch_lengths : np.ndarray of float
+        The branch length of each node, indexed by node id.
+
+    Raises
+    ------
+    ValueError, DuplicateNodeError
+        If ``validate`` is ``True`` and the tree is invalid.
+
+    Notes
+    -----
+    The prepared tree reflects the tree at the time it was prepared. If the
+    topology or the branch lengths of ``tree`` are changed afterwards, a new
+    ``PreparedTree`` must be created.
+
+    Examples
+    --------
+    >>> from io import StringIO
+    >>> from skbio import TreeNode
+    >>> from skbio.diversity import PreparedTree
+    >>> from skbio.diversity.alpha import faith_pd
+    >>> tree = TreeNode.read(StringIO(
+    ...     '(((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0,OTU4:0.75)root;'))
+    >>> prepared = PreparedTree(tree)
+    >>> faith_pd([1, 0, 2, 0], ['OTU1', 'OTU2', 'OTU3', 'OTU4'], prepared)
+    3.0
+    >>> faith_pd([0, 1], ['OTU1', 'OTU4'], prepared)
+    0.75
+
+    """
+
+    @experimental(as_of="0.5.1")
+    def __init__(self, tree, validate=True):
+        self.tree = tree
+        self.tree_index = tree.to_array(nan_length_value=0.0)
+        self.branch_lengths = self.tree_index['length']
+
+        # nodes without children are the tips
+        child_index = self.tree_index['child_index']
+        is_tip = np.ones(len(self.branch_lengths), dtype=bool)
+        is_tip[child_index[:, 0]] = False
+        self._tip_indices = np.flatnonzero(is_tip)
+        names = self.tree_index['name'][self._tip_indices]
+        self._tip_lookup = dict(zip(names, self._tip_indices))
+
+        self._parents = None
+        self._tip_distances = None
+
+        self._validated = False
+        self._validation_error = None
+        if validate:
+            self._validate()
+
+    @classmethod
+    def _from_arrays(cls, child_index, branch_lengths, tip_indices, parents,
+                     tip_distances, tip_names, validation_error=None):
+        """Create a prepared tree from the arrays of another, without a tree
+
+        This is how worker processes attach to a shared ``PreparedTree``. The
+        arrays are used as is. The resulting ``tree`` is ``None``, and
+        ``tree_index`` only has the ``'child_index'`` and ``'length'``
+        arrays. The tree is valid unless ``validation_error`` is provided, in
+        which case it is raised by ``_validate``.
+
+        """
+        prepared = cls.__new__(cls)
+        prepared.tree = None
+        prepared.tree_index = {'child_index': child_index,
+                               'length': branch_lengths}
+        prepared.branch_lengths = branch_lengths
+        prepared._tip_indices = tip_indices
+        prepared._tip_lookup = dict(zip(tip_names, tip_indices))
+        prepared._parents = parents
+        prepared._tip_distances = tip_distances
+        prepared._validated = validation_error is None
+        prepared._validation_error = validation_error
+        return prepared
+
+    def _validate(self):
+        """Validate the tree if necessary, returning a lookup of tip names"""
+        if not self._validated:
+            if self.tree is None:
+                raise self._validation_error
+            _validate_tree(self.tree)
+            self._validated = True
+        return self._tip_lookup
+
+    def _tip_rows(self, otu_ids):
+        """Find the position of each OTU's tip in the arrays of tree_index"""
+        tip_lookup = self._tip_lookup
+        return np.array([tip_lookup[otu_id] for otu_id in otu_ids],
+                        dtype=np.int64)
+
+    def _get_parents(self):
+        """The position of the parent of each node, the root being its own"""
+        if self._parents is None:
+            self._parents = _parents(self.tree_index['child_index'],
+                                     len(self.branch_lengths))
+        return self._parents
+
+    def _get_tip_distances(self):
+        """The distance from each tip to the root, and zero for other nodes"""
+        if self._tip_distances is None:
+            self._tip_distances = _tip_distances(self.branch_lengths,
+                                                 self.tree, self._tip_indices)
+        return self._tip_distances
+
+
+def _prepare_tree(tree):
+    """Return ``tree`` as a PreparedTree, preparing it if necessary"""
+    if isinstance(tree, PreparedTree):
+        return tree
+    return PreparedTree(tree, validate=False)
+
+
+def _parents(child_index, n_nodes):
+    """Find the position of each node's parent from a to_array child_index
+
+    The children of each node in ``child_index`` are the contiguous range
+    ``[start, end]``. The root is its own parent.
+
+    """
+    parents = np.arange(n_nodes, dtype=np.int64)
+    starts = child_index[:, 1]
+    n_children = child_index[:, 2] - starts + 1
+    offsets = np.cumsum(n_children) - n_children
+    children = (np.repeat(starts - offsets, n_children) +
+                np.arange(n_children.sum()))
+    parents[children] = np.repeat(child_index[:, 0], n_children)
+    return parents
+
+
+def _validate_tree(tree):
+    """Validate a tree for phylogenetic diversity calculations
+
+    Returns the set of tip names in the tree.
+
+    """
+    if len(tree.root().children) == 0:
+        raise ValueError("``tree`` must contain more than just a root node.")
+
+    if len(tree.root().children) > 2:
+        # this is an imperfect check for whether the tree is rooted or not.
+        # can this be improved?
+        raise ValueError("``tree`` must be rooted.")
+
+    # all nodes (except the root node) have corresponding branch lengths
+    # all tip names in tree are unique
+    branch_lengths = []
+    tip_names = []
+    for e in tree.traverse():
+        if not e.is_root():
+            branch_lengths.append(e.length)
+        if e.is_tip():
+            tip_names.append(e.name)
+    set_tip_names = set(tip_names)
+    if len(tip_names) != len(set_tip_names):
+        raise DuplicateNodeError("All tip names must be unique.")
+    if np.array([length is None for length in branch_lengths]).any():
+        raise ValueError("All non-root nodes in ``tree`` must have a branch "
+                         "length.")
+
+    return set_tip_names
+
+
+def _validate_otu_ids_in_tree(otu_ids, tip_names):
+    """Check that all otu_ids are in tip_names, a set or mapping"""
+    missing_tip_names = {o for o in otu_ids if o not in tip_names}
+    if missing_tip_names:
+        n_missing_tip_names = len(missing_tip_names)
+        raise MissingNodeError("All ``otu_ids`` must be present as tip names "
+                               "in ``tree``. ``otu_ids`` not corresponding to "
+                               "tip names (n=%d): %s" %
+                               (n_missing_tip_names,
+                                " ".join(missing_tip_names)))
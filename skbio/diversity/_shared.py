@@ -0,0 +1,243 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import os
+import tempfile
+
+import numpy as np
+import scipy.sparse
+
+from skbio.tree import TreeNode, CompactTree, DuplicateNodeError
+from skbio.diversity._prepared_tree import PreparedTree
+
+
+def _shared_directory():
+    """The directory in which shared buffers are created
+
+    ``/dev/shm`` is backed by memory on Linux, so that buffers are never
+    written to disk. Elsewhere, the temporary directory is used and the page
+    cache keeps the buffers in memory.
+
+    """
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+class _SharedArray:
+    """A numpy array in a file which worker processes can memory map
+
+    Only the path of the file is pickled, so that sending the array to a
+    worker process does not copy its data. Workers attach to the array as a
+    read-only ``np.memmap``, which shares its pages with every other process
+    mapping the same file.
+
+    Parameters
+    ----------
+    array : array_like
+        The array to share. Object arrays cannot be shared.
+    directory : str, optional
+        The directory in which to create the file. Defaults to ``/dev/shm``
+        if it is available, and to the temporary directory otherwise.
+
+    """
+
+    def __init__(self, array, directory=None):
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise TypeError("Arrays of Python objects cannot be shared.")
+        if directory is None:
+            directory = _shared_directory()
+        fd, self.path = tempfile.mkstemp(prefix='skbio-', suffix='.npy',
+                                         dir=directory)
+        with os.fdopen(fd, 'wb') as fh:
+            np.save(fh, array)
+        self.size = array.size
+
+    def attach(self):
+        """Map the array into memory, without copying it"""
+        # an empty array cannot be memory mapped
+        return np.load(self.path, mmap_mode='r' if self.size else None)
+
+    def unlink(self):
+        """Delete the file of the array once no more workers will attach"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class _SharedSparse:
+    """A sparse matrix whose arrays are shared with ``_SharedArray``"""
+
+    def __init__(self, matrix, directory=None):
+        if matrix.format not in ('csr', 'csc'):
+            matrix = matrix.tocsr()
+        self.format = matrix.format
+        self.shape = matrix.shape
+        self.arrays = [_SharedArray(array, directory) for array in
+                       (matrix.data, matrix.indices, matrix.indptr)]
+
+    def attach(self):
+        data, indices, indptr = [array.attach() for array in self.arrays]
+        if self.format == 'csr':
+            constructor = scipy.sparse.csr_matrix
+        else:
+            constructor = scipy.sparse.csc_matrix
+        # the arrays are used as is, as their dtypes are already valid
+        return constructor((data, indices, indptr), shape=self.shape,
+                           copy=False)
+
+    def unlink(self):
+        for array in self.arrays:
+            array.unlink()
+
+
+class _SharedNames:
+    """Names shared as a single UTF-8 buffer, if they are all strings
+
+    A name may also be ``None``. Names which are not all strings or ``None``
+    are pickled instead.
+
+    """
+
+    def __init__(self, names, directory=None):
+        names = list(names)
+        if all(name is None or isinstance(name, str) for name in names):
+            encoded = [b'' if name is None else name.encode('utf-8')
+                       for name in names]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(name) for name in encoded], out=offsets[1:])
+            missing = np.array([name is None for name in names], dtype=bool)
+            buffer = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+            self.arrays = [_SharedArray(buffer, directory),
+                           _SharedArray(offsets, directory),
+                           _SharedArray(missing, directory)]
+            self.names = None
+        else:
+            self.arrays = []
+            self.names = names
+
+    def attach(self):
+        if self.names is not None:
+            return self.names
+        buffer, offsets, missing = [array.attach() for array in self.arrays]
+        text = buffer.tobytes()
+        offsets = offsets.tolist()
+        return [None if is_missing else text[start:end].decode('utf-8')
+                for start, end, is_missing in
+                zip(offsets[:-1], offsets[1:], missing.tolist())]
+
+    def unlink(self):
+        for array in self.arrays:
+            array.unlink()
+
+
+class _SharedTree:
+    """A tree shared as the flat arrays of its nodes in preorder
+
+    The parent, branch length and name of each node are stored in arrays, so
+    that the tree is neither pickled recursively nor limited in depth by the
+    recursion limit. Each worker rebuilds a ``TreeNode`` from these arrays
+    without recursion, as the tree is then modified (e.g., sheared) by each
+    block.
+
+    """
+
+    def __init__(self, tree, directory=None):
+        compact = CompactTree.from_tree_node(tree)
+        self.arrays = [_SharedArray(compact.parents, directory),
+                       _SharedArray(compact.lengths, directory)]
+        self.names = _SharedNames(compact.names.tolist(), directory)
+
+    def attach(self):
+        parents, lengths = [array.attach() for array in self.arrays]
+        return CompactTree(parents, lengths,
+                           self.names.attach()).to_tree_node()
+
+    def unlink(self):
+        for array in self.arrays:
+            array.unlink()
+        self.names.unlink()
+
+
+class _SharedPreparedTree:
+    """A ``PreparedTree`` shared as the arrays it was prepared into
+
+    The tree is validated, and the parents and tip distances are computed,
+    once in the main process. Workers map the arrays without copying them and
+    create a ``PreparedTree`` from them without a ``TreeNode``, so that the
+    tree is neither rebuilt nor prepared again. Only the lookup of tip names
+    is built by each worker. If the tree is invalid, the error is raised by
+    workers which validate it.
+
+    """
+
+    def __init__(self, prepared, directory=None):
+        self.validation_error = None
+        try:
+            prepared._validate()
+        except (ValueError, DuplicateNodeError) as e:
+            self.validation_error = e
+
+        self.arrays = [_SharedArray(array, directory) for array in (
+            prepared.tree_index['child_index'], prepared.branch_lengths,
+            prepared._tip_indices, prepared._get_parents(),
+            prepared._get_tip_distances())]
+        self.tip_names = _SharedNames(
+            prepared.tree_index['name'][prepared._tip_indices].tolist(),
+            directory)
+
+    def attach(self):
+        (child_index, branch_lengths, tip_indices, parents,
+         tip_distances) = [array.attach() for array in self.arrays]
+        return PreparedTree._from_arrays(
+            child_index, branch_lengths, tip_indices, parents, tip_distances,
+            self.tip_names.attach(), self.validation_error)
+
+    def unlink(self):
+        for array in self.arrays:
+            array.unlink()
+        self.tip_names.unlink()
+
+
+_shared_types = (_SharedArray, _SharedSparse, _SharedNames, _SharedTree,
+                 _SharedPreparedTree)
+
+
+def _share(value, directory=None):
+    """Return a handle from which worker processes can attach to a value
+
+    Numeric arrays, sparse matrices, ``TreeNode`` and ``PreparedTree``
+    objects are stored in memory-mapped files and are pickled as the paths of
+    these files. Arrays, sparse matrices and prepared trees are attached
+    without copying their arrays, while a ``TreeNode`` is rebuilt from them.
+    Other values are returned as is. ``_unlink`` must be called on the handle
+    once workers no longer need to attach to it.
+
+    """
+    if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        return _SharedArray(value, directory)
+    if scipy.sparse.issparse(value):
+        return _SharedSparse(value, directory)
+    if isinstance(value, TreeNode):
+        return _SharedTree(value, directory)
+    if isinstance(value, PreparedTree):
+        return _SharedPreparedTree(value, directory)
+    return value
+
+
+def _attach(value):
+    """Return the value shared by a handle from ``_share``"""
+    if isinstance(value, _shared_types):
+        return value.attach()
+    return value
+
+
+def _unlink(value):
+    """Delete the files of a handle from ``_share``"""
+    if isinstance(value, _shared_types):
+        value.unlink()
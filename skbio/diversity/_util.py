@@ -9,9 +9,12 @@
 import collections
 
 import numpy as np
+import scipy.sparse
 
-from skbio.tree import DuplicateNodeError, MissingNodeError
-from skbio.diversity._phylogenetic import _nodes_by_counts
+from skbio.diversity._phylogenetic import _traverse_reduce
+from skbio.diversity._prepared_tree import (PreparedTree, _prepare_tree,
+                                            _validate_tree,
+                                            _validate_otu_ids_in_tree)
 
 
 def _validate_counts_vector(counts, suppress_cast=False):
@@ -34,6 +37,10 @@ def _validate_counts_vector(counts, suppress_cast=False):
 
 
 def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
+    if scipy.sparse.issparse(counts):
+        return _validate_sparse_counts_matrix(counts, ids=ids,
+                                              suppress_cast=suppress_cast)
+
     results = []
 
     # handle case of where counts is a single vector by making it a matrix.
@@ -52,6 +59,11 @@ def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
             "Number of rows in ``counts`` must be equal to number of provided "
             "``ids``.")
 
+    if counts.ndim == 2:
+        # rows are of equal length, so the whole matrix is validated at once
+        return _validate_counts_vector(counts.ravel(),
+                                       suppress_cast).reshape(counts.shape)
+
     lens = []
     for v in counts:
         results.append(_validate_counts_vector(v, suppress_cast))
@@ -62,62 +74,118 @@ def _validate_counts_matrix(counts, ids=None, suppress_cast=False):
     return np.asarray(results)
 
 
+def _validate_sparse_counts_matrix(counts, ids=None, suppress_cast=False):
+    """Validate and convert a scipy.sparse matrix to a canonical CSR matrix
+
+    The returned matrix has no duplicate or explicitly stored zero entries,
+    so the stored values of a row are exactly its nonzero counts. The counts
+    are never converted to a dense array.
+
+    """
+    counts = scipy.sparse.csr_matrix(counts, copy=True)
+
+    if ids is not None and counts.shape[0] != len(ids):
+        raise ValueError(
+            "Number of rows in ``counts`` must be equal to number of provided "
+            "``ids``.")
+
+    counts.sum_duplicates()
+    counts.eliminate_zeros()
+
+    if not suppress_cast:
+        counts.data = counts.data.astype(int, casting='safe', copy=False)
+
+    if (counts.data < 0).any():
+        raise ValueError("Counts vector cannot contain negative values.")
+
+    return counts
+
+
 def _validate_otu_ids_and_tree(counts, otu_ids, tree):
     len_otu_ids = len(otu_ids)
     set_otu_ids = set(otu_ids)
     if len_otu_ids != len(set_otu_ids):
         raise ValueError("``otu_ids`` cannot contain duplicated ids.")
 
-    if len(counts) != len_otu_ids:
+    # counts may be a single row of a sparse matrix, which has no length
+    len_counts = counts.shape[-1] if hasattr(counts, 'shape') else len(counts)
+    if len_counts != len_otu_ids:
         raise ValueError("``otu_ids`` must be the same length as ``counts`` "
                          "vector(s).")
 
-    if len(tree.root().children) == 0:
-        raise ValueError("``tree`` must contain more than just a root node.")
-
-    if len(tree.root().children) > 2:
-        # this is an imperfect check for whether the tree is rooted or not.
-        # can this be improved?
-        raise ValueError("``tree`` must be rooted.")
-
-    # all nodes (except the root node) have corresponding branch lengths
-    # all tip names in tree are unique
-    # all otu_ids correspond to tip names in tree
-    branch_lengths = []
-    tip_names = []
-    for e in tree.traverse():
-        if not e.is_root():
-            branch_lengths.append(e.length)
-        if e.is_tip():
-            tip_names.append(e.name)
-    set_tip_names = set(tip_names)
-    if len(tip_names) != len(set_tip_names):
-        raise DuplicateNodeError("All tip names must be unique.")
-    if np.array([l is None for l in branch_lengths]).any():
-        raise ValueError("All non-root nodes in ``tree`` must have a branch "
-                         "length.")
-    missing_tip_names = set_otu_ids - set_tip_names
-    if missing_tip_names != set():
-        n_missing_tip_names = len(missing_tip_names)
-        raise MissingNodeError("All ``otu_ids`` must be present as tip names "
-                               "in ``tree``. ``otu_ids`` not corresponding to "
-                               "tip names (n=%d): %s" %
-                               (n_missing_tip_names,
-                                " ".join(missing_tip_names)))
+    if isinstance(tree, PreparedTree):
+        tip_names = tree._validate()
+    else:
+        tip_names = _validate_tree(tree)
+    _validate_otu_ids_in_tree(otu_ids, tip_names)
 
 
 def _vectorize_counts_and_tree(counts, otu_ids, tree):
     """ Index tree and convert counts to np.array in corresponding order
+
+    ``tree`` may be a TreeNode or a PreparedTree. If ``counts`` is a
+    ``scipy.sparse`` matrix, the counts of each node are returned as a sparse
+    matrix storing only the nodes observed in each sample.
+
     """
-    tree_index = tree.to_array(nan_length_value=0.0)
+    tree = _prepare_tree(tree)
+    if scipy.sparse.issparse(counts):
+        counts = counts.tocoo()
+        rows, cols, data = counts.row, counts.col, counts.data
+    else:
+        counts = np.atleast_2d(counts)
+        rows, cols = np.nonzero(counts)
+        data = counts[rows, cols]
+
+    # only the OTUs observed in at least one sample are placed in the tree
     otu_ids = np.asarray(otu_ids)
-    counts = np.atleast_2d(counts)
-    counts_by_node = _nodes_by_counts(counts, otu_ids, tree_index)
-    branch_lengths = tree_index['length']
+    observed = np.unique(cols)
+    tip_rows = np.zeros(len(otu_ids), dtype=np.int64)
+    tip_rows[observed] = tree._tip_rows(otu_ids[observed])
+
+    # a row per node and a column per sample, with counts summed up the tree
+    if scipy.sparse.issparse(counts):
+        counts_by_node = _sparse_counts_by_node(tree, tip_rows[cols], rows,
+                                                data, counts.shape[0])
+    else:
+        counts_by_node = np.zeros((len(tree.branch_lengths), counts.shape[0]),
+                                  dtype=np.int64)
+        counts_by_node[tip_rows[cols], rows] = data
+        _traverse_reduce(tree.tree_index['child_index'], counts_by_node)
 
     # branch_lengths is just a reference to the array inside of tree_index,
     # but it's used so much that it's convenient to just pull it out here.
-    return counts_by_node.T, tree_index, branch_lengths
+    return counts_by_node.T, tree.tree_index, tree.branch_lengths
+
+
+def _sparse_counts_by_node(tree, tips, samples, data, n_samples):
+    """Sum sparse tip counts up the tree into a sparse nodes by samples matrix
+
+    Every observed tip is paired with itself and each of its ancestors in a
+    sparse matrix, which is multiplied with the counts of the observed tips.
+    Only the nodes ancestral to a tip observed in a sample are stored.
+
+    """
+    parents = tree._get_parents()
+    observed, tips = np.unique(tips, return_inverse=True)
+    tip_counts = scipy.sparse.csr_matrix(
+        (data.astype(np.int64), (tips, samples)),
+        shape=(len(observed), n_samples))
+
+    nodes, node_tips = [observed], [np.arange(len(observed))]
+    while len(nodes[-1]):
+        # the root is its own parent
+        parent = parents[nodes[-1]]
+        not_root = parent != nodes[-1]
+        nodes.append(parent[not_root])
+        node_tips.append(node_tips[-1][not_root])
+    nodes = np.concatenate(nodes)
+    ancestors = scipy.sparse.csr_matrix(
+        (np.ones(len(nodes), dtype=np.int64),
+         (nodes, np.concatenate(node_tips))),
+        shape=(len(tree.branch_lengths), len(observed)))
+
+    return ancestors.dot(tip_counts).tocsr()
 
 
 def _get_phylogenetic_kwargs(counts, **kwargs):
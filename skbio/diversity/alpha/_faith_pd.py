@@ -6,14 +6,15 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import numpy as np
+import scipy.sparse
+
 from skbio.util._decorator import experimental
 from skbio.diversity._util import (_validate_counts_vector,
-                                   _validate_otu_ids_and_tree,
-                                   _vectorize_counts_and_tree)
-
-
-def _faith_pd(counts_by_node, branch_lengths):
-    return (branch_lengths * (counts_by_node > 0)).sum()
+                                   _validate_counts_matrix,
+                                   _validate_otu_ids_and_tree)
+from skbio.diversity._prepared_tree import _prepare_tree
+from skbio.diversity._phylogenetic import _faith_pd_observed
 
 
 @experimental(as_of="0.4.1")
@@ -23,11 +24,12 @@ def faith_pd(counts, otu_ids, tree, validate=True):
     Parameters
     ----------
     counts : 1-D array_like, int
-        Vectors of counts/abundances of OTUs for one sample.
+        Vectors of counts/abundances of OTUs for one sample. May also be a
+        ``scipy.sparse`` matrix with a single row.
     otu_ids: list, np.array
         Vector of OTU ids corresponding to tip names in ``tree``. Must be the
         same length as ``counts``.
-    tree: skbio.TreeNode
+    tree: skbio.TreeNode or skbio.diversity.PreparedTree
         Tree relating the OTUs in otu_ids. The set of tip names in the tree can
         be a superset of ``otu_ids``, but not a subset.
     validate: bool, optional
@@ -74,8 +76,12 @@ def faith_pd(counts, otu_ids, tree, validate=True):
     are performed on a rooted tree and that all OTU IDs are present in the
     tree.
 
-    This implementation of Faith's PD is based on the array-based
-    implementation of UniFrac described in [2]_.
+    This implementation of Faith's PD uses the array representation of the
+    tree from the array-based implementation of UniFrac described in [2]_.
+    The branches covered by a sample are found by walking from its observed
+    tips toward the root, stopping at branches which have already been
+    counted, so the memory required is proportional to the number of nodes
+    in the tree plus the number of nonzero counts.
 
     References
     ----------
@@ -119,23 +125,52 @@ def faith_pd(counts, otu_ids, tree, validate=True):
     6.95
 
     """
-    counts_by_node, branch_lengths = _setup_faith_pd(
-        counts, otu_ids, tree, validate, single_sample=True)
+    if scipy.sparse.issparse(counts):
+        if counts.shape[0] != 1:
+            raise ValueError("Only 1-D vectors are supported.")
+        if validate:
+            counts = _validate_counts_matrix(counts)
+    elif validate:
+        counts = _validate_counts_vector(counts)
+    else:
+        counts = np.asarray(counts)
 
-    return _faith_pd(counts_by_node, branch_lengths)
+    if validate:
+        _validate_otu_ids_and_tree(counts, otu_ids, tree)
 
+    if not scipy.sparse.issparse(counts):
+        counts = counts[np.newaxis, :]
 
-def _setup_faith_pd(counts, otu_ids, tree, validate, single_sample):
-    if validate:
-        if single_sample:
-            # only validate count if operating in single sample mode, they
-            # will have already been validated otherwise
-            counts = _validate_counts_vector(counts)
-            _validate_otu_ids_and_tree(counts, otu_ids, tree)
-        else:
-            _validate_otu_ids_and_tree(counts[0], otu_ids, tree)
-
-    counts_by_node, tree_index, branch_lengths = \
-        _vectorize_counts_and_tree(counts, otu_ids, tree)
-
-    return counts_by_node, branch_lengths
+    return _faith_pd(counts, otu_ids, tree)[0]
+
+
+def _faith_pd(counts, otu_ids, tree):
+    """Compute Faith PD for each row of a dense or scipy.sparse counts matrix
+
+    Only the positions of the observed counts are gathered, so neither the
+    counts nor a nodes by samples matrix are made dense.
+
+    """
+    n_samples = counts.shape[0]
+    if scipy.sparse.issparse(counts):
+        counts = counts.tocsr()
+        observed = counts.data > 0
+        rows = np.repeat(np.arange(n_samples),
+                         np.diff(counts.indptr))[observed]
+        cols = counts.indices[observed]
+    else:
+        rows, cols = np.nonzero(counts > 0)
+
+    indptr = np.zeros(n_samples + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_samples), out=indptr[1:])
+
+    tree = _prepare_tree(tree)
+
+    # only look up the OTUs which are observed in at least one sample
+    otu_ids = np.asarray(otu_ids)
+    observed_otus = np.unique(cols)
+    tip_rows = np.zeros(len(otu_ids), dtype=np.int64)
+    tip_rows[observed_otus] = tree._tip_rows(otu_ids[observed_otus])
+
+    return _faith_pd_observed(indptr, tip_rows[cols], tree._get_parents(),
+                              tree.branch_lengths)
@@ -0,0 +1,169 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+from scipy.special import gammaln
+
+
+# Matrix versions of the alpha diversity metrics. Each function takes a 2-D
+# array of counts, where each row contains the counts of OTUs in a sample,
+# and computes the metric for every sample with reductions along axis 1. The
+# results match those of the corresponding function applied to each row,
+# including nan/inf for degenerate samples (e.g., samples without counts).
+# The counts are not validated.
+
+def _totals(counts):
+    return counts.sum(axis=1)
+
+
+def _freqs(counts):
+    return counts / counts.sum(axis=1, keepdims=True)
+
+
+def _observed_otus(counts):
+    return (counts != 0).sum(axis=1)
+
+
+def _singles(counts):
+    return (counts == 1).sum(axis=1)
+
+
+def _doubles(counts):
+    return (counts == 2).sum(axis=1)
+
+
+def _berger_parker_d(counts):
+    return counts.max(axis=1) / _totals(counts)
+
+
+def _brillouin_d(counts):
+    # gammaln(1) is zero, so unobserved OTUs do not contribute to the sum
+    n = _totals(counts)
+    return (gammaln(n + 1) - gammaln(counts + 1).sum(axis=1)) / n
+
+
+def _dominance(counts):
+    freqs = _freqs(counts)
+    return (freqs * freqs).sum(axis=1)
+
+
+def _enspie(counts):
+    return 1 / _dominance(counts)
+
+
+def _goods_coverage(counts):
+    return 1 - (_singles(counts) / _totals(counts))
+
+
+def _heip_e(counts):
+    return ((np.exp(_shannon(counts, base=np.e)) - 1) /
+            (_observed_otus(counts) - 1))
+
+
+def _kempton_taylor_q(counts, lower_quantile=0.25, upper_quantile=0.75):
+    n = counts.shape[1]
+    lower = int(np.ceil(n * lower_quantile))
+    upper = int(n * upper_quantile)
+    sorted_counts = np.sort(counts, axis=1)
+    return (upper - lower) / np.log(sorted_counts[:, upper] /
+                                    sorted_counts[:, lower])
+
+
+def _margalef(counts):
+    return (_observed_otus(counts) - 1) / np.log(_totals(counts))
+
+
+def _mcintosh_d(counts):
+    u = np.sqrt((counts * counts).sum(axis=1))
+    n = _totals(counts)
+    return (n - u) / (n - np.sqrt(n))
+
+
+def _mcintosh_e(counts):
+    numerator = np.sqrt((counts * counts).sum(axis=1))
+    n = _totals(counts)
+    s = _observed_otus(counts)
+    denominator = np.sqrt((n - s + 1) ** 2 + s - 1)
+    return numerator / denominator
+
+
+def _menhinick(counts):
+    return _observed_otus(counts) / np.sqrt(_totals(counts))
+
+
+def _pielou_e(counts):
+    return _shannon(counts, base=np.e) / np.log(_observed_otus(counts))
+
+
+def _robbins(counts):
+    return _singles(counts) / _totals(counts)
+
+
+def _shannon(counts, base=2):
+    freqs = _freqs(counts)
+    # only the nonzero frequencies contribute, as in shannon; the frequencies
+    # of a sample without counts are nan, which propagate to the result
+    nonzero = freqs != 0
+    logs = np.zeros_like(freqs)
+    np.log(freqs, out=logs, where=nonzero)
+    return -(freqs * logs).sum(axis=1) / np.log(base)
+
+
+def _simpson(counts):
+    return 1 - _dominance(counts)
+
+
+def _simpson_e(counts):
+    return _enspie(counts) / _observed_otus(counts)
+
+
+def _strong(counts):
+    n = _totals(counts)[:, np.newaxis]
+    s = _observed_otus(counts)[:, np.newaxis]
+    i = np.arange(1, counts.shape[1] + 1)
+    sorted_sum = np.sort(counts, axis=1)[:, ::-1].cumsum(axis=1)
+    return (sorted_sum / n - (i / s)).max(axis=1)
+
+
+def _chao1(counts, bias_corrected=True):
+    o = _observed_otus(counts)
+    s = _singles(counts)
+    d = _doubles(counts)
+    corrected = o + s * (s - 1) / (2 * (d + 1))
+    if bias_corrected:
+        return corrected
+
+    # the uncorrected form is only used where there are singletons and
+    # doubletons, so the division by zero elsewhere is discarded
+    with np.errstate(divide='ignore', invalid='ignore'):
+        uncorrected = o + s ** 2 / (d * 2)
+    return np.where((s != 0) & (d != 0), uncorrected, corrected)
+
+
+_vectorized_alpha_metrics = {
+    'berger_parker_d': _berger_parker_d,
+    'brillouin_d': _brillouin_d,
+    'chao1': _chao1,
+    'dominance': _dominance,
+    'doubles': _doubles,
+    'enspie': _enspie,
+    'goods_coverage': _goods_coverage,
+    'heip_e': _heip_e,
+    'kempton_taylor_q': _kempton_taylor_q,
+    'margalef': _margalef,
+    'mcintosh_d': _mcintosh_d,
+    'mcintosh_e': _mcintosh_e,
+    'menhinick': _menhinick,
+    'observed_otus': _observed_otus,
+    'pielou_e': _pielou_e,
+    'robbins': _robbins,
+    'shannon': _shannon,
+    'simpson': _simpson,
+    'simpson_e': _simpson_e,
+    'singles': _singles,
+    'strong': _strong}
@@ -12,11 +12,13 @@ import os
 
 import numpy as np
 import pandas as pd
+import scipy.sparse
 
 from skbio import TreeNode
 from skbio.util import get_data_path
 from skbio.tree import DuplicateNodeError, MissingNodeError
 from skbio.diversity.alpha import faith_pd
+from skbio.diversity.alpha._faith_pd import _faith_pd
 
 
 class FaithPDTests(TestCase):
@@ -75,6 +77,42 @@ class FaithPDTests(TestCase):
         expected = 4.75
         self.assertAlmostEqual(actual, expected)
 
+    def test_faith_pd_sparse(self):
+        for counts in self.b1:
+            exp = faith_pd(counts, self.oids1, self.t1)
+            obs = faith_pd(scipy.sparse.csr_matrix(counts), self.oids1,
+                           self.t1)
+            self.assertAlmostEqual(obs, exp)
+
+        obs = faith_pd(scipy.sparse.csr_matrix([[0, 0, 0, 0, 0]]),
+                       self.oids1, self.t1)
+        self.assertAlmostEqual(obs, 0.0)
+
+        with self.assertRaisesRegex(ValueError, '1-D'):
+            faith_pd(scipy.sparse.csr_matrix(self.b1), self.oids1, self.t1)
+
+    def test_faith_pd_many_samples(self):
+        counts = np.vstack([self.b1, [0, 0, 0, 0, 0], [0, 0, 0, 0, 9]])
+        tree = self.t1_w_extra_tips.copy()
+        tree.length = 0.125
+
+        # the branches on the paths from each observed tip to the root
+        expected = []
+        for row in counts:
+            nodes = set()
+            for otu_id in np.asarray(self.oids1)[row > 0]:
+                nodes.update(id(n) for n in
+                             tree.find(otu_id).ancestors())
+                nodes.add(id(tree.find(otu_id)))
+            expected.append(sum(n.length for n in tree.traverse()
+                                if id(n) in nodes))
+
+        np.testing.assert_almost_equal(
+            _faith_pd(counts, self.oids1, tree), expected)
+        np.testing.assert_almost_equal(
+            _faith_pd(scipy.sparse.csr_matrix(counts), self.oids1, tree),
+            expected)
+
     def test_faith_pd_extra_tips(self):
         # results are the same despite presences of unobserved tips in tree
         actual = faith_pd(self.b1[0], self.oids1, self.t1_w_extra_tips)
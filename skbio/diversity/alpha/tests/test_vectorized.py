@@ -0,0 +1,63 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import TestCase, main
+import warnings
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio.diversity import alpha
+from skbio.diversity.alpha._vectorized import _vectorized_alpha_metrics
+
+
+class VectorizedAlphaMetricsTests(TestCase):
+
+    def setUp(self):
+        self.counts = np.array([[0, 1, 1, 4, 2, 5, 2, 4, 1, 2],
+                                [1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                                [9, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                                [2, 2, 0, 3, 0, 1, 0, 0, 0, 7],
+                                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+                                [5, 3, 1, 8, 2, 2, 1, 13, 1, 1]])
+
+    def assert_matches_per_sample(self, metric, counts, **kwargs):
+        f = getattr(alpha, metric)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            exp = np.array([f(c, **kwargs) for c in counts])
+            obs = _vectorized_alpha_metrics[metric](counts, **kwargs)
+        self.assertEqual(obs.shape, (counts.shape[0],))
+        npt.assert_almost_equal(obs, exp, err_msg=metric)
+
+    def test_all_metrics(self):
+        for metric in _vectorized_alpha_metrics:
+            self.assert_matches_per_sample(metric, self.counts)
+
+    def test_single_sample(self):
+        for metric in _vectorized_alpha_metrics:
+            self.assert_matches_per_sample(metric, self.counts[:1])
+
+    def test_kwargs(self):
+        self.assert_matches_per_sample('shannon', self.counts, base=np.e)
+        self.assert_matches_per_sample('shannon', self.counts, base=10)
+        self.assert_matches_per_sample('chao1', self.counts,
+                                       bias_corrected=False)
+        self.assert_matches_per_sample('kempton_taylor_q',
+                                       self.counts[[0, 1, 5]],
+                                       lower_quantile=0.3,
+                                       upper_quantile=0.6)
+
+    def test_integer_results(self):
+        for metric in 'observed_otus', 'singles', 'doubles':
+            obs = _vectorized_alpha_metrics[metric](self.counts)
+            self.assertTrue(np.issubdtype(obs.dtype, np.integer))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+import scipy.sparse
+
+
+# Each metric is computed from summaries of the two samples ``u`` and ``v``
+# (where ``v`` holds every subsequent sample at once), and from terms summed
+# over the OTUs observed in both samples.
+
+def _braycurtis(u, v, shared):
+    sums = u['total'] + v['total']
+    return (sums - 2 * shared['min']) / sums
+
+
+def _cityblock(u, v, shared):
+    return u['total'] + v['total'] - 2 * shared['min']
+
+
+def _sqeuclidean(u, v, shared):
+    # clip small negative values arising from cancellation
+    return np.maximum(u['norm'] ** 2 + v['norm'] ** 2 - 2 * shared['dot'],
+                      0.0)
+
+
+def _euclidean(u, v, shared):
+    return np.sqrt(_sqeuclidean(u, v, shared))
+
+
+def _cosine(u, v, shared):
+    return 1.0 - shared['dot'] / (u['norm'] * v['norm'])
+
+
+def _jaccard(u, v, shared):
+    # as in scipy, the proportion of the positions observed in either vector
+    # in which the vectors differ
+    union = u['nnz'] + v['nnz'] - shared['nnz']
+    return (union - shared['equal']) / union
+
+
+_sparse_pdist_metrics = {
+    'braycurtis': _braycurtis,
+    'cityblock': _cityblock,
+    'cosine': _cosine,
+    'euclidean': _euclidean,
+    'jaccard': _jaccard,
+    'sqeuclidean': _sqeuclidean}
+
+
+def _shared_terms(u_values, v_values, rows, n, first):
+    """Sum terms over the OTUs shared between a sample and the other samples
+
+    ``u_values`` and ``v_values`` are aligned entries for OTUs observed in
+    both samples, and ``rows`` is the sample of each entry of ``v_values``.
+    Only the sums for samples ``first`` onwards are returned.
+
+    """
+    def pairwise_sum(weights):
+        return np.bincount(rows, weights, minlength=n)[first:]
+
+    return {'min': pairwise_sum(np.minimum(u_values, v_values)),
+            'dot': pairwise_sum(u_values * v_values),
+            'equal': pairwise_sum(u_values == v_values),
+            'nnz': pairwise_sum(None)}
+
+
+def _sparse_pdist(counts, metric):
+    """Compute pairwise distances between the rows of a sparse matrix
+
+    Parameters
+    ----------
+    counts : scipy.sparse.csr_matrix
+        Matrix containing count/abundance data where each row contains counts
+        of OTUs in a given sample. Must not contain negative values, duplicate
+        entries or explicitly stored zeros.
+    metric : str
+        The name of the metric, one of the keys of ``_sparse_pdist_metrics``.
+        Metrics follow the definitions of ``scipy.spatial.distance.pdist``.
+
+    Returns
+    -------
+    1D np.ndarray of float
+        The condensed form of the distance matrix.
+
+    Raises
+    ------
+    ValueError
+        If ``metric`` is not supported for sparse input.
+
+    Notes
+    -----
+    The matrix is never converted to a dense array. Each sample is compared
+    against all subsequent samples at once by selecting, from a copy of
+    ``counts`` in compressed sparse column format, only the OTUs observed in
+    the sample. The work per sample is therefore proportional to the number
+    of nonzero entries in the OTUs it shares with other samples.
+
+    """
+    try:
+        f = _sparse_pdist_metrics[metric]
+    except (KeyError, TypeError):
+        raise ValueError("Metric %r is not supported for scipy.sparse input. "
+                         "Supported metrics are: %s." %
+                         (metric, ', '.join(sorted(_sparse_pdist_metrics))))
+
+    counts = scipy.sparse.csr_matrix(counts, dtype=float)
+    n = counts.shape[0]
+    summaries = {
+        'total': np.asarray(counts.sum(axis=1)).ravel(),
+        'norm': np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1))
+                        .ravel()),
+        'nnz': np.diff(counts.indptr)}
+    by_otu = counts.tocsc()
+
+    distances = np.empty(n * (n - 1) // 2)
+    pos = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(n - 1):
+            start, end = counts.indptr[i], counts.indptr[i + 1]
+            sub = by_otu[:, counts.indices[start:end]]
+
+            # the value in sample i aligned with each entry of the submatrix
+            u_values = np.repeat(counts.data[start:end], np.diff(sub.indptr))
+            shared = _shared_terms(u_values, sub.data, sub.indices, n, i + 1)
+            u = {k: v[i] for k, v in summaries.items()}
+            v = {k: v[i + 1:] for k, v in summaries.items()}
+
+            distances[pos:pos + n - i - 1] = f(u, v, shared)
+            pos += n - i - 1
+
+    return distances
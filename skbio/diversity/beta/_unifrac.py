@@ -9,12 +9,14 @@
 import functools
 
 import numpy as np
+import scipy.sparse
 
 from skbio.util._decorator import experimental
 from skbio.diversity._util import (_validate_counts_matrix,
                                    _validate_otu_ids_and_tree,
                                    _vectorize_counts_and_tree)
-from skbio.diversity._phylogenetic import _tip_distances
+from skbio.diversity._prepared_tree import _prepare_tree
+from skbio.diversity._phylogenetic import _unifrac_stripes
 
 
 # The default value indicating whether normalization should be applied
@@ -36,7 +38,7 @@ def unweighted_unifrac(u_counts, v_counts, otu_ids, tree, validate=True):
     otu_ids: list, np.array
         Vector of OTU ids corresponding to tip names in ``tree``. Must be the
         same length as ``u_counts`` and ``v_counts``.
-    tree: skbio.TreeNode
+    tree: skbio.TreeNode or skbio.diversity.PreparedTree
         Tree relating the OTUs in otu_ids. The set of tip names in the tree can
         be a superset of ``otu_ids``, but not a subset.
     validate: bool, optional
@@ -163,7 +165,7 @@ def weighted_unifrac(u_counts, v_counts, otu_ids, tree,
     otu_ids: list, np.array
         Vector of OTU ids corresponding to tip names in ``tree``. Must be the
         same length as ``u_counts`` and ``v_counts``.
-    tree: skbio.TreeNode
+    tree: skbio.TreeNode or skbio.diversity.PreparedTree
         Tree relating the OTUs in otu_ids. The set of tip names in the tree can
         be a superset of ``otu_ids``, but not a subset.
     normalized: boolean, optional
@@ -276,15 +278,14 @@ def weighted_unifrac(u_counts, v_counts, otu_ids, tree,
     0.33
 
     """
+    tree = _prepare_tree(tree)
     u_node_counts, v_node_counts, u_total_count, v_total_count, tree_index =\
         _setup_pairwise_unifrac(u_counts, v_counts, otu_ids, tree, validate,
                                 normalized=normalized, unweighted=False)
     branch_lengths = tree_index['length']
 
     if normalized:
-        tip_indices = _get_tip_indices(tree_index)
-        node_to_root_distances = _tip_distances(branch_lengths, tree,
-                                                tip_indices)
+        node_to_root_distances = tree._get_tip_distances()
         return _weighted_unifrac_normalized(u_node_counts, v_node_counts,
                                             u_total_count, v_total_count,
                                             branch_lengths,
@@ -450,6 +451,9 @@ def _setup_multiple_unifrac(counts, otu_ids, tree, validate):
 
     counts_by_node, tree_index, branch_lengths = \
         _vectorize_counts_and_tree(counts, otu_ids, tree)
+    # the pairwise functions take the dense counts of each sample's nodes
+    if scipy.sparse.issparse(counts_by_node):
+        counts_by_node = counts_by_node.toarray()
 
     return counts_by_node, tree_index, branch_lengths
 
@@ -517,13 +521,13 @@ def _setup_multiple_weighted_unifrac(counts, otu_ids, tree, normalized,
         Counts of all nodes in ``tree``.
 
     """
+    tree = _prepare_tree(tree)
     counts_by_node, tree_index, branch_lengths = \
         _setup_multiple_unifrac(counts, otu_ids, tree, validate)
-    tip_indices = _get_tip_indices(tree_index)
+    tip_indices = tree._tip_indices
 
     if normalized:
-        node_to_root_distances = _tip_distances(branch_lengths, tree,
-                                                tip_indices)
+        node_to_root_distances = tree._get_tip_distances()
 
         def f(u_node_counts, v_node_counts):
             u_total_count = np.take(u_node_counts, tip_indices).sum()
@@ -545,10 +549,134 @@ def _setup_multiple_weighted_unifrac(counts, otu_ids, tree, normalized,
     return f, counts_by_node
 
 
-def _get_tip_indices(tree_index):
-    tip_indices = np.array([n.id for n in tree_index['id_index'].values()
-                            if n.is_tip()])
-    return tip_indices
+def _stripes_to_condensed(stripes):
+    """Unpack all-pairs stripes into a condensed distance vector
+
+    Parameters
+    ----------
+    stripes : 2D np.ndarray
+        Stripes as computed by ``_unifrac_stripes``, where ``stripes[s, k]``
+        relates sample ``k`` to sample ``(k + s + 1) % n``.
+
+    Returns
+    -------
+    1D np.ndarray
+        The values ordered as the condensed form defined by
+        ``scipy.spatial.distance.squareform``, of the same dtype as
+        ``stripes``.
+    """
+    n_stripes, n = stripes.shape
+    condensed = np.empty(n * (n - 1) // 2, dtype=stripes.dtype)
+    k = np.arange(n)
+
+    for s in range(n_stripes):
+        offset = s + 1
+        if 2 * offset == n:
+            # the second half of this stripe repeats the first half
+            i, j = k[:offset], k[:offset] + offset
+            values = stripes[s, :offset]
+        else:
+            i, j = k, (k + offset) % n
+            values = stripes[s]
+        lo = np.minimum(i, j)
+        hi = np.maximum(i, j)
+        condensed[n * lo - (lo * (lo + 1)) // 2 + (hi - lo - 1)] = values
+
+    return condensed
+
+
+def _unifrac_all_pairs(counts, otu_ids, tree, validate, weighted,
+                       normalized=_normalize_weighted_unifrac_by_default,
+                       dtype=np.float64):
+    """Compute UniFrac between all pairs of samples in a single tree pass
+
+    Parameters
+    ----------
+    counts : 2D np.array of ints or floats, or scipy.sparse matrix
+        Matrix containing count/abundance data where each row contains counts
+        of observations in a given sample.
+    otu_ids: list, np.array
+        Vector of OTU ids corresponding to tip names in ``tree``.
+    tree: skbio.TreeNode
+        Tree relating the OTUs in otu_ids.
+    validate: bool
+        If `False`, validation of the input won't be performed.
+    weighted : bool
+        Whether to compute weighted or unweighted UniFrac.
+    normalized : bool, optional
+        Whether weighted UniFrac is normalized. Ignored if not ``weighted``.
+    dtype : {np.float64, np.float32}, optional
+        The floating point type used for the per-node values and the
+        accumulated stripes. ``np.float32`` halves the memory required at the
+        cost of precision.
+
+    Returns
+    -------
+    1D np.array of float
+        The condensed form of the distance matrix.
+
+    Raises
+    ------
+    ValueError
+        If ``dtype`` is not ``np.float32`` or ``np.float64``.
+
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("``dtype`` must be float32 or float64, not %s."
+                         % dtype)
+
+    if not scipy.sparse.issparse(counts):
+        counts = np.asarray(counts)
+    tree = _prepare_tree(tree)
+    if validate:
+        _validate_otu_ids_and_tree(counts[0], otu_ids, tree)
+    counts_by_node, tree_index, branch_lengths = \
+        _vectorize_counts_and_tree(counts, otu_ids, tree)
+
+    # counts_by_node is a transposed view of a nodes by samples array, which
+    # is sparse for sparse counts. Only the nodes observed in at least one
+    # sample contribute to any distance, and only these are made dense.
+    node_counts = counts_by_node.T
+    if scipy.sparse.issparse(node_counts):
+        keep = np.flatnonzero(node_counts.getnnz(axis=1))
+        node_counts = node_counts[keep].toarray()
+    else:
+        keep = np.flatnonzero(node_counts.any(axis=1))
+        node_counts = node_counts[keep]
+    lengths = np.ascontiguousarray(branch_lengths[keep], dtype=dtype)
+
+    if weighted:
+        totals = np.asarray(counts.sum(axis=1)).ravel()
+        scale = np.where(totals > 0, totals, 1)
+        node_values = np.ascontiguousarray(node_counts / scale, dtype=dtype)
+    else:
+        node_values = np.ascontiguousarray(node_counts > 0, dtype=dtype)
+
+    if weighted and normalized:
+        node_to_root_distances = tree._get_tip_distances()
+        correction = np.ascontiguousarray(node_to_root_distances[keep],
+                                          dtype=dtype)
+    else:
+        correction = np.array([], dtype=dtype)
+
+    num, den = _unifrac_stripes(node_values, lengths, correction,
+                                not weighted)
+    num = _stripes_to_condensed(num).astype(float)
+
+    if weighted and not normalized:
+        return num
+
+    # the denominator is only zero if neither sample was observed
+    den = _stripes_to_condensed(den).astype(float)
+    empty = den == 0.0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distances = num / den
+    # handle special case to avoid division by zero
+    distances[empty] = 0.0
+
+    return distances
 
 
 def _weighted_unifrac_branch_correction(node_to_root_distances,
@@ -0,0 +1,57 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+from unittest import main, TestCase
+
+import numpy as np
+import numpy.testing as npt
+import scipy.sparse
+from scipy.spatial.distance import pdist
+
+from skbio.diversity.beta._sparse import _sparse_pdist, _sparse_pdist_metrics
+
+
+class SparsePdistTests(TestCase):
+
+    def setUp(self):
+        self.counts = np.array([[1, 3, 0, 1, 0],
+                                [0, 2, 0, 4, 4],
+                                [0, 0, 6, 2, 1],
+                                [0, 0, 1, 1, 1],
+                                [5, 3, 5, 0, 0],
+                                [0, 0, 0, 3, 5]])
+
+    def test_matches_pdist(self):
+        sparse = scipy.sparse.csr_matrix(self.counts)
+        for metric in _sparse_pdist_metrics:
+            exp = pdist(self.counts, metric)
+            obs = _sparse_pdist(sparse, metric)
+            npt.assert_almost_equal(obs, exp, err_msg=metric)
+
+    def test_no_shared_otus(self):
+        counts = np.array([[1, 0, 0], [0, 2, 0], [0, 0, 3]])
+        sparse = scipy.sparse.csr_matrix(counts)
+        for metric in _sparse_pdist_metrics:
+            exp = pdist(counts, metric)
+            obs = _sparse_pdist(sparse, metric)
+            npt.assert_almost_equal(obs, exp, err_msg=metric)
+
+    def test_single_sample(self):
+        sparse = scipy.sparse.csr_matrix([[1, 2, 3]])
+        npt.assert_equal(_sparse_pdist(sparse, 'braycurtis'), np.array([]))
+
+    def test_unsupported_metric(self):
+        sparse = scipy.sparse.csr_matrix(self.counts)
+        with self.assertRaisesRegex(ValueError, 'braycurtis, cityblock'):
+            _sparse_pdist(sparse, 'canberra')
+        with self.assertRaisesRegex(ValueError, 'not supported'):
+            _sparse_pdist(sparse, pdist)
+
+
+if __name__ == '__main__':
+    main()
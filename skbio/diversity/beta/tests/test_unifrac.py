@@ -10,13 +10,16 @@ from io import StringIO
 from unittest import main, TestCase
 
 import numpy as np
+import numpy.testing as npt
 
 from skbio import TreeNode
 from skbio.tree import DuplicateNodeError, MissingNodeError
 from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
 from skbio.diversity.beta._unifrac import (_unweighted_unifrac,
                                            _weighted_unifrac,
-                                           _weighted_unifrac_branch_correction)
+                                           _weighted_unifrac_branch_correction,
+                                           _unifrac_all_pairs,
+                                           _stripes_to_condensed)
 
 
 class UnifracTests(TestCase):
@@ -683,6 +686,54 @@ class UnifracTests(TestCase):
         self.assertAlmostEqual(
             _weighted_unifrac(m[:, 1], m[:, 2], m1s, m2s, bl)[0], 4.5)
 
+    def _pairwise_condensed(self, metric, counts, **kwargs):
+        n = len(counts)
+        return np.array([metric(counts[i], counts[j], self.oids1, self.t1,
+                                **kwargs)
+                         for i in range(n) for j in range(i + 1, n)])
+
+    def test_unifrac_all_pairs(self):
+        # include a sample with no counts
+        counts = np.vstack([self.b1, np.zeros(5, dtype=int)])
+        for n in range(1, len(counts) + 1):
+            sub = counts[:n]
+            exp = self._pairwise_condensed(unweighted_unifrac, sub)
+            obs = _unifrac_all_pairs(sub, self.oids1, self.t1, True,
+                                     weighted=False)
+            npt.assert_almost_equal(obs, exp)
+
+            for normalized in (True, False):
+                exp = self._pairwise_condensed(weighted_unifrac, sub,
+                                               normalized=normalized)
+                obs = _unifrac_all_pairs(sub, self.oids1, self.t1, True,
+                                         weighted=True, normalized=normalized)
+                npt.assert_almost_equal(obs, exp)
+
+    def test_unifrac_all_pairs_float32(self):
+        for weighted in (True, False):
+            exp = _unifrac_all_pairs(self.b1, self.oids1, self.t1, True,
+                                     weighted=weighted)
+            obs = _unifrac_all_pairs(self.b1, self.oids1, self.t1, True,
+                                     weighted=weighted, dtype=np.float32)
+            self.assertEqual(obs.dtype, np.float64)
+            npt.assert_almost_equal(obs, exp, decimal=5)
+
+    def test_unifrac_all_pairs_invalid_dtype(self):
+        with self.assertRaisesRegex(ValueError, 'float32 or float64'):
+            _unifrac_all_pairs(self.b1, self.oids1, self.t1, True,
+                               weighted=False, dtype=np.int64)
+
+    def test_stripes_to_condensed(self):
+        # stripe s relates sample k to sample (k + s + 1) % n
+        for n in (2, 3, 4, 5):
+            exp = np.array([float(i * 10 + j) for i in range(n)
+                            for j in range(i + 1, n)])
+            stripes = np.array([[float(min(k, (k + s + 1) % n) * 10 +
+                                       max(k, (k + s + 1) % n))
+                                 for k in range(n)]
+                                for s in range(n // 2)])
+            npt.assert_equal(_stripes_to_condensed(stripes), exp)
+
 
 if __name__ == '__main__':
     main()
@@ -10,12 +10,14 @@ from unittest import TestCase, main
 
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse
 
 from skbio import TreeNode, DistanceMatrix
-from skbio.diversity import beta_diversity, block_beta_diversity
+from skbio.diversity import (beta_diversity, block_beta_diversity,
+                             PreparedTree)
 from skbio.diversity._block import (_block_party, _generate_id_blocks,
                                     _pairs_to_compute, _block_compute,
-                                    _block_kwargs, _map, _reduce)
+                                    _block_kwargs, _map, _pool_map, _reduce)
 
 
 class ParallelBetaDiversity(TestCase):
@@ -93,6 +95,50 @@ class ParallelBetaDiversity(TestCase):
         obs = list(_map(func, kwargs))
         self.assertEqual(obs, exp)
 
+    def test_pool_map_thread(self):
+        kwargs = [{'a': 0, 'b': 1, 'c': 4},
+                  {'a': 2, 'b': 3}]
+        exp = [5, 5]
+        obs = list(_pool_map(_add_kwargs, kwargs, n_jobs=2,
+                             backend='thread'))
+        self.assertEqual(sorted(obs), exp)
+
+    def test_pool_map_process(self):
+        kwargs = [{'a': 0, 'b': 1, 'counts': 0},
+                  {'a': 2, 'b': 3, 'counts': 0},
+                  {'a': 4, 'b': 5, 'counts': 0}]
+        exp = [1, 5, 9]
+        for share in (True, False):
+            obs = list(_pool_map(_add_kwargs, kwargs, n_jobs=2,
+                                 backend='process', share=share))
+            self.assertEqual(sorted(obs), exp)
+
+    def test_pool_map_process_deep_tree(self):
+        # the tree is deeper than the recursion limit, so that it could not
+        # be pickled
+        tree = TreeNode(name='0')
+        node = tree
+        for i in range(1, 5000):
+            child = TreeNode(name=str(i))
+            node.append(child)
+            node = child
+        kwargs = [{'a': 0, 'b': 1, 'tree': tree},
+                  {'a': 2, 'b': 3, 'tree': tree}]
+        obs = list(_pool_map(_count_tips, kwargs, n_jobs=2,
+                             backend='process'))
+        self.assertEqual(sorted(obs), [2, 6])
+
+    def test_pool_map_empty(self):
+        for backend in ('thread', 'process'):
+            obs = list(_pool_map(_add_kwargs, [], n_jobs=2, backend=backend))
+            self.assertEqual(obs, [])
+
+    def test_pool_map_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'backend'):
+            list(_pool_map(_add_kwargs, [{'a': 1, 'b': 2}], backend='foo'))
+        with self.assertRaisesRegex(ValueError, 'n_jobs'):
+            list(_pool_map(_add_kwargs, [{'a': 1, 'b': 2}], n_jobs=0))
+
     def test_reduce(self):
         dm1 = DistanceMatrix(np.array([[0, 0, 44],
                                        [0, 0, 60],
@@ -114,6 +160,41 @@ class ParallelBetaDiversity(TestCase):
         npt.assert_equal(obs.data, exp.data)
         self.assertEqual(obs.ids, exp.ids)
 
+    def test_reduce_streaming(self):
+        dm1 = DistanceMatrix(np.array([[0, 0, 44],
+                                       [0, 0, 60],
+                                       [44, 60, 0]]), (2, 3, 4))
+        dm2 = DistanceMatrix(np.array([[0, 123],
+                                       [123, 0]]), (5, 1))
+        dm3 = DistanceMatrix(np.array([[0, 1, 2, 3],
+                                       [1, 0, 4, 5],
+                                       [2, 4, 0, 6],
+                                       [3, 5, 6, 0]]), (0, 3, 4, 5))
+        dm4 = DistanceMatrix(np.array([[0]]), (2, ))
+        exp = DistanceMatrix(np.array([[0, 0, 0, 1, 2, 3],
+                                       [0, 0, 0, 0, 0, 123],
+                                       [0, 0, 0, 0, 44, 0],
+                                       [1, 0, 0, 0, 64, 5],
+                                       [2, 0, 44, 64, 0, 6],
+                                       [3, 123, 0, 5, 6, 0]]), list(range(6)))
+
+        # blocks are consumed from a generator without being retained
+        obs = _reduce(iter([dm1, dm2, dm3, dm4]), n=6)
+        npt.assert_equal(obs.data, exp.data)
+        self.assertEqual(obs.ids, exp.ids)
+
+        out = np.zeros(15)
+        obs = _reduce(iter([dm1, dm2, dm3, dm4]), out=out, condensed=True)
+        npt.assert_equal(obs.data, exp.data)
+        npt.assert_equal(out, exp.condensed_form())
+        # the result is stored in `out`, without a redundant copy
+        self.assertIs(obs.condensed_form(), out)
+
+    def test_reduce_bad_out(self):
+        dm = DistanceMatrix(np.array([[0, 1], [1, 0]]), (0, 1))
+        with self.assertRaisesRegex(ValueError, 'length 3'):
+            _reduce([dm], n=3, out=np.zeros(4))
+
     def test_block_beta_diversity(self):
         exp = beta_diversity('unweighted_unifrac', self.table1, self.sids1,
                              tree=self.tree1, otu_ids=self.oids1)
@@ -122,6 +203,55 @@ class ParallelBetaDiversity(TestCase):
                                    tree=self.tree1, k=2)
         npt.assert_equal(obs.data, exp.data)
         self.assertEqual(obs.ids, exp.ids)
+        # the redundant form is stored unless the condensed form is requested
+        self.assertNotIn('(condensed)', str(obs))
+
+        obs = block_beta_diversity('unweighted_unifrac', self.table1,
+                                   self.sids1, otu_ids=self.oids1,
+                                   tree=self.tree1, k=2, condensed=True)
+        self.assertIn('(condensed)', str(obs))
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+        self.assertEqual(obs.ids, exp.ids)
+
+    def test_block_beta_diversity_parallel(self):
+        table = np.array([[1, 5, 0, 3],
+                          [2, 3, 0, 0],
+                          [0, 1, 4, 1],
+                          [3, 0, 2, 2],
+                          [0, 0, 9, 1]])
+        sids = list('ABCDE')
+        tree = TreeNode.read([
+            '(((O1:0.25, O2:0.50):0.25, O3:0.75):0.5, O4:1.0)root;'])
+        oids = ['O1', 'O2', 'O3', 'O4']
+        exp = beta_diversity('weighted_unifrac', table, sids, tree=tree,
+                             otu_ids=oids)
+        for backend in ('thread', 'process'):
+            obs = block_beta_diversity('weighted_unifrac', table, sids,
+                                       otu_ids=oids, tree=tree, k=2,
+                                       n_jobs=2, backend=backend)
+            npt.assert_almost_equal(obs.data, exp.data)
+            self.assertEqual(obs.ids, exp.ids)
+
+    def test_block_beta_diversity_parallel_sparse(self):
+        table = np.array([[1, 5, 0, 3],
+                          [2, 3, 0, 0],
+                          [0, 1, 4, 1],
+                          [3, 0, 2, 2],
+                          [0, 0, 9, 1]])
+        sids = list('ABCDE')
+        tree = TreeNode.read([
+            '(((O1:0.25, O2:0.50):0.25, O3:0.75):0.5, O4:1.0)root;'])
+        oids = ['O1', 'O2', 'O3', 'O4']
+        for metric, t in (('unweighted_unifrac', tree),
+                          ('weighted_unifrac', tree),
+                          ('weighted_unifrac', PreparedTree(tree))):
+            exp = beta_diversity(metric, table, sids, tree=tree,
+                                 otu_ids=oids)
+            obs = block_beta_diversity(metric, scipy.sparse.csr_matrix(table),
+                                       sids, otu_ids=oids, tree=t, k=2,
+                                       n_jobs=2, backend='process')
+            npt.assert_almost_equal(obs.data, exp.data)
+            self.assertEqual(obs.ids, exp.ids)
 
     def test_generate_id_blocks(self):
         ids = [1, 2, 3, 4, 5]
@@ -203,5 +333,14 @@ class ParallelBetaDiversity(TestCase):
             _pairs_to_compute(rids, cids)
 
 
+# defined at the module level so that it can be pickled for a process pool
+def _add_kwargs(a, b, c=0, counts=0):
+    return a + b + c + counts
+
+
+def _count_tips(a, b, tree):
+    return a + b + len(list(tree.tips()))
+
+
 if __name__ == "__main__":
     main()
@@ -12,6 +12,8 @@ from unittest import TestCase, main
 import pandas as pd
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse
+import scipy.spatial.distance
 
 from skbio import DistanceMatrix, TreeNode
 from skbio.util._testing import assert_series_almost_equal
@@ -19,6 +21,7 @@ from skbio.diversity import (alpha_diversity, beta_diversity,
                              partial_beta_diversity,
                              get_alpha_diversity_metrics,
                              get_beta_diversity_metrics)
+from skbio.diversity import alpha
 from skbio.diversity.alpha import faith_pd, observed_otus
 from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
 from skbio.tree import DuplicateNodeError, MissingNodeError
@@ -262,6 +265,76 @@ class AlphaDiversityTests(TestCase):
                                       otu_ids=self.oids1)
         assert_series_almost_equal(optimized, unoptimized)
 
+    def test_vectorized(self):
+        # metrics computed for all samples at once give the same results as
+        # calling the metric on each sample
+        for metric, kwargs in [('shannon', {}), ('shannon', {'base': 10}),
+                               ('simpson', {}), ('chao1', {}),
+                               ('chao1', {'bias_corrected': False}),
+                               ('pielou_e', {}), ('strong', {})]:
+            f = getattr(alpha, metric)
+            expected = pd.Series([f(c, **kwargs) for c in self.table1],
+                                 index=self.sids1)
+            actual = alpha_diversity(metric, self.table1, ids=self.sids1,
+                                     **kwargs)
+            assert_series_almost_equal(actual, expected)
+
+        # a single vector of counts
+        actual = alpha_diversity('shannon', [1, 2, 0, 4])
+        expected = pd.Series([alpha.shannon([1, 2, 0, 4])])
+        assert_series_almost_equal(actual, expected)
+
+
+class SparseAlphaDiversityTests(TestCase):
+    def setUp(self):
+        self.table1 = np.array([[1, 3, 0, 1, 0],
+                                [0, 2, 0, 4, 4],
+                                [0, 0, 6, 2, 1],
+                                [0, 0, 1, 1, 1],
+                                [0, 0, 0, 0, 0]])
+        self.sids1 = list('ABCDE')
+        self.oids1 = ['OTU%d' % i for i in range(1, 6)]
+        self.tree1 = TreeNode.read(io.StringIO(
+            '(((((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0):'
+            '0.0,(OTU4:0.75,OTU5:0.75):1.25):0.0)root;'))
+
+    def test_sparse_matches_dense(self):
+        sparse = scipy.sparse.csr_matrix(self.table1)
+        for metric in ('observed_otus', 'shannon', 'simpson', 'dominance',
+                       'goods_coverage', 'singles', 'doubles', 'strong',
+                       'mcintosh_d'):
+            exp = alpha_diversity(metric, self.table1[:4], self.sids1[:4])
+            obs = alpha_diversity(metric, sparse[:4], self.sids1[:4])
+            assert_series_almost_equal(obs, exp)
+
+    def test_sparse_callable(self):
+        sparse = scipy.sparse.csr_matrix(self.table1)
+        exp = alpha_diversity(observed_otus, self.table1, self.sids1)
+        obs = alpha_diversity(observed_otus, sparse, self.sids1)
+        assert_series_almost_equal(obs, exp)
+
+    def test_sparse_faith_pd(self):
+        for fmt in ('csr', 'coo', 'csc'):
+            sparse = scipy.sparse.csr_matrix(self.table1).asformat(fmt)
+            exp = alpha_diversity('faith_pd', self.table1, self.sids1,
+                                  otu_ids=self.oids1, tree=self.tree1)
+            obs = alpha_diversity('faith_pd', sparse, self.sids1,
+                                  otu_ids=self.oids1, tree=self.tree1)
+            assert_series_almost_equal(obs, exp)
+
+    def test_sparse_invalid_input(self):
+        sparse = scipy.sparse.csr_matrix(self.table1)
+        with self.assertRaisesRegex(ValueError, 'Number of rows'):
+            alpha_diversity('observed_otus', sparse, list('ABC'))
+        with self.assertRaisesRegex(ValueError, 'not-a-metric'):
+            alpha_diversity('not-a-metric', sparse)
+        with self.assertRaisesRegex(ValueError, 'negative values'):
+            alpha_diversity('observed_otus',
+                            scipy.sparse.csr_matrix([[1, -1], [0, 1]]))
+        with self.assertRaises(TypeError):
+            alpha_diversity('faith_pd', sparse, otu_ids=self.oids1,
+                            tree=self.tree1, not_a_real_kwarg=42)
+
 
 class BetaDiversityTests(TestCase):
     def setUp(self):
@@ -572,6 +645,64 @@ class BetaDiversityTests(TestCase):
                 npt.assert_almost_equal(dm1[id1, id2],
                                         expected_dm[id1, id2], 6)
 
+    def test_unifrac_float32(self):
+        for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+            dm1 = beta_diversity(metric, self.table1, self.sids1,
+                                 otu_ids=self.oids1, tree=self.tree1)
+            dm2 = beta_diversity(metric, self.table1, self.sids1,
+                                 otu_ids=self.oids1, tree=self.tree1,
+                                 dtype=np.float32)
+            self.assertEqual(dm2.ids, dm1.ids)
+            npt.assert_almost_equal(dm2.data, dm1.data, decimal=5)
+
+    def test_unifrac_unexpected_kwargs(self):
+        for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+            with self.assertRaisesRegex(TypeError, 'not_a_real_kwarg'):
+                beta_diversity(metric, self.table1, self.sids1,
+                               otu_ids=self.oids1, tree=self.tree1,
+                               not_a_real_kwarg=42)
+        # normalized only applies to weighted UniFrac
+        with self.assertRaisesRegex(TypeError, 'normalized'):
+            beta_diversity('unweighted_unifrac', self.table1, self.sids1,
+                           otu_ids=self.oids1, tree=self.tree1,
+                           normalized=True)
+
+    def test_sparse_unifrac(self):
+        sparse = scipy.sparse.csr_matrix(self.table1)
+        for metric in ('unweighted_unifrac', 'weighted_unifrac'):
+            exp = beta_diversity(metric, self.table1, self.sids1,
+                                 otu_ids=self.oids1, tree=self.tree1)
+            obs = beta_diversity(metric, sparse, self.sids1,
+                                 otu_ids=self.oids1, tree=self.tree1)
+            self.assertEqual(obs.ids, exp.ids)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_sparse_pdist_metrics(self):
+        sparse = scipy.sparse.csr_matrix(self.table2)
+        for metric in ('braycurtis', 'cityblock', 'cosine', 'euclidean',
+                       'jaccard', 'sqeuclidean'):
+            exp = beta_diversity(metric, self.table2, self.sids2)
+            obs = beta_diversity(metric, sparse, self.sids2)
+            self.assertEqual(obs.ids, exp.ids)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_sparse_pairwise_func(self):
+        def dense_pdist(counts, metric):
+            return scipy.spatial.distance.pdist(counts.toarray(), metric)
+
+        sparse = scipy.sparse.csr_matrix(self.table2)
+        exp = beta_diversity('canberra', self.table2, self.sids2)
+        obs = beta_diversity('canberra', sparse, self.sids2,
+                             pairwise_func=dense_pdist)
+        npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_sparse_unsupported_metric(self):
+        sparse = scipy.sparse.csr_matrix(self.table2)
+        with self.assertRaisesRegex(ValueError, 'canberra.*not supported'):
+            beta_diversity('canberra', sparse, self.sids2)
+        with self.assertRaisesRegex(ValueError, 'not supported'):
+            beta_diversity(lambda u, v: 0.0, sparse, self.sids2)
+
     def test_scipy_kwargs(self):
         # confirm that p can be passed to SciPy's minkowski, and that it
         # gives a different result than not passing it (the off-diagonal
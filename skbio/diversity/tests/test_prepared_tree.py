@@ -0,0 +1,140 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import TreeNode
+from skbio.diversity import (alpha_diversity, beta_diversity,
+                             block_beta_diversity, PreparedTree)
+from skbio.diversity.alpha import faith_pd
+from skbio.diversity.beta import unweighted_unifrac, weighted_unifrac
+from skbio.diversity._prepared_tree import _parents
+from skbio.tree import DuplicateNodeError, MissingNodeError
+
+
+class PreparedTreeTests(TestCase):
+
+    def setUp(self):
+        self.counts = np.array([[1, 3, 0, 1, 0],
+                                [0, 2, 0, 4, 4],
+                                [0, 0, 6, 2, 1],
+                                [0, 0, 1, 1, 1],
+                                [5, 3, 5, 0, 0]])
+        self.ids = list('ABCDE')
+        self.otu_ids = ['OTU%d' % i for i in range(1, 6)]
+        self.tree = TreeNode.read(io.StringIO(
+            '(((((OTU1:0.5,OTU2:0.5):0.5,OTU3:1.0):1.0):0.0,(OTU4:0.75,'
+            '(OTU5:0.25,(OTU6:0.5,OTU7:0.5):0.5):0.5):1.25):0.0)root;'))
+
+    def test_attributes(self):
+        prepared = PreparedTree(self.tree)
+        self.assertIs(prepared.tree, self.tree)
+        npt.assert_equal(prepared.branch_lengths,
+                         self.tree.to_array(nan_length_value=0.0)['length'])
+        self.assertEqual(sorted(prepared._tip_lookup),
+                         ['OTU%d' % i for i in range(1, 8)])
+
+    def test_parents(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5,f:6)g:7)r;"))
+        tree_index = t.to_array()
+        parents = _parents(tree_index['child_index'],
+                           len(tree_index['name']))
+        names = tree_index['name']
+        obs = {n: names[p] for n, p in zip(names, parents)}
+        exp = {'a': 'c', 'b': 'c', 'c': 'r', 'd': 'g', 'e': 'g', 'f': 'g',
+               'g': 'r', 'r': 'r'}
+        self.assertEqual(obs, exp)
+
+    def test_internal_names_are_not_tips(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)a:3,c:4)r;"))
+        prepared = PreparedTree(t, validate=False)
+        npt.assert_equal(prepared._tip_rows(['a', 'c']), [0, 3])
+
+    def test_invalid_tree(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2):3,(a:4,c:5):6)r;"))
+        with self.assertRaises(DuplicateNodeError):
+            PreparedTree(t)
+
+        # validation is deferred to the first call that validates
+        prepared = PreparedTree(t, validate=False)
+        with self.assertRaises(DuplicateNodeError):
+            faith_pd([1, 1], ['a', 'b'], prepared)
+
+        t = TreeNode.read(io.StringIO("(a:1,b:2,c:3)r;"))
+        with self.assertRaisesRegex(ValueError, 'rooted'):
+            PreparedTree(t)
+
+    def test_missing_otu_ids(self):
+        prepared = PreparedTree(self.tree)
+        with self.assertRaises(MissingNodeError):
+            faith_pd([1, 1], ['OTU1', 'foo'], prepared)
+
+    def test_tree_indexed_once(self):
+        calls = []
+        to_array = self.tree.to_array
+
+        def counting_to_array(*args, **kwargs):
+            calls.append(1)
+            return to_array(*args, **kwargs)
+
+        self.tree.to_array = counting_to_array
+        prepared = PreparedTree(self.tree)
+        for metric in 'unweighted_unifrac', 'weighted_unifrac':
+            beta_diversity(metric, self.counts, otu_ids=self.otu_ids,
+                           tree=prepared)
+        alpha_diversity('faith_pd', self.counts, otu_ids=self.otu_ids,
+                        tree=prepared)
+        weighted_unifrac(self.counts[0], self.counts[1], self.otu_ids,
+                         prepared, normalized=True)
+        self.assertEqual(len(calls), 1)
+
+    def test_same_results(self):
+        prepared = PreparedTree(self.tree)
+        kw = {'otu_ids': self.otu_ids, 'ids': self.ids}
+
+        npt.assert_almost_equal(
+            alpha_diversity('faith_pd', self.counts, tree=prepared,
+                            **kw).values,
+            alpha_diversity('faith_pd', self.counts, tree=self.tree,
+                            **kw).values)
+
+        for metric, metric_kw in [('unweighted_unifrac', {}),
+                                  ('weighted_unifrac', {}),
+                                  ('weighted_unifrac', {'normalized': True})]:
+            exp = beta_diversity(metric, self.counts, tree=self.tree, **kw,
+                                 **metric_kw)
+            obs = beta_diversity(metric, self.counts, tree=prepared, **kw,
+                                 **metric_kw)
+            npt.assert_almost_equal(obs.data, exp.data)
+
+            if not metric_kw:
+                obs = block_beta_diversity(metric, self.counts,
+                                           tree=prepared, k=2, **kw)
+                npt.assert_almost_equal(obs.data, exp.data)
+
+        for u, v in [(0, 1), (2, 3), (1, 4)]:
+            u, v = self.counts[u], self.counts[v]
+            self.assertAlmostEqual(
+                unweighted_unifrac(u, v, self.otu_ids, prepared),
+                unweighted_unifrac(u, v, self.otu_ids, self.tree))
+            self.assertAlmostEqual(
+                weighted_unifrac(u, v, self.otu_ids, prepared,
+                                 normalized=True),
+                weighted_unifrac(u, v, self.otu_ids, self.tree,
+                                 normalized=True))
+            self.assertAlmostEqual(
+                faith_pd(u, self.otu_ids, prepared),
+                faith_pd(u, self.otu_ids, self.tree))
+
+
+if __name__ == '__main__':
+    main()
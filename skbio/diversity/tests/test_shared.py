@@ -0,0 +1,149 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import os
+import pickle
+import shutil
+import tempfile
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+import scipy.sparse
+
+from skbio import TreeNode
+from skbio.diversity import PreparedTree
+from skbio.diversity._shared import (_share, _attach, _unlink, _SharedArray,
+                                     _SharedSparse, _SharedTree,
+                                     _SharedPreparedTree)
+
+
+class SharedTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tree = TreeNode.read([
+            "(((O1:0.25,'O 2':0.5)x:0.25,O3:0.75):0.5,O4:1.0)root;"])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def roundtrip(self, value):
+        # handles are sent to workers by pickling
+        handle = _share(value, self.directory)
+        return handle, _attach(pickle.loads(pickle.dumps(handle)))
+
+    def test_array(self):
+        for array in (np.arange(12).reshape(3, 4), np.array([[0.5], [1.5]]),
+                      np.array([], dtype=bool), np.array([[1, 2], [3, 4]]).T):
+            handle, obs = self.roundtrip(array)
+            self.assertIsInstance(handle, _SharedArray)
+            npt.assert_array_equal(obs, array)
+            self.assertEqual(obs.dtype, array.dtype)
+            _unlink(handle)
+            self.assertEqual(os.listdir(self.directory), [])
+
+    def test_array_is_memory_mapped(self):
+        handle, obs = self.roundtrip(np.arange(10))
+        self.assertIsInstance(obs, np.memmap)
+        self.assertFalse(obs.flags.writeable)
+        self.assertLess(len(pickle.dumps(handle)), 1000)
+        _unlink(handle)
+
+    def test_array_object(self):
+        with self.assertRaisesRegex(TypeError, 'objects'):
+            _SharedArray(np.array(['a', None], dtype=object), self.directory)
+        # object arrays are passed as is
+        array = np.array(['a', None], dtype=object)
+        self.assertIs(_share(array, self.directory), array)
+
+    def test_sparse(self):
+        dense = np.array([[0, 1, 0], [2, 0, 3]])
+        for matrix in (scipy.sparse.csr_matrix(dense),
+                       scipy.sparse.csc_matrix(dense),
+                       scipy.sparse.coo_matrix(dense)):
+            handle, obs = self.roundtrip(matrix)
+            self.assertIsInstance(handle, _SharedSparse)
+            self.assertIn(obs.format, ('csr', 'csc'))
+            npt.assert_array_equal(obs.toarray(), dense)
+            _unlink(handle)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_tree(self):
+        handle, obs = self.roundtrip(self.tree)
+        self.assertIsInstance(handle, _SharedTree)
+        self.assertEqual(str(obs), str(self.tree))
+        _unlink(handle)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_tree_names(self):
+        tree = TreeNode.read(["((a,b)é,(c,d));"])
+        handle, obs = self.roundtrip(tree)
+        self.assertEqual([n.name for n in obs.preorder()],
+                         [None, 'é', 'a', 'b', None, 'c', 'd'])
+        _unlink(handle)
+
+        # names which are not strings are pickled
+        for node, name in zip(tree.preorder(), range(7)):
+            node.name = name
+        handle, obs = self.roundtrip(tree)
+        self.assertEqual([n.name for n in obs.preorder()], list(range(7)))
+        _unlink(handle)
+
+    def test_deep_tree(self):
+        # deeper than the recursion limit
+        tree = TreeNode(name='0')
+        node = tree
+        for i in range(1, 5000):
+            child = TreeNode(name=str(i), length=1.0)
+            node.append(child)
+            node = child
+        handle = _share(tree, self.directory)
+        obs = _attach(pickle.loads(pickle.dumps(handle)))
+        self.assertEqual([n.name for n in obs.preorder()],
+                         [str(i) for i in range(5000)])
+        _unlink(handle)
+
+    def test_prepared_tree(self):
+        prepared = PreparedTree(self.tree)
+        handle, obs = self.roundtrip(prepared)
+        self.assertIsInstance(handle, _SharedPreparedTree)
+        self.assertIsInstance(obs, PreparedTree)
+        self.assertTrue(obs._validated)
+        # workers use the prepared arrays, without a tree
+        self.assertIsNone(obs.tree)
+        npt.assert_array_equal(obs.branch_lengths, prepared.branch_lengths)
+        npt.assert_array_equal(obs.tree_index['child_index'],
+                               prepared.tree_index['child_index'])
+        self.assertEqual(obs._tip_lookup, prepared._tip_lookup)
+        npt.assert_array_equal(obs._get_parents(), prepared._get_parents())
+        npt.assert_array_equal(obs._get_tip_distances(),
+                               prepared._get_tip_distances())
+        npt.assert_array_equal(obs._tip_rows(['O4', 'O1']),
+                               prepared._tip_rows(['O4', 'O1']))
+        self.assertIsInstance(obs.branch_lengths, np.memmap)
+        _unlink(handle)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_prepared_tree_invalid(self):
+        tree = TreeNode.read(['((O1:0.25,O2:0.5):0.25,O3)root;'])
+        prepared = PreparedTree(tree, validate=False)
+        handle, obs = self.roundtrip(prepared)
+        self.assertFalse(obs._validated)
+        with self.assertRaisesRegex(ValueError, 'branch length'):
+            obs._validate()
+        _unlink(handle)
+
+    def test_other_values(self):
+        for value in ('unweighted_unifrac', ['O1', 'O2'], None, 3):
+            self.assertIs(_share(value, self.directory), value)
+            self.assertIs(_attach(value), value)
+            _unlink(value)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ from unittest import TestCase, main
 
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse
 
 from skbio import TreeNode
 from skbio.diversity._util import (_validate_counts_vector,
@@ -93,6 +94,29 @@ class ValidationTests(TestCase):
         npt.assert_array_equal(obs[0], np.array([]))
         npt.assert_array_equal(obs[1], np.array([]))
 
+    def test_validate_counts_matrix_sparse(self):
+        counts = scipy.sparse.coo_matrix(
+            ([1, 2, 0, 3, 4], ([0, 0, 1, 1, 0], [1, 4, 0, 2, 1])),
+            shape=(2, 5))
+        obs = _validate_counts_matrix(counts, ids=['a', 'b'])
+        self.assertTrue(scipy.sparse.isspmatrix_csr(obs))
+        npt.assert_array_equal(obs.toarray(), [[0, 5, 0, 0, 2],
+                                               [0, 0, 3, 0, 0]])
+        # duplicates are summed and explicit zeros are removed
+        self.assertEqual(obs.nnz, 3)
+        self.assertEqual(obs.dtype, int)
+
+        with self.assertRaisesRegex(ValueError, 'Number of rows'):
+            _validate_counts_matrix(counts, ids=['a'])
+        with self.assertRaisesRegex(ValueError, 'negative'):
+            _validate_counts_matrix(scipy.sparse.csr_matrix([[1, -1]]))
+        with self.assertRaises(TypeError):
+            _validate_counts_matrix(scipy.sparse.csr_matrix([[1.5, 1]]))
+
+        obs = _validate_counts_matrix(scipy.sparse.csr_matrix([[1.5, 1]]),
+                                      suppress_cast=True)
+        npt.assert_array_equal(obs.toarray(), [[1.5, 1]])
+
     def test_validate_counts_matrix_suppress_cast(self):
         # suppress_cast is passed through to _validate_counts_vector
         obs = _validate_counts_matrix(
@@ -242,6 +266,23 @@ class ValidationTests(TestCase):
         exp_counts = np.array([[0, 1, 10], [1, 5, 1], [1, 6, 11], [1, 6, 11]])
         npt.assert_equal(count_array, exp_counts.T)
 
+    def test_vectorize_counts_and_tree_sparse(self):
+        t = TreeNode.read(io.StringIO("(((a:1, b:2)c:3, d:4)e:1)root;"))
+        counts = np.array([[0, 1, 0], [1, 5, 0], [0, 0, 2], [0, 0, 0]])
+        otu_ids = np.array(['a', 'b', 'd'])
+        exp, _, _ = _vectorize_counts_and_tree(counts, otu_ids, t)
+        obs, _, _ = _vectorize_counts_and_tree(
+            scipy.sparse.csr_matrix(counts), otu_ids, t)
+        self.assertTrue(scipy.sparse.issparse(obs))
+        npt.assert_equal(obs.toarray(), exp)
+        # only the nodes observed in each sample are stored
+        self.assertEqual(obs.nnz, np.count_nonzero(exp))
+
+        obs, _, _ = _vectorize_counts_and_tree(
+            scipy.sparse.csr_matrix((2, 3), dtype=int), otu_ids, t)
+        self.assertEqual(obs.shape, (2, 6))
+        self.assertEqual(obs.nnz, 0)
+
 
 if __name__ == "__main__":
     main()
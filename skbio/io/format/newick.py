@@ -18,6 +18,10 @@ Format Support
 +======+======+===============================================================+
 |Yes   |Yes   |:mod:`skbio.tree.TreeNode`                                     |
 +------+------+---------------------------------------------------------------+
+|Yes   |Yes   |:mod:`skbio.tree.CompactTree`                                  |
++------+------+---------------------------------------------------------------+
+|Yes   |No    |generator of :mod:`skbio.tree.TreeNode` objects                |
++------+------+---------------------------------------------------------------+
 
 Format Specification
 --------------------
@@ -169,6 +173,14 @@ program in which the underscores were not escaped. This parameter only affects
 `read` operations. It does not exist for `write` operations; they will always
 properly escape underscores.
 
+Generator Reader Parameters
+^^^^^^^^^^^^^^^^^^^^^^^^^^^
+A file can contain several trees, each ending with a semicolon (e.g. one tree
+per line). When reading into a generator, the trees are read from the file one
+at a time, and the ``constructor`` parameter specifies the type of the trees.
+It defaults to ``TreeNode`` and can be a subclass of ``TreeNode``, or
+``CompactTree`` to read each tree into arrays.
+
 Examples
 --------
 This is a simple Newick string.
@@ -205,6 +217,15 @@ This is a complex Newick string.
 Notice that the node originally labeled ``d_d`` became ``d d``. Additionally
 ``'b_b'''`` became ``b_b'``. Note that the underscore was preserved in `b_b'`.
 
+This is a file with several trees, which are read one at a time.
+
+>>> f = StringIO("(a, b)c;\\n(d, e)f;\\n")
+>>> for tree in read(f, format="newick"):
+...     print(tree.name, [tip.name for tip in tree.tips()])
+c ['a', 'b']
+f ['d', 'e']
+>>> f.close()
+
 References
 ----------
 .. [1] http://evolution.genetics.washington.edu/phylip/newick_doc.html
@@ -220,11 +241,28 @@ References
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import io
+import re
+
+import numpy as np
+
 from skbio.io import create_format, NewickFormatError
-from skbio.tree import TreeNode
+from skbio.tree import TreeNode, CompactTree
 
 newick = create_format('newick')
 
+# Splits text without quotes or comments into labels and structure tokens,
+# dropping the whitespace around the structure tokens.
+_newick_split = re.compile(r"\s*([(),;:])\s*")
+# Matches whitespace inside of a label without quotes.
+_newick_label_whitespace = re.compile(r"[^\s(),;:]\s+[^\s(),;:]")
+# Matches the text up to and including the next structure token that is not
+# in a quoted label. Quoted labels (including escaped quotes, which are read
+# as two adjacent quoted labels) are skipped over as a whole.
+_newick_segment = re.compile(r"([^'(),;:]*(?:'[^']*'[^'(),;:]*)*)([(),;:])")
+# Matches the characters which change whether a semicolon ends a tree.
+_newick_tree_delimiters = re.compile(r"[;'\[\]]")
+
 
 @newick.sniffer()
 def _newick_sniffer(fh):
@@ -233,7 +271,8 @@ def _newick_sniffer(fh):
     #       * It is an empty file.
     #       * There is whitespace inside of a label (handled by tokenizer)
     #       * : is followed by anything that is an operator
-    #       * ( is not preceded immediately by , or another (
+    #       * ( is not preceded immediately by , or another ( (or by ; when
+    #         a file has several trees)
     #       * The parens are unablanced when ; is found.
     #   If 100 tokens (or less if EOF occurs earlier) then it is probably
     #   newick, or at least we can't prove it isn't.
@@ -254,7 +293,7 @@ def _newick_sniffer(fh):
                 pass
             elif token == ')' and last_token != ':':
                 indent -= 1
-            elif token == '(' and (last_token == '(' or last_token == ','):
+            elif token == '(' and last_token in ('(', ',', ';'):
                 indent += 1
             else:
                 raise NewickFormatError()
@@ -269,17 +308,120 @@ def _newick_sniffer(fh):
 
 @newick.reader(TreeNode)
 def _newick_to_tree_node(fh, convert_underscores=True):
-    tree_stack = []
+    return _lists_to_tree_node(*_parse_newick(fh, convert_underscores),
+                               node_class=TreeNode)
+
+
+@newick.reader(None)
+def _newick_to_generator(fh, convert_underscores=True, constructor=TreeNode):
+    for text in _newick_tree_texts(fh):
+        tree_fh = io.StringIO(text)
+        if issubclass(constructor, CompactTree):
+            yield constructor(*_newick_to_arrays(tree_fh, convert_underscores))
+        else:
+            yield _lists_to_tree_node(
+                *_parse_newick(tree_fh, convert_underscores),
+                node_class=constructor)
+
+
+def _newick_tree_texts(fh):
+    """Yield the text of each tree of a newick file, reading a line at a time.
+
+    A tree ends with a semicolon which is neither in a quoted label nor in a
+    comment. Within comments, a single-quote escapes the next bracket.
+
+    """
+    lines = []
+    quoted = False
+    comment_depth = 0
+    for line in fh:
+        start = 0
+        escaped = -1
+        for match in _newick_tree_delimiters.finditer(line):
+            token = match.group()
+            if comment_depth:
+                if match.start() == escaped:
+                    continue
+                if token == "'":
+                    escaped = match.end()
+                elif token == '[':
+                    comment_depth += 1
+                elif token == ']':
+                    comment_depth -= 1
+            elif token == "'":
+                quoted = not quoted
+            elif quoted:
+                continue
+            elif token == '[':
+                comment_depth += 1
+            elif token == ';':
+                lines.append(line[start:match.end()])
+                yield ''.join(lines)
+                lines = []
+                start = match.end()
+        lines.append(line[start:])
+
+    text = ''.join(lines)
+    if text.strip():
+        yield text
+
+
+def _lists_to_tree_node(parents, lengths, names, node_class):
+    """Create linked nodes of `node_class` from the lists of a parsed tree."""
+    nodes = [node_class(name=name, length=length)
+             for name, length in zip(names, lengths)]
+    # This is much faster than TreeNode.extend. Children are created after
+    # their parent and in sibling order, so appending preserves that order.
+    for node, parent_idx in zip(nodes[1:], parents[1:]):
+        parent = nodes[parent_idx]
+        node.parent = parent
+        parent.children.append(node)
+    return nodes[0]
+
+
+def _newick_to_arrays(fh, convert_underscores=True):
+    """Read the first tree of a newick file into arrays, one entry per node.
+
+    Nodes are numbered in pre-order, so the root is node 0 and every node
+    comes after its parent, with siblings in the order of the file.
+
+    Returns
+    -------
+    parents : np.ndarray of np.intp
+        Index of the parent of each node, and -1 for the root.
+    lengths : np.ndarray of float
+        Branch length of each node, and ``np.nan`` where there is none.
+    names : np.ndarray of object
+        Name of each node, and ``None`` where there is none.
+
+    """
+    parents, lengths, names = _parse_newick(fh, convert_underscores)
+
+    parents = np.array(parents, dtype=np.intp)
+    lengths = np.array([np.nan if length is None else length
+                        for length in lengths])
+    names = np.array(names, dtype=object)
+    return parents, lengths, names
+
+
+def _parse_newick(fh, convert_underscores):
+    """Return the parent, length and name of each node as lists."""
+    # Each entry of `tree_stack` is the index of a node whose parent is not
+    # known yet, along with its depth.
+    parents = [-1]
+    lengths = [None]
+    names = [None]
+    has_children = [False]
+    tree_stack = [(0, 0)]
     current_depth = 0
     last_token = ''
     next_is_distance = False
-    root = TreeNode()
-    tree_stack.append((root, current_depth))
-    for token in _tokenize_newick(fh, convert_underscores=convert_underscores):
+    tokens = _fast_tokenize_newick(fh, convert_underscores=convert_underscores)
+    for token in tokens:
         # Check for a label
         if last_token not in '(,):':
             if not next_is_distance:
-                tree_stack[-1][0].name = last_token if last_token else None
+                names[tree_stack[-1][0]] = last_token if last_token else None
             else:
                 next_is_distance = False
         # Check for a distance
@@ -287,38 +429,45 @@ def _newick_to_tree_node(fh, convert_underscores=True):
             next_is_distance = True
         elif last_token == ':':
             try:
-                tree_stack[-1][0].length = float(token)
+                lengths[tree_stack[-1][0]] = float(token)
             except ValueError:
                 raise NewickFormatError("Could not read length as numeric type"
                                         ": %s." % token)
 
-        elif token == '(':
-            current_depth += 1
-            tree_stack.append((TreeNode(), current_depth))
-        elif token == ',':
-            tree_stack.append((TreeNode(), current_depth))
+        elif token == '(' or token == ',':
+            if token == '(':
+                current_depth += 1
+            tree_stack.append((len(parents), current_depth))
+            parents.append(-1)
+            lengths.append(None)
+            names.append(None)
+            has_children.append(False)
         elif token == ')':
             if len(tree_stack) < 2:
                 raise NewickFormatError("Could not parse file as newick."
                                         " Parenthesis are unbalanced.")
-            children = []
-            # Pop all nodes at this depth as they belong to the remaining
-            # node on the top of the stack as children.
-            while current_depth == tree_stack[-1][1]:
-                node, _ = tree_stack.pop()
-                children.insert(0, node)
-            parent = tree_stack[-1][0]
-            if parent.children:
+            # All nodes at this depth belong to the remaining node on the top
+            # of the stack as children.
+            first_child = len(tree_stack)
+            while (first_child > 0 and
+                   current_depth == tree_stack[first_child - 1][1]):
+                first_child -= 1
+            if first_child == 0:
+                raise NewickFormatError("Could not parse file as newick."
+                                        " Parenthesis are unbalanced.")
+            children = tree_stack[first_child:]
+            del tree_stack[first_child:]
+            parent_idx = tree_stack[-1][0]
+            if has_children[parent_idx]:
                 raise NewickFormatError("Could not parse file as newick."
                                         " Contains unnested children.")
-            # This is much faster than TreeNode.extend
-            for child in children:
-                child.parent = parent
-            parent.children = children
+            for child_idx, _ in children:
+                parents[child_idx] = parent_idx
+            has_children[parent_idx] = True
             current_depth -= 1
         elif token == ';':
             if len(tree_stack) == 1:
-                return root
+                return parents, lengths, names
             break
 
         last_token = token
@@ -329,6 +478,16 @@ def _newick_to_tree_node(fh, convert_underscores=True):
                             " missing its root.")
 
 
+@newick.reader(CompactTree)
+def _newick_to_compact_tree(fh, convert_underscores=True):
+    return CompactTree(*_newick_to_arrays(fh, convert_underscores))
+
+
+@newick.writer(CompactTree)
+def _compact_tree_to_newick(obj, fh):
+    _tree_node_to_newick(obj.to_tree_node(), fh)
+
+
 @newick.writer(TreeNode)
 def _tree_node_to_newick(obj, fh):
     operators = set(",:_;()[]")
@@ -481,3 +640,61 @@ def _tokenize_newick(fh, convert_underscores=True):
             #      the sequence ''' to result in ''.
             #    * We have encountered whitespace that is not properly escaped.
             last_non_ws_char = character
+
+
+def _fast_tokenize_newick(fh, convert_underscores=True):
+    """Tokenize a newick file a label at a time instead of a character at a
+    time.
+
+    The tokens are the same as those of `_tokenize_newick`. If there are no
+    quotes, comments or misplaced whitespace, the whole file is split into
+    tokens with a single regular expression. Otherwise, labels without
+    quotes are found and checked one at a time with regular expressions and
+    string methods, and labels with quotes are tokenized by
+    `_tokenize_newick` as they have more involved rules. Files with comments,
+    as well as any text that cannot be split into labels (e.g. because of an
+    unbalanced quote), are left to `_tokenize_newick`.
+
+    """
+    text = fh.read()
+    if '[' in text:
+        yield from _tokenize_newick([text],
+                                    convert_underscores=convert_underscores)
+        return
+
+    if "'" not in text and not _newick_label_whitespace.search(text):
+        # Labels and structure tokens alternate, starting with a label, and
+        # the text after the last structure token is not part of any token.
+        tokens = _newick_split.split(text.lstrip())[:-1]
+        if convert_underscores:
+            tokens = [token.replace('_', ' ') for token in tokens if token]
+        yield from tokens
+        return
+
+    pos = 0
+    match = _newick_segment.match(text, pos)
+    while match is not None:
+        label, structure = match.groups()
+        if "'" in label:
+            # Tokenizing the label on its own is equivalent, as the state of
+            # the tokenizer that carries over from before a structure token
+            # only matters within comments.
+            yield from _tokenize_newick(
+                [label + structure], convert_underscores=convert_underscores)
+        else:
+            label = label.strip()
+            if len(label.split()) > 1:
+                raise NewickFormatError("Newick files cannot have unescaped"
+                                        " whitespace in their labels.")
+            if not convert_underscores:
+                yield label
+            elif label:
+                yield label.replace('_', ' ')
+            yield structure
+
+        pos = match.end()
+        match = _newick_segment.match(text, pos)
+
+    if pos < len(text):
+        yield from _tokenize_newick([text[pos:]],
+                                    convert_underscores=convert_underscores)
@@ -9,10 +9,16 @@
 import io
 import unittest
 
+import numpy as np
+import numpy.testing as npt
+
 from skbio import TreeNode
+from skbio.tree import CompactTree
 from skbio.io import NewickFormatError
 from skbio.io.format.newick import (
-    _newick_to_tree_node, _tree_node_to_newick, _newick_sniffer)
+    _newick_to_tree_node, _tree_node_to_newick, _newick_sniffer,
+    _newick_to_arrays, _tokenize_newick, _fast_tokenize_newick,
+    _newick_to_generator)
 
 
 class TestNewick(unittest.TestCase):
@@ -316,6 +322,106 @@ class TestNewick(unittest.TestCase):
                 self.assertIn(frag, str(cm.exception))
             fh.close()
 
+    def test_newick_to_arrays_valid_files(self):
+        for _, newicks in self.trees_newick_lists:
+            for newick in newicks:
+                fh = io.StringIO(newick)
+                parents, lengths, names = _newick_to_arrays(fh)
+                fh.seek(0)
+                nodes = list(_newick_to_tree_node(fh).preorder())
+
+                index = {id(node): i for i, node in enumerate(nodes)}
+                npt.assert_equal(parents, [-1] + [index[id(node.parent)]
+                                                  for node in nodes[1:]])
+                npt.assert_equal(lengths, [np.nan if node.length is None
+                                           else node.length
+                                           for node in nodes])
+                self.assertEqual(names.tolist(),
+                                 [node.name for node in nodes])
+                self.assertEqual(parents.dtype, np.intp)
+
+                fh.close()
+
+    def test_newick_to_arrays_invalid_files(self):
+        for invalid, error_fragments in self.invalid_newicks:
+            fh = io.StringIO(invalid)
+            with self.assertRaises(NewickFormatError) as cm:
+                _newick_to_arrays(fh)
+            for frag in error_fragments:
+                self.assertIn(frag, str(cm.exception))
+            fh.close()
+
+    def test_newick_to_generator_valid_files(self):
+        trees = [tree for tree, newicks in self.trees_newick_lists
+                 for _ in newicks]
+        newicks = [newick for _, newicks in self.trees_newick_lists
+                   for newick in newicks]
+        for separator in '', '\n', '\n\n ':
+            fh = io.StringIO(separator.join(newicks))
+            read_trees = list(_newick_to_generator(fh))
+            self.assertEqual(len(read_trees), len(trees))
+            for tree, read_tree in zip(trees, read_trees):
+                self._assert_equal(tree, read_tree)
+            fh.close()
+
+    def test_newick_to_generator_constructor(self):
+        class Node(TreeNode):
+            pass
+
+        newick = "(a:1,(b,c)d:2);\n[a;comment]('e;f',g);\n"
+        fh = io.StringIO(newick)
+        trees = list(_newick_to_generator(fh, constructor=Node))
+        self.assertEqual(len(trees), 2)
+        self.assertTrue(all(isinstance(node, Node)
+                            for tree in trees for node in tree.traverse()))
+        self.assertEqual([tip.name for tip in trees[1].tips()],
+                         ['e;f', 'g'])
+
+        fh.seek(0)
+        trees = list(_newick_to_generator(fh, constructor=CompactTree))
+        self.assertEqual(len(trees), 2)
+        self.assertIsInstance(trees[0], CompactTree)
+        npt.assert_equal(trees[0].lengths, [np.nan, 1, 2, np.nan, np.nan])
+        self.assertEqual(trees[1].names.tolist(), [None, 'e;f', 'g'])
+        fh.close()
+
+    def test_newick_to_generator_invalid_files(self):
+        fh = io.StringIO("(a,b);\n(c,d)\n")
+        trees = _newick_to_generator(fh)
+        self.assertEqual([tip.name for tip in next(trees).tips()],
+                         ['a', 'b'])
+        with self.assertRaises(NewickFormatError):
+            next(trees)
+        fh.close()
+
+        fh = io.StringIO("")
+        self.assertEqual(list(_newick_to_generator(fh)), [])
+        fh.close()
+
+    def test_fast_tokenize_newick(self):
+        newicks = [newick for _, newicks in self.trees_newick_lists
+                   for newick in newicks]
+        newicks += [invalid for invalid, _ in self.invalid_newicks]
+        newicks += ["(_:0.1, _a, _b)__;", "('a'_b, c d);", "(a,b);e f"]
+
+        def tokens(tokenize, newick, convert_underscores):
+            fh = io.StringIO(newick)
+            result = []
+            try:
+                for token in tokenize(fh, convert_underscores):
+                    result.append(token)
+            except NewickFormatError:
+                result.append(NewickFormatError)
+            fh.close()
+            return result
+
+        for newick in newicks:
+            for convert_underscores in True, False:
+                self.assertEqual(
+                    tokens(_fast_tokenize_newick, newick,
+                           convert_underscores),
+                    tokens(_tokenize_newick, newick, convert_underscores))
+
     def test_tree_node_to_newick(self):
         for tree, newicks in self.trees_newick_lists:
             newick = newicks[0]
@@ -358,6 +464,11 @@ class TestNewick(unittest.TestCase):
                 self.assertEqual(_newick_sniffer(fh), (True, {}))
                 fh.close()
 
+    def test_newick_sniffer_several_trees(self):
+        fh = io.StringIO("(a,b);\n(c,(d,e));\n")
+        self.assertEqual(_newick_sniffer(fh), (True, {}))
+        fh.close()
+
     def test_newick_sniffer_invalid_files(self):
         for invalid, _ in self.invalid_newicks:
             fh = io.StringIO(invalid)
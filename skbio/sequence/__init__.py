@@ -33,6 +33,15 @@ Classes
    RNA
    Protein
    GeneticCode
+   MinHashSketch
+
+Functions
+---------
+
+.. autosummary::
+   :toctree: generated/
+
+   kmer_profile
 
 Subpackages
 -----------
@@ -312,8 +321,10 @@ from ._dna import DNA
 from ._rna import RNA
 from ._genetic_code import GeneticCode
 from ._grammared_sequence import GrammaredSequence
+from ._kmer_profile import kmer_profile
+from ._minhash import MinHashSketch
 
 __all__ = ['Sequence', 'Protein', 'DNA', 'RNA', 'GeneticCode',
-           'GrammaredSequence']
+           'GrammaredSequence', 'kmer_profile', 'MinHashSketch']
 
 test = TestRunner(__file__).test
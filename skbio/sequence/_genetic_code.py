@@ -8,9 +8,12 @@
 
 import numpy as np
 
-from skbio.util._decorator import classproperty, stable, classonlymethod
+import skbio
+from skbio.util._decorator import (classproperty, stable, classonlymethod,
+                                   experimental)
 from skbio._base import SkbioObject
-from skbio.sequence import Protein, RNA
+from skbio.metadata import IntervalMetadata
+from skbio.sequence import Protein, DNA, RNA
 from skbio._base import ElasticLines
 
 
@@ -123,15 +126,17 @@ class GeneticCode(SkbioObject):
     def _offset_table(cls):
         if cls.__offset_table is None:
             # create lookup table that is filled with 255 everywhere except for
-            # indices corresponding to U, C, A, and G. 255 was chosen to
+            # indices corresponding to U (or T), C, A, and G. 255 was chosen to
             # represent invalid character offsets because it will create an
             # invalid (out of bounds) index into `amino_acids` which should
             # error noisily. this is important in case the valid definite
             # IUPAC RNA characters change in the future and the assumptions
-            # currently made by the code become invalid
-            table = np.empty(ord(b'U') + 1, dtype=np.uint8)
+            # currently made by the code become invalid. the table covers all
+            # byte values so that any sequence's bytes can index it
+            table = np.empty(256, dtype=np.uint8)
             table.fill(255)
             table[ord(b'U')] = 0
+            table[ord(b'T')] = 0
             table[ord(b'C')] = 1
             table[ord(b'A')] = 2
             table[ord(b'G')] = 3
@@ -235,6 +240,9 @@ class GeneticCode(SkbioObject):
             raise ValueError("`amino_acids` must contain at least one M "
                              "(methionine) character")
         self._amino_acids = amino_acids
+        # the amino acid of each codon index (0-63)
+        self._amino_acid_table = amino_acids.values
+        self._stop_table = self._amino_acid_table == b'*'
         self._m_character_codon = self._index_to_codon(indices[0])
 
     def _set_starts(self, starts):
@@ -250,6 +258,8 @@ class GeneticCode(SkbioObject):
             raise ValueError("`starts` may only contain M and - characters")
 
         self._starts = starts
+        # whether each codon index (0-63) is a start codon
+        self._start_table = starts.values == b'M'
 
         indices = (self._starts.values == b'M').nonzero()[0]
         codons = np.empty((indices.size, 3), dtype=np.uint8)
@@ -528,91 +538,112 @@ class GeneticCode(SkbioObject):
 
         """
         self._validate_translate_inputs(sequence, reading_frame, start, stop)
-
-        offset = abs(reading_frame) - 1
-        if reading_frame < 0:
-            sequence = sequence.reverse_complement()
-
-        # Translation strategy:
-        #
-        #   1. Obtain view of underlying sequence bytes from the beginning of
-        #      the reading frame.
-        #   2. Convert bytes to offsets (0-3, base 4 since there are only 4
-        #      characters allowed: UCAG).
-        #   3. Reshape byte vector into (N, 3), where N is the number of codons
-        #      in the reading frame. Each row represents a codon in the
-        #      sequence.
-        #   4. (Optional) Find start codon in the reading frame and trim to
-        #      this position. Replace start codon with M codon.
-        #   5. Convert each codon (encoded as offsets) into an index
-        #      corresponding to an amino acid (0-63).
-        #   6. Obtain translated sequence by indexing into the amino acids
-        #      vector (`amino_acids`) using the indices defined in step 5.
-        #   7. (Optional) Find first stop codon and trim to this position.
-        data = sequence.values[offset:].view(np.uint8)
-        # since advanced indexing is used with an integer ndarray, a copy is
-        # always returned. thus, the in-place modification made below
-        # (replacing the start codon) is safe.
-        data = self._offset_table[data]
-        data = data[:data.size // 3 * 3].reshape((-1, 3))
-
-        if start in {'require', 'optional'}:
-            start_codon_index = data.shape[0]
-            for start_codon in self._start_codons:
-                indices = np.all(data == start_codon, axis=1).nonzero()[0]
-
-                if indices.size > 0:
-                    first_index = indices[0]
-                    if first_index < start_codon_index:
-                        start_codon_index = first_index
-
-            if start_codon_index != data.shape[0]:
-                data = data[start_codon_index:]
-                data[0] = self._m_character_codon
-            elif start == 'require':
-                self._raise_require_error('start', reading_frame)
-
-        indices = (data * self._radix_multiplier).sum(axis=1)
-        translated = self._amino_acids.values[indices]
-
-        if stop in {'require', 'optional'}:
-            stop_codon_indices = (translated == b'*').nonzero()[0]
-            if stop_codon_indices.size > 0:
-                translated = translated[:stop_codon_indices[0]]
-            elif stop == 'require':
-                self._raise_require_error('stop', reading_frame)
-
-        metadata = None
-        if sequence.has_metadata():
-            metadata = sequence.metadata
-
-        # turn off validation because `translated` is guaranteed to be valid
-        return Protein(translated, metadata=metadata, validate=False)
+        offsets = self._validated_offsets(sequence)
+        return self._translate_frame(offsets, reading_frame, start, stop,
+                                     self._translated_metadata(sequence))
 
     def _validate_translate_inputs(self, sequence, reading_frame, start, stop):
         if not isinstance(sequence, RNA):
             raise TypeError("Sequence to translate must be RNA, not %s" %
                             type(sequence).__name__)
+        self._validate_options([reading_frame], start, stop)
 
-        if reading_frame not in self.reading_frames:
-            raise ValueError("`reading_frame` must be one of %r, not %r" %
-                             (self.reading_frames, reading_frame))
+    def _validate_options(self, reading_frames, start, stop):
+        for reading_frame in reading_frames:
+            if reading_frame not in self.reading_frames:
+                raise ValueError("`reading_frame` must be one of %r, not %r" %
+                                 (self.reading_frames, reading_frame))
 
         for name, value in ('start', start), ('stop', stop):
             if value not in self._start_stop_options:
                 raise ValueError("`%s` must be one of %r, not %r" %
                                  (name, self._start_stop_options, value))
 
+    def _validated_offsets(self, sequence):
+        """Return the offsets (0-3) of the characters of a sequence.
+
+        Gapped and degenerate sequences are found from the offsets, in a single
+        pass over the sequence.
+
+        """
+        offsets = self._offset_table[sequence._bytes]
+        if not (offsets == 255).any():
+            return offsets
+
         if sequence.has_gaps():
             raise ValueError("scikit-bio does not support translation of "
                              "gapped sequences.")
 
-        if sequence.has_degenerates():
-            raise NotImplementedError("scikit-bio does not currently support "
-                                      "translation of degenerate sequences."
-                                      "`RNA.expand_degenerates` can be used "
-                                      "to obtain all definite versions "
-                                      "of a degenerate sequence.")
+        raise NotImplementedError("scikit-bio does not currently support "
+                                  "translation of degenerate sequences."
+                                  "`RNA.expand_degenerates` can be used "
+                                  "to obtain all definite versions "
+                                  "of a degenerate sequence.")
+
+    def _translated_metadata(self, sequence):
+        return sequence.metadata if sequence.has_metadata() else None
+
+    def _frame_codons(self, offsets, reading_frame):
+        """Return the codon indices (0-63) of a reading frame.
+
+        The first, second and third offsets of the codons of the reading frame
+        are strided views of the offsets, and are combined into the index of
+        each codon in NCBI's codon order. Reverse frames are read from the
+        reversed offsets, without computing the reverse complement:
+        complementing an offset (U <-> A, C <-> G) flips its second bit, so
+        that the index of each reverse complement codon is obtained with a
+        single XOR.
+
+        """
+        if reading_frame < 0:
+            offsets = offsets[::-1]
+        offset = abs(reading_frame) - 1
+        end = offset + max(len(offsets) - offset, 0) // 3 * 3
+        codons = offsets[offset:end:3] * 16
+        codons += offsets[offset + 1:end:3] * 4
+        codons += offsets[offset + 2:end:3]
+        if reading_frame < 0:
+            codons ^= 0b101010
+        return codons
+
+    def _translate_frame(self, offsets, reading_frame, start, stop, metadata):
+        """Translate a reading frame of a sequence encoded as offsets.
+
+        Translation strategy:
+
+        1. Obtain the codon indices (0-63) of the reading frame.
+        2. (Optional) Find the first start codon with the start codon lookup
+           table and trim to this position.
+        3. Obtain the translated sequence by indexing into the amino acids
+           lookup table with the codon indices. Replace the start codon with
+           M.
+        4. (Optional) Find the first stop codon and trim to this position.
+
+        """
+        codons = self._frame_codons(offsets, reading_frame)
+
+        has_start = False
+        if start in {'require', 'optional'}:
+            is_start = self._start_table[codons]
+            if is_start.any():
+                codons = codons[is_start.argmax():]
+                has_start = True
+            elif start == 'require':
+                self._raise_require_error('start', reading_frame)
+
+        translated = self._amino_acid_table[codons]
+        if has_start:
+            translated[0] = b'M'
+
+        if stop in {'require', 'optional'}:
+            is_stop = translated == b'*'
+            if is_stop.any():
+                translated = translated[:is_stop.argmax()]
+            elif stop == 'require':
+                self._raise_require_error('stop', reading_frame)
+
+        # turn off validation because `translated` is guaranteed to be valid
+        return Protein(translated, metadata=metadata, validate=False)
 
     def _raise_require_error(self, name, reading_frame):
         raise ValueError(
@@ -747,14 +778,265 @@ class GeneticCode(SkbioObject):
         <BLANKLINE>
 
         """
-        rc = sequence.reverse_complement()
-
-        for reading_frame in range(1, 4):
-            yield self.translate(sequence, reading_frame=reading_frame,
-                                 start=start, stop=stop)
-        for reading_frame in range(1, 4):
-            yield self.translate(rc, reading_frame=reading_frame,
-                                 start=start, stop=stop)
+        self._validate_translate_inputs(sequence, 1, start, stop)
+        offsets = self._validated_offsets(sequence)
+        metadata = self._translated_metadata(sequence)
+        for reading_frame in self.reading_frames:
+            yield self._translate_frame(offsets, reading_frame, start, stop,
+                                        metadata)
+
+    @experimental(as_of="0.5.1")
+    def translate_many(self, sequences, reading_frames=1, start='ignore',
+                       stop='ignore', constructor=DNA):
+        """Translate many sequences into protein, in one or more frames.
+
+        Parameters
+        ----------
+        sequences : iterable of DNA or RNA, or str or filehandle
+            Sequences to translate. ``DNA`` sequences are assumed to be the
+            coding strand, and are translated as if they were transcribed into
+            RNA. If a filepath or filehandle, the sequences are read from it as
+            a FASTA file with ``skbio.io.read``.
+        reading_frames : int or iterable of int, optional
+            Reading frame or frames in which to translate each sequence, from
+            ``GeneticCode.reading_frames``. See ``GeneticCode.translate`` for
+            details.
+        start : {'ignore', 'require', 'optional'}
+            How to handle start codons. See ``GeneticCode.translate`` for
+            details.
+        stop : {'ignore', 'require', 'optional'}
+            How to handle stop codons. See ``GeneticCode.translate`` for
+            details.
+        constructor : {DNA, RNA}, optional
+            The type of the sequences read from a file.
+
+        Yields
+        ------
+        Protein
+            Translated sequence in each reading frame, in the order of
+            `reading_frames`, for each sequence in turn.
+
+        Raises
+        ------
+        TypeError
+            If a sequence is not ``DNA`` or ``RNA``.
+        ValueError
+            If a reading frame, `start` or `stop` is invalid, if a sequence is
+            gapped, or if a start or stop codon is required and not found.
+        NotImplementedError
+            If a sequence is degenerate.
+
+        See Also
+        --------
+        translate
+        translate_six_frames
+
+        Notes
+        -----
+        Each sequence is translated as by ``GeneticCode.translate`` (or
+        ``GeneticCode.translate_six_frames``), but is neither transcribed nor
+        reverse complemented, and is validated in a single pass. Codons are
+        read from the sequence's bytes through lookup tables of the indices of
+        the nucleotides and of the amino acids and start codons of the 64
+        codons, which are shared by all sequences.
+
+        Input sequence metadata are included in each translated protein
+        sequence. Positional metadata are not included.
+
+        Examples
+        --------
+        Translate DNA sequences in their first forward reading frame using
+        NCBI's standard genetic code (table ID 1):
+
+        >>> from skbio import DNA, GeneticCode
+        >>> sgc = GeneticCode.from_ncbi()
+        >>> seqs = [DNA('ATGCCACTTTAA'), DNA('ATGGGTTGA')]
+        >>> [str(protein) for protein in sgc.translate_many(seqs)]
+        ['MPL*', 'MG*']
+
+        Translate the sequences of a FASTA file in the first forward and
+        reverse reading frames:
+
+        >>> from io import StringIO
+        >>> fasta = StringIO('>a\\nATGCCACTTTAA\\n>b\\nATGGGTTGA\\n')
+        >>> for protein in sgc.translate_many(fasta, [1, -1]):
+        ...     print(protein.metadata['id'], protein)
+        a MPL*
+        a LKWH
+        b MG*
+        b STH
+
+        """
+        if isinstance(reading_frames, int):
+            reading_frames = [reading_frames]
+        else:
+            reading_frames = list(reading_frames)
+        self._validate_options(reading_frames, start, stop)
+
+        if isinstance(sequences, str) or hasattr(sequences, 'read'):
+            sequences = skbio.io.read(sequences, format='fasta',
+                                      constructor=constructor)
+
+        for sequence in sequences:
+            if not isinstance(sequence, (DNA, RNA)):
+                raise TypeError("Sequence to translate must be DNA or RNA, "
+                                "not %s" % type(sequence).__name__)
+            offsets = self._validated_offsets(sequence)
+            metadata = self._translated_metadata(sequence)
+            for reading_frame in reading_frames:
+                yield self._translate_frame(offsets, reading_frame, start,
+                                            stop, metadata)
+
+    @experimental(as_of="0.5.1")
+    def find_orfs(self, sequence, min_length=75, alternative_starts=False,
+                  partial=False, as_interval_metadata=False):
+        """Find the open reading frames (ORFs) of a sequence.
+
+        An ORF is the region of a reading frame from a start codon to the next
+        stop codon, inclusive. Only the first start codon after each stop codon
+        (or after the beginning of the reading frame) starts an ORF, so that
+        ORFs nested in a longer ORF of the same reading frame are not
+        reported. All six reading frames are searched.
+
+        Parameters
+        ----------
+        sequence : DNA or RNA
+            Sequence in which to find ORFs. ``DNA`` sequences are read as
+            ``RNA`` would be, without being transcribed.
+        min_length : int, optional
+            Minimum length of the ORFs in nucleotides, including the stop
+            codon. The default of 75 is that of NCBI's ORFfinder [1]_.
+        alternative_starts : bool, optional
+            If ``False``, only start codons coding for methionine (M) start
+            ORFs, e.g. AUG in NCBI's standard genetic code. If ``True``, all
+            start codons of the genetic code do, e.g. AUG, CUG and UUG.
+        partial : bool, optional
+            Also report ORFs which are not terminated by a stop codon before
+            the end of the sequence. These end at the last complete codon of
+            the reading frame.
+        as_interval_metadata : bool, optional
+            Return the ORFs as an ``IntervalMetadata`` object instead of a
+            list.
+
+        Returns
+        -------
+        list of tuple or IntervalMetadata
+            The ``(start, end, reading_frame)`` of each ORF, where `start` and
+            `end` are the zero-based, half-open coordinates of the ORF on the
+            forward strand, and `reading_frame` is one of
+            ``GeneticCode.reading_frames``. ORFs are listed by reading frame,
+            in this order, and then in the order in which they are read on
+            their strand. If `as_interval_metadata` is ``True``, each ORF is an
+            interval feature whose metadata have a ``'type'`` of ``'ORF'``, a
+            ``'strand'`` of ``'+'`` or ``'-'``, a ``'phase'`` of 0, and the
+            ``'reading_frame'``. The end of a partial ORF without stop codon is
+            fuzzy.
+
+        Raises
+        ------
+        TypeError
+            If `sequence` is not ``DNA`` or ``RNA``.
+        ValueError
+            If `sequence` is gapped.
+        NotImplementedError
+            If `sequence` is degenerate.
+
+        See Also
+        --------
+        translate
+        translate_six_frames
+        skbio.metadata.IntervalMetadata
+
+        Notes
+        -----
+        The codon indices of each reading frame are computed as in
+        ``GeneticCode.translate``, and start and stop codons are found with
+        lookup tables over these indices. The first start codon after each
+        stop codon is found for all stop codons of a reading frame at once
+        with a binary search in the positions of the start codons, so that no
+        protein sequence is built.
+
+        References
+        ----------
+        .. [1] https://www.ncbi.nlm.nih.gov/orffinder/
+
+        Examples
+        --------
+        Find the ORFs of at least 9 nucleotides of a DNA sequence using NCBI's
+        standard genetic code (table ID 1):
+
+        >>> from skbio import DNA, GeneticCode
+        >>> sgc = GeneticCode.from_ncbi()
+        >>> dna = DNA('ATGAAATAGTTGCCCTGACTATTTCAT')
+        >>> sgc.find_orfs(dna, min_length=9)
+        [(0, 9, 1), (18, 27, -1)]
+
+        Alternative start codons, such as UUG (TTG in DNA), can also start
+        ORFs:
+
+        >>> sgc.find_orfs(dna, min_length=9, alternative_starts=True)
+        [(0, 9, 1), (9, 18, 1), (18, 27, -1)]
+
+        ORFs can be returned as interval features, e.g. to be added to the
+        sequence's interval metadata:
+
+        >>> orfs = sgc.find_orfs(dna, min_length=9, as_interval_metadata=True)
+        >>> dna.interval_metadata.merge(orfs)
+        >>> dna.interval_metadata.num_interval_features
+        2
+
+        """
+        if not isinstance(sequence, (DNA, RNA)):
+            raise TypeError("Sequence in which to find ORFs must be DNA or "
+                            "RNA, not %s" % type(sequence).__name__)
+        offsets = self._validated_offsets(sequence)
+
+        start_table = self._start_table
+        if not alternative_starts:
+            start_table = start_table & (self._amino_acid_table == b'M')
+
+        length = len(offsets)
+        orfs = []
+        for reading_frame in self.reading_frames:
+            codons = self._frame_codons(offsets, reading_frame)
+            starts = np.flatnonzero(start_table[codons])
+            stops = np.flatnonzero(self._stop_table[codons])
+            ends = stops + 1
+            if partial:
+                # the end of the reading frame is a stop codon of partial ORFs
+                stops = np.append(stops, len(codons))
+                ends = np.append(ends, len(codons))
+
+            # each stop codon ends the ORF of the first start codon after the
+            # previous stop codon, if there is one before it
+            after_stops = np.concatenate([[0], ends])[:len(ends)]
+            first_starts = np.append(starts, len(codons))[
+                np.searchsorted(starts, after_stops)]
+            is_orf = first_starts < stops
+            is_orf &= (ends - first_starts) * 3 >= min_length
+
+            offset = abs(reading_frame) - 1
+            has_stop = (ends != stops)[is_orf]
+            first_starts = first_starts[is_orf] * 3 + offset
+            ends = ends[is_orf] * 3 + offset
+            if reading_frame < 0:
+                first_starts, ends = length - ends, length - first_starts
+            orfs.extend(zip(first_starts.tolist(), ends.tolist(),
+                            [reading_frame] * len(ends), has_stop.tolist()))
+
+        if not as_interval_metadata:
+            return [orf[:3] for orf in orfs]
+
+        interval_metadata = IntervalMetadata(length)
+        for start, end, reading_frame, has_stop in orfs:
+            forward = reading_frame > 0
+            interval_metadata.add(
+                [(start, end)],
+                fuzzy=[(not has_stop and not forward,
+                        not has_stop and forward)],
+                metadata={'type': 'ORF', 'strand': '+' if forward else '-',
+                          'phase': 0, 'reading_frame': reading_frame})
+        return interval_metadata
 
 
 # defined at http://www.ncbi.nlm.nih.gov/Taxonomy/Utils/wprintgc.cgi
@@ -15,6 +15,7 @@ import numpy as np
 from skbio.util._decorator import (classproperty, overrides, stable,
                                    deprecated, experimental)
 from skbio.util._misc import MiniRegistry
+from ._kmer import _kmer_counts
 from ._sequence import Sequence
 
 
@@ -792,6 +793,63 @@ class GrammaredSequence(Sequence, metaclass=GrammaredSequenceMeta):
 
         return self._motifs[motif_type](self, min_length, ignore)
 
+    @experimental(as_of='0.5.1')
+    def kmer_counts(self, k, overlap=True, relative=False):
+        """Return counts of words of length `k` as a dense vector.
+
+        Only words of definite characters are counted. The count of each word
+        is at the index of the word in the lexicographical order of all words
+        of length `k` of the sorted definite characters, i.e. in the order of
+        ``itertools.product(sorted(self.definite_chars), repeat=k)``.
+
+        Parameters
+        ----------
+        k : int
+            The word length.
+        overlap : bool, optional
+            Defines whether the kmers should be overlapping or not.
+        relative : bool, optional
+            If ``True``, return the relative frequency of each kmer among the
+            counted kmers instead of its count.
+
+        Returns
+        -------
+        np.ndarray
+            Counts of the ``len(self.definite_chars) ** k`` words of length
+            `k`.
+
+        Raises
+        ------
+        ValueError
+            If `k` is less than 1, or if there are too many words of length
+            `k` to be indexed with 64-bit integers.
+
+        See Also
+        --------
+        kmer_frequencies
+
+        Notes
+        -----
+        Each definite character is encoded as its index in the sorted definite
+        characters (e.g., 2 bits per character for ``DNA``), and the index of
+        each kmer is computed from these for all kmers at once. Kmers which
+        contain gap or degenerate characters are not counted.
+
+        Examples
+        --------
+        >>> from skbio import DNA
+        >>> s = DNA('ACGTNACG')
+        >>> counts = s.kmer_counts(2)
+        >>> counts.reshape(4, 4)
+        array([[0, 2, 0, 0],
+               [0, 0, 2, 0],
+               [0, 0, 0, 1],
+               [0, 0, 0, 0]])
+
+        """
+        alphabet = np.sort(self._definite_char_codes).astype(np.uint8)
+        return _kmer_counts(self._bytes, k, overlap, relative, alphabet)
+
     @overrides(Sequence)
     def _constructor(self, **kwargs):
         return self.__class__(validate=False, lowercase=False, **kwargs)
@@ -0,0 +1,195 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import collections
+
+import numpy as np
+
+# k-mer codes are stored as int64, so that there must be fewer than 2 ** 63
+# distinct k-mers of an alphabet
+_max_num_kmers = 2 ** 63
+
+
+def _num_kmers(length, k, overlap):
+    """Return the number of k-mers of a sequence and the step between them"""
+    if k < 1:
+        raise ValueError("k must be greater than 0.")
+    step = 1 if overlap else k
+    if length < k:
+        return 0, step
+    return (length - k) // step + 1, step
+
+
+def _kmer_codes(seq_bytes, k, overlap, alphabet, complement=None):
+    """Encode each k-mer of a sequence as an integer.
+
+    Each character of `alphabet` is assigned its index, and each k-mer is
+    encoded as its characters' indices in base ``len(alphabet)``, the first
+    being the most significant. The codes of all k-mers are computed at once,
+    a position of the k-mers at a time. As `alphabet` is sorted, codes are in
+    the lexicographical order of the k-mers.
+
+    Parameters
+    ----------
+    seq_bytes : np.ndarray of np.uint8
+        The characters of the sequence.
+    k : int
+        The k-mer length.
+    overlap : bool
+        Whether the k-mers overlap.
+    alphabet : np.ndarray of np.uint8
+        The sorted, distinct characters to encode. K-mers containing other
+        characters are not returned.
+    complement : np.ndarray of np.uint8, optional
+        The complement of each character of `alphabet`, which must also be in
+        `alphabet`. If provided, each k-mer is encoded as the smaller of its
+        code and the code of its reverse complement, i.e. as its canonical
+        k-mer.
+
+    Returns
+    -------
+    np.ndarray of np.int64
+        The code of each k-mer, in the order of the k-mers in the sequence.
+
+    Raises
+    ------
+    ValueError
+        If there are too many k-mers of the alphabet to be encoded in 64 bits.
+
+    """
+    count, step = _num_kmers(len(seq_bytes), k, overlap)
+    base = len(alphabet)
+    if base ** k > _max_num_kmers:
+        raise ValueError("k=%d is too large to encode the k-mers of an "
+                         "alphabet of %d characters." % (k, base))
+
+    lookup = np.full(256, -1, dtype=np.int64)
+    lookup[alphabet] = np.arange(base)
+    indices = lookup[seq_bytes]
+    if complement is not None:
+        complement_indices = lookup[complement]
+
+    codes = np.zeros(count, dtype=np.int64)
+    if complement is not None:
+        reverse_codes = np.zeros(count, dtype=np.int64)
+    end = (count - 1) * step + 1
+    for position in range(k):
+        column = indices[position:position + end:step]
+        codes *= base
+        codes += column
+        if complement is not None:
+            # the first character of a k-mer is the last of its reverse
+            # complement, i.e. the least significant
+            reverse_codes += complement_indices[column] * base ** position
+
+    if complement is not None:
+        np.minimum(codes, reverse_codes, out=codes)
+
+    invalid = indices < 0
+    if count and invalid.any():
+        # a k-mer is valid if there are as many invalid characters before its
+        # first character as before its end
+        invalid_before = np.zeros(len(invalid) + 1, dtype=np.intp)
+        np.cumsum(invalid, out=invalid_before[1:])
+        starts = np.arange(0, end, step)
+        codes = codes[invalid_before[starts] == invalid_before[starts + k]]
+    return codes
+
+
+def _decode_kmers(codes, k, alphabet):
+    """Return the k-mer strings of codes from ``_kmer_codes``"""
+    base = len(alphabet)
+    chars = np.empty((len(codes), k), dtype=np.uint8)
+    remainders = np.array(codes, dtype=np.int64)
+    for position in range(k - 1, -1, -1):
+        chars[:, position] = alphabet[remainders % base]
+        remainders //= base
+    text = chars.tostring().decode('ascii')
+    return [text[start:start + k] for start in range(0, len(text), k)]
+
+
+def _kmer_frequencies(seq_bytes, k, overlap, relative, complement_lookup=None):
+    """Count the k-mers of a sequence as a dict keyed by k-mer string.
+
+    Parameters
+    ----------
+    seq_bytes : np.ndarray of np.uint8
+        The characters of the sequence.
+    k : int
+        The k-mer length.
+    overlap : bool
+        Whether the k-mers overlap.
+    relative : bool
+        Whether to divide the counts by the number of k-mers.
+    complement_lookup : np.ndarray of np.uint8, optional
+        The complement of each character code. If provided, canonical k-mers
+        are counted.
+
+    """
+    count, step = _num_kmers(len(seq_bytes), k, overlap)
+    if not count:
+        return {}
+
+    # only the characters of the sequence are encoded, so that DNA is usually
+    # encoded with 2 bits per character
+    alphabet = np.flatnonzero(np.bincount(seq_bytes, minlength=256))
+    complement = None
+    if complement_lookup is not None:
+        alphabet = np.union1d(alphabet, complement_lookup[alphabet])
+        complement = complement_lookup[alphabet].astype(np.uint8)
+    alphabet = alphabet.astype(np.uint8)
+
+    if len(alphabet) ** k > _max_num_kmers:
+        # long k-mers of large alphabets cannot be encoded as integers
+        text = seq_bytes.tostring().decode('ascii')
+        starts = range(0, count * step, step)
+        words = [text[start:start + k] for start in starts]
+        if complement is not None:
+            reverse = complement_lookup[seq_bytes[::-1]]
+            reverse = reverse.tostring().decode('ascii')
+            ends = [len(text) - start for start in starts]
+            words = [min(word, reverse[end - k:end])
+                     for word, end in zip(words, ends)]
+        freqs = collections.Counter(words)
+        values, counts = list(freqs), np.array(list(freqs.values()))
+    else:
+        codes = _kmer_codes(seq_bytes, k, overlap, alphabet, complement)
+        values, counts = np.unique(codes, return_counts=True)
+        values = _decode_kmers(values, k, alphabet)
+
+    if relative:
+        counts = counts / count
+    return dict(zip(values, counts.tolist()))
+
+
+def _kmer_counts(seq_bytes, k, overlap, relative, alphabet, complement=None):
+    """Count the k-mers of a sequence as a vector indexed by k-mer code.
+
+    Parameters
+    ----------
+    seq_bytes : np.ndarray of np.uint8
+        The characters of the sequence.
+    k : int
+        The k-mer length.
+    overlap : bool
+        Whether the k-mers overlap.
+    relative : bool
+        Whether to divide the counts by the number of counted k-mers.
+    alphabet : np.ndarray of np.uint8
+        The sorted, distinct characters of the counted k-mers.
+    complement : np.ndarray of np.uint8, optional
+        The complement of each character of `alphabet`. If provided, canonical
+        k-mers are counted.
+
+    """
+    codes = _kmer_codes(seq_bytes, k, overlap, alphabet, complement)
+    counts = np.bincount(codes, minlength=len(alphabet) ** k)
+    if relative:
+        total = len(codes)
+        counts = counts / total if total else counts.astype(float)
+    return counts
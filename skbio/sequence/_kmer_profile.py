@@ -0,0 +1,173 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+import scipy.sparse
+
+import skbio
+from skbio.util._decorator import experimental
+from ._dna import DNA
+from ._grammared_sequence import GrammaredSequence
+from ._kmer import _kmer_codes
+from ._nucleotide_mixin import NucleotideMixin
+
+
+@experimental(as_of='0.5.1')
+def kmer_profile(sequences, k, overlap=True, canonical=False, alphabet=None,
+                 constructor=DNA):
+    """Count the k-mers of each of a collection of sequences.
+
+    Parameters
+    ----------
+    sequences : iterable of Sequence, or str or filehandle
+        The sequences, all of the same type. If a filepath or filehandle, the
+        sequences are read from it as a FASTA file with ``skbio.io.read``.
+    k : int
+        The k-mer length.
+    overlap : bool, optional
+        Defines whether the kmers should be overlapping or not.
+    canonical : bool, optional
+        If ``True``, count each kmer together with its reverse complement as
+        in ``canonical_kmer_counts``. The sequences must be ``DNA`` or
+        ``RNA``.
+    alphabet : str, optional
+        The characters of the counted kmers. Defaults to the definite
+        characters of the sequences' type, and must be provided for sequences
+        which are not a ``GrammaredSequence``.
+    constructor : type, optional
+        The type of the sequences read from a file.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The count of each kmer (column) in each sequence (row). Columns are
+        indexed as in ``GrammaredSequence.kmer_counts``, i.e. in the
+        lexicographical order of all ``len(alphabet) ** k`` kmers of the
+        sorted characters of `alphabet`.
+    list of str
+        The ID of each sequence, from its ``'id'`` metadata if it has one, and
+        its index otherwise.
+
+    Raises
+    ------
+    ValueError
+        If `k` is less than 1, or if there are too many kmers of length `k` to
+        be indexed with 64-bit integers.
+    ValueError
+        If `alphabet` is not provided for sequences which are not a
+        ``GrammaredSequence``, or if `canonical` is ``True`` and the
+        complements of its characters are not in `alphabet`.
+    TypeError
+        If the sequences are not all of the same type, or if `canonical` is
+        ``True`` and they are not nucleotide sequences.
+
+    See Also
+    --------
+    GrammaredSequence.kmer_counts
+    skbio.sequence.distance.kmer_profile_distances
+
+    Notes
+    -----
+    The sequences are read in a single pass and only the kmers of one sequence
+    are held in memory at a time, in addition to the nonzero entries of the
+    matrix. Kmers containing other characters than those of `alphabet` (e.g.,
+    gap or degenerate characters) are not counted.
+
+    The matrix can be used as a table of counts, e.g. by
+    ``skbio.diversity.beta_diversity``, with the IDs of the sequences.
+
+    Examples
+    --------
+    >>> from skbio import DNA
+    >>> from skbio.sequence import kmer_profile
+    >>> seqs = [DNA('ACGTT', metadata={'id': 'a'}),
+    ...         DNA('ACGTA', metadata={'id': 'b'})]
+    >>> counts, ids = kmer_profile(seqs, 2)
+    >>> counts.shape
+    (2, 16)
+    >>> counts.toarray()[:, :4]
+    array([[0, 1, 0, 0],
+           [0, 1, 0, 0]])
+    >>> ids
+    ['a', 'b']
+
+    FASTA files can be read directly:
+
+    >>> from io import StringIO
+    >>> fasta = StringIO('>x\\nACGT\\n>y\\nAAAA\\n')
+    >>> counts, ids = kmer_profile(fasta, 3, canonical=True)
+    >>> counts.toarray()[:, [0, 6]]
+    array([[0, 2],
+           [2, 0]])
+    >>> ids
+    ['x', 'y']
+
+    """
+    if isinstance(sequences, str) or hasattr(sequences, 'read'):
+        sequences = skbio.io.read(sequences, format='fasta',
+                                  constructor=constructor)
+
+    seq_type = None
+    ids = []
+    indices = []
+    data = []
+    indptr = [0]
+    for i, seq in enumerate(sequences):
+        if seq_type is None:
+            seq_type = type(seq)
+            codes, complement = _profile_alphabet(seq_type, canonical,
+                                                  alphabet)
+        elif type(seq) is not seq_type:
+            raise TypeError("All sequences must be of the same type (%s), "
+                            "not %s." % (seq_type.__name__,
+                                         type(seq).__name__))
+
+        kmers, counts = np.unique(
+            _kmer_codes(seq._bytes, k, overlap, codes, complement),
+            return_counts=True)
+        indices.append(kmers)
+        data.append(counts)
+        indptr.append(indptr[-1] + len(kmers))
+        ids.append(str(seq.metadata.get('id', i)) if seq.has_metadata()
+                   else str(i))
+
+    if seq_type is None:
+        # without sequences, the columns are only defined by the alphabet
+        codes = np.unique(np.fromstring(alphabet or '', dtype=np.uint8))
+        _kmer_codes(np.empty(0, dtype=np.uint8), k, overlap, codes)
+
+    num_kmers = len(codes) ** k
+    indices = np.concatenate(indices) if indices else np.empty(0, np.int64)
+    data = np.concatenate(data) if data else np.empty(0, np.int64)
+    counts = scipy.sparse.csr_matrix(
+        (data, indices, np.asarray(indptr, dtype=np.int64)),
+        shape=(len(ids), num_kmers))
+    return counts, ids
+
+
+def _profile_alphabet(seq_type, canonical, alphabet):
+    """Return the sorted character codes and complements of a profile"""
+    if alphabet is None:
+        if not issubclass(seq_type, GrammaredSequence):
+            raise ValueError("An alphabet must be provided for sequences of "
+                             "type %s." % seq_type.__name__)
+        codes = np.sort(seq_type._definite_char_codes)
+    else:
+        codes = np.unique(np.fromstring(alphabet, dtype=np.uint8))
+    codes = codes.astype(np.uint8)
+
+    complement = None
+    if canonical:
+        if not issubclass(seq_type, NucleotideMixin):
+            raise TypeError("Canonical kmers are only defined for nucleotide "
+                            "sequences, not %s." % seq_type.__name__)
+        complement = seq_type._complement_lookup[codes]
+        if not np.in1d(complement, codes).all():
+            raise ValueError("The complements of the characters of the "
+                             "alphabet must be in the alphabet.")
+    return codes, complement
@@ -0,0 +1,472 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+
+import skbio
+from skbio._base import SkbioObject
+from skbio.util._decorator import experimental, classonlymethod
+from ._dna import DNA
+from ._grammared_sequence import GrammaredSequence
+from ._kmer import _kmer_codes
+from ._nucleotide_mixin import NucleotideMixin
+from ._sequence import Sequence
+
+
+class MinHashSketch(SkbioObject):
+    """A bottom-k MinHash sketch of the k-mers of sequences.
+
+    A sketch stores the smallest hashes of the distinct kmers of one or more
+    sequences (e.g., the contigs of a genome), from which the Jaccard index of
+    the kmers of two sketched genomes, and the Mash distance [1]_ between them,
+    are estimated without storing all of their kmers.
+
+    Parameters
+    ----------
+    hashes : 1-D array_like of np.uint64
+        The hashes of the kmers. Only the `size` smallest distinct hashes are
+        kept.
+    k : int
+        The kmer length.
+    size : int
+        The largest number of hashes of the sketch.
+    alphabet : str
+        The characters of the kmers, from which the hashes are computed.
+    canonical : bool
+        Whether the hashes are those of canonical kmers, i.e. whether a kmer
+        and its reverse complement have the same hash.
+    seed : int
+        The seed of the hash function.
+
+    Attributes
+    ----------
+    hashes
+    k
+    size
+    alphabet
+    canonical
+    seed
+
+    Raises
+    ------
+    ValueError
+        If `k` or `size` is less than 1.
+
+    See Also
+    --------
+    skbio.sequence.distance.minhash_distances
+
+    Notes
+    -----
+    Sketches are usually created with ``from_sequences``. Each kmer of definite
+    characters is encoded as an integer, as in
+    ``GrammaredSequence.kmer_counts``, and hashed with a bijective 64-bit
+    mixing function, so that distinct kmers have distinct hashes.
+
+    References
+    ----------
+    .. [1] Ondov BD, Treangen TJ, Melsted P, Mallonee AB, Bergman NH, Koren S,
+       Phillippy AM. (2016) "Mash: fast genome and metagenome distance
+       estimation using MinHash." Genome Biology 17:132.
+
+    Examples
+    --------
+    >>> from skbio import DNA
+    >>> from skbio.sequence import MinHashSketch
+    >>> seq1 = DNA('ACGGTCAGTTACGATCGGACTTAGGC')
+    >>> seq2 = DNA('ACGGTCAGTTACGATCGGACTTAGGA')
+    >>> sketch1 = MinHashSketch.from_sequences(seq1, k=5, size=100)
+    >>> sketch2 = MinHashSketch.from_sequences(seq2, k=5, size=100)
+    >>> sketch1
+    <MinHashSketch, k: 5, size: 100, hashes: 21, canonical: True>
+    >>> round(sketch1.jaccard(sketch2), 6)
+    0.909091
+    >>> round(sketch1.mash_distance(sketch2), 6)
+    0.009758
+
+    """
+
+    @property
+    @experimental(as_of='0.5.1')
+    def hashes(self):
+        """The sorted, distinct hashes of the sketch."""
+        return self._hashes
+
+    @property
+    @experimental(as_of='0.5.1')
+    def k(self):
+        """The kmer length."""
+        return self._k
+
+    @property
+    @experimental(as_of='0.5.1')
+    def size(self):
+        """The largest number of hashes of the sketch."""
+        return self._size
+
+    @property
+    @experimental(as_of='0.5.1')
+    def alphabet(self):
+        """The sorted characters of the kmers."""
+        return self._alphabet
+
+    @property
+    @experimental(as_of='0.5.1')
+    def canonical(self):
+        """Whether the hashes are those of canonical kmers."""
+        return self._canonical
+
+    @property
+    @experimental(as_of='0.5.1')
+    def seed(self):
+        """The seed of the hash function."""
+        return self._seed
+
+    @experimental(as_of='0.5.1')
+    def __init__(self, hashes, k, size, alphabet, canonical, seed):
+        if k < 1:
+            raise ValueError("k must be greater than 0.")
+        if size < 1:
+            raise ValueError("size must be greater than 0.")
+        hashes = _bottom_hashes(np.asarray(hashes, dtype=np.uint64), size)
+        hashes.flags.writeable = False
+        self._hashes = hashes
+        self._k = int(k)
+        self._size = int(size)
+        self._alphabet = ''.join(sorted(set(alphabet)))
+        self._canonical = bool(canonical)
+        self._seed = int(seed)
+
+    @classonlymethod
+    @experimental(as_of='0.5.1')
+    def from_sequences(cls, sequences, k=21, size=1000, canonical=None,
+                       seed=42, constructor=DNA):
+        """Sketch the kmers of one or more sequences.
+
+        Parameters
+        ----------
+        sequences : GrammaredSequence, iterable of GrammaredSequence, or str
+                    or filehandle
+            The sequences, all of the same type. The kmers of all sequences
+            are sketched together. If a filepath or filehandle, the sequences
+            are read from it as a FASTA file with ``skbio.io.read``.
+        k : int, optional
+            The kmer length.
+        size : int, optional
+            The largest number of hashes of the sketch.
+        canonical : bool, optional
+            Whether to hash each kmer together with its reverse complement.
+            Defaults to ``True`` for nucleotide sequences, and ``False``
+            otherwise.
+        seed : int, optional
+            The seed of the hash function. Only sketches with the same seed
+            can be compared.
+        constructor : type, optional
+            The type of the sequences read from a file.
+
+        Returns
+        -------
+        MinHashSketch
+            The sketch of the kmers of the sequences.
+
+        Raises
+        ------
+        TypeError
+            If the sequences are not all of the same ``GrammaredSequence``
+            type, or if `canonical` is ``True`` and they are not nucleotide
+            sequences.
+        ValueError
+            If there are no sequences, or if there are too many kmers of
+            length `k` to be indexed with 64-bit integers.
+
+        Notes
+        -----
+        Kmers containing gap or degenerate characters are not sketched. The
+        sequences are hashed a block of positions at a time, so that only the
+        hashes of a block and those of the sketch are held in memory.
+
+        """
+        if isinstance(sequences, Sequence):
+            sequences = [sequences]
+        elif isinstance(sequences, str) or hasattr(sequences, 'read'):
+            sequences = skbio.io.read(sequences, format='fasta',
+                                      constructor=constructor)
+
+        hashes = np.empty(0, dtype=np.uint64)
+        seq_type = None
+        for seq in sequences:
+            if seq_type is None:
+                seq_type = type(seq)
+                if not issubclass(seq_type, GrammaredSequence):
+                    raise TypeError("Sequences must be a GrammaredSequence, "
+                                    "not %s." % seq_type.__name__)
+                alphabet = np.sort(seq_type._definite_char_codes)
+                alphabet = alphabet.astype(np.uint8)
+                is_nucleotide = issubclass(seq_type, NucleotideMixin)
+                if canonical is None:
+                    canonical = is_nucleotide
+                elif canonical and not is_nucleotide:
+                    raise TypeError("Canonical kmers are only defined for "
+                                    "nucleotide sequences, not %s." %
+                                    seq_type.__name__)
+                complement = (seq_type._complement_lookup[alphabet]
+                              if canonical else None)
+            elif type(seq) is not seq_type:
+                raise TypeError("All sequences must be of the same type (%s), "
+                                "not %s." % (seq_type.__name__,
+                                             type(seq).__name__))
+
+            seq_bytes = seq._bytes
+            # consecutive blocks share the first k - 1 positions of the
+            # next block, so that every kmer is in a block
+            for start in range(0, max(len(seq_bytes) - k + 1, 0),
+                               _sketch_block_size):
+                block = seq_bytes[start:start + _sketch_block_size + k - 1]
+                codes = _kmer_codes(block, k, True, alphabet, complement)
+                block_hashes = _bottom_hashes(_hash_codes(codes, seed), size)
+                hashes = _bottom_hashes(
+                    np.concatenate([hashes, block_hashes]), size)
+
+        if seq_type is None:
+            raise ValueError("There must be at least one sequence.")
+        alphabet = alphabet.tostring().decode('ascii')
+        return cls(hashes, k, size, alphabet, canonical, seed)
+
+    @experimental(as_of='0.5.1')
+    def jaccard(self, other):
+        """Estimate the Jaccard index of the kmers of two sketches.
+
+        Parameters
+        ----------
+        other : MinHashSketch
+            The sketch to compare with.
+
+        Returns
+        -------
+        float
+            The estimated Jaccard index, between 0 and 1.
+
+        Raises
+        ------
+        ValueError
+            If the sketches do not have the same `k`, `alphabet`, `canonical`
+            and `seed`.
+
+        Notes
+        -----
+        The sketches are truncated to the smaller of their sizes. A sketch
+        with as many hashes as its size holds all the hashes of the kmers up
+        to its largest hash, and a smaller sketch holds the hashes of all the
+        kmers. The Jaccard index is estimated from the hashes up to the largest
+        hash of the two sketches which are complete up to it, i.e. as the
+        number of these hashes in both sketches divided by their number in
+        either sketch. This uses at least as many hashes as the bottom-k
+        estimate of Mash. The Jaccard index of two sketches without hashes is
+        1.
+
+        """
+        self._check_compatible(other)
+        size = min(self._size, other._size)
+        first, second = self._hashes[:size], other._hashes[:size]
+        threshold = min(_threshold(first, size), _threshold(second, size))
+        first = first[:np.searchsorted(first, threshold, side='right')]
+        second = second[:np.searchsorted(second, threshold, side='right')]
+        shared = len(np.intersect1d(first, second, assume_unique=True))
+        union = len(first) + len(second) - shared
+        return shared / union if union else 1.0
+
+    @experimental(as_of='0.5.1')
+    def mash_distance(self, other):
+        """Estimate the Mash distance between the kmers of two sketches.
+
+        Parameters
+        ----------
+        other : MinHashSketch
+            The sketch to compare with.
+
+        Returns
+        -------
+        float
+            The Mash distance, between 0 and 1.
+
+        Raises
+        ------
+        ValueError
+            If the sketches do not have the same `k`, `alphabet`, `canonical`
+            and `seed`.
+
+        See Also
+        --------
+        jaccard
+
+        Notes
+        -----
+        The Mash distance [1]_ :math:`-\\frac{1}{k}\\ln\\frac{2J}{1+J}` is an
+        estimate of the mutation rate between two sequences from the Jaccard
+        index :math:`J` of their kmers. It is 1 if no kmers are shared.
+
+        References
+        ----------
+        .. [1] Ondov BD, Treangen TJ, Melsted P, Mallonee AB, Bergman NH,
+           Koren S, Phillippy AM. (2016) "Mash: fast genome and metagenome
+           distance estimation using MinHash." Genome Biology 17:132.
+
+        """
+        return float(_mash_distance(np.array([self.jaccard(other)]),
+                                    self._k)[0])
+
+    @experimental(as_of='0.5.1')
+    def save(self, file):
+        """Save the sketch to a numpy ``.npz`` file.
+
+        Parameters
+        ----------
+        file : str or filehandle
+            The file to write to.
+
+        See Also
+        --------
+        load
+
+        """
+        np.savez(file, hashes=self._hashes, k=self._k, size=self._size,
+                 alphabet=self._alphabet, canonical=self._canonical,
+                 seed=self._seed)
+
+    @classonlymethod
+    @experimental(as_of='0.5.1')
+    def load(cls, file):
+        """Load a sketch saved with ``save``.
+
+        Parameters
+        ----------
+        file : str or filehandle
+            The file to read from.
+
+        Returns
+        -------
+        MinHashSketch
+            The saved sketch.
+
+        See Also
+        --------
+        save
+
+        """
+        with np.load(file) as data:
+            return cls(data['hashes'], int(data['k']), int(data['size']),
+                       str(data['alphabet']), bool(data['canonical']),
+                       int(data['seed']))
+
+    @experimental(as_of='0.5.1')
+    def __eq__(self, other):
+        """Determine if two sketches are equal.
+
+        Sketches are equal if they are of the same type and have the same
+        hashes and parameters.
+
+        """
+        if type(self) is not type(other):
+            return False
+        return (self._params() == other._params() and
+                np.array_equal(self._hashes, other._hashes))
+
+    @experimental(as_of='0.5.1')
+    def __ne__(self, other):
+        """Determine if two sketches are not equal."""
+        return not (self == other)
+
+    @experimental(as_of='0.5.1')
+    def __len__(self):
+        """Return the number of hashes of the sketch."""
+        return len(self._hashes)
+
+    @experimental(as_of='0.5.1')
+    def __repr__(self):
+        """Return a summary of the sketch."""
+        return "<%s, k: %d, size: %d, hashes: %d, canonical: %s>" % (
+            self.__class__.__name__, self._k, self._size, len(self._hashes),
+            self._canonical)
+
+    @experimental(as_of='0.5.1')
+    def __str__(self):
+        """Return a summary of the sketch."""
+        return repr(self)
+
+    def _params(self):
+        return self._k, self._alphabet, self._canonical, self._seed
+
+    def _check_compatible(self, other):
+        if not isinstance(other, MinHashSketch):
+            raise TypeError("Sketches can only be compared with a "
+                            "MinHashSketch, not %s." % type(other).__name__)
+        if self._params() != other._params():
+            raise ValueError("Sketches must have the same k, alphabet, "
+                             "canonical and seed to be compared: %r != %r" %
+                             (self._params(), other._params()))
+
+
+# the number of positions of a sequence which are hashed at once
+_sketch_block_size = 2 ** 20
+
+_max_hash = np.uint64(2 ** 64 - 1)
+
+
+def _mix(values):
+    """Mix 64-bit integers in place with the finalizer of MurmurHash3.
+
+    Each step is invertible, so that distinct values remain distinct.
+
+    """
+    values ^= values >> np.uint64(33)
+    values *= np.uint64(0xff51afd7ed558ccd)
+    values ^= values >> np.uint64(33)
+    values *= np.uint64(0xc4ceb9fe1a85ec53)
+    values ^= values >> np.uint64(33)
+    return values
+
+
+def _hash_codes(codes, seed):
+    """Hash the integer codes of kmers"""
+    key = _mix(np.array([seed], dtype=np.uint64))
+    hashes = codes.astype(np.uint64)
+    hashes ^= key
+    return _mix(hashes)
+
+
+def _bottom_hashes(hashes, size):
+    """Return the `size` smallest distinct hashes, sorted"""
+    if len(hashes) <= size:
+        return np.unique(hashes)
+    # the smallest hashes are selected without sorting all of them, and more
+    # are selected if some are duplicates
+    num_selected = size
+    while True:
+        selected = np.unique(np.partition(hashes, num_selected - 1)
+                             [:num_selected])
+        if len(selected) >= size or num_selected == len(hashes):
+            return selected[:size]
+        num_selected = min(2 * num_selected, len(hashes))
+
+
+def _threshold(hashes, size):
+    """Return the largest hash up to which a sketch holds all hashes"""
+    return hashes[-1] if len(hashes) == size else _max_hash
+
+
+def _jaccard(shared, union):
+    """Return the Jaccard index, and 1 if there are no hashes"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, shared / union, 1.0)
+
+
+def _mash_distance(jaccard, k):
+    """Return the Mash distances from Jaccard indices"""
+    with np.errstate(divide='ignore'):
+        distance = np.log((1 + jaccard) / (2 * jaccard)) / k
+    return np.minimum(distance, 1.0)
@@ -10,8 +10,10 @@ from abc import ABCMeta, abstractproperty
 
 import numpy as np
 
-from skbio.util._decorator import classproperty, stable
+import skbio
+from skbio.util._decorator import classproperty, stable, experimental
 from ._grammared_sequence import _motifs as parent_motifs
+from ._kmer import _kmer_counts, _kmer_frequencies
 
 
 class NucleotideMixin(metaclass=ABCMeta):
@@ -372,6 +374,143 @@ class NucleotideMixin(metaclass=ABCMeta):
                 gc /= len(seq)
         return gc
 
+    @experimental(as_of='0.5.1')
+    def canonical_kmer_frequencies(self, k, overlap=True, relative=False):
+        """Return counts of canonical words of length `k`.
+
+        A word and its reverse complement are counted together as the
+        canonical word, which is the lexicographically smaller of the two.
+
+        Parameters
+        ----------
+        k : int
+            The word length.
+        overlap : bool, optional
+            Defines whether the kmers should be overlapping or not.
+        relative : bool, optional
+            If ``True``, return the relative frequency of each canonical kmer
+            instead of its count.
+
+        Returns
+        -------
+        dict
+            Frequencies of canonical words of length `k` contained in this
+            sequence.
+
+        Raises
+        ------
+        ValueError
+            If `k` is less than 1.
+
+        See Also
+        --------
+        kmer_frequencies
+        canonical_kmer_counts
+
+        Examples
+        --------
+        >>> from pprint import pprint
+        >>> from skbio import DNA
+        >>> s = DNA('ACGTT')
+        >>> pprint(s.canonical_kmer_frequencies(2))
+        {'AA': 1, 'AC': 2, 'CG': 1}
+
+        """
+        return _kmer_frequencies(self._bytes, k, overlap, relative,
+                                 complement_lookup=self._complement_lookup)
+
+    @experimental(as_of='0.5.1')
+    def canonical_kmer_counts(self, k, overlap=True, relative=False):
+        """Return counts of canonical words of length `k` as a dense vector.
+
+        A word and its reverse complement are counted together at the index of
+        the canonical word, which is the lexicographically smaller of the two.
+        Indices are those of ``kmer_counts``, so that the counts of words
+        which are not canonical are zero.
+
+        Parameters
+        ----------
+        k : int
+            The word length.
+        overlap : bool, optional
+            Defines whether the kmers should be overlapping or not.
+        relative : bool, optional
+            If ``True``, return the relative frequency of each canonical kmer
+            among the counted kmers instead of its count.
+
+        Returns
+        -------
+        np.ndarray
+            Counts of the ``len(self.definite_chars) ** k`` words of length
+            `k`.
+
+        Raises
+        ------
+        ValueError
+            If `k` is less than 1, or if there are too many words of length
+            `k` to be indexed with 64-bit integers.
+
+        See Also
+        --------
+        kmer_counts
+        canonical_kmer_frequencies
+
+        Examples
+        --------
+        >>> from skbio import DNA
+        >>> s = DNA('ACGTT')
+        >>> s.canonical_kmer_counts(2).reshape(4, 4)
+        array([[1, 2, 0, 0],
+               [0, 0, 1, 0],
+               [0, 0, 0, 0],
+               [0, 0, 0, 0]])
+
+        """
+        alphabet = np.sort(self._definite_char_codes).astype(np.uint8)
+        complement = self._complement_lookup[alphabet]
+        return _kmer_counts(self._bytes, k, overlap, relative, alphabet,
+                            complement)
+
+    @experimental(as_of='0.5.1')
+    def find_orfs(self, genetic_code=1, *args, **kwargs):
+        """Find the open reading frames (ORFs) of the sequence.
+
+        Parameters
+        ----------
+        genetic_code : int, GeneticCode, optional
+            Genetic code to use in finding ORFs. If ``int``, used as a table ID
+            to look up the corresponding NCBI genetic code.
+        args : tuple
+            Positional arguments accepted by ``GeneticCode.find_orfs``.
+        kwargs : dict
+            Keyword arguments accepted by ``GeneticCode.find_orfs``.
+
+        Returns
+        -------
+        list of tuple or IntervalMetadata
+            The ``(start, end, reading_frame)`` of each ORF, or the ORFs as
+            interval features. See ``GeneticCode.find_orfs`` for details.
+
+        See Also
+        --------
+        skbio.sequence.GeneticCode.find_orfs
+        translate_six_frames
+
+        Examples
+        --------
+        Find the ORFs of at least 9 nucleotides using NCBI's bacterial genetic
+        code (table ID 11) and its alternative start codons:
+
+        >>> from skbio import DNA
+        >>> dna = DNA('ATGAAATAGTTGCCCTGACTATTTCAT')
+        >>> dna.find_orfs(11, min_length=9, alternative_starts=True)
+        [(0, 9, 1), (9, 18, 1), (18, 27, -1)]
+
+        """
+        if not isinstance(genetic_code, skbio.GeneticCode):
+            genetic_code = skbio.GeneticCode.from_ncbi(genetic_code)
+        return genetic_code.find_orfs(self, *args, **kwargs)
+
 
 _motifs = parent_motifs.copy()
 
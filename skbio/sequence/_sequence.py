@@ -20,6 +20,7 @@ from skbio.metadata._mixin import (MetadataMixin, PositionalMetadataMixin,
                                    IntervalMetadataMixin)
 from skbio.metadata import IntervalMetadata
 from skbio.sequence._repr import _SequenceReprBuilder
+from skbio.sequence._kmer import _kmer_frequencies
 from skbio.util._decorator import (stable, experimental, classonlymethod,
                                    overrides)
 
@@ -1967,22 +1968,14 @@ fuzzy=[(True, False)], metadata={'gene': 'foo'})
         >>> pprint(freqs)
         {'ACA': 0.25, 'CAT': 0.25, 'TTA': 0.5}
 
-        """
-        kmers = self.iter_kmers(k, overlap=overlap)
-        freqs = dict(collections.Counter((str(seq) for seq in kmers)))
-
-        if relative:
-            if overlap:
-                num_kmers = len(self) - k + 1
-            else:
-                num_kmers = len(self) // k
-
-            relative_freqs = {}
-            for kmer, count in freqs.items():
-                relative_freqs[kmer] = count / num_kmers
-            freqs = relative_freqs
+        Notes
+        -----
+        The k-mers are counted without creating a ``Sequence`` for each k-mer:
+        each k-mer is encoded as an integer from the characters of the
+        sequence, and the distinct integers are counted with numpy.
 
-        return freqs
+        """
+        return _kmer_frequencies(self._bytes, k, overlap, relative)
 
     @stable(as_of="0.4.0")
     def find_with_regex(self, regex, ignore=None):
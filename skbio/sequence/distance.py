@@ -18,6 +18,8 @@ Functions
 
    hamming
    kmer_distance
+   kmer_profile_distances
+   minhash_distances
 
 """
 
@@ -30,6 +32,7 @@ Functions
 # ----------------------------------------------------------------------------
 
 import numpy as np
+import scipy.sparse
 import scipy.spatial.distance
 
 import skbio
@@ -152,8 +155,8 @@ def kmer_distance(seq1, seq2, k, overlap=True):
 
     """
     _check_seqs(seq1, seq2)
-    seq1_kmers = set(map(str, seq1.iter_kmers(k, overlap=overlap)))
-    seq2_kmers = set(map(str, seq2.iter_kmers(k, overlap=overlap)))
+    seq1_kmers = set(seq1.kmer_frequencies(k, overlap=overlap))
+    seq2_kmers = set(seq2.kmer_frequencies(k, overlap=overlap))
     all_kmers = seq1_kmers | seq2_kmers
     if not all_kmers:
         return np.nan
@@ -163,6 +166,324 @@ def kmer_distance(seq1, seq2, k, overlap=True):
     return fraction_unique
 
 
+@experimental(as_of='0.5.1')
+def kmer_profile_distances(counts, ids=None, metric='jaccard',
+                           condensed=False):
+    """Compute the kmer distances between all pairs of kmer profiles
+
+    Parameters
+    ----------
+    counts : scipy.sparse matrix or 2D array_like of ints
+        The count of each kmer (column) in each sequence (row), e.g. from
+        ``skbio.sequence.kmer_profile``.
+    ids : list of str, optional
+        The IDs of the sequences. Defaults to ``'0'``, ``'1'``, etc.
+    metric : {'jaccard', 'braycurtis', 'cosine'}, optional
+        The distance metric. ``'jaccard'`` is the fraction of the distinct
+        kmers of two sequences which are found in only one of them, as in
+        ``kmer_distance``. ``'braycurtis'`` and ``'cosine'`` follow the
+        definitions of ``scipy.spatial.distance``.
+    condensed : bool, optional
+        If ``True``, the distance matrix stores only the condensed form of the
+        distances.
+
+    Returns
+    -------
+    skbio.DistanceMatrix
+        The distance between each pair of sequences.
+
+    Raises
+    ------
+    ValueError
+        If `metric` is not supported, or if `counts` contains negative counts
+        or, for ``'braycurtis'``, counts which are not integers.
+
+    See Also
+    --------
+    kmer_distance
+    skbio.sequence.kmer_profile
+
+    Notes
+    -----
+    The terms shared by each pair of sequences are the entries of a product of
+    a sparse matrix with its transpose, computed for a block of sequences at a
+    time. For ``'jaccard'``, this is the number of shared kmers, computed from
+    the presence of each kmer, and for ``'cosine'`` the dot product of the
+    counts. For ``'braycurtis'``, the sum over kmers of the smaller of the two
+    counts is the number of shared kmer occurrences: the :math:`c`
+    occurrences of a kmer in a sequence are the columns for the first
+    :math:`c` occurrences of this kmer, so that two sequences share as many of
+    these columns as the smaller of their counts.
+
+    Unlike ``kmer_distance``, the distance between two sequences without kmers
+    is 0 instead of ``np.nan``. The distance between a sequence without kmers
+    and a sequence with kmers is 1.
+
+    Examples
+    --------
+    >>> from skbio import DNA
+    >>> from skbio.sequence import kmer_profile
+    >>> from skbio.sequence.distance import kmer_profile_distances
+    >>> seqs = [DNA('ATCGGCGAT'), DNA('GCAGATGTG'), DNA('ATCGGCGTT')]
+    >>> counts, ids = kmer_profile(seqs, 3)
+    >>> dm = kmer_profile_distances(counts, ids)
+    >>> print(round(dm['0', '1'], 6))
+    0.923077
+    >>> print(round(dm['0', '2'], 6))
+    0.444444
+
+    """
+    if metric not in _kmer_profile_metrics:
+        raise ValueError("Metric %r is not supported. Supported metrics are: "
+                         "%s." % (metric, ', '.join(_kmer_profile_metrics)))
+
+    counts = scipy.sparse.csr_matrix(counts)
+    counts.sum_duplicates()
+    counts.eliminate_zeros()
+    if (counts.data < 0).any():
+        raise ValueError("Counts must be non-negative.")
+    num_seqs = counts.shape[0]
+    if ids is None:
+        ids = [str(i) for i in range(num_seqs)]
+
+    # only the observed kmers are columns of the matrix of shared terms
+    observed, columns = np.unique(counts.indices, return_inverse=True)
+    rows = np.repeat(np.arange(num_seqs), np.diff(counts.indptr))
+    if metric == 'jaccard':
+        values = np.ones(len(columns))
+        sizes = np.diff(counts.indptr).astype(float)
+    elif metric == 'cosine':
+        values = counts.data.astype(float)
+        sizes = np.sqrt(np.bincount(rows, values ** 2, minlength=num_seqs))
+    else:
+        values = counts.data
+        if not np.array_equal(values, np.round(values)):
+            raise ValueError("Counts must be integers for the 'braycurtis' "
+                             "metric.")
+        repeats = values.astype(np.int64)
+        sizes = np.bincount(rows, repeats, minlength=num_seqs)
+
+        # the column of the first occurrence of each kmer, followed by those
+        # of its other occurrences up to its largest count
+        largest = np.zeros(len(observed), dtype=np.int64)
+        np.maximum.at(largest, columns, repeats)
+        first = np.concatenate([[0], np.cumsum(largest)[:-1]])
+        ends = np.cumsum(repeats)
+        occurrences = np.arange(ends[-1] if len(ends) else 0) - np.repeat(
+            ends - repeats, repeats)
+        columns = np.repeat(first[columns], repeats) + occurrences
+        rows = np.repeat(rows, repeats)
+        values = np.ones(len(columns))
+
+    matrix = scipy.sparse.csr_matrix((values, (rows, columns)),
+                                     shape=(num_seqs, columns.max() + 1
+                                            if len(columns) else 0))
+    transpose = matrix.T.tocsr()
+
+    distances = np.empty(num_seqs * (num_seqs - 1) // 2)
+    block_size = max(1, _distance_block_size // max(num_seqs, 1))
+    for start in range(0, num_seqs, block_size):
+        end = min(start + block_size, num_seqs)
+        shared = matrix[start:end].dot(transpose).toarray()[:, start:]
+        u = sizes[start:end, np.newaxis]
+        v = sizes[np.newaxis, start:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if metric == 'jaccard':
+                union = u + v - shared
+                block = 1 - shared / union
+                empty = union == 0
+            elif metric == 'cosine':
+                block = np.maximum(1 - shared / (u * v), 0)
+                empty = (u == 0) | (v == 0)
+                block[empty] = ((u != 0) | (v != 0))[empty]
+                empty = (u == 0) & (v == 0)
+            else:
+                total = u + v
+                block = 1 - 2 * shared / total
+                empty = total == 0
+        block[empty] = 0
+
+        # the distances to the subsequent sequences of each sequence of the
+        # block are contiguous in condensed form
+        upper = (np.arange(start, num_seqs)[np.newaxis, :] >
+                 np.arange(start, end)[:, np.newaxis])
+        offset = start * num_seqs - start * (start + 1) // 2
+        distances[offset:offset + upper.sum()] = block[upper]
+
+    if num_seqs < 2:
+        # the condensed form of a single distance does not define the size of
+        # the matrix
+        distances = np.zeros((num_seqs, num_seqs))
+    return skbio.DistanceMatrix(distances, ids, condensed=condensed)
+
+
+@experimental(as_of='0.5.1')
+def minhash_distances(sketches, ids=None, metric='mash', condensed=False):
+    """Compute the distances between all pairs of MinHash sketches
+
+    Parameters
+    ----------
+    sketches : iterable of MinHashSketch
+        The sketches, which must have the same `k`, `alphabet`, `canonical`
+        and `seed`.
+    ids : list of str, optional
+        The IDs of the sketches. Defaults to ``'0'``, ``'1'``, etc.
+    metric : {'mash', 'jaccard'}, optional
+        The Mash distance of ``MinHashSketch.mash_distance``, or one minus the
+        Jaccard index of ``MinHashSketch.jaccard``.
+    condensed : bool, optional
+        If ``True``, the distance matrix stores only the condensed form of the
+        distances.
+
+    Returns
+    -------
+    skbio.DistanceMatrix
+        The distance between each pair of sketches.
+
+    Raises
+    ------
+    ValueError
+        If `metric` is not supported, or if the sketches cannot be compared.
+    TypeError
+        If `sketches` contains objects which are not a ``MinHashSketch``.
+
+    See Also
+    --------
+    skbio.sequence.MinHashSketch
+
+    Notes
+    -----
+    The distances are those of ``MinHashSketch.mash_distance`` and
+    ``MinHashSketch.jaccard``, which truncate each pair of sketches to the
+    smaller of their sizes. They are computed for all pairs of sketches at
+    once for each distinct size, over the sketches at least as large
+    truncated to that size. Sketches are ordered by the largest hash up to
+    which they are complete, so that the hashes of each pair of sketches are
+    compared up to that of the first sketch. The numbers of shared hashes are
+    the entries of a sparse matrix product over the distinct hashes, computed
+    for a block of sketches at a time, and the number of hashes of each
+    sketch up to the largest hash of each preceding sketch are counted with a
+    single search of its hashes.
+
+    Examples
+    --------
+    >>> from skbio import DNA
+    >>> from skbio.sequence import MinHashSketch
+    >>> from skbio.sequence.distance import minhash_distances
+    >>> seqs = [DNA('ACGGTCAGTTACGATCGGACTTAGGC'),
+    ...         DNA('ACGGTCAGTTACGATCGGACTTAGGA'),
+    ...         DNA('TTGACCAGTTACGATCCGACTAAGGC')]
+    >>> sketches = [MinHashSketch.from_sequences(seq, k=5, size=100)
+    ...             for seq in seqs]
+    >>> dm = minhash_distances(sketches, ids=['a', 'b', 'c'])
+    >>> print(round(dm['a', 'b'], 6))
+    0.009758
+    >>> print(round(dm['a', 'c'], 6))
+    0.153094
+
+    """
+    # imported here, as sequence types import this module
+    from skbio.sequence._minhash import MinHashSketch
+
+    if metric not in _minhash_metrics:
+        raise ValueError("Metric %r is not supported. Supported metrics are: "
+                         "%s." % (metric, ', '.join(_minhash_metrics)))
+    sketches = list(sketches)
+    for sketch in sketches:
+        if not isinstance(sketch, MinHashSketch):
+            raise TypeError("Sketches must be a MinHashSketch, not %s." %
+                            type(sketch).__name__)
+        sketches[0]._check_compatible(sketch)
+    num_sketches = len(sketches)
+    if ids is None:
+        ids = [str(i) for i in range(num_sketches)]
+    if num_sketches < 2:
+        return skbio.DistanceMatrix(np.zeros((num_sketches, num_sketches)),
+                                    ids, condensed=condensed)
+
+    # each pair of sketches is compared up to the smaller of their sizes
+    sizes = np.array([sketch.size for sketch in sketches])
+    distance_sizes = np.unique(sizes)
+    if len(distance_sizes) == 1:
+        distances = _minhash_condensed(sketches, distance_sizes[0], metric)
+        return skbio.DistanceMatrix(distances, ids, condensed=condensed)
+
+    distances = np.empty(num_sketches * (num_sketches - 1) // 2)
+    for size in distance_sizes:
+        indices = np.flatnonzero(sizes >= size)
+        if len(indices) < 2:
+            continue
+        subset = _minhash_condensed([sketches[i] for i in indices], size,
+                                    metric)
+        first, second = np.triu_indices(len(indices), k=1)
+        first, second = indices[first], indices[second]
+        # only the pairs with a sketch of this size are compared up to it
+        keep = (sizes[first] == size) | (sizes[second] == size)
+        first, second = first[keep], second[keep]
+        positions = (first * num_sketches - first * (first + 1) // 2 +
+                     second - first - 1)
+        distances[positions] = subset[keep]
+
+    return skbio.DistanceMatrix(distances, ids, condensed=condensed)
+
+
+def _minhash_condensed(sketches, size, metric):
+    """Return the condensed distances of sketches truncated to a size"""
+    from skbio.sequence._minhash import _threshold, _jaccard, _mash_distance
+
+    num_sketches = len(sketches)
+    hashes = [sketch.hashes[:size] for sketch in sketches]
+    thresholds = np.array([_threshold(h, size) for h in hashes],
+                          dtype=np.uint64)
+    order = np.lexsort((np.arange(num_sketches), thresholds))
+    hashes = [hashes[i] for i in order]
+    thresholds = thresholds[order]
+    lengths = np.array([len(h) for h in hashes])
+
+    # the rows of the matrix are the sketches in order, and its columns the
+    # distinct hashes
+    _, columns = np.unique(np.concatenate(hashes), return_inverse=True)
+    rows = np.repeat(np.arange(num_sketches), lengths)
+    matrix = scipy.sparse.csr_matrix(
+        (np.ones(len(columns)), (rows, columns)),
+        shape=(num_sketches, columns.max() + 1 if len(columns) else 0))
+    transpose = matrix.T.tocsr()
+
+    distances = np.empty(num_sketches * (num_sketches - 1) // 2)
+    block_size = max(1, _distance_block_size // num_sketches)
+    for start in range(0, num_sketches, block_size):
+        end = min(start + block_size, num_sketches)
+        shared_block = matrix[start:end].dot(transpose).toarray()
+        for row in range(start, end):
+            # the number of hashes of the sketch up to the threshold of each
+            # preceding sketch
+            before = np.searchsorted(thresholds[:row], hashes[row])
+            counts = np.cumsum(np.bincount(before, minlength=row + 1))[:row]
+
+            shared = shared_block[row - start, :row]
+            jaccard = _jaccard(shared, counts + lengths[:row] - shared)
+            if metric == 'mash':
+                row_distances = _mash_distance(jaccard, sketches[0].k)
+            else:
+                row_distances = 1 - jaccard
+
+            first = np.minimum(order[row], order[:row])
+            second = np.maximum(order[row], order[:row])
+            positions = (first * num_sketches - first * (first + 1) // 2 +
+                         second - first - 1)
+            distances[positions] = row_distances
+
+    return distances
+
+
+_kmer_profile_metrics = ('jaccard', 'braycurtis', 'cosine')
+
+_minhash_metrics = ('mash', 'jaccard')
+
+# the number of distances computed at once
+_distance_block_size = 2 ** 22
+
+
 def _check_seqs(seq1, seq2):
     # Asserts both sequences are skbio.sequence objects
     for seq in seq1, seq2:
@@ -11,9 +11,16 @@ import unittest
 
 import numpy as np
 import numpy.testing as npt
+import scipy.sparse
+import scipy.spatial.distance
 
-from skbio import Sequence, DNA
-from skbio.sequence.distance import hamming, kmer_distance
+from skbio import Sequence, DNA, DistanceMatrix
+from skbio.stats.distance import DissimilarityMatrixError
+from skbio.sequence import kmer_profile, MinHashSketch
+from skbio.sequence.distance import (hamming, kmer_distance,
+                                     kmer_profile_distances,
+                                     minhash_distances)
+import skbio.sequence.distance
 
 
 class TestHamming(unittest.TestCase):
@@ -230,5 +237,159 @@ class TestKmerDistance(unittest.TestCase):
             kmer_distance(seq1, seq2, 3)
 
 
+class TestKmerProfileDistances(unittest.TestCase):
+    def setUp(self):
+        self.seqs = [DNA('ATCGGCGAT'), DNA('GCAGATGTG'), DNA('ATCGGCGTT'),
+                     DNA('AAAAAAAAT'), DNA('AAAT'), DNA('AC')]
+        self.counts, self.ids = kmer_profile(self.seqs, 3)
+
+    def test_jaccard_matches_kmer_distance(self):
+        obs = kmer_profile_distances(self.counts, self.ids)
+        for (i, seq1), (j, seq2) in itertools.combinations(
+                enumerate(self.seqs[:5]), 2):
+            self.assertAlmostEqual(obs[str(i), str(j)],
+                                   kmer_distance(seq1, seq2, 3))
+        self.assertEqual(obs.ids, tuple(self.ids))
+
+    def test_scipy_metrics(self):
+        dense = self.counts.toarray()[:5]
+        for metric in 'braycurtis', 'cosine':
+            obs = kmer_profile_distances(self.counts[:5], metric=metric)
+            exp = scipy.spatial.distance.pdist(dense, metric)
+            npt.assert_almost_equal(obs.condensed_form(), exp)
+
+    def test_no_kmers(self):
+        counts = scipy.sparse.csr_matrix(np.array([[0, 0], [0, 0], [1, 2]]))
+        for metric in 'jaccard', 'braycurtis', 'cosine':
+            obs = kmer_profile_distances(counts, metric=metric)
+            npt.assert_equal(obs.condensed_form(), [0, 1, 1])
+
+    def test_dense_counts_and_ids(self):
+        obs = kmer_profile_distances([[1, 0, 2], [1, 1, 0]], ids=['a', 'b'],
+                                     metric='braycurtis')
+        self.assertEqual(obs, DistanceMatrix([[0, 0.6], [0.6, 0]], ['a', 'b']))
+
+    def test_condensed(self):
+        obs = kmer_profile_distances(self.counts, self.ids, condensed=True)
+        exp = kmer_profile_distances(self.counts, self.ids)
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+        self.assertEqual(obs.shape, (6, 6))
+
+    def test_blocks(self):
+        exp = kmer_profile_distances(self.counts, metric='braycurtis')
+        block_size = skbio.sequence.distance._distance_block_size
+        try:
+            for size in 1, 7, 13:
+                skbio.sequence.distance._distance_block_size = size
+                obs = kmer_profile_distances(self.counts, metric='braycurtis')
+                npt.assert_almost_equal(obs.condensed_form(),
+                                        exp.condensed_form())
+        finally:
+            skbio.sequence.distance._distance_block_size = block_size
+
+    def test_single_and_no_sequences(self):
+        obs = kmer_profile_distances(self.counts[:1], ['a'])
+        self.assertEqual(obs, DistanceMatrix([[0]], ['a']))
+
+        obs = kmer_profile_distances(self.counts[:1], ['a'], condensed=True)
+        self.assertEqual(obs, DistanceMatrix([[0]], ['a']))
+
+        with self.assertRaisesRegex(DissimilarityMatrixError, '1x1'):
+            kmer_profile_distances(scipy.sparse.csr_matrix((0, 4)))
+
+    def test_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'euclidean.*not supported'):
+            kmer_profile_distances(self.counts, metric='euclidean')
+        with self.assertRaisesRegex(ValueError, 'non-negative'):
+            kmer_profile_distances([[1, -1], [0, 1]])
+        with self.assertRaisesRegex(ValueError, 'integers'):
+            kmer_profile_distances([[1, 0.5], [0, 1]], metric='braycurtis')
+
+
+class TestMinHashDistances(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        base = ''.join(rng.choice(list('ACGT'), 1000))
+        seqs = []
+        for length in 1000, 800, 600, 1000, 5:
+            seq = list(base[:length])
+            for position in rng.randint(0, length, 20):
+                seq[position] = rng.choice(list('ACGT'))
+            seqs.append(DNA(''.join(seq)))
+        self.sketches = [MinHashSketch.from_sequences(seq, k=11, size=200)
+                         for seq in seqs]
+        self.sketches.append(MinHashSketch.from_sequences(seqs[3], k=11,
+                                                          size=200))
+
+    def test_matches_pairwise(self):
+        for metric in 'mash', 'jaccard':
+            obs = minhash_distances(self.sketches, metric=metric)
+            for i, j in itertools.combinations(range(len(self.sketches)), 2):
+                sketch1, sketch2 = self.sketches[i], self.sketches[j]
+                if metric == 'mash':
+                    exp = sketch1.mash_distance(sketch2)
+                else:
+                    exp = 1 - sketch1.jaccard(sketch2)
+                self.assertAlmostEqual(obs[str(i), str(j)], exp)
+            self.assertEqual(obs['3', '5'], 0)
+            self.assertEqual(obs['0', '4'], 1)
+
+    def test_ids_and_condensed(self):
+        ids = list('abcdef')
+        obs = minhash_distances(self.sketches, ids, condensed=True)
+        exp = minhash_distances(self.sketches)
+        self.assertEqual(obs.ids, tuple(ids))
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+
+    def test_blocks(self):
+        exp = minhash_distances(self.sketches)
+        block_size = skbio.sequence.distance._distance_block_size
+        try:
+            for size in 1, 10, 17:
+                skbio.sequence.distance._distance_block_size = size
+                obs = minhash_distances(self.sketches)
+                npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+        finally:
+            skbio.sequence.distance._distance_block_size = block_size
+
+    def test_mixed_sizes(self):
+        # each pair is truncated to the smaller of its sizes, as by the
+        # pairwise methods
+        sketches = [MinHashSketch(sketch.hashes, sketch.k, size,
+                                  sketch.alphabet, sketch.canonical,
+                                  sketch.seed)
+                    for sketch, size in zip(self.sketches,
+                                            [200, 50, 120, 50, 200, 120])]
+        for metric in 'mash', 'jaccard':
+            obs = minhash_distances(sketches, metric=metric)
+            for i, j in itertools.combinations(range(len(sketches)), 2):
+                sketch1, sketch2 = sketches[i], sketches[j]
+                if metric == 'mash':
+                    exp = sketch1.mash_distance(sketch2)
+                else:
+                    exp = 1 - sketch1.jaccard(sketch2)
+                self.assertAlmostEqual(obs[str(i), str(j)], exp)
+
+        smaller = [MinHashSketch(sketch.hashes, sketch.k, 50,
+                                 sketch.alphabet, sketch.canonical,
+                                 sketch.seed) for sketch in self.sketches]
+        obs = minhash_distances(self.sketches[:1] + smaller[1:])
+        exp = minhash_distances(smaller)
+        npt.assert_equal(obs.condensed_form(), exp.condensed_form())
+
+    def test_single_sketch(self):
+        obs = minhash_distances(self.sketches[:1], ['a'])
+        self.assertEqual(obs, DistanceMatrix([[0]], ['a']))
+
+    def test_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'braycurtis.*not supported'):
+            minhash_distances(self.sketches, metric='braycurtis')
+        with self.assertRaisesRegex(TypeError, 'MinHashSketch.*DNA'):
+            minhash_distances(self.sketches + [DNA('ACGT')])
+        other = MinHashSketch.from_sequences(DNA('ACGT'), k=3)
+        with self.assertRaisesRegex(ValueError, 'same k'):
+            minhash_distances(self.sketches + [other])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,7 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import io
 import itertools
 import unittest
 
@@ -13,6 +14,7 @@ import numpy as np
 import numpy.testing as npt
 
 from skbio import Sequence, DNA, RNA, Protein, GeneticCode
+from skbio.metadata import IntervalMetadata
 from skbio.sequence._genetic_code import _ncbi_genetic_codes
 
 
@@ -498,6 +500,208 @@ class TestGeneticCode(unittest.TestCase):
             [Protein('M', metadata={'foo': 'bar', 'baz': 42}),
              Protein('', metadata={'foo': 'bar', 'baz': 42})])
 
+    def test_translate_six_frames_invalid_input(self):
+        with self.assertRaisesRegex(TypeError, 'RNA.*DNA'):
+            list(self.sgc.translate_six_frames(DNA('ACG')))
+        with self.assertRaisesRegex(ValueError, 'gapped'):
+            list(self.sgc.translate_six_frames(RNA('UU-G')))
+        with self.assertRaisesRegex(NotImplementedError, 'degenerate'):
+            list(self.sgc.translate_six_frames(RNA('RUG')))
+
+    def test_translate_many(self):
+        seqs = [RNA('AUGCUAACAUAAA'), RNA(''), RNA('AGUAUUCUGCCACUGUAAGAA')]
+        for gc in self.sgc, GeneticCode.from_ncbi(11):
+            for start, stop in itertools.product(['ignore', 'optional'],
+                                                 repeat=2):
+                exp = [gc.translate(seq, start=start, stop=stop)
+                       for seq in seqs]
+                obs = list(gc.translate_many(seqs, start=start, stop=stop))
+                self.assertEqual(obs, exp)
+
+                exp = [protein for seq in seqs for protein in
+                       gc.translate_six_frames(seq, start=start, stop=stop)]
+                obs = list(gc.translate_many(seqs, gc.reading_frames,
+                                             start=start, stop=stop))
+                self.assertEqual(obs, exp)
+
+    def test_translate_many_reading_frames(self):
+        seqs = [RNA('AUGCUAACAUAAA'), RNA('UUUAUGUUAGCAU')]
+        obs = list(self.sgc.translate_many(seqs, (-2, 3)))
+        exp = [Protein('LC*H'), Protein('ANI'), Protein('C*HK'),
+               Protein('YVS')]
+        self.assertEqual(obs, exp)
+
+        obs = list(self.sgc.translate_many(seqs, -1))
+        self.assertEqual(obs, [Protein('FMLA'), Protein('MLT*')])
+
+        self.assertEqual(list(self.sgc.translate_many(seqs, [])), [])
+        self.assertEqual(list(self.sgc.translate_many([], -1)), [])
+
+    def test_translate_many_dna(self):
+        seqs = [DNA('ATGCTAACATAAA'), DNA('TTTATGTTAGCAT')]
+        for start, stop in ('ignore', 'ignore'), ('require', 'optional'):
+            exp = [protein for seq in seqs for protein in
+                   seq.translate_six_frames(start='optional', stop=stop)]
+            obs = list(self.sgc.translate_many(seqs, self.sgc.reading_frames,
+                                               start='optional', stop=stop))
+            self.assertEqual(obs, exp)
+
+    def test_translate_many_fasta(self):
+        fasta = io.StringIO('>a\nATGCTAACATAAA\n>b desc\nTTTATGTTAGCAT\n')
+        obs = list(self.sgc.translate_many(fasta, stop='optional'))
+        exp = [Protein('MLT', metadata={'id': 'a', 'description': ''}),
+               Protein('FMLA', metadata={'id': 'b', 'description': 'desc'})]
+        self.assertEqual(obs, exp)
+
+        fasta = io.StringIO('>a\nAUGCUAACAUAAA\n')
+        obs = list(self.sgc.translate_many(fasta, constructor=RNA))
+        self.assertEqual(obs, [Protein('MLT*', metadata={
+            'id': 'a', 'description': ''})])
+
+    def test_translate_many_preserves_metadata(self):
+        seq = DNA('ATG', metadata={'foo': 'bar'},
+                  positional_metadata={'foo': range(3)})
+        obs = list(self.sgc.translate_many([seq], [1, 2]))
+        self.assertEqual(obs, [Protein('M', metadata={'foo': 'bar'}),
+                               Protein('', metadata={'foo': 'bar'})])
+
+    def test_translate_many_require(self):
+        seqs = [RNA('AUGUAA'), RNA('CCCUAA')]
+        proteins = self.sgc.translate_many(seqs, start='require',
+                                           stop='require')
+        self.assertEqual(next(proteins), Protein('M'))
+        with self.assertRaisesRegex(ValueError,
+                                    'reading_frame=1.*start=\'require\''):
+            next(proteins)
+
+        proteins = self.sgc.translate_many(seqs, -1, stop='require')
+        with self.assertRaisesRegex(ValueError,
+                                    'reading_frame=-1.*stop=\'require\''):
+            next(proteins)
+
+    def test_translate_many_invalid_input(self):
+        with self.assertRaisesRegex(TypeError, 'DNA or RNA.*Protein'):
+            list(self.sgc.translate_many([Protein('MAL')]))
+        with self.assertRaisesRegex(TypeError, 'DNA or RNA.*str'):
+            list(self.sgc.translate_many(['ACG']))
+        with self.assertRaisesRegex(ValueError, r'\[1, 2, 3, -1, -2, -3\].*4'):
+            list(self.sgc.translate_many([RNA('AUG')], [1, 4]))
+        with self.assertRaisesRegex(ValueError, 'start.*foo'):
+            list(self.sgc.translate_many([RNA('AUG')], start='foo'))
+        with self.assertRaisesRegex(ValueError, 'stop.*foo'):
+            list(self.sgc.translate_many([RNA('AUG')], stop='foo'))
+        with self.assertRaisesRegex(ValueError, 'gapped'):
+            list(self.sgc.translate_many([DNA('ATG'), DNA('TT-G')]))
+        with self.assertRaisesRegex(NotImplementedError, 'degenerate'):
+            list(self.sgc.translate_many([DNA('NTG')]))
+
+    def test_find_orfs(self):
+        # forward ORFs in frames 1 (MK*) and 2 (MG*), and a reverse ORF in
+        # frame -1 (MK*)
+        seq = DNA('ATGAAATAGCATGGGTTGACTATTTCAT')
+        self.assertEqual(self.sgc.find_orfs(seq, min_length=9),
+                         [(0, 9, 1), (10, 19, 2), (19, 28, -1)])
+        self.assertEqual(self.sgc.find_orfs(seq.transcribe(), min_length=9),
+                         [(0, 9, 1), (10, 19, 2), (19, 28, -1)])
+        self.assertEqual(self.sgc.find_orfs(seq), [])
+
+        # ORFs are found on the reverse strand
+        self.assertEqual(
+            self.sgc.find_orfs(seq.reverse_complement(), min_length=9),
+            [(0, 9, 1), (19, 28, -1), (9, 18, -2)])
+
+    def test_find_orfs_min_length(self):
+        seq = DNA('ATGTAAATGAAATAAATGAAAAAATAA')
+        for min_length, exp in ((0, [(0, 6, 1), (6, 15, 1), (15, 27, 1)]),
+                                (7, [(6, 15, 1), (15, 27, 1)]),
+                                (9, [(6, 15, 1), (15, 27, 1)]),
+                                (10, [(15, 27, 1)]),
+                                (13, [])):
+            obs = [orf for orf in self.sgc.find_orfs(seq, min_length)
+                   if orf[2] == 1]
+            self.assertEqual(obs, exp)
+
+    def test_find_orfs_nested(self):
+        # only the first start codon after a stop codon starts an ORF
+        seq = DNA('CCCATGATGAAAATGTAGATGCCCTAA')
+        self.assertEqual(self.sgc.find_orfs(seq, 0),
+                         [(3, 18, 1), (18, 27, 1)])
+
+    def test_find_orfs_alternative_starts(self):
+        # CTG and TTG are alternative start codons of the standard code
+        seq = DNA('CTGAAATAGTTGAAATAGATGAAATAG')
+        self.assertEqual(self.sgc.find_orfs(seq, 0), [(18, 27, 1)])
+        self.assertEqual(self.sgc.find_orfs(seq, 0, alternative_starts=True),
+                         [(0, 9, 1), (9, 18, 1), (18, 27, 1)])
+
+        # in the vertebrate mitochondrial code, ATA codes for M and is a start
+        # codon
+        seq = DNA('ATAAAATAG')
+        self.assertEqual(self.sgc.find_orfs(seq, 0), [])
+        self.assertEqual(GeneticCode.from_ncbi(2).find_orfs(seq, 0),
+                         [(0, 9, 1)])
+
+    def test_find_orfs_partial(self):
+        seq = DNA('ATGAAATAGCATGCCCCCTT')
+        self.assertEqual(self.sgc.find_orfs(seq, 0), [(0, 9, 1)])
+        self.assertEqual(self.sgc.find_orfs(seq, 0, partial=True),
+                         [(0, 9, 1), (10, 19, 2), (0, 12, -3)])
+        self.assertEqual(self.sgc.find_orfs(seq, 10, partial=True),
+                         [(0, 12, -3)])
+
+        # a stop codon in the last codon does not start a partial ORF
+        self.assertEqual(self.sgc.find_orfs(DNA('ATGTAA'), 0, partial=True),
+                         [(0, 6, 1)])
+
+    def test_find_orfs_empty(self):
+        for seq in DNA(''), RNA('A'), DNA('AT'), DNA('ATG'), DNA('TAA'):
+            for partial in True, False:
+                obs = self.sgc.find_orfs(seq, 0, partial=partial)
+                self.assertEqual(obs, [(0, 3, 1)] if partial and
+                                 str(seq) == 'ATG' else [])
+
+    def test_find_orfs_matches_translation(self):
+        rng = np.random.RandomState(0)
+        seq = DNA(''.join(rng.choice(list('ACGT'), 3000)))
+        for alternative_starts in False, True:
+            starts = 'M' if not alternative_starts else 'MLIV'
+            orfs = self.sgc.find_orfs(seq, 30, alternative_starts)
+            self.assertGreater(len(orfs), 0)
+            for start, end, reading_frame in orfs:
+                orf = seq[start:end]
+                if reading_frame < 0:
+                    orf = orf.reverse_complement()
+                protein = str(orf.translate())
+                self.assertGreaterEqual(len(protein), 10)
+                self.assertIn(protein[0], starts)
+                self.assertEqual(protein.index('*'), len(protein) - 1)
+
+    def test_find_orfs_interval_metadata(self):
+        seq = DNA('ATGAAATAGCATGCCCCCTT')
+        obs = self.sgc.find_orfs(seq, 0, partial=True,
+                                 as_interval_metadata=True)
+        exp = IntervalMetadata(20)
+        exp.add([(0, 9)], metadata={'type': 'ORF', 'strand': '+',
+                                    'phase': 0, 'reading_frame': 1})
+        exp.add([(10, 19)], fuzzy=[(False, True)],
+                metadata={'type': 'ORF', 'strand': '+', 'phase': 0,
+                          'reading_frame': 2})
+        exp.add([(0, 12)], fuzzy=[(True, False)],
+                metadata={'type': 'ORF', 'strand': '-', 'phase': 0,
+                          'reading_frame': -3})
+        self.assertEqual(obs, exp)
+
+        seq.interval_metadata.merge(obs)
+        self.assertEqual(seq.interval_metadata.num_interval_features, 3)
+
+    def test_find_orfs_invalid_input(self):
+        with self.assertRaisesRegex(TypeError, 'DNA or RNA.*Protein'):
+            self.sgc.find_orfs(Protein('MAL'))
+        with self.assertRaisesRegex(ValueError, 'gapped'):
+            self.sgc.find_orfs(DNA('ATG-TAA'))
+        with self.assertRaisesRegex(NotImplementedError, 'degenerate'):
+            self.sgc.find_orfs(RNA('AUGNUAA'))
+
 
 if __name__ == '__main__':
     unittest.main()
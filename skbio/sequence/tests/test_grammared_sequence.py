@@ -616,6 +616,41 @@ class TestGrammaredSequence(TestCase):
         self.assertEqual(seq.find_motifs("name1"), "ABC")
         self.assertEqual(seq.find_motifs("name2"), 3)
 
+    def test_kmer_counts(self):
+        seq = ExampleGrammaredSequence('ABCAB-CXA.')
+
+        # AA AB AC BA BB BC CA CB CC
+        npt.assert_equal(seq.kmer_counts(2),
+                         np.array([0, 2, 0, 0, 0, 1, 1, 0, 0]))
+        npt.assert_equal(seq.kmer_counts(2, overlap=False),
+                         np.array([0, 1, 0, 0, 0, 0, 1, 0, 0]))
+        npt.assert_equal(seq.kmer_counts(2, relative=True),
+                         np.array([0, 2, 0, 0, 0, 1, 1, 0, 0]) / 4)
+        npt.assert_equal(seq.kmer_counts(1), np.array([3, 2, 2]))
+
+        obs = seq.kmer_counts(3)
+        self.assertEqual(obs.shape, (27,))
+        # ABC, BCA and CAB
+        self.assertEqual(obs[5], 1)
+        self.assertEqual(obs[15], 1)
+        self.assertEqual(obs[19], 1)
+        self.assertEqual(obs.sum(), 3)
+
+    def test_kmer_counts_no_kmers(self):
+        for seq in (ExampleGrammaredSequence(''),
+                    ExampleGrammaredSequence('A-B'),
+                    ExampleGrammaredSequence('AB')):
+            npt.assert_equal(seq.kmer_counts(3), np.zeros(27))
+            npt.assert_equal(seq.kmer_counts(3, relative=True), np.zeros(27))
+
+    def test_kmer_counts_invalid_k(self):
+        seq = ExampleGrammaredSequence('ABC')
+
+        with self.assertRaisesRegex(ValueError, 'k must be greater'):
+            seq.kmer_counts(0)
+        with self.assertRaisesRegex(ValueError, 'too large'):
+            seq.kmer_counts(40)
+
     def test_repr(self):
         # basic sanity checks for custom repr stats. more extensive testing is
         # performed on Sequence.__repr__
@@ -0,0 +1,93 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import Sequence, DNA, RNA, Protein
+from skbio.sequence import kmer_profile
+
+
+class TestKmerProfile(unittest.TestCase):
+    def test_rows_match_kmer_counts(self):
+        seqs = [DNA('ACGTTNAC-GT', metadata={'id': 'a'}), DNA(''),
+                DNA('GGGG', metadata={'id': 'c'})]
+        for overlap in True, False:
+            for k in 1, 2, 3:
+                counts, ids = kmer_profile(seqs, k, overlap=overlap)
+                self.assertEqual(ids, ['a', '1', 'c'])
+                self.assertEqual(counts.shape, (3, 4 ** k))
+                exp = [seq.kmer_counts(k, overlap=overlap) for seq in seqs]
+                npt.assert_equal(counts.toarray(), exp)
+
+    def test_canonical(self):
+        seqs = [RNA('ACGUUNACGU'), RNA('AAUCG')]
+        counts, ids = kmer_profile(seqs, 2, canonical=True)
+        exp = [seq.canonical_kmer_counts(2) for seq in seqs]
+        npt.assert_equal(counts.toarray(), exp)
+        self.assertEqual(ids, ['0', '1'])
+
+    def test_generator(self):
+        counts, ids = kmer_profile((Protein(s) for s in ('MKV', 'KVM')), 2)
+        self.assertEqual(counts.shape, (2, 400))
+        self.assertEqual(counts.sum(), 4)
+        self.assertEqual(counts.nnz, 4)
+
+    def test_fasta(self):
+        fasta = io.StringIO('>x desc\nACGT\nAC\n>y\nAAAA\n')
+        counts, ids = kmer_profile(fasta, 3, canonical=True)
+        self.assertEqual(ids, ['x', 'y'])
+        exp = np.zeros((2, 64))
+        # ACG (and CGT as ACG), GTA (and TAC as GTA)
+        exp[0, [6, 44]] = [2, 2]
+        exp[1, 0] = 2
+        npt.assert_equal(counts.toarray(), exp)
+
+        fasta = io.StringIO('>x\nACGU\n')
+        counts, ids = kmer_profile(fasta, 2, constructor=RNA)
+        npt.assert_equal(counts.toarray(), [RNA('ACGU').kmer_counts(2)])
+
+    def test_alphabet(self):
+        seqs = [Sequence('abcab'), Sequence('cba-')]
+        counts, ids = kmer_profile(seqs, 2, alphabet='cab')
+        exp = np.zeros((2, 9))
+        exp[0, [1, 5, 6]] = [2, 1, 1]
+        exp[1, [7, 3]] = [1, 1]
+        npt.assert_equal(counts.toarray(), exp)
+
+        counts, ids = kmer_profile([DNA('ACGTN')], 1, alphabet='AN')
+        npt.assert_equal(counts.toarray(), [[1, 1]])
+
+    def test_no_sequences(self):
+        counts, ids = kmer_profile([], 2)
+        self.assertEqual(counts.shape, (0, 0))
+        self.assertEqual(ids, [])
+
+        counts, ids = kmer_profile([], 2, alphabet='ACGT')
+        self.assertEqual(counts.shape, (0, 16))
+
+    def test_invalid_input(self):
+        with self.assertRaisesRegex(ValueError, 'k must be greater'):
+            kmer_profile([DNA('ACGT')], 0)
+        with self.assertRaisesRegex(ValueError, 'k must be greater'):
+            kmer_profile([], 0)
+        with self.assertRaisesRegex(ValueError, 'alphabet must be provided'):
+            kmer_profile([Sequence('ACGT')], 2)
+        with self.assertRaisesRegex(TypeError, 'same type.*DNA.*RNA'):
+            kmer_profile([DNA('ACGT'), RNA('ACGU')], 2)
+        with self.assertRaisesRegex(TypeError, 'nucleotide.*Protein'):
+            kmer_profile([Protein('MKV')], 2, canonical=True)
+        with self.assertRaisesRegex(ValueError, 'complements'):
+            kmer_profile([DNA('ACGT')], 2, canonical=True, alphabet='AC')
+
+
+if __name__ == '__main__':
+    unittest.main()
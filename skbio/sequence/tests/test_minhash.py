@@ -0,0 +1,219 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+import unittest
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import Sequence, DNA, RNA, Protein
+from skbio.sequence import MinHashSketch
+import skbio.sequence._minhash
+
+
+def _random_dna(length, seed):
+    rng = np.random.RandomState(seed)
+    return ''.join(rng.choice(list('ACGT'), length))
+
+
+class TestMinHashSketch(unittest.TestCase):
+    def setUp(self):
+        self.seq = _random_dna(2000, 0)
+        # the first half of the sequence followed by other characters
+        self.other = self.seq[:1000] + _random_dna(1000, 1)
+
+    def test_init(self):
+        sketch = MinHashSketch([5, 3, 9, 3, 1], k=4, size=3, alphabet='TGCA',
+                               canonical=False, seed=1)
+        npt.assert_equal(sketch.hashes, [1, 3, 5])
+        self.assertEqual(sketch.hashes.dtype, np.uint64)
+        self.assertFalse(sketch.hashes.flags.writeable)
+        self.assertEqual(sketch.k, 4)
+        self.assertEqual(sketch.size, 3)
+        self.assertEqual(sketch.alphabet, 'ACGT')
+        self.assertFalse(sketch.canonical)
+        self.assertEqual(sketch.seed, 1)
+        self.assertEqual(len(sketch), 3)
+
+    def test_init_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'k must be'):
+            MinHashSketch([], 0, 10, 'ACGT', True, 0)
+        with self.assertRaisesRegex(ValueError, 'size must be'):
+            MinHashSketch([], 5, 0, 'ACGT', True, 0)
+
+    def test_from_sequences(self):
+        sketch = MinHashSketch.from_sequences(DNA(self.seq), k=15, size=100)
+        self.assertEqual(len(sketch), 100)
+        self.assertTrue(sketch.canonical)
+        self.assertEqual(sketch.alphabet, 'ACGT')
+        self.assertEqual((sketch.k, sketch.size, sketch.seed), (15, 100, 42))
+        self.assertTrue((np.diff(sketch.hashes.astype(float)) > 0).all())
+
+        # the sketch of the whole sequence is the bottom of the sketch of all
+        # of its kmers
+        everything = MinHashSketch.from_sequences(DNA(self.seq), k=15,
+                                                  size=10000)
+        self.assertEqual(len(everything), 1986)
+        npt.assert_equal(everything.hashes[:100], sketch.hashes)
+
+    def test_from_sequences_canonical(self):
+        seq = DNA(self.seq)
+        obs = MinHashSketch.from_sequences(seq.reverse_complement(), k=9)
+        self.assertEqual(obs, MinHashSketch.from_sequences(seq, k=9))
+
+        obs = MinHashSketch.from_sequences(seq, k=9, canonical=False)
+        self.assertFalse(obs.canonical)
+        self.assertNotEqual(
+            obs, MinHashSketch.from_sequences(seq.reverse_complement(), k=9,
+                                              canonical=False))
+
+        rna = MinHashSketch.from_sequences(RNA(self.seq.replace('T', 'U')),
+                                           k=9)
+        self.assertTrue(rna.canonical)
+        self.assertEqual(rna.alphabet, 'ACGU')
+
+    def test_from_sequences_several(self):
+        seqs = [DNA(self.seq[:700]), DNA('NNNN'), DNA(self.seq[690:])]
+        obs = MinHashSketch.from_sequences(seqs, k=11, size=50)
+        exp = MinHashSketch.from_sequences(DNA(self.seq), k=11, size=50)
+        self.assertEqual(obs, exp)
+
+        # kmers with degenerate characters are not sketched
+        obs = MinHashSketch.from_sequences(DNA('ACGTNAGGT'), k=4, size=50)
+        self.assertEqual(len(obs), 2)
+
+    def test_from_sequences_blocks(self):
+        exp = MinHashSketch.from_sequences(DNA(self.seq), k=13, size=200)
+        block_size = skbio.sequence._minhash._sketch_block_size
+        try:
+            for size in 1, 7, 100:
+                skbio.sequence._minhash._sketch_block_size = size
+                obs = MinHashSketch.from_sequences(DNA(self.seq), k=13,
+                                                   size=200)
+                self.assertEqual(obs, exp)
+        finally:
+            skbio.sequence._minhash._sketch_block_size = block_size
+
+    def test_from_sequences_fasta(self):
+        fasta = io.StringIO('>a\n%s\n>b\n%s\n' % (self.seq[:500],
+                                                  self.seq[490:]))
+        obs = MinHashSketch.from_sequences(fasta, k=11)
+        self.assertEqual(obs, MinHashSketch.from_sequences(DNA(self.seq),
+                                                           k=11))
+
+    def test_from_sequences_protein(self):
+        obs = MinHashSketch.from_sequences(Protein('MKVLAAGIW*'), k=3)
+        self.assertFalse(obs.canonical)
+        self.assertEqual(len(obs), 7)
+
+        with self.assertRaisesRegex(TypeError, 'nucleotide.*Protein'):
+            MinHashSketch.from_sequences(Protein('MKV'), k=3, canonical=True)
+
+    def test_from_sequences_short(self):
+        obs = MinHashSketch.from_sequences(DNA('ACG'), k=5)
+        self.assertEqual(len(obs), 0)
+
+    def test_from_sequences_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'at least one sequence'):
+            MinHashSketch.from_sequences([])
+        with self.assertRaisesRegex(TypeError, 'GrammaredSequence.*Sequence'):
+            MinHashSketch.from_sequences(Sequence('ACGT'))
+        with self.assertRaisesRegex(TypeError, 'same type.*DNA.*RNA'):
+            MinHashSketch.from_sequences([DNA('ACGT'), RNA('ACGU')])
+        with self.assertRaisesRegex(ValueError, 'too large'):
+            MinHashSketch.from_sequences(DNA('ACGT' * 10), k=32)
+
+    def test_jaccard_exact(self):
+        # sketches which hold all kmers give the exact Jaccard index
+        first = DNA(self.seq)
+        second = DNA(self.other)
+        kmers1 = set(first.canonical_kmer_frequencies(12))
+        kmers2 = set(second.canonical_kmer_frequencies(12))
+        exp = len(kmers1 & kmers2) / len(kmers1 | kmers2)
+
+        sketch1 = MinHashSketch.from_sequences(first, k=12, size=5000)
+        sketch2 = MinHashSketch.from_sequences(second, k=12, size=5000)
+        self.assertAlmostEqual(sketch1.jaccard(sketch2), exp)
+        self.assertAlmostEqual(sketch2.jaccard(sketch1), exp)
+        self.assertEqual(sketch1.jaccard(sketch1), 1.0)
+
+    def test_jaccard_estimate(self):
+        sketch1 = MinHashSketch.from_sequences(DNA(self.seq), k=12, size=500)
+        sketch2 = MinHashSketch.from_sequences(DNA(self.other), k=12,
+                                               size=500)
+        # about a third of the kmers are shared
+        self.assertAlmostEqual(sketch1.jaccard(sketch2), 1 / 3, delta=0.05)
+
+        # a larger sketch is truncated to the size of the smaller one
+        larger = MinHashSketch.from_sequences(DNA(self.other), k=12,
+                                              size=1000)
+        self.assertEqual(sketch1.jaccard(larger), sketch1.jaccard(sketch2))
+
+    def test_jaccard_empty(self):
+        empty = MinHashSketch([], 5, 10, 'ACGT', True, 42)
+        sketch = MinHashSketch.from_sequences(DNA(self.seq), k=5, size=10)
+        self.assertEqual(empty.jaccard(empty), 1.0)
+        self.assertEqual(empty.jaccard(sketch), 0.0)
+        self.assertEqual(empty.mash_distance(sketch), 1.0)
+
+    def test_jaccard_incompatible(self):
+        sketch = MinHashSketch.from_sequences(DNA(self.seq), k=5)
+        for other in (MinHashSketch.from_sequences(DNA(self.seq), k=6),
+                      MinHashSketch.from_sequences(DNA(self.seq), k=5,
+                                                   seed=1),
+                      MinHashSketch.from_sequences(DNA(self.seq), k=5,
+                                                   canonical=False)):
+            with self.assertRaisesRegex(ValueError, 'same k'):
+                sketch.jaccard(other)
+        with self.assertRaisesRegex(TypeError, 'MinHashSketch.*DNA'):
+            sketch.jaccard(DNA(self.seq))
+
+    def test_mash_distance(self):
+        sketch1 = MinHashSketch([1, 2, 3, 4], 10, 4, 'ACGT', True, 42)
+        sketch2 = MinHashSketch([1, 2, 3, 5], 10, 4, 'ACGT', True, 42)
+        sketch3 = MinHashSketch([6, 7, 8, 9], 10, 4, 'ACGT', True, 42)
+        # 3 of the hashes up to 4 are shared
+        self.assertAlmostEqual(sketch1.jaccard(sketch2), 0.75)
+        self.assertAlmostEqual(sketch1.mash_distance(sketch2),
+                               -np.log(1.5 / 1.75) / 10)
+        self.assertEqual(sketch1.mash_distance(sketch1), 0.0)
+        self.assertEqual(sketch1.mash_distance(sketch3), 1.0)
+
+    def test_save_load(self):
+        sketch = MinHashSketch.from_sequences(DNA(self.seq), k=12, size=50,
+                                              seed=7)
+        fh = io.BytesIO()
+        sketch.save(fh)
+        fh.seek(0)
+        obs = MinHashSketch.load(fh)
+        self.assertEqual(obs, sketch)
+        self.assertEqual(obs.seed, 7)
+        self.assertEqual(obs.alphabet, 'ACGT')
+
+    def test_eq(self):
+        sketch = MinHashSketch([1, 2], 5, 10, 'ACGT', True, 42)
+        self.assertTrue(sketch == MinHashSketch([2, 1], 5, 10, 'ACGT', True,
+                                                42))
+        self.assertFalse(sketch != MinHashSketch([2, 1], 5, 10, 'ACGT',
+                                                 True, 42))
+        self.assertNotEqual(sketch, MinHashSketch([1, 3], 5, 10, 'ACGT',
+                                                  True, 42))
+        self.assertNotEqual(sketch, MinHashSketch([1, 2], 5, 10, 'ACGT',
+                                                  False, 42))
+        self.assertNotEqual(sketch, [1, 2])
+
+    def test_repr_str(self):
+        sketch = MinHashSketch([1, 2], 5, 10, 'ACGT', True, 42)
+        exp = '<MinHashSketch, k: 5, size: 10, hashes: 2, canonical: True>'
+        self.assertEqual(repr(sketch), exp)
+        self.assertEqual(str(sketch), exp)
+
+
+if __name__ == '__main__':
+    unittest.main()
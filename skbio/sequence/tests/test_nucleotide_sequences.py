@@ -9,6 +9,7 @@
 import unittest
 
 import numpy as np
+import numpy.testing as npt
 
 from skbio import DNA, RNA, Protein, GeneticCode
 from skbio.sequence._nucleotide_mixin import NucleotideMixin
@@ -513,6 +514,70 @@ class TestNucleotideSequence(unittest.TestCase):
                 self.assertEqual(ratio, seq.gc_frequency(relative=True))
                 self.assertEqual(ratio, seq.gc_content())
 
+    def test_canonical_kmer_frequencies(self):
+        for constructor, t in (DNA, 'T'), (RNA, 'U'):
+            seq = constructor('AC-G%sNNA%s' % (t, t))
+
+            obs = seq.canonical_kmer_frequencies(1)
+            self.assertEqual(obs, {'A': 4, 'C': 2, '-': 1, 'N': 2})
+
+            obs = seq.canonical_kmer_frequencies(2)
+            # C- is counted as -G, and TN as NA
+            exp = {'AC': 2, '-G': 2, 'NA': 2, 'NN': 1, 'A' + t: 1}
+            self.assertEqual(obs, exp)
+
+            obs = seq.canonical_kmer_frequencies(3, overlap=False,
+                                                 relative=True)
+            exp = {'-G' + t: 1/3, 'G%sN' % t: 1/3, 'A%sN' % t: 1/3}
+            self.assertEqual(obs, exp)
+
+            self.assertEqual(seq.canonical_kmer_frequencies(10), {})
+
+    def test_canonical_kmer_frequencies_reverse_complement(self):
+        seq = DNA('ACGGTTAGCANNGATC')
+        for k in range(1, 6):
+            self.assertEqual(
+                seq.canonical_kmer_frequencies(k),
+                seq.reverse_complement().canonical_kmer_frequencies(k))
+
+    def test_canonical_kmer_counts(self):
+        for constructor, t in (DNA, 'T'), (RNA, 'U'):
+            seq = constructor('AC-G%sNNA%sG' % (t, t))
+
+            # A C G T
+            npt.assert_equal(seq.canonical_kmer_counts(1),
+                             np.array([4, 3, 0, 0]))
+            # AC (and GT), AT, TG (as CA)
+            exp = np.zeros(16)
+            exp[[1, 3, 4]] = [2, 1, 1]
+            npt.assert_equal(seq.canonical_kmer_counts(2), exp)
+            npt.assert_equal(seq.canonical_kmer_counts(2, relative=True),
+                             exp / 4)
+            npt.assert_equal(seq.canonical_kmer_counts(3, overlap=False),
+                             np.zeros(64))
+
+    def test_canonical_kmer_counts_reverse_complement(self):
+        seq = DNA('ACGGTTAGCANNGATC')
+        for k in range(1, 6):
+            npt.assert_equal(
+                seq.canonical_kmer_counts(k),
+                seq.reverse_complement().canonical_kmer_counts(k))
+            self.assertEqual(seq.canonical_kmer_counts(k).sum(),
+                             seq.kmer_counts(k).sum())
+
+    def test_find_orfs(self):
+        dna = DNA('ATGAAATAGTTGCCCTGACTATTTCAT')
+        for seq in dna, dna.transcribe():
+            self.assertEqual(seq.find_orfs(min_length=9),
+                             [(0, 9, 1), (18, 27, -1)])
+            self.assertEqual(seq.find_orfs(11, min_length=9,
+                                           alternative_starts=True),
+                             [(0, 9, 1), (9, 18, 1), (18, 27, -1)])
+            self.assertEqual(
+                seq.find_orfs(GeneticCode.from_ncbi(11), 9, True),
+                [(0, 9, 1), (9, 18, 1), (18, 27, -1)])
+            self.assertEqual(seq.find_orfs(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
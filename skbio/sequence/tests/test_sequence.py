@@ -1897,6 +1897,37 @@ class TestSequence(TestSequenceBase, ReallyEqualMixin):
         seq = Sequence('AAAAAAAAAA')
         self.assertEqual(seq.kmer_frequencies(1, relative=True), {'A': 1.0})
 
+    def test_kmer_frequencies_invalid_k(self):
+        seq = Sequence('GATTACA')
+
+        for k in 0, -1:
+            with self.assertRaisesRegex(ValueError, 'k must be greater'):
+                seq.kmer_frequencies(k)
+
+    def test_kmer_frequencies_many_characters(self):
+        # more distinct k-mers than can be encoded as 64-bit integers
+        seq = Sequence('abcdefghijklmnopqrstuvwxyz' * 2)
+
+        obs = seq.kmer_frequencies(26)
+        self.assertEqual(len(obs), 26)
+        self.assertEqual(obs['abcdefghijklmnopqrstuvwxyz'], 2)
+        self.assertEqual(set(obs.values()), {1, 2})
+
+        obs = seq.kmer_frequencies(20, overlap=False, relative=True)
+        self.assertEqual(obs, {'abcdefghijklmnopqrst': 0.5,
+                               'uvwxyzabcdefghijklmn': 0.5})
+
+    def test_kmer_frequencies_matches_iter_kmers(self):
+        seq = Sequence('AC.GT AAC-GT.AC GT!Z ~zA\'CGT', metadata={'id': 'a'})
+
+        for k in range(1, 6):
+            for overlap in True, False:
+                exp = {}
+                for kmer in seq.iter_kmers(k, overlap=overlap):
+                    exp[str(kmer)] = exp.get(str(kmer), 0) + 1
+                self.assertEqual(seq.kmer_frequencies(k, overlap=overlap),
+                                 exp)
+
     def test_find_with_regex(self):
         seq = Sequence('GATTACA', positional_metadata={'quality': range(7)})
         pat = re.compile('(T+A)(CA)')
@@ -9,14 +9,17 @@
 from functools import partial
 
 import numpy as np
+from scipy.spatial.distance import squareform
 from scipy.stats import rankdata
 
-from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
+from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results,
+                    _within_group_sums)
 from skbio.util._decorator import experimental
 
 
 @experimental(as_of="0.4.0")
-def anosim(distance_matrix, grouping, column=None, permutations=999):
+def anosim(distance_matrix, grouping, column=None, permutations=999,
+           seed=None, n_jobs=1):
     """Test for significant differences between groups using ANOSIM.
 
     Analysis of Similarities (ANOSIM) is a non-parametric method that tests
@@ -58,6 +61,15 @@ def anosim(distance_matrix, grouping, column=None, permutations=999):
         significance. Must be greater than or equal to zero. If zero,
         statistical significance calculations will be skipped and the p-value
         will be ``np.nan``.
+    seed : int, np.random.RandomState or np.random.Generator, optional
+        Source of randomness for the permutations. By default, numpy's global
+        random state is used (e.g., as set by ``np.random.seed``). If an int,
+        a new ``np.random.RandomState`` seeded with it is used, making the
+        p-value reproducible.
+    n_jobs : int, optional
+        Number of threads used to compute the test statistics of the
+        permutations. If ``None`` or ``-1``, the number of CPUs is used. The
+        p-value does not depend on `n_jobs`.
 
     Returns
     -------
@@ -172,33 +184,36 @@ def anosim(distance_matrix, grouping, column=None, permutations=999):
 
     divisor = sample_size * ((sample_size - 1) / 4)
     ranked_dists = rankdata(distances, method='average')
+    ranked_matrix = squareform(ranked_dists, force='tomatrix', checks=False)
 
-    test_stat_function = partial(_compute_r_stat, tri_idxs, ranked_dists,
+    # The number of within-group distances is the same for every permutation
+    # of the grouping vector.
+    group_sizes = np.bincount(grouping)
+    num_within = (group_sizes * (group_sizes - 1) // 2).sum()
+
+    test_stat_function = partial(_compute_r_stat, ranked_matrix,
+                                 ranked_dists.sum(), num_within,
+                                 len(ranked_dists) - num_within, num_groups,
                                  divisor)
     stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
-                                           permutations)
+                                           permutations, seed, n_jobs)
 
     return _build_results('ANOSIM', 'R', sample_size, num_groups, stat,
                           p_value, permutations)
 
 
-def _compute_r_stat(tri_idxs, ranked_dists, divisor, grouping):
-    """Compute ANOSIM R statistic (between -1 and +1)."""
-    # Create a matrix where True means that the two objects are in the same
-    # group. This ufunc requires that grouping is a numeric vector (e.g., it
-    # won't work with a grouping vector of strings).
-    grouping_matrix = np.equal.outer(grouping, grouping)
-
-    # Extract upper triangle from the grouping matrix. It is important to
-    # extract the values in the same order that the distances are extracted
-    # from the distance matrix (see ranked_dists). Extracting the upper
-    # triangle (excluding the diagonal) preserves this order.
-    grouping_tri = grouping_matrix[tri_idxs]
+def _compute_r_stat(ranked_matrix, rank_sum, num_within, num_between,
+                    num_groups, divisor, groupings):
+    """Compute ANOSIM R statistic (between -1 and +1) for each row of
+    `groupings`."""
+    # Each within-group distance is counted once from each of its objects.
+    within_sum = _within_group_sums(ranked_matrix, groupings,
+                                    num_groups).sum(axis=1) / 2
 
     # within
-    r_W = np.mean(ranked_dists[grouping_tri])
+    r_W = within_sum / num_within
 
     # between
-    r_B = np.mean(ranked_dists[np.invert(grouping_tri)])
+    r_B = (rank_sum - within_sum) / num_between
 
     return (r_B - r_W) / divisor
@@ -7,12 +7,15 @@
 # ----------------------------------------------------------------------------
 
 import itertools
+import multiprocessing.pool
+import numbers
 from copy import deepcopy
 
 from IPython.core.pylabtools import print_figure
 from IPython.core.display import Image, SVG
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import as_strided
 from scipy.spatial.distance import squareform
 
 from skbio._base import SkbioObject
@@ -96,7 +99,8 @@ class DissimilarityMatrix(SkbioObject):
         if isinstance(data, DissimilarityMatrix):
             ids = data.ids if ids is None else ids
             data = data.data
-        data = np.asarray(data, dtype='float')
+        # asanyarray keeps a numpy.memmap of float64 as is
+        data = np.asanyarray(data, dtype='float')
         if data.ndim == 1:
             data = squareform(data, force='tomatrix', checks=False)
         if ids is None:
@@ -193,7 +197,7 @@ class DissimilarityMatrix(SkbioObject):
     @ids.setter
     def ids(self, ids_):
         ids_ = tuple(ids_)
-        self._validate(self.data, ids_)
+        self._validate_ids(self.shape, ids_)
         self._ids = ids_
         self._id_index = self._index_list(self._ids)
 
@@ -214,7 +218,7 @@ class DissimilarityMatrix(SkbioObject):
         entries will always be equal.
 
         """
-        return self.data.shape
+        return (len(self._ids),) * 2
 
     @property
     @experimental(as_of="0.4.0")
@@ -226,7 +230,7 @@ class DissimilarityMatrix(SkbioObject):
         Equivalent to ``self.shape[0] * self.shape[1]``.
 
         """
-        return self.data.size
+        return self.shape[0] * self.shape[1]
 
     @property
     @experimental(as_of="0.4.0")
@@ -363,6 +367,10 @@ class DissimilarityMatrix(SkbioObject):
                     pass
             ids = found_ids
 
+        return self._take(idxs, ids)
+
+    def _take(self, idxs, ids):
+        """Return the matrix of the rows/columns at `idxs`, labeled `ids`."""
         filtered_data = self._data[idxs][:, idxs]
         return self.__class__(filtered_data, ids)
 
@@ -676,17 +684,21 @@ class DissimilarityMatrix(SkbioObject):
         if data.dtype != np.double:
             raise DissimilarityMatrixError("Data must contain only floating "
                                            "point values.")
+        self._validate_ids(data.shape, ids)
+
+    def _validate_ids(self, shape, ids):
+        """Validate the IDs against the shape of the data array."""
         duplicates = find_duplicates(ids)
         if duplicates:
             formatted_duplicates = ', '.join(repr(e) for e in duplicates)
             raise DissimilarityMatrixError("IDs must be unique. Found the "
                                            "following duplicate IDs: %s" %
                                            formatted_duplicates)
-        if len(ids) != data.shape[0]:
+        if len(ids) != shape[0]:
             raise DissimilarityMatrixError("The number of IDs (%d) must match "
                                            "the number of rows/columns in the "
                                            "data (%d)." %
-                                           (len(ids), data.shape[0]))
+                                           (len(ids), shape[0]))
 
     def _index_list(self, list_):
         return {id_: idx for idx, id_ in enumerate(list_)}
@@ -708,12 +720,39 @@ class DistanceMatrix(DissimilarityMatrix):
     --------
     DissimilarityMatrix
 
+    Parameters
+    ----------
+    data : array_like or DissimilarityMatrix
+        Distances in redundant or condensed form. See `DissimilarityMatrix`
+        for details.
+    ids : sequence of str, optional
+        Sequence of strings to be used as object IDs. See
+        `DissimilarityMatrix` for details.
+    condensed : bool, optional
+        If ``True``, store only the condensed form of the distances. If
+        `data` is a one-dimensional ``numpy.ndarray`` (or ``numpy.memmap``)
+        of float64, it is stored as is, without a copy.
+
+        .. versionadded:: 0.5.1
+
     Notes
     -----
-    The distances are stored in redundant (square-form) format [1]_. To
-    facilitate use with other scientific Python routines (e.g., scipy), the
-    distances can be retrieved in condensed (vector-form) format using
-    `condensed_form`.
+    The distances are stored in redundant (square-form) format [1]_ by
+    default. To facilitate use with other scientific Python routines (e.g.,
+    scipy), the distances can be retrieved in condensed (vector-form) format
+    using `condensed_form`.
+
+    If ``condensed=True`` (added in 0.5.1), only the condensed form is
+    stored, which requires half the memory. Backing it with a
+    ``numpy.memmap`` allows distance matrices larger than the available
+    memory. Indexing, `filter`, `permute`, `condensed_form` and `to_series`
+    operate on the condensed form directly, while `data`, `redundant_form`,
+    `to_data_frame`, `plot` and equality comparisons create the redundant
+    form in memory each time they are used.
+
+    The methods overridden to support the condensed form keep the stability
+    and version of the `DissimilarityMatrix` methods they override; their
+    behavior for condensed storage is new in 0.5.1.
 
     `DistanceMatrix` only requires that the distances it stores are symmetric.
     Checks are *not* performed to ensure the other three metric properties
@@ -731,6 +770,42 @@ class DistanceMatrix(DissimilarityMatrix):
     # Override here, used in superclass __str__
     _matrix_element_name = 'distance'
 
+    # The condensed form of the distances, if they are stored in condensed
+    # form only. Otherwise, the redundant form is stored in `_data`.
+    _condensed = None
+
+    @experimental(as_of="0.4.0")
+    def __init__(self, data, ids=None, condensed=False):
+        if not condensed:
+            super(DistanceMatrix, self).__init__(data, ids)
+            return
+
+        if isinstance(data, DistanceMatrix):
+            ids = data.ids if ids is None else ids
+            data = data.condensed_form()
+        elif isinstance(data, DissimilarityMatrix):
+            ids = data.ids if ids is None else ids
+            data = data.data
+        # asanyarray keeps a numpy.memmap of float64 as is
+        data = np.asanyarray(data, dtype='float')
+
+        if data.ndim != 1:
+            # validate the redundant form before keeping a single triangle
+            redundant = DistanceMatrix(data, ids)
+            data, ids = redundant.condensed_form(), redundant.ids
+
+        n = _num_objects(data)
+        if ids is None:
+            ids = (str(i) for i in range(n))
+        ids = tuple(ids)
+
+        self._validate_condensed(data, ids)
+
+        self._data = None
+        self._condensed = data
+        self._ids = ids
+        self._id_index = self._index_list(self._ids)
+
     @classonlymethod
     @experimental(as_of="0.4.1")
     def from_iterable(cls, iterable, metric, key=None, keys=None,
@@ -795,6 +870,132 @@ class DistanceMatrix(DissimilarityMatrix):
 
         return cls(dm, keys_)
 
+    @property
+    @experimental(as_of="0.4.0")
+    def data(self):
+        """Array of distances.
+
+        A square, hollow, two-dimensional ``numpy.ndarray`` of distances
+        (floats). A copy is *not* returned, unless the distances are stored
+        in condensed form, in which case a new redundant form is created on
+        every access.
+
+        Notes
+        -----
+        This property is not writeable.
+
+        """
+        if self._condensed is not None:
+            return squareform(self._condensed, force='tomatrix', checks=False)
+        return self._data
+
+    @property
+    @experimental(as_of="0.4.0")
+    def dtype(self):
+        """Data type of the distances."""
+        if self._condensed is not None:
+            return self._condensed.dtype
+        return self._data.dtype
+
+    @experimental(as_of="0.4.0")
+    def transpose(self):
+        """Return the transpose of the distance matrix.
+
+        Notes
+        -----
+        A deep copy is returned. As a distance matrix is symmetric, this is
+        equivalent to `copy`.
+
+        Returns
+        -------
+        DistanceMatrix
+            Transpose of the distance matrix. Will be the same type as
+            `self`.
+
+        """
+        if self._condensed is not None:
+            return self.copy()
+        return super(DistanceMatrix, self).transpose()
+
+    @experimental(as_of="0.4.0")
+    def copy(self):
+        """Return a deep copy of the distance matrix.
+
+        Returns
+        -------
+        DistanceMatrix
+            Deep copy of the distance matrix. Will be the same type as
+            `self`. If the distances are stored in condensed form, the copy
+            stores an in-memory copy of the condensed form.
+
+        """
+        if self._condensed is not None:
+            return self.__class__(np.array(self._condensed),
+                                  deepcopy(self.ids), condensed=True)
+        return super(DistanceMatrix, self).copy()
+
+    @experimental(as_of="0.4.0")
+    def __str__(self):
+        """Return a string representation of the distance matrix.
+
+        Summary includes matrix dimensions, a (truncated) list of IDs, and
+        (truncated) array of distances. If the distances are stored in
+        condensed form, the condensed form is shown.
+
+        Returns
+        -------
+        str
+            String representation of the distance matrix.
+
+        """
+        if self._condensed is None:
+            return super(DistanceMatrix, self).__str__()
+        return '%dx%d %s matrix (condensed)\nIDs:\n%s\nData:\n' % (
+            self.shape[0], self.shape[1], self._matrix_element_name,
+            _pprint_strs(self.ids)) + str(self._condensed)
+
+    @experimental(as_of="0.4.0")
+    def __getitem__(self, index):
+        """Slice into distance data by object ID or numpy indexing.
+
+        See `DissimilarityMatrix.__getitem__` for the supported forms of
+        `index`. If the distances are stored in condensed form, only the
+        requested distances are read from it.
+
+        Parameters
+        ----------
+        index : str, two-tuple of str, or numpy index
+            An ID, a pair of IDs, or a numpy index.
+
+        Returns
+        -------
+        ndarray or scalar
+            Indexed data, where return type depends on the form of `index`.
+
+        Raises
+        ------
+        MissingIDError
+            If the ID(s) specified in `index` are not in the distance matrix.
+
+        """
+        if self._condensed is None:
+            return super(DistanceMatrix, self).__getitem__(index)
+
+        n = self.shape[0]
+        if isinstance(index, str):
+            rows, cols = self.index(index), np.arange(n)
+        elif self._is_id_pair(index):
+            rows, cols = self.index(index[0]), self.index(index[1])
+        else:
+            # index the row and column positions of the redundant form, which
+            # are broadcast from a single vector rather than allocated
+            positions = np.arange(n)
+            stride = positions.strides[0]
+            rows = as_strided(positions, (n, n), (stride, 0))[index]
+            cols = as_strided(positions, (n, n), (0, stride))[index]
+
+        return _condensed_lookup(self._condensed, n, rows, cols)
+
     @experimental(as_of="0.4.0")
     def condensed_form(self):
         """Return an array of distances in condensed format.
@@ -809,13 +1010,17 @@ class DistanceMatrix(DissimilarityMatrix):
         Condensed format is described in [1]_.
 
         The conversion is not a constant-time operation, though it should be
-        relatively quick to perform.
+        relatively quick to perform. If the distances are stored in condensed
+        form, no conversion is needed and the stored array (which may be a
+        ``numpy.memmap``) is returned rather than a copy.
 
         References
         ----------
         .. [1] http://docs.scipy.org/doc/scipy/reference/spatial.distance.html
 
         """
+        if self._condensed is not None:
+            return self._condensed
         return squareform(self._data, force='tovector', checks=False)
 
     @experimental(as_of="0.4.0")
@@ -852,6 +1057,14 @@ class DistanceMatrix(DissimilarityMatrix):
 
         """
         order = np.random.permutation(self.shape[0])
+
+        if self._condensed is not None:
+            permuted = _condensed_take(self._condensed, self.shape[0], order)
+            if condensed:
+                return permuted
+            else:
+                return self.__class__(permuted, self.ids, condensed=True)
+
         permuted = self._data[order][:, order]
 
         if condensed:
@@ -876,6 +1089,31 @@ class DistanceMatrix(DissimilarityMatrix):
             raise DistanceMatrixError("Data must be hollow (i.e., the diagonal"
                                       " can only contain zeros).")
 
+    def _validate_condensed(self, condensed, ids):
+        """Validate the condensed form of the distances and IDs.
+
+        A condensed form is always symmetric and hollow, so only its dtype is
+        checked, and it is scanned for NaNs a block at a time.
+
+        """
+        if condensed.dtype != np.double:
+            raise DistanceMatrixError("Data must contain only floating "
+                                      "point values.")
+        n = _num_objects(condensed)
+        self._validate_ids((n, n), ids)
+
+        for start in range(0, condensed.shape[0], _CONDENSED_BLOCK_SIZE):
+            block = condensed[start:start + _CONDENSED_BLOCK_SIZE]
+            if np.isnan(block).any():
+                raise DistanceMatrixError(
+                    "Data must be symmetric and cannot contain NaNs.")
+
+    def _take(self, idxs, ids):
+        if self._condensed is None:
+            return super(DistanceMatrix, self)._take(idxs, ids)
+        taken = _condensed_take(self._condensed, self.shape[0], idxs)
+        return self.__class__(taken, ids, condensed=True)
+
     @experimental(as_of="0.5.1")
     def to_series(self):
         """Create a ``pandas.Series`` from this ``DistanceMatrix``.
@@ -927,6 +1165,63 @@ class DistanceMatrix(DissimilarityMatrix):
         return pd.Series(data=distances, index=index, dtype=float)
 
 
+# The number of distances read at a time when scanning a condensed form
+_CONDENSED_BLOCK_SIZE = 2 ** 20
+
+
+def _num_objects(condensed):
+    """Return the number of objects described by a condensed form."""
+    if condensed.ndim != 1:
+        raise DistanceMatrixError("Condensed data must have exactly one "
+                                  "dimension.")
+    m = condensed.shape[0]
+    n = int(np.round((1 + np.sqrt(1 + 8 * m)) / 2))
+    if n * (n - 1) // 2 != m:
+        raise DistanceMatrixError("Condensed data of length %d does not "
+                                  "describe the distances between any "
+                                  "number of objects." % m)
+    return n
+
+
+def _condensed_lookup(condensed, n, rows, cols):
+    """Look up the distances at positions `rows`, `cols` of the redundant form
+
+    `rows` and `cols` are broadcast together. A scalar is returned if both
+    are scalars.
+
+    """
+    rows, cols = np.broadcast_arrays(rows, cols)
+    i = np.minimum(rows, cols)
+    j = np.maximum(rows, cols)
+    diagonal = i == j
+    idx = np.where(diagonal, 0, n * i - i * (i + 1) // 2 + (j - i - 1))
+
+    if condensed.shape[0] == 0:
+        values = np.zeros(idx.shape)
+    else:
+        values = np.where(diagonal, 0.0, condensed[idx])
+    return values[()]
+
+
+def _condensed_take(condensed, n, idxs):
+    """Return the condensed form of the submatrix of rows/columns `idxs`
+
+    The submatrix is gathered a row at a time, so that only the distances it
+    contains are read from `condensed`.
+
+    """
+    idxs = np.asarray(idxs, dtype=np.intp)
+    k = idxs.shape[0]
+    taken = np.empty(k * (k - 1) // 2)
+    start = 0
+    for a in range(k - 1):
+        end = start + k - a - 1
+        taken[start:end] = _condensed_lookup(condensed, n, idxs[a],
+                                             idxs[a + 1:])
+        start = end
+    return taken
+
+
 @experimental(as_of="0.4.0")
 def randdm(num_objects, ids=None, constructor=None, random_fn=None):
     """Generate a distance matrix populated with random distances.
@@ -1076,27 +1371,134 @@ def _df_to_vector(distance_matrix, df, column):
     return grouping.tolist()
 
 
-def _run_monte_carlo_stats(test_stat_function, grouping, permutations):
-    """Run stat test and compute significance with Monte Carlo permutations."""
+# The approximate number of objects in a batch of permuted groupings, summed
+# over the groupings in the batch
+_PERMUTATION_BATCH_SIZE = 2 ** 18
+# The absolute difference below which a permuted statistic is counted as
+# equal to the original one
+_PERMUTATION_TOLERANCE = 1e-10
+
+
+def _run_monte_carlo_stats(test_stat_function, grouping, permutations,
+                           seed=None, n_jobs=1):
+    """Run stat test and compute significance with Monte Carlo permutations.
+
+    `test_stat_function` computes the test statistic for each row of a 2-D
+    array of groupings. Permuted groupings are drawn one at a time, in the
+    same order as with ``np.random.permutation``, and passed to
+    `test_stat_function` in batches. If `n_jobs` is not 1, batches are
+    evaluated by a pool of threads, so `test_stat_function` should release
+    the GIL (e.g., by spending its time in numpy). As the rounding of the
+    statistics may depend on the size of a batch, permuted statistics equal
+    to the original one up to `_PERMUTATION_TOLERANCE` are counted as ties.
+
+    """
     if permutations < 0:
         raise ValueError(
             "Number of permutations must be greater than or equal to zero.")
 
-    stat = test_stat_function(grouping)
+    grouping = np.asarray(grouping)
+    stat = test_stat_function(grouping[np.newaxis])[0]
 
     p_value = np.nan
     if permutations > 0:
-        perm_stats = np.empty(permutations, dtype=np.float64)
+        random_state = _random_state(seed)
+        batch_size = max(1, _PERMUTATION_BATCH_SIZE // len(grouping))
+
+        def batches():
+            for start in range(0, permutations, batch_size):
+                end = min(start + batch_size, permutations)
+                yield np.array([random_state.permutation(grouping)
+                                for _ in range(start, end)])
 
-        for i in range(permutations):
-            perm_grouping = np.random.permutation(grouping)
-            perm_stats[i] = test_stat_function(perm_grouping)
+        if n_jobs == 1:
+            perm_stats = [test_stat_function(batch) for batch in batches()]
+        else:
+            perm_stats = _thread_map(test_stat_function, batches(), n_jobs)
+        perm_stats = np.concatenate(perm_stats)
 
-        p_value = ((perm_stats >= stat).sum() + 1) / (permutations + 1)
+        ties = np.isclose(perm_stats, stat, rtol=0,
+                          atol=_PERMUTATION_TOLERANCE)
+        count_better = ((perm_stats >= stat) | ties).sum()
+        p_value = (count_better + 1) / (permutations + 1)
 
     return stat, p_value
 
 
+def _random_state(seed):
+    """Return the source of randomness described by `seed`
+
+    ``None`` refers to numpy's global random state, an int seeds a new
+    ``np.random.RandomState``, and an existing ``np.random.RandomState`` or
+    ``np.random.Generator`` is used as is.
+
+    """
+    if seed is None:
+        return np.random
+    if isinstance(seed, numbers.Integral):
+        return np.random.RandomState(seed)
+    if hasattr(seed, 'permutation'):
+        return seed
+    raise TypeError("seed must be None, an int, a np.random.RandomState or a "
+                    "np.random.Generator, not %r." % type(seed).__name__)
+
+
+def _thread_map(func, iterable, n_jobs):
+    """Map `func` over `iterable` in order with a pool of `n_jobs` threads
+
+    `iterable` is consumed `n_jobs` items at a time, so that only as many
+    items as there are threads are held in memory.
+
+    """
+    if n_jobs is None or n_jobs == -1:
+        n_jobs = multiprocessing.cpu_count()
+    if n_jobs < 1:
+        raise ValueError("n_jobs must be a positive integer, -1 or None.")
+
+    iterator = iter(iterable)
+    results = []
+    with multiprocessing.pool.ThreadPool(n_jobs) as pool:
+        while True:
+            items = list(itertools.islice(iterator, n_jobs))
+            if not items:
+                break
+            results.extend(pool.map(func, items))
+    return results
+
+
+def _within_group_sums(matrix, groupings, num_groups):
+    """Sum the entries of `matrix` between each object and its own group.
+
+    Parameters
+    ----------
+    matrix : 2-D np.ndarray
+        Symmetric, hollow matrix relating ``n`` objects.
+    groupings : 2-D np.ndarray of int
+        Each row assigns the ``n`` objects to groups ``0`` to
+        ``num_groups - 1``.
+    num_groups : int
+        Number of groups.
+
+    Returns
+    -------
+    2-D np.ndarray
+        Entry ``[k, i]`` is the sum of ``matrix[i, j]`` over the objects
+        ``j`` in the same group as object ``i`` in ``groupings[k]``.
+
+    Notes
+    -----
+    Each grouping is encoded as ``num_groups`` indicator columns, so the sums
+    for all of the groupings are obtained from a single matrix product.
+
+    """
+    num_groupings, n = groupings.shape
+    columns = groupings + num_groups * np.arange(num_groupings)[:, np.newaxis]
+    indicators = np.zeros((n, num_groupings * num_groups))
+    indicators[np.arange(n), columns] = 1
+    products = matrix.dot(indicators)
+    return products[np.arange(n), columns]
+
+
 def _build_results(method_name, test_stat_name, sample_size, num_groups, stat,
                    p_value, permutations):
     """Return ``pandas.Series`` containing results of statistical test."""
@@ -6,20 +6,31 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import multiprocessing
+from functools import partial
 from itertools import combinations
 
 import numpy as np
 import pandas as pd
 import scipy.misc
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import pearsonr, rankdata, spearmanr
 
 from skbio.stats.distance import DistanceMatrix
 from skbio.util._decorator import experimental
+from ._base import _random_state
+
+
+# The approximate number of distances in a batch of permuted condensed
+# distance vectors
+_MANTEL_BATCH_SIZE = 2 ** 20
+# The absolute difference below which a permuted correlation is counted as
+# equal to the original one
+_MANTEL_TOLERANCE = 1e-10
 
 
 @experimental(as_of="0.4.0")
 def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
-           strict=True, lookup=None):
+           strict=True, lookup=None, seed=None):
     """Compute correlation between distance matrices using the Mantel test.
 
     The Mantel test compares two distance matrices by computing the correlation
@@ -102,6 +113,11 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
         already match between the distance matrices, this parameter is not
         necessary. This parameter is disallowed if `x` and `y` are
         ``array_like``.
+    seed : int, np.random.RandomState or np.random.Generator, optional
+        Source of randomness for the permutations. By default, numpy's global
+        random state is used (e.g., as set by ``np.random.seed``). If an int,
+        a new ``np.random.RandomState`` seeded with it is used, making the
+        p-value reproducible.
 
     Returns
     -------
@@ -124,7 +140,7 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
         `alternative` are provided.
     TypeError
         If `x` and `y` are not both ``DistanceMatrix`` instances or
-        ``array_like``.
+        ``array_like``, or if `seed` is not valid.
 
     See Also
     --------
@@ -139,6 +155,13 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
     interface are similar to ``vegan::mantel``, available in R's vegan
     package [3]_.
 
+    The correlations of the permuted distance matrices are computed in
+    batches, without creating a ``DistanceMatrix`` for each permutation: the
+    condensed distances of `x` (ranked if ``method='spearman'``) are centered
+    and scaled once, each permutation of `x` is applied as an array of indices
+    into them, and the correlation with `y` is reduced for all of the
+    permutations of a batch at once.
+
     ``np.nan`` will be returned for the p-value if `permutations` is zero or if
     the correlation coefficient is ``np.nan``. The correlation coefficient will
     be ``np.nan`` if one or both of the inputs does not have any variation
@@ -278,17 +301,30 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
     if permutations == 0 or np.isnan(orig_stat):
         p_value = np.nan
     else:
-        perm_gen = (corr_func(x.permute(condensed=True), y_flat)[0]
-                    for _ in range(permutations))
-        permuted_stats = np.fromiter(perm_gen, np.float, count=permutations)
+        random_state = _random_state(seed)
 
+        if method == 'spearman':
+            x_flat = rankdata(x_flat)
+            y_flat = rankdata(y_flat)
+
+        permuted_stats = _permuted_correlations(x_flat, y_flat, n,
+                                                permutations, random_state)
+
+        # The permuted correlations are computed with different arithmetic
+        # than the original one, so those equal to it up to rounding (e.g.,
+        # permutations which leave the distances unchanged) are counted as
+        # equal to it.
         if alternative == 'two-sided':
-            count_better = (np.absolute(permuted_stats) >=
-                            np.absolute(orig_stat)).sum()
-        elif alternative == 'greater':
-            count_better = (permuted_stats >= orig_stat).sum()
+            permuted_stats = np.absolute(permuted_stats)
+            stat = np.absolute(orig_stat)
+        else:
+            stat = orig_stat
+        ties = np.isclose(permuted_stats, stat, rtol=0,
+                          atol=_MANTEL_TOLERANCE)
+        if alternative == 'less':
+            count_better = ((permuted_stats <= stat) | ties).sum()
         else:
-            count_better = (permuted_stats <= orig_stat).sum()
+            count_better = ((permuted_stats >= stat) | ties).sum()
 
         p_value = (count_better + 1) / (permutations + 1)
 
@@ -297,7 +333,8 @@ def mantel(x, y, method='pearson', permutations=999, alternative='two-sided',
 
 @experimental(as_of="0.4.0")
 def pwmantel(dms, labels=None, method='pearson', permutations=999,
-             alternative='two-sided', strict=True, lookup=None):
+             alternative='two-sided', strict=True, lookup=None, seed=None,
+             n_jobs=1):
     """Run Mantel tests for every pair of given distance matrices.
 
     Runs a Mantel test for each pair of distance matrices and collates the
@@ -328,6 +365,15 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
         Handling of nonmatching IDs. See ``mantel`` function for more details.
     lookup : dict, optional
         Map existing IDs to new IDs. See ``mantel`` function for more details.
+    seed : int, np.random.RandomState or np.random.Generator, optional
+        Source of randomness for the permutations. See ``mantel`` function for
+        more details.
+    n_jobs : int, optional
+        Number of processes used to run the Mantel tests. If ``None`` or
+        ``-1``, the number of CPUs is used. If not 1, the permutations of each
+        pair of distance matrices are drawn from a ``np.random.RandomState``
+        seeded from `seed`, so p-values are the same for any `n_jobs` greater
+        than 1, but differ from those obtained with ``n_jobs=1``.
 
     Returns
     -------
@@ -348,7 +394,8 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
     --------
     Passing a list of filepaths can be useful as it allows for a smaller amount
     of memory consumption as it only loads two matrices at a time as opposed to
-    loading all distance matrices into memory.
+    loading all distance matrices into memory. With ``n_jobs`` processes, each
+    process loads the two matrices of the test that it runs.
 
     Examples
     --------
@@ -404,21 +451,95 @@ def pwmantel(dms, labels=None, method='pearson', permutations=999,
                      ('permutations', int), ('alternative', object)]
     results = np.empty(num_combs, dtype=results_dtype)
 
-    for i, pair in enumerate(combinations(zip(labels, dms), 2)):
-        (xlabel, x), (ylabel, y) = pair
-        if isinstance(x, str):
-            x = DistanceMatrix.read(x)
-        if isinstance(y, str):
-            y = DistanceMatrix.read(y)
+    test = partial(_pairwise_mantel, method=method, permutations=permutations,
+                   alternative=alternative, strict=strict, lookup=lookup)
+    random_state = _random_state(seed)
+    pairs = combinations(dms, 2)
+    label_pairs = combinations(labels, 2)
+
+    if n_jobs == 1:
+        tests = (test((x, y, random_state)) for x, y in pairs)
+        _write_pwmantel_results(results, label_pairs, tests, method,
+                                permutations, alternative)
+    else:
+        if n_jobs is None or n_jobs == -1:
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs < 1:
+            raise ValueError("n_jobs must be a positive integer, -1 or None.")
+
+        # Seeds are drawn with `choice` as it is provided by both
+        # np.random.RandomState and np.random.Generator.
+        seeds = random_state.choice(2 ** 31, size=num_combs)
+        tasks = ((x, y, seed) for (x, y), seed in zip(pairs, seeds))
+        with multiprocessing.Pool(n_jobs) as pool:
+            _write_pwmantel_results(results, label_pairs,
+                                    pool.imap(test, tasks), method,
+                                    permutations, alternative)
+
+    return pd.DataFrame.from_records(results, index=('dm1', 'dm2'))
+
+
+def _pairwise_mantel(task, **kwargs):
+    """Run a Mantel test on a pair of distance matrices or filepaths."""
+    x, y, seed = task
+    if isinstance(x, str):
+        x = DistanceMatrix.read(x)
+    if isinstance(y, str):
+        y = DistanceMatrix.read(y)
+    return mantel(x, y, seed=seed, **kwargs)
 
-        stat, p_val, n = mantel(x, y, method=method, permutations=permutations,
-                                alternative=alternative, strict=strict,
-                                lookup=lookup)
 
+def _write_pwmantel_results(results, label_pairs, tests, method,
+                            permutations, alternative):
+    """Fill `results` with the Mantel test results of each pair of labels."""
+    for i, ((xlabel, ylabel), (stat, p_val, n)) in enumerate(
+            zip(label_pairs, tests)):
         results[i] = (xlabel, ylabel, stat, p_val, n, method, permutations,
                       alternative)
 
-    return pd.DataFrame.from_records(results, index=('dm1', 'dm2'))
+
+def _permuted_correlations(x_flat, y_flat, n, permutations, random_state):
+    """Compute the Pearson correlation of permuted condensed distances.
+
+    Returns an array of the correlations of `y_flat` with `x_flat` after
+    permuting the rows and columns of the ``n`` x ``n`` matrix of `x_flat`.
+    Orders are drawn from `random_state` one at a time, as in
+    ``DistanceMatrix.permute``, and each batch of them is applied as a 2-D
+    array of indices into `x_flat`.
+
+    """
+    x_std = x_flat - x_flat.mean()
+    x_std /= np.sqrt((x_std ** 2).sum())
+    y_std = y_flat - y_flat.mean()
+    y_std /= np.sqrt((y_std ** 2).sum())
+
+    batch_size = max(1, _MANTEL_BATCH_SIZE // len(x_flat))
+    permuted_stats = np.empty(permutations)
+    for start in range(0, permutations, batch_size):
+        end = min(start + batch_size, permutations)
+        orders = np.array([random_state.permutation(n)
+                           for _ in range(start, end)])
+        permuted = x_std[_permuted_condensed_indices(n, orders)]
+        permuted_stats[start:end] = (permuted * y_std).sum(axis=1)
+
+    return permuted_stats
+
+
+def _permuted_condensed_indices(n, orders):
+    """Return indices into condensed distances for each order of the objects.
+
+    Row ``k`` of the result holds, for each pair ``(i, j)`` of the condensed
+    form of a permuted ``n`` x ``n`` matrix, the index of pair
+    ``(orders[k, i], orders[k, j])`` in the condensed form of the original
+    matrix.
+
+    """
+    rows, cols = np.triu_indices(n, k=1)
+    a = orders[:, rows]
+    b = orders[:, cols]
+    lo = np.minimum(a, b)
+    hi = np.maximum(a, b)
+    return n * lo - lo * (lo + 1) // 2 + hi - lo - 1
 
 
 def _order_dms(x, y, strict=True, lookup=None):
@@ -10,12 +10,14 @@ from functools import partial
 
 import numpy as np
 
-from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results)
+from ._base import (_preprocess_input, _run_monte_carlo_stats, _build_results,
+                    _within_group_sums)
 from skbio.util._decorator import experimental
 
 
 @experimental(as_of="0.4.0")
-def permanova(distance_matrix, grouping, column=None, permutations=999):
+def permanova(distance_matrix, grouping, column=None, permutations=999,
+              seed=None, n_jobs=1):
     """Test for significant differences between groups using PERMANOVA.
 
     Permutational Multivariate Analysis of Variance (PERMANOVA) is a
@@ -58,6 +60,15 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
         significance. Must be greater than or equal to zero. If zero,
         statistical significance calculations will be skipped and the p-value
         will be ``np.nan``.
+    seed : int, np.random.RandomState or np.random.Generator, optional
+        Source of randomness for the permutations. By default, numpy's global
+        random state is used (e.g., as set by ``np.random.seed``). If an int,
+        a new ``np.random.RandomState`` seeded with it is used, making the
+        p-value reproducible.
+    n_jobs : int, optional
+        Number of threads used to compute the test statistics of the
+        permutations. If ``None`` or ``-1``, the number of CPUs is used. The
+        p-value does not depend on `n_jobs`.
 
     Returns
     -------
@@ -95,41 +106,26 @@ def permanova(distance_matrix, grouping, column=None, permutations=999):
     # Calculate number of objects in each group.
     group_sizes = np.bincount(grouping)
     s_T = (distances ** 2).sum() / sample_size
+    squared_distances = distance_matrix.data ** 2
 
     test_stat_function = partial(_compute_f_stat, sample_size, num_groups,
-                                 tri_idxs, distances, group_sizes, s_T)
+                                 squared_distances, group_sizes, s_T)
     stat, p_value = _run_monte_carlo_stats(test_stat_function, grouping,
-                                           permutations)
+                                           permutations, seed, n_jobs)
 
     return _build_results('PERMANOVA', 'pseudo-F', sample_size, num_groups,
                           stat, p_value, permutations)
 
 
-def _compute_f_stat(sample_size, num_groups, tri_idxs, distances, group_sizes,
-                    s_T, grouping):
-    """Compute PERMANOVA pseudo-F statistic."""
-    # Create a matrix where objects in the same group are marked with the group
-    # index (e.g. 0, 1, 2, etc.). objects that are not in the same group are
-    # marked with -1.
-    grouping_matrix = -1 * np.ones((sample_size, sample_size), dtype=int)
-    for group_idx in range(num_groups):
-        within_indices = _index_combinations(
-            np.where(grouping == group_idx)[0])
-        grouping_matrix[within_indices] = group_idx
+def _compute_f_stat(sample_size, num_groups, squared_distances, group_sizes,
+                    s_T, groupings):
+    """Compute PERMANOVA pseudo-F statistic for each row of `groupings`."""
+    # Sum of squared distances from each object to the other objects in its
+    # group. Each within-group pair is counted once from each of its objects.
+    within = _within_group_sums(squared_distances, groupings, num_groups)
 
-    # Extract upper triangle (in same order as distances were extracted
-    # from full distance matrix).
-    grouping_tri = grouping_matrix[tri_idxs]
-
-    # Calculate s_W for each group, accounting for different group sizes.
-    s_W = 0
-    for i in range(num_groups):
-        s_W += (distances[grouping_tri == i] ** 2).sum() / group_sizes[i]
+    # Calculate s_W, accounting for different group sizes.
+    s_W = (within / group_sizes[groupings]).sum(axis=1) / 2
 
     s_A = s_T - s_W
     return (s_A / (num_groups - 1)) / (s_W / (sample_size - num_groups))
-
-
-def _index_combinations(indices):
-    # Modified from http://stackoverflow.com/a/11144716
-    return np.tile(indices, len(indices)), np.repeat(indices, len(indices))
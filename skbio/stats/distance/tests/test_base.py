@@ -7,6 +7,8 @@
 # ----------------------------------------------------------------------------
 
 import io
+import os
+import tempfile
 from unittest import TestCase, main
 
 import matplotlib as mpl
@@ -22,7 +24,8 @@ from skbio.stats.distance import (
     DissimilarityMatrixError, DistanceMatrixError, MissingIDError,
     DissimilarityMatrix, randdm)
 from skbio.stats.distance._base import (_preprocess_input,
-                                        _run_monte_carlo_stats)
+                                        _run_monte_carlo_stats,
+                                        _within_group_sums)
 from skbio.util import assert_data_frame_almost_equal
 from skbio.util._testing import assert_series_almost_equal
 
@@ -795,6 +798,118 @@ class DistanceMatrixTests(DissimilarityMatrixTestData):
         obs = self.dm_3x3.permute()
         self.assertEqual(obs, exp)
 
+    def test_init_condensed_storage(self):
+        for dm, condensed in zip(self.dms, self.dm_condensed_forms):
+            for data in dm, dm.data, condensed:
+                obs = DistanceMatrix(data, dm.ids, condensed=True)
+                self.assertEqual(obs, dm)
+                self.assertIsNone(obs._data)
+                npt.assert_equal(obs.condensed_form(), condensed)
+                self.assertEqual(obs.shape, dm.shape)
+                self.assertEqual(obs.size, dm.size)
+                self.assertEqual(obs.dtype, np.float64)
+
+        # default IDs, and the condensed form is stored as is
+        data = np.array([1.0, 2.0, 3.0])
+        obs = DistanceMatrix(data, condensed=True)
+        self.assertEqual(obs.ids, ('0', '1', '2'))
+        self.assertIs(obs.condensed_form(), data)
+
+    def test_init_condensed_storage_invalid_input(self):
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([1.0, 2.0], condensed=True)
+
+        with self.assertRaisesRegex(DistanceMatrixError, 'NaNs'):
+            DistanceMatrix([1.0, np.nan, 3.0], condensed=True)
+
+        with self.assertRaises(DistanceMatrixError):
+            DistanceMatrix([[0.0, 2.0], [1.0, 0.0]], condensed=True)
+
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix([1.0, 2.0, 3.0], ['a', 'b'], condensed=True)
+
+        with self.assertRaises(DissimilarityMatrixError):
+            DistanceMatrix([1.0, 2.0, 3.0], ['a', 'b', 'a'], condensed=True)
+
+    def test_condensed_storage_memmap(self):
+        dm = DistanceMatrix([[0.0, 0.2, 0.3, 0.4],
+                             [0.2, 0.0, 0.5, 0.6],
+                             [0.3, 0.5, 0.0, 0.7],
+                             [0.4, 0.6, 0.7, 0.0]], ['a', 'b', 'c', 'd'])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'dm.bin')
+            dm.condensed_form().tofile(path)
+            data = np.memmap(path, dtype=np.float64, mode='r')
+
+            obs = DistanceMatrix(data, dm.ids, condensed=True)
+            self.assertIs(obs.condensed_form(), data)
+            self.assertEqual(obs, dm)
+            self.assertEqual(obs['b', 'd'], 0.6)
+            npt.assert_equal(obs['c'], dm['c'])
+            self.assertEqual(obs.filter(['d', 'b']),
+                             dm.filter(['d', 'b']))
+            assert_series_almost_equal(obs.to_series(), dm.to_series())
+
+            # copies are held in memory
+            self.assertNotIsInstance(obs.copy().condensed_form(), np.memmap)
+            del obs, data
+
+    def test_getitem_condensed_storage(self):
+        dm = self.dm_3x3
+        obs = DistanceMatrix(dm, condensed=True)
+
+        self.assertEqual(obs['b', 'c'], 12.0)
+        self.assertEqual(obs['c', 'b'], 12.0)
+        self.assertEqual(obs['a', 'a'], 0.0)
+        npt.assert_equal(obs['b'], dm['b'])
+
+        for index in (1, -1, slice(1, None), (0, 2), (slice(None), 1),
+                      ([0, 2], [1, 1]), np.array([True, False, True]),
+                      (Ellipsis, slice(None, None, -1))):
+            npt.assert_equal(obs[index], dm[index])
+
+        with self.assertRaises(MissingIDError):
+            obs['d']
+
+        with self.assertRaises(MissingIDError):
+            obs['a', 'd']
+
+    def test_filter_condensed_storage(self):
+        obs = DistanceMatrix(self.dm_3x3, condensed=True)
+        filtered = obs.filter(['c', 'a'])
+        self.assertEqual(filtered, self.dm_3x3.filter(['c', 'a']))
+        self.assertIsNone(filtered._data)
+
+        with self.assertRaises(MissingIDError):
+            obs.filter(['a', 'd'])
+
+    def test_permute_condensed_storage(self):
+        obs = DistanceMatrix(self.dm_3x3, condensed=True)
+
+        np.random.seed(0)
+        npt.assert_equal(obs.permute(condensed=True),
+                         np.array([12.0, 4.2, 0.01]))
+
+        # the same permutation as with redundant storage
+        np.random.seed(0)
+        permuted = obs.permute()
+        self.assertIsNone(permuted._data)
+        np.random.seed(0)
+        self.assertEqual(permuted, self.dm_3x3.permute())
+
+    def test_copy_condensed_storage(self):
+        obs = DistanceMatrix(self.dm_3x3, condensed=True)
+        for copied in obs.copy(), obs.transpose():
+            self.assertEqual(copied, self.dm_3x3)
+            self.assertIsNone(copied._data)
+            self.assertIsNot(copied.condensed_form(), obs.condensed_form())
+
+    def test_str_condensed_storage(self):
+        obs = str(DistanceMatrix(self.dm_2x2, condensed=True))
+        self.assertEqual(obs, "2x2 distance matrix (condensed)\nIDs:\n"
+                              "'a', 'b'\nData:\n[ 0.123]")
+
     def test_eq(self):
         # Compare DistanceMatrix to DissimilarityMatrix, where both have the
         # same data and IDs.
@@ -960,17 +1075,71 @@ class CategoricalStatsHelperFunctionTests(TestCase):
             _preprocess_input(self.dm, [1, 1, 1], None)
 
     def test_run_monte_carlo_stats_with_permutations(self):
-        obs = _run_monte_carlo_stats(lambda e: 42, self.grouping, 50)
+        obs = _run_monte_carlo_stats(lambda e: np.full(len(e), 42.0),
+                                     self.grouping, 50)
         npt.assert_equal(obs, (42, 1.0))
 
     def test_run_monte_carlo_stats_no_permutations(self):
-        obs = _run_monte_carlo_stats(lambda e: 42, self.grouping, 0)
+        obs = _run_monte_carlo_stats(lambda e: np.full(len(e), 42.0),
+                                     self.grouping, 0)
         npt.assert_equal(obs, (42, np.nan))
 
     def test_run_monte_carlo_stats_invalid_permutations(self):
         with self.assertRaises(ValueError):
             _run_monte_carlo_stats(lambda e: 42, self.grouping, -1)
 
+    def test_run_monte_carlo_stats_batches(self):
+        # The statistic is the position of the first object's group, so
+        # permutations are counted as extreme if they keep it in place.
+        grouping = np.array([0, 1, 1, 0, 1])
+
+        def stat(groupings):
+            return (groupings == grouping).all(axis=1).astype(float)
+
+        np.random.seed(0)
+        exp = sum((np.random.permutation(grouping) == grouping).all()
+                  for _ in range(1000))
+        exp = (exp + 1) / 1001
+
+        for n_jobs in 1, 3:
+            np.random.seed(0)
+            obs = _run_monte_carlo_stats(stat, grouping, 1000, n_jobs=n_jobs)
+            self.assertEqual(obs, (1.0, exp))
+
+            obs = _run_monte_carlo_stats(stat, grouping, 1000, seed=0,
+                                         n_jobs=n_jobs)
+            self.assertEqual(obs, (1.0, exp))
+
+        with self.assertRaises(ValueError):
+            _run_monte_carlo_stats(stat, grouping, 10, n_jobs=0)
+
+    def test_run_monte_carlo_stats_ties(self):
+        # Permutations which only swap the labels of the groups give the
+        # original statistic, up to rounding which may depend on the batch.
+        grouping = np.array([0, 0, 1, 1])
+
+        def stat(groupings):
+            same = (groupings == grouping).all(axis=1)
+            swapped = (groupings == 1 - grouping).all(axis=1)
+            return np.where(same, 1.0, np.where(swapped, 1.0 - 1e-14, 0.0))
+
+        np.random.seed(0)
+        exp = sum(len(set(zip(np.random.permutation(grouping), grouping))) == 2
+                  for _ in range(100))
+        exp = (exp + 1) / 101
+
+        obs = _run_monte_carlo_stats(stat, grouping, 100, seed=0)
+        self.assertEqual(obs, (1.0, exp))
+
+    def test_within_group_sums(self):
+        matrix = self.dm.data
+        groupings = np.array([[0, 1, 0], [0, 0, 1], [0, 0, 0]])
+        obs = _within_group_sums(matrix, groupings, 2)
+        exp = np.array([[2.0, 0.0, 2.0],
+                        [1.0, 1.0, 0.0],
+                        [3.0, 4.0, 5.0]])
+        npt.assert_equal(obs, exp)
+
 
 if __name__ == '__main__':
     main()
@@ -15,7 +15,8 @@ import pandas as pd
 from skbio import DistanceMatrix
 from skbio.stats.distance import (DissimilarityMatrixError,
                                   DistanceMatrixError, mantel, pwmantel)
-from skbio.stats.distance._mantel import _order_dms
+from skbio.stats.distance._mantel import (_order_dms,
+                                          _permuted_condensed_indices)
 from skbio.util import get_data_path, assert_data_frame_almost_equal
 
 
@@ -272,6 +273,28 @@ class MantelTests(MantelTestData):
                          method='spearman', alternative=alt)
             npt.assert_equal(obs, exp)
 
+    def test_seed(self):
+        # A seed gives the same results as seeding numpy's global random
+        # state.
+        for seed in 0, np.random.RandomState(0):
+            obs = mantel(self.veg_dm_vegan, self.env_dm_vegan,
+                         alternative='greater', seed=seed)
+            self.assertAlmostEqual(obs[0], 0.3047454)
+            self.assertAlmostEqual(obs[1], 0.002)
+            self.assertEqual(obs[2], 24)
+
+        with self.assertRaises(TypeError):
+            mantel(self.minx, self.miny, seed='foo')
+
+    def test_permuted_condensed_indices(self):
+        dm = DistanceMatrix(self.veg_dm_vegan)
+        orders = np.array([np.random.permutation(24) for _ in range(5)])
+
+        obs = dm.condensed_form()[_permuted_condensed_indices(24, orders)]
+        for order, permuted in zip(orders, obs):
+            exp = dm.filter(np.array(dm.ids)[order]).condensed_form()
+            npt.assert_equal(permuted, exp)
+
     def test_no_side_effects(self):
         minx = np.asarray(self.minx, dtype='float')
         miny = np.asarray(self.miny, dtype='float')
@@ -477,6 +500,26 @@ class PairwiseMantelTests(MantelTestData):
         obs = pwmantel(dms)
         assert_data_frame_almost_equal(obs, self.exp_results_all_dms)
 
+    def test_n_jobs(self):
+        dms = [
+            get_data_path('dm2.txt'),
+            get_data_path('dm.txt'),
+            get_data_path('dm4.txt'),
+            get_data_path('dm3.txt')
+        ]
+
+        obs = pwmantel(dms, seed=0, n_jobs=2)
+        npt.assert_almost_equal(obs['statistic'].values,
+                                self.exp_results_all_dms['statistic'].values)
+        npt.assert_equal(obs['n'].values, self.exp_results_all_dms['n'].values)
+
+        # The results do not depend on the number of processes.
+        assert_data_frame_almost_equal(pwmantel(dms, seed=0, n_jobs=3), obs)
+
+    def test_invalid_n_jobs(self):
+        with self.assertRaises(ValueError):
+            pwmantel(self.min_dms, n_jobs=0)
+
 
 class OrderDistanceMatricesTests(MantelTestData):
     def setUp(self):
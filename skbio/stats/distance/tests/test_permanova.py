@@ -114,6 +114,24 @@ class TestPERMANOVA(TestCase):
         obs = permanova(self.dm_unequal, self.grouping_unequal_relabeled)
         self.assert_series_equal(obs, exp)
 
+    def test_call_seed(self):
+        # A seed gives the same results as seeding numpy's global random
+        # state, whatever the number of threads.
+        exp = pd.Series(index=self.exp_index,
+                        data=['PERMANOVA', 'pseudo-F', 6, 3, 0.578848,
+                              0.645, 999],
+                        name='PERMANOVA results')
+
+        for n_jobs in 1, 2:
+            for seed in 0, np.random.RandomState(0):
+                obs = permanova(self.dm_unequal, self.grouping_unequal,
+                                seed=seed, n_jobs=n_jobs)
+                self.assert_series_equal(obs, exp)
+
+    def test_call_invalid_seed(self):
+        with self.assertRaises(TypeError):
+            permanova(self.dm_unequal, self.grouping_unequal, seed='foo')
+
 
 if __name__ == '__main__':
     main()
@@ -17,6 +17,7 @@ Classes
    :toctree: generated/
 
     TreeNode
+    CompactTree
 
 Phylogenetic Reconstruction
 ---------------------------
@@ -26,6 +27,15 @@ Phylogenetic Reconstruction
 
     nj
 
+Tree Comparison
+---------------
+
+.. autosummary::
+   :toctree: generated/
+
+    rf_dists
+    subset_dists
+
 Utility Functions
 -----------------
 
@@ -184,12 +194,15 @@ pairwise tip-to-tip distances between trees:
 from skbio.util import TestRunner
 
 from ._tree import TreeNode
+from ._compact import CompactTree
 from ._nj import nj
 from ._majority_rule import majority_rule
+from ._compare import rf_dists, subset_dists
 from ._exception import (TreeError, NoLengthError, DuplicateNodeError,
                          MissingNodeError, NoParentError)
 
-__all__ = ['TreeNode', 'nj', 'majority_rule', 'TreeError', 'NoLengthError',
-           'DuplicateNodeError', 'MissingNodeError', 'NoParentError']
+__all__ = ['TreeNode', 'CompactTree', 'nj', 'majority_rule', 'rf_dists',
+           'subset_dists', 'TreeError', 'NoLengthError', 'DuplicateNodeError',
+           'MissingNodeError', 'NoParentError']
 
 test = TestRunner(__file__).test
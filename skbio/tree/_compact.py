@@ -0,0 +1,680 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import warnings
+
+import numpy as np
+
+from skbio._base import SkbioObject
+from skbio.stats.distance import DistanceMatrix
+from skbio.util import RepresentationWarning
+from skbio.util._decorator import experimental, classonlymethod
+from ._exception import DuplicateNodeError, MissingNodeError
+from ._tree import TreeNode, _tip_tip_distances
+
+
+class CompactTree(SkbioObject):
+    """An immutable tree stored as arrays, with one entry per node.
+
+    ``CompactTree`` stores the topology, branch lengths and names of a tree
+    in numpy arrays instead of a Python object per node, so that large trees
+    need little memory and can be traversed and queried with vectorized
+    operations. Nodes are referred to by their index, which is their position
+    in a preorder traversal of the tree: the root is node 0, and the
+    descendants of each node directly follow it.
+
+    Parameters
+    ----------
+    parents : 1-D array_like of int
+        Index of the parent of each node, and -1 for the root. Nodes must be
+        in preorder, with siblings in order.
+    lengths : 1-D array_like of float, optional
+        Branch length of each node, ``np.nan`` where there is none. If not
+        provided, no node has a branch length.
+    names : 1-D array_like, optional
+        Name of each node, ``None`` where there is none. If not provided, no
+        node has a name.
+
+    Attributes
+    ----------
+    parents
+    lengths
+    names
+    child_offsets
+    child_indices
+    preorder
+    postorder
+    default_write_format
+
+    Raises
+    ------
+    ValueError
+        If `parents` does not describe a tree in preorder, or if `lengths` or
+        `names` do not have one entry per node.
+
+    See Also
+    --------
+    TreeNode
+
+    Notes
+    -----
+    A ``CompactTree`` cannot be modified. Methods which change the tree, such
+    as `shear`, return a new ``CompactTree``.
+
+    Examples
+    --------
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import CompactTree
+    >>> tree = TreeNode.read(["((a:1,b:2)c:3,(d:4,e:5)f:6)root;"])
+    >>> compact = CompactTree.from_tree_node(tree)
+    >>> compact
+    <CompactTree, name: root, internal node count: 2, tips count: 4>
+    >>> compact.parents
+    array([-1,  0,  1,  1,  0,  4,  4])
+    >>> compact.names[compact.tips()]
+    array(['a', 'b', 'd', 'e'], dtype=object)
+    >>> print(compact.shear(['a', 'b', 'd']))
+    ((a:1.0,b:2.0)c:3.0,d:10.0)root;
+    <BLANKLINE>
+
+    """
+    default_write_format = 'newick'
+
+    @property
+    @experimental(as_of="0.5.1")
+    def parents(self):
+        """Index of the parent of each node, and -1 for the root."""
+        return self._parents
+
+    @property
+    @experimental(as_of="0.5.1")
+    def lengths(self):
+        """Branch length of each node, and ``np.nan`` where there is none."""
+        return self._lengths
+
+    @property
+    @experimental(as_of="0.5.1")
+    def names(self):
+        """Name of each node, and ``None`` where there is none."""
+        return self._names
+
+    @property
+    @experimental(as_of="0.5.1")
+    def child_offsets(self):
+        """Offsets of the children of each node in `child_indices`.
+
+        The children of node ``i`` are
+        ``child_indices[child_offsets[i]:child_offsets[i + 1]]``.
+
+        """
+        return self._child_offsets
+
+    @property
+    @experimental(as_of="0.5.1")
+    def child_indices(self):
+        """Indices of the children of each node, in order of their parent."""
+        return self._child_indices
+
+    @property
+    @experimental(as_of="0.5.1")
+    def preorder(self):
+        """Indices of the nodes in preorder."""
+        return np.arange(len(self._parents))
+
+    @property
+    @experimental(as_of="0.5.1")
+    def postorder(self):
+        """Indices of the nodes in postorder."""
+        return self._postorder
+
+    @experimental(as_of="0.5.1")
+    def __init__(self, parents, lengths=None, names=None):
+        parents = np.asarray(parents, dtype=np.intp)
+        n = len(parents)
+        if parents.ndim != 1 or n == 0:
+            raise ValueError("parents must be a non-empty 1-D array.")
+        if parents[0] != -1 or not (
+                (parents[1:] >= 0) &
+                (parents[1:] < np.arange(1, n))).all():
+            raise ValueError("The first node must be the root, and every "
+                             "other node must come after its parent.")
+
+        if lengths is None:
+            lengths = np.full(n, np.nan)
+        else:
+            lengths = np.array(lengths, dtype=float)
+        if names is None:
+            names = np.full(n, None, dtype=object)
+        else:
+            names = _object_array(names)
+        if lengths.shape != (n,) or names.shape != (n,):
+            raise ValueError("lengths and names must have one entry per "
+                             "node.")
+
+        # Children are grouped by parent, and stay in index order within
+        # each group.
+        num_children = np.bincount(parents[1:], minlength=n)
+        child_offsets = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(num_children, out=child_offsets[1:])
+        child_indices = np.argsort(parents[1:], kind='mergesort') + 1
+
+        internal = np.flatnonzero(num_children)
+        last_children = np.arange(n)
+        last_children[internal] = child_indices[child_offsets[internal + 1] -
+                                                1]
+        last_descendants = _pointer_jump(last_children)
+
+        # In preorder, the first child of a node directly follows it and
+        # each subsequent child directly follows the last descendant of the
+        # previous child.
+        first_children = child_indices[child_offsets[internal]]
+        siblings = parents[child_indices[1:]] == parents[child_indices[:-1]]
+        if ((first_children != internal + 1).any() or
+                (last_descendants[child_indices[:-1][siblings]] + 1 !=
+                 child_indices[1:][siblings]).any()):
+            raise ValueError("Nodes must be in preorder.")
+
+        depths = _path_sums(parents, np.ones(n, dtype=np.intp))
+        # The nodes that come before a node in postorder are its descendants
+        # and the nodes before it in preorder which are not its ancestors.
+        postorder = np.empty(n, dtype=np.intp)
+        postorder[last_descendants - depths] = np.arange(n)
+
+        self._parents = parents
+        self._lengths = lengths
+        self._names = names
+        self._child_offsets = child_offsets
+        self._child_indices = child_indices
+        self._postorder = postorder
+        self._num_children = num_children
+        self._last_descendants = last_descendants
+        self._depths = depths
+        for array in (parents, lengths, names, child_offsets, child_indices,
+                      postorder):
+            array.flags.writeable = False
+
+        self._tip_cache = None
+        self._non_tip_cache = None
+
+    @classonlymethod
+    @experimental(as_of="0.5.1")
+    def from_tree_node(cls, tree):
+        """Construct a ``CompactTree`` from a ``TreeNode``.
+
+        Parameters
+        ----------
+        tree : TreeNode
+            The tree to convert. Only `tree` and its descendants are
+            converted, with `tree` as the root.
+
+        Returns
+        -------
+        CompactTree
+            The converted tree.
+
+        See Also
+        --------
+        to_tree_node
+
+        """
+        parents = []
+        lengths = []
+        names = []
+        index = {}
+        for i, node in enumerate(tree.preorder()):
+            index[id(node)] = i
+            parents.append(-1 if node is tree else index[id(node.parent)])
+            lengths.append(np.nan if node.length is None else node.length)
+            names.append(node.name)
+        return cls(parents, lengths, names)
+
+    @experimental(as_of="0.5.1")
+    def to_tree_node(self):
+        """Convert to a ``TreeNode``.
+
+        Returns
+        -------
+        TreeNode
+            The root of the converted tree.
+
+        See Also
+        --------
+        from_tree_node
+
+        """
+        lengths = [None if np.isnan(length) else length
+                   for length in self._lengths.tolist()]
+        nodes = [TreeNode(name=name, length=length)
+                 for name, length in zip(self._names, lengths)]
+        # This is much faster than TreeNode.extend. Children come after their
+        # parent and in sibling order, so appending preserves that order.
+        for node, parent_idx in zip(nodes[1:], self._parents[1:].tolist()):
+            parent = nodes[parent_idx]
+            node.parent = parent
+            parent.children.append(node)
+        return nodes[0]
+
+    @experimental(as_of="0.5.1")
+    def __repr__(self):
+        r"""Return a summary of the tree.
+
+        Returns
+        -------
+        str
+            The name of the root and the number of internal nodes and tips
+            other than the root.
+
+        """
+        n_tips = len(self.tips())
+        n_nontips = len(self._parents) - 1 - n_tips
+        name = self._names[0] if self._names[0] is not None else "unnamed"
+        return "<%s, name: %s, internal node count: %d, tips count: %d>" % \
+               (self.__class__.__name__, name, n_nontips, n_tips)
+
+    @experimental(as_of="0.5.1")
+    def __str__(self):
+        r"""Return a Newick representation of the tree.
+
+        Returns
+        -------
+        str
+            Newick representation of the tree.
+
+        """
+        return str(''.join(self.write([])))
+
+    @experimental(as_of="0.5.1")
+    def tips(self, include_self=False):
+        """Return the indices of the tips.
+
+        Parameters
+        ----------
+        include_self : bool, optional
+            If ``True``, the root is included if it is a tip, i.e. if it is
+            the only node.
+
+        Returns
+        -------
+        np.ndarray of int
+            Indices of the tips, in the order of a postorder traversal (which
+            is also their order in a preorder traversal).
+
+        See Also
+        --------
+        TreeNode.tips
+
+        """
+        tips = np.flatnonzero(self._num_children == 0)
+        if not include_self:
+            tips = tips[tips != 0]
+        return tips
+
+    @experimental(as_of="0.5.1")
+    def find(self, name):
+        """Find the index of a node by `name`.
+
+        As with ``TreeNode.find``, tips are searched first, and if no tip has
+        this name, the first internal node with this name in a postorder
+        traversal is returned. Lookups are cached on the first call.
+
+        Parameters
+        ----------
+        name : str
+            The name of the node to find.
+
+        Returns
+        -------
+        int
+            Index of the node.
+
+        Raises
+        ------
+        MissingNodeError
+            If no node has this name.
+        DuplicateNodeError
+            If several tips have the same name.
+
+        See Also
+        --------
+        TreeNode.find
+
+        """
+        if self._tip_cache is None:
+            self._create_caches()
+
+        node = self._tip_cache.get(name)
+        if node is None:
+            node = self._non_tip_cache.get(name)
+        if node is None:
+            raise MissingNodeError("Node %s is not in self" % name)
+        return node
+
+    def _create_caches(self):
+        """Build the lookups of tips and internal nodes by name"""
+        names = self._names
+        is_tip = self._num_children == 0
+        tips = np.flatnonzero(is_tip)
+        tips = tips[np.not_equal(names[tips], None)]
+        tip_cache = dict(zip(names[tips].tolist(), tips.tolist()))
+        if len(tip_cache) != len(tips):
+            raise DuplicateNodeError("All tip names must be unique.")
+
+        # Later entries replace earlier ones, so going through internal nodes
+        # in reverse postorder keeps the first one of each name.
+        non_tips = self._postorder[~is_tip[self._postorder]][::-1]
+        non_tips = non_tips[np.not_equal(names[non_tips], None)]
+        self._non_tip_cache = dict(zip(names[non_tips].tolist(),
+                                       non_tips.tolist()))
+        self._tip_cache = tip_cache
+
+    @experimental(as_of="0.5.1")
+    def to_array(self, nan_length_value=None):
+        """Return an array representation of the tree.
+
+        The representation is the same as the one of ``TreeNode.to_array``,
+        with node ids assigned as in ``TreeNode.assign_ids``, except that
+        ``id_index`` is an array of node indices instead of a ``dict`` of
+        nodes.
+
+        Parameters
+        ----------
+        nan_length_value : float, optional
+            If provided, replaces any `nan` in the branch length vector
+            (i.e., ``result['length']``) with this value.
+
+        Returns
+        -------
+        dict of array
+            {id_index: array of node index for each id,
+             child_index: ((node_id, left_child_id, right_child_id)),
+             name: array of name for each id,
+             length: array of length for each id,
+             id: array of ids}
+
+        See Also
+        --------
+        TreeNode.to_array
+
+        """
+        n = len(self._parents)
+        num_children = self._num_children
+
+        # Ids are assigned to the children of each internal node in turn,
+        # taking internal nodes in postorder, and the root has the last id.
+        internal = self._postorder[num_children[self._postorder] > 0]
+        first_ids = np.zeros(n, dtype=np.intp)
+        first_ids[internal] = (np.cumsum(num_children[internal]) -
+                               num_children[internal])
+        child_indices = self._child_indices
+        ranks = (np.arange(n - 1) -
+                 self._child_offsets[self._parents[child_indices]])
+        ids = np.empty(n, dtype=np.intp)
+        ids[child_indices] = first_ids[self._parents[child_indices]] + ranks
+        ids[0] = n - 1
+
+        id_index = np.empty(n, dtype=np.intp)
+        id_index[ids] = np.arange(n)
+
+        internal = internal[np.argsort(ids[internal])]
+        child_index = np.column_stack([
+            ids[internal], first_ids[internal],
+            first_ids[internal] + num_children[internal] - 1])
+        if len(internal) == 0:
+            child_index = np.atleast_2d(np.asarray([]))
+
+        length = self._lengths[id_index]
+        if nan_length_value is not None:
+            length[np.isnan(length)] = nan_length_value
+
+        return {'id_index': id_index, 'child_index': child_index,
+                'name': self._names[id_index], 'length': length,
+                'id': np.arange(n)}
+
+    @experimental(as_of="0.5.1")
+    def shear(self, names):
+        """Keep only the tips with the given names, and their ancestors.
+
+        Internal nodes left with a single child are removed, and their branch
+        length is added to the child's. If the root is left with a single
+        child, the root takes the name and length of the child and the child
+        is removed, as in ``TreeNode.shear``. Unlike ``TreeNode.shear``, the
+        order of the remaining siblings is preserved.
+
+        Parameters
+        ----------
+        names : Iterable of str
+            The tip names on the tree to keep.
+
+        Returns
+        -------
+        CompactTree
+            The resulting tree.
+
+        Raises
+        ------
+        ValueError
+            If the names do not exist in the tree.
+
+        See Also
+        --------
+        TreeNode.shear
+
+        """
+        names = set(names)
+        tips = self.tips()
+        tip_names = self._names[tips]
+        if not names.issubset(tip_names):
+            raise ValueError("ids are not a subset of the tree.")
+
+        n = len(self._parents)
+        parents = self._parents
+        lengths = self._lengths
+        selected = np.zeros(n, dtype=bool)
+        selected[tips] = [name in names for name in tip_names]
+
+        # The descendants of each node are the nodes up to its last
+        # descendant, so a node is kept if any of them is selected.
+        counts = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(selected, out=counts[1:])
+        kept = counts[self._last_descendants + 1] - counts[:-1] > 0
+        kept[0] = True
+
+        num_kept_children = np.bincount(parents[1:][kept[1:]], minlength=n)
+        collapsed = kept & (num_kept_children == 1)
+        collapsed[0] = False
+
+        # Attach each remaining node to its closest remaining ancestor,
+        # adding the lengths of the collapsed nodes in between.
+        nodes = np.flatnonzero(kept & ~collapsed)[1:]
+        new_parents = parents[nodes]
+        new_lengths = lengths[nodes]
+        pending = np.flatnonzero(collapsed[new_parents])
+        while len(pending):
+            new_lengths[pending] = _add_lengths(
+                new_lengths[pending], lengths[new_parents[pending]])
+            new_parents[pending] = parents[new_parents[pending]]
+            pending = pending[collapsed[new_parents[pending]]]
+
+        new_index = np.empty(n, dtype=np.intp)
+        new_index[nodes] = np.arange(1, len(nodes) + 1)
+        new_index[0] = 0
+        new_parents = np.concatenate([[-1], new_index[new_parents]])
+        new_lengths = np.concatenate([lengths[:1], new_lengths])
+        new_names = np.concatenate([self._names[:1], self._names[nodes]])
+
+        # The root takes the place of its only child.
+        if num_kept_children[0] == 1:
+            new_lengths[0] = new_lengths[1]
+            new_names[0] = new_names[1]
+            new_parents = np.delete(new_parents, 1)
+            new_parents[1:] = np.maximum(new_parents[1:] - 1, 0)
+            new_lengths = np.delete(new_lengths, 1)
+            new_names = np.delete(new_names, 1)
+
+        return self.__class__(new_parents, new_lengths, new_names)
+
+    @experimental(as_of="0.5.1")
+    def tip_tip_distances(self, endpoints=None, condensed=False, out=None):
+        """Return the distance matrix between pairs of tips.
+
+        Parameters
+        ----------
+        endpoints : list of str, optional
+            Names of the tips to compute distances between, in the order of
+            the result. If ``None``, all tips are used, in postorder.
+        condensed : bool, optional
+            If ``True``, return a ``DistanceMatrix`` which stores only the
+            condensed form of the distances.
+        out : 1-D np.ndarray of float64, optional
+            Array of length ``n * (n - 1) / 2``, where ``n`` is the number of
+            tips in the result, into which the condensed form of the
+            distances is written, such as a ``np.memmap``. Implies
+            ``condensed=True``.
+
+        Returns
+        -------
+        DistanceMatrix
+            The distance matrix.
+
+        Raises
+        ------
+        ValueError
+            If any of the specified `endpoints` are not tips.
+        ValueError
+            If `out` does not have the shape or dtype of the condensed form
+            of the result.
+
+        See Also
+        --------
+        TreeNode.tip_tip_distances
+
+        Notes
+        -----
+        If a node does not have an associated length, 0.0 will be used and a
+        ``RepresentationWarning`` will be raised.
+
+        """
+        if endpoints is None:
+            tips = self.tips(include_self=True)
+        else:
+            tips = np.array([self.find(name) for name in endpoints],
+                            dtype=np.intp)
+            for tip, name in zip(tips, endpoints):
+                if self._num_children[tip]:
+                    raise ValueError("Node with name '%s' is not a tip." %
+                                     name)
+
+        lengths = self._lengths.copy()
+        lengths[0] = 0.0
+        missing = np.isnan(lengths)
+        if missing.any():
+            warnings.warn(
+                "`CompactTree.tip_tip_distances`: %d nodes do not have an "
+                "associated length, so a length of 0.0 will be used." %
+                missing.sum(), RepresentationWarning)
+            lengths[missing] = 0.0
+        root_distances = _path_sums(self._parents, lengths)
+
+        result = _tip_tip_distances(self._parents, self._depths,
+                                    root_distances, tips, out)
+        return DistanceMatrix(result, self._names[tips].tolist(),
+                              condensed=condensed or out is not None)
+
+    @experimental(as_of="0.5.1")
+    def descending_branch_length(self, tip_subset=None):
+        """Find the total branch length below the root or a subset of tips.
+
+        Parameters
+        ----------
+        tip_subset : Iterable, or None
+            If None, the total branch length of the tree is returned. If a
+            list of tip names is provided then only the total branch length
+            connecting those tips to their lowest common ancestor is returned.
+
+        Returns
+        -------
+        float
+            The total descending branch length for the specified set of tips.
+
+        Raises
+        ------
+        ValueError
+            If `tip_subset` contains names that are not tip names.
+
+        See Also
+        --------
+        TreeNode.descending_branch_length
+
+        Notes
+        -----
+        Nodes with no length are counted as having a length of 0. As with
+        ``TreeNode.descending_branch_length``, the length of the root is
+        included if no `tip_subset` is provided.
+
+        """
+        if tip_subset is None:
+            return np.nansum(self._lengths)
+
+        tip_subset = set(tip_subset)
+        tips = self.tips()
+        if not tip_subset.issubset(self._names[tips]):
+            raise ValueError('tip_subset contains ids that aren\'t tip '
+                             'names.')
+
+        n = len(self._parents)
+        selected = np.zeros(n, dtype=bool)
+        selected[[self.find(name) for name in tip_subset]] = True
+        counts = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(selected, out=counts[1:])
+        counts = counts[self._last_descendants + 1] - counts[:-1]
+
+        # The lowest common ancestor and its ancestors are above all of the
+        # tips.
+        below = (counts > 0) & (counts < len(tip_subset))
+        return np.nansum(self._lengths[below])
+
+
+def _object_array(values):
+    """Return a 1-D object array of `values`, which may be sequences"""
+    values = list(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _pointer_jump(pointers):
+    """Follow `pointers` from each entry until reaching a fixed point."""
+    while True:
+        jumped = pointers[pointers]
+        if np.array_equal(jumped, pointers):
+            return pointers
+        pointers = jumped
+
+
+def _path_sums(parents, values):
+    """Sum `values` from each node up to, but excluding, the root.
+
+    The sums are obtained by pointer jumping: at each step, the sum from a
+    node up to its ancestor ``ancestors[i]`` is extended by the sum from that
+    ancestor, and ``ancestors[i]`` is replaced by the ancestor's, doubling
+    the length of the paths covered.
+
+    """
+    sums = np.array(values)
+    sums[0] = 0
+    ancestors = np.array(parents)
+    ancestors[0] = 0
+    while (ancestors != 0).any():
+        sums += sums[ancestors]
+        ancestors = ancestors[ancestors]
+    return sums
+
+
+def _add_lengths(a, b):
+    """Add branch lengths, where ``np.nan`` means that there is no length"""
+    return np.where(np.isnan(a), b, a + np.nan_to_num(b))
@@ -0,0 +1,328 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from skbio.stats.distance import DistanceMatrix
+from skbio.stats.distance._base import _thread_map
+from skbio.util._decorator import experimental
+from ._compact import CompactTree
+from ._exception import DuplicateNodeError
+
+
+@experimental(as_of="0.5.1")
+def rf_dists(trees, ids=None, proportion=False, n_jobs=1):
+    """Compute the Robinson-Foulds distances between all pairs of trees.
+
+    Parameters
+    ----------
+    trees : iterable of TreeNode or CompactTree
+        The trees to compare.
+    ids : list of str, optional
+        The IDs of the trees in the resulting distance matrix. Defaults to
+        ``'0'``, ``'1'``, etc.
+    proportion : bool, optional
+        Return the distances as a proportion of the number of clades of the
+        two trees.
+    n_jobs : int, optional
+        Number of threads used to compare pairs of trees which do not have the
+        same tips. If ``None`` or ``-1``, the number of CPUs is used.
+
+    Returns
+    -------
+    DistanceMatrix
+        The distance between each pair of trees, as computed by
+        ``TreeNode.compare_rfd``.
+
+    Raises
+    ------
+    DuplicateNodeError
+        If a tree has several tips with the same name.
+
+    See Also
+    --------
+    subset_dists
+    TreeNode.compare_rfd
+
+    Notes
+    -----
+    The clades (i.e. the sets of tip names returned by ``TreeNode.subsets``)
+    of every tree are encoded once as 64-bit hashes, which are the XOR of
+    random 64-bit keys of their tips, as in HashRF [1]_. The tips of each node
+    of a tree are contiguous in preorder, so the hash of each clade is the XOR
+    of two entries of the prefix XORs of the keys of the tips. Two distinct
+    clades have the same hash with a probability of :math:`2^{-64}`.
+
+    If all trees have the same tips, the number of clades shared by each pair
+    of trees is computed at once with a sparse matrix product. Otherwise, as
+    in ``TreeNode.compare_rfd``, each pair of trees is compared on the tips
+    they share: the clades of a tree are restricted to these tips by masking
+    the keys of the other tips, which is done for each pair.
+
+    References
+    ----------
+    .. [1] Sul SJ, Williams TL. (2008) "An experimental analysis of
+       Robinson-Foulds distance matrix algorithms." Algorithms - ESA 2008,
+       793-804.
+
+    Examples
+    --------
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import rf_dists
+    >>> trees = [TreeNode.read(["((a,b),(c,d));"]),
+    ...          TreeNode.read(["(((a,b),c),d);"]),
+    ...          TreeNode.read(["(((a,c),b),d);"])]
+    >>> dm = rf_dists(trees, ids=['x', 'y', 'z'])
+    >>> print(dm)
+    3x3 distance matrix
+    IDs:
+    'x', 'y', 'z'
+    Data:
+    [[ 0.  2.  4.]
+     [ 2.  0.  2.]
+     [ 4.  2.  0.]]
+
+    """
+    return _clade_dists(trees, ids, n_jobs, shear=True,
+                        metric='proportion' if proportion else 'count')
+
+
+@experimental(as_of="0.5.1")
+def subset_dists(trees, ids=None, exclude_absent_taxa=False, n_jobs=1):
+    """Compute the fraction of differing subsets between all pairs of trees.
+
+    Parameters
+    ----------
+    trees : iterable of TreeNode or CompactTree
+        The trees to compare.
+    ids : list of str, optional
+        The IDs of the trees in the resulting distance matrix. Defaults to
+        ``'0'``, ``'1'``, etc.
+    exclude_absent_taxa : bool, optional
+        Compare each pair of trees on the tips they share.
+    n_jobs : int, optional
+        Number of threads used to compare pairs of trees on the tips they
+        share. If ``None`` or ``-1``, the number of CPUs is used.
+
+    Returns
+    -------
+    DistanceMatrix
+        The distance between each pair of trees, as computed by
+        ``TreeNode.compare_subsets``.
+
+    Raises
+    ------
+    DuplicateNodeError
+        If a tree has several tips with the same name.
+
+    See Also
+    --------
+    rf_dists
+    TreeNode.compare_subsets
+
+    Notes
+    -----
+    Clades are encoded as in ``rf_dists``. The distance between a tree and
+    itself is 0, including for trees without clades.
+
+    Examples
+    --------
+    >>> from skbio import TreeNode
+    >>> from skbio.tree import subset_dists
+    >>> trees = [TreeNode.read(["((a,b),(c,d));"]),
+    ...          TreeNode.read(["(((a,b),c),d);"])]
+    >>> dm = subset_dists(trees)
+    >>> print(dm['0', '1'])
+    0.5
+
+    """
+    return _clade_dists(trees, ids, n_jobs, shear=exclude_absent_taxa,
+                        metric='subsets')
+
+
+class _TreeClades:
+    """The tips and clades of a tree, as ranges of its tips in preorder.
+
+    Parameters
+    ----------
+    tree : TreeNode or CompactTree
+        The tree.
+    tip_indices : dict
+        The index of each tip name, keyed by name. Names which are not found
+        are added with the next index.
+
+    """
+
+    def __init__(self, tree, tip_indices):
+        if isinstance(tree, CompactTree):
+            is_tip = tree._num_children == 0
+            names = tree.names[is_tip]
+            # the tips of a node are those before its last descendant and not
+            # before itself, and the root is excluded
+            tips_before = np.concatenate([[0], np.cumsum(is_tip)])
+            starts = tips_before[1:-1]
+            ends = tips_before[tree._last_descendants[1:] + 1]
+        else:
+            names = []
+            starts = []
+            ends = []
+            ranges = {}
+            for node in tree.postorder(include_self=False):
+                if node.children:
+                    start = ranges[id(node.children[0])][0]
+                    end = ranges.pop(id(node.children[-1]))[1]
+                else:
+                    start = len(names)
+                    end = start + 1
+                    names.append(node.name)
+                ranges[id(node)] = start, end
+                starts.append(start)
+                ends.append(end)
+            if not len(names):
+                names.append(tree.name)
+
+        tips = []
+        for name in names:
+            index = tip_indices.get(name)
+            if index is None:
+                index = tip_indices[name] = len(tip_indices)
+            tips.append(index)
+        tips = np.array(tips, dtype=np.intp)
+        if len(np.unique(tips)) != len(tips):
+            raise DuplicateNodeError("All tip names must be unique.")
+
+        sizes = np.asarray(ends) - np.asarray(starts)
+        self.tips = tips
+        self.starts = np.asarray(starts, dtype=np.intp)[sizes > 1]
+        self.ends = np.asarray(ends, dtype=np.intp)[sizes > 1]
+
+    def hashes(self, keys, mask=None, num_shared=None):
+        """Return the sorted, distinct hashes of the clades of the tree.
+
+        Parameters
+        ----------
+        keys : np.ndarray of np.uint64
+            The key of each tip index.
+        mask : np.ndarray of bool, optional
+            Whether each tip index is kept. Clades are restricted to the kept
+            tips, and only those with more than one kept tip are returned.
+        num_shared : int, optional
+            The number of kept tips. If provided and the tree has other tips,
+            the clade of all kept tips is not returned, as it is merged into
+            the root when the tree is sheared.
+
+        """
+        tip_keys = keys[self.tips]
+        if mask is not None:
+            kept = mask[self.tips]
+            tip_keys = np.where(kept, tip_keys, np.uint64(0))
+        prefix = np.zeros(len(tip_keys) + 1, dtype=np.uint64)
+        np.bitwise_xor.accumulate(tip_keys, out=prefix[1:])
+        hashes = prefix[self.ends] ^ prefix[self.starts]
+
+        if mask is not None:
+            counts = np.concatenate([[0], np.cumsum(kept)])
+            sizes = counts[self.ends] - counts[self.starts]
+            keep = sizes > 1
+            if num_shared is not None and num_shared < len(self.tips):
+                keep &= sizes < num_shared
+            hashes = hashes[keep]
+        return np.unique(hashes)
+
+
+def _clade_dists(trees, ids, n_jobs, shear, metric):
+    """Compute distances between trees from the numbers of shared clades.
+
+    Parameters
+    ----------
+    trees : iterable of TreeNode or CompactTree
+        The trees to compare.
+    ids : list of str or None
+        The IDs of the trees.
+    n_jobs : int or None
+        Number of threads used to compare pairs of trees.
+    shear : bool
+        Whether to compare each pair of trees on the tips they share. For the
+        Robinson-Foulds distance, the clade of all shared tips is then only
+        kept in trees without other tips, as in ``TreeNode.compare_rfd``.
+    metric : {'count', 'proportion', 'subsets'}
+        The number of clades in only one of the trees, its proportion of the
+        total number of clades of the trees, or the fraction of clades which
+        are not shared.
+
+    """
+    tip_indices = {}
+    encoded = [_TreeClades(tree, tip_indices) for tree in trees]
+    num_trees = len(encoded)
+    if ids is None:
+        ids = [str(i) for i in range(num_trees)]
+
+    # random keys from a fixed seed so that the distances are reproducible
+    rng = np.random.RandomState(0)
+    keys = np.frombuffer(rng.bytes(8 * len(tip_indices)), dtype=np.uint64)
+
+    tip_sets = [np.sort(clades.tips) for clades in encoded]
+    same_tips = all(len(tips) == len(tip_sets[0]) and
+                    (tips == tip_sets[0]).all() for tips in tip_sets)
+
+    if not shear or same_tips:
+        hashes = [clades.hashes(keys) for clades in encoded]
+        sizes = np.array([len(h) for h in hashes], dtype=float)
+
+        # each tree is a row of an incidence matrix of the distinct clades,
+        # so that the numbers of shared clades are given by its gram matrix
+        all_hashes = np.concatenate(hashes) if hashes else np.array([])
+        distinct, columns = np.unique(all_hashes, return_inverse=True)
+        rows = np.repeat(np.arange(num_trees), sizes.astype(np.intp))
+        incidence = csr_matrix((np.ones(len(columns)), (rows, columns)),
+                               shape=(num_trees, len(distinct)))
+        shared = incidence.dot(incidence.T).toarray()
+        totals = sizes[:, np.newaxis] + sizes
+    else:
+        # the clade of all shared tips is merged into the root of a sheared
+        # tree, but is kept by compare_subsets
+        drop_shared_clade = metric != 'subsets'
+
+        def compare_row(i):
+            """Compare tree i with the trees before it on their shared tips"""
+            row_totals = np.zeros(i)
+            row_shared = np.zeros(i)
+            mask = np.zeros(len(keys), dtype=bool)
+            for j in range(i):
+                shared_tips = np.intersect1d(tip_sets[i], tip_sets[j],
+                                             assume_unique=True)
+                mask[shared_tips] = True
+                num_shared = len(shared_tips) if drop_shared_clade else None
+                hashes_i = encoded[i].hashes(keys, mask, num_shared)
+                hashes_j = encoded[j].hashes(keys, mask, num_shared)
+                mask[shared_tips] = False
+                row_totals[j] = len(hashes_i) + len(hashes_j)
+                row_shared[j] = len(np.intersect1d(hashes_i, hashes_j,
+                                                   assume_unique=True))
+            return row_totals, row_shared
+
+        shared = np.zeros((num_trees, num_trees))
+        totals = np.zeros((num_trees, num_trees))
+        rows = _thread_map(compare_row, range(num_trees), n_jobs)
+        for i, (row_totals, row_shared) in enumerate(rows):
+            totals[i, :i] = row_totals
+            shared[i, :i] = row_shared
+        totals += totals.T
+        shared += shared.T
+
+    different = totals - 2 * shared
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if metric == 'count':
+            result = different
+        elif metric == 'proportion':
+            result = np.where(totals > 0, different / totals, 0)
+        else:
+            result = np.where(totals > 0, different / totals, 1)
+    np.fill_diagonal(result, 0)
+    return DistanceMatrix(result, ids)
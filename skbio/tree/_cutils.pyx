@@ -0,0 +1,330 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+cimport numpy as np
+cimport cython
+from libc.math cimport INFINITY
+
+DTYPE = np.int64
+ctypedef np.int64_t DTYPE_t
+
+
+cdef inline DTYPE_t _pair_key(DTYPE_t pos_i, DTYPE_t pos_j, Py_ssize_t n):
+    """Order pairs by the distance of their position in the lower triangle of
+    the distance matrix to its top-left corner, and then by row"""
+    cdef DTYPE_t row = pos_i if pos_i > pos_j else pos_j
+    cdef DTYPE_t col = pos_j if pos_i > pos_j else pos_i
+    return (row * row + col * col) * n + row
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _nj_joins(double[:, ::1] dm, bint disallow_negative_branch_length,
+              bint rapid):
+    """Join the nodes of a distance matrix by neighbor joining
+
+    The distance matrix is updated in place: the node created by each join
+    takes the row and column of one of the joined nodes, and the row sums are
+    updated with the differences in distances.
+
+    Parameters
+    ----------
+    dm : 2-D np.ndarray of double
+        Distances between the tips, which are overwritten.
+    disallow_negative_branch_length : bool
+        If ``True``, negative branch lengths and distances to new nodes are
+        set to zero.
+    rapid : bool
+        If ``True``, prune the search for the pair to join as in RapidNJ,
+        which finds the same pair as the search of all pairs.
+
+    Returns
+    -------
+    np.ndarray of int
+        For each of the first ``n - 3`` joins, the two nodes that are joined.
+        Tips are numbered from 0 to ``n - 1`` and the node created by the
+        ``k``-th join is numbered ``n + k``.
+    np.ndarray of double
+        For each join, the lengths of the branches to the two nodes.
+    np.ndarray of int
+        The last three nodes, in the order of their rows in a distance matrix
+        in which each new node comes first.
+    np.ndarray of double
+        The distances between the last three nodes.
+
+    Notes
+    -----
+    Pairs minimizing Q are ordered by the positions of their rows in a
+    distance matrix in which each new node is inserted first and the
+    remaining nodes keep their order, so that exact ties are broken as when
+    the matrix is rebuilt at each join. The row sums are updated rather than
+    recomputed, so Q values which are only equal in exact arithmetic (e.g.,
+    those of complementary pairs among the last four nodes) may be ordered
+    differently by rounding.
+
+    In rapid mode, the row of each node lists the older nodes and their
+    distances, sorted by distance, so that every pair is listed once. As Q is
+    at least ``(m - 2) * d - (r_i + r_max)`` for the distance ``d`` of a
+    pair, scanning a row stops at the first distance at which this bound
+    exceeds the lowest Q found so far [1]_. Distances between remaining nodes
+    do not change, and nodes which have been joined are skipped when they are
+    found in a row.
+
+    References
+    ----------
+    .. [1] Simonsen M, Mailund T, Pedersen CNS. (2008) "Rapid neighbour-
+       joining." Algorithms in Bioinformatics, 113-122.
+
+    """
+    cdef:
+        Py_ssize_t n = dm.shape[0]
+        Py_ssize_t m = n
+        Py_ssize_t num_joins = n - 3 if n > 3 else 0
+        Py_ssize_t t, x, y, e, i, j, k, a, b
+        DTYPE_t pos_a, pos_b, key, best_key
+        double d, q, best_q, r_max, d_ab, d_uk, length_a, length_b
+        double[::1] sums = np.asarray(dm).sum(axis=1)
+        double[::1] new_distances = np.empty(n)
+        DTYPE_t[::1] active = np.arange(n, dtype=DTYPE)
+        DTYPE_t[::1] node_of_slot = np.arange(n, dtype=DTYPE)
+        DTYPE_t[::1] slot_of_node = np.full(2 * n, -1, dtype=DTYPE)
+        DTYPE_t[::1] positions = np.arange(n, dtype=DTYPE)
+        np.ndarray dm_array, sorted_array, sorted_distances_array
+        np.int32_t[:, ::1] sorted_nodes
+        double[:, ::1] sorted_distances
+        DTYPE_t[::1] row_lengths, row_starts
+        DTYPE_t[:, ::1] joins = np.empty((num_joins, 2), dtype=DTYPE)
+        double[:, ::1] lengths = np.empty((num_joins, 2))
+        DTYPE_t[::1] last = np.empty(3, dtype=DTYPE)
+        DTYPE_t[::1] last_slots = np.empty(3, dtype=DTYPE)
+        double[:, ::1] last_distances = np.empty((3, 3))
+        DTYPE_t[::1] order
+
+    slot_of_node[:n] = node_of_slot
+
+    if rapid:
+        # the row of each tip lists the tips before it
+        dm_array = np.asarray(dm)
+        sorted_array = np.zeros((n, n), dtype=np.int32)
+        sorted_distances_array = np.zeros((n, n))
+        for i in range(1, n):
+            sorted_array[i, :i] = np.argsort(dm_array[i, :i])
+            sorted_distances_array[i, :i] = dm_array[i, sorted_array[i, :i]]
+        sorted_nodes = sorted_array
+        sorted_distances = sorted_distances_array
+        row_lengths = np.arange(n, dtype=DTYPE)
+        row_starts = np.zeros(n, dtype=DTYPE)
+
+    for t in range(num_joins):
+        best_q = INFINITY
+        best_key = -1
+        a = b = -1
+
+        if rapid:
+            r_max = -INFINITY
+            for x in range(m):
+                if sums[active[x]] > r_max:
+                    r_max = sums[active[x]]
+
+            # seed the lowest Q with the nearest remaining node of each row,
+            # so that scanning the rows stops early
+            for x in range(m):
+                i = active[x]
+                while (row_starts[i] < row_lengths[i] and
+                       slot_of_node[sorted_nodes[i, row_starts[i]]] < 0):
+                    row_starts[i] += 1
+                for e in range(row_starts[i], row_lengths[i]):
+                    j = slot_of_node[sorted_nodes[i, e]]
+                    if j >= 0:
+                        q = ((m - 2) * sorted_distances[i, e] -
+                             (sums[i] + sums[j]))
+                        key = _pair_key(positions[i], positions[j], n)
+                        if q < best_q or (q == best_q and key < best_key):
+                            best_q, best_key, a, b = q, key, i, j
+                        break
+
+        for x in range(m):
+            i = active[x]
+            if rapid:
+                for e in range(row_starts[i], row_lengths[i]):
+                    j = slot_of_node[sorted_nodes[i, e]]
+                    if j < 0:
+                        continue
+                    d = sorted_distances[i, e]
+                    if (m - 2) * d - (sums[i] + r_max) > best_q:
+                        break
+                    q = (m - 2) * d - (sums[i] + sums[j])
+                    if q > best_q:
+                        continue
+                    key = _pair_key(positions[i], positions[j], n)
+                    if q < best_q or key < best_key:
+                        best_q, best_key, a, b = q, key, i, j
+            else:
+                for y in range(x + 1, m):
+                    j = active[y]
+                    q = (m - 2) * dm[i, j] - (sums[i] + sums[j])
+                    if q > best_q:
+                        continue
+                    key = _pair_key(positions[i], positions[j], n)
+                    if q < best_q or key < best_key:
+                        best_q, best_key, a, b = q, key, i, j
+
+        # the first joined node is the one with the later row
+        if positions[a] < positions[b]:
+            a, b = b, a
+
+        # lengths of the branches from the joined nodes to the new node
+        d_ab = dm[a, b]
+        length_a = (0.5 * d_ab) + ((sums[a] - sums[b]) / (2 * (m - 2)))
+        if disallow_negative_branch_length and length_a < 0:
+            length_a = 0
+        length_b = d_ab - length_a
+        if disallow_negative_branch_length and length_b < 0:
+            length_b = 0
+        joins[t, 0] = node_of_slot[a]
+        joins[t, 1] = node_of_slot[b]
+        lengths[t, 0] = length_a
+        lengths[t, 1] = length_b
+
+        # the new node takes the slot of b, and a is removed
+        slot_of_node[node_of_slot[a]] = -1
+        slot_of_node[node_of_slot[b]] = -1
+        node_of_slot[b] = n + t
+        slot_of_node[n + t] = b
+        for x in range(m):
+            if active[x] == a:
+                active[x] = active[m - 1]
+                break
+        m -= 1
+
+        pos_a = positions[a]
+        pos_b = positions[b]
+        sums[b] = 0
+        for x in range(m):
+            k = active[x]
+            if k == b:
+                continue
+            d_uk = 0.5 * (dm[a, k] + dm[b, k] - d_ab)
+            if disallow_negative_branch_length and d_uk < 0:
+                d_uk = 0
+            sums[k] = sums[k] - dm[a, k] - dm[b, k] + d_uk
+            sums[b] += d_uk
+            dm[b, k] = d_uk
+            dm[k, b] = d_uk
+            positions[k] += (1 - (positions[k] > pos_a) -
+                             (positions[k] > pos_b))
+        dm[b, b] = 0
+        positions[b] = 0
+
+        if rapid:
+            # the row of the new node lists all other nodes
+            for x in range(m):
+                new_distances[x] = dm[b, active[x]]
+            order = np.argsort(np.asarray(new_distances[:m])).astype(DTYPE)
+            e = 0
+            for y in range(m):
+                k = active[order[y]]
+                if k != b:
+                    sorted_nodes[b, e] = node_of_slot[k]
+                    sorted_distances[b, e] = new_distances[order[y]]
+                    e += 1
+            row_lengths[b] = e
+            row_starts[b] = 0
+
+    for x in range(m):
+        last_slots[positions[active[x]]] = active[x]
+    for x in range(3):
+        last[x] = node_of_slot[last_slots[x]]
+        for y in range(3):
+            last_distances[x, y] = dm[last_slots[x], last_slots[y]]
+    return (np.asarray(joins), np.asarray(lengths), np.asarray(last),
+            np.asarray(last_distances))
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _max_distance(DTYPE_t[::1] parents, double[::1] lengths):
+    """Find the two most distant tips of a tree
+
+    Parameters
+    ----------
+    parents : np.ndarray of int
+        The index of the parent of each node in preorder, the first node
+        being the root.
+    lengths : np.ndarray of double
+        The length of the branch of each node to its parent.
+
+    Returns
+    -------
+    double
+        The distance between the two tips, or 0 if no two tips are at a
+        positive distance.
+    int
+        The index of the first tip, or -1.
+    int
+        The index of the second tip, or -1.
+
+    Notes
+    -----
+    The nodes are visited in reverse preorder, so that the children of a
+    node are visited before it, and each node keeps the two longest paths
+    from its children down to a tip. The most distant tips are those of the
+    two paths of the first node in preorder whose sum is the largest. Ties
+    are broken in favor of the later child, as by a stable sort of the
+    children by the length of their longest path.
+
+    """
+    cdef:
+        Py_ssize_t n = parents.shape[0]
+        Py_ssize_t i, p, tip
+        double value, longest = 0
+        DTYPE_t first = -1, second = -1
+        # the longest path below each node, and the second longest path
+        # through another child
+        double[::1] best = np.full(n, -INFINITY)
+        double[::1] runner_up = np.full(n, -INFINITY)
+        DTYPE_t[::1] best_tip = np.full(n, -1, dtype=DTYPE)
+        DTYPE_t[::1] runner_up_tip = np.full(n, -1, dtype=DTYPE)
+        DTYPE_t[::1] num_children = np.zeros(n, dtype=DTYPE)
+
+    for i in range(n - 1, -1, -1):
+        if num_children[i] == 0:
+            best[i] = runner_up[i] = 0
+            best_tip[i] = runner_up_tip[i] = i
+        if i == 0:
+            break
+
+        # the runner-up path is kept on ties
+        if best[i] > runner_up[i]:
+            value = best[i]
+            tip = best_tip[i]
+        else:
+            value = runner_up[i]
+            tip = runner_up_tip[i]
+        value += lengths[i]
+
+        # children are visited from last to first, so that a path only
+        # replaces one at least as long if it is strictly longer
+        p = parents[i]
+        num_children[p] += 1
+        if value > best[p]:
+            runner_up[p] = best[p]
+            runner_up_tip[p] = best_tip[p]
+            best[p] = value
+            best_tip[p] = tip
+        elif value > runner_up[p]:
+            runner_up[p] = value
+            runner_up_tip[p] = tip
+
+    for i in range(n):
+        if num_children[i] > 1 and runner_up[i] + best[i] > longest:
+            longest = runner_up[i] + best[i]
+            first = runner_up_tip[i]
+            second = best_tip[i]
+    return longest, first, second
@@ -0,0 +1,136 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import numpy as np
+
+
+class LCAIndex:
+    """Index of a tree for constant-time lowest common ancestor queries.
+
+    Nodes are numbered in preorder, so that the descendants of a node
+    directly follow it. For two nodes ``i < j``, every node in ``(i, j]``
+    descends from their lowest common ancestor, and the shallowest of these
+    nodes is one of its children, so the lowest common ancestor is the
+    parent of the shallowest node in ``(i, j]``. The shallowest node of any
+    range is found in constant time with a sparse table, which stores the
+    shallowest node of every range whose length is a power of two.
+
+    Parameters
+    ----------
+    root : TreeNode
+        The root of the tree to index.
+
+    Notes
+    -----
+    Branch lengths are read when the index is built. Nodes without a length
+    count as having a length of 0 in the distances to the root, and are
+    counted separately so that distances going through them can be rejected.
+
+    """
+
+    def __init__(self, root):
+        nodes = []
+        positions = {}
+        parents = []
+        depths = []
+        root_distances = []
+        missing_lengths = []
+        for i, node in enumerate(root.preorder(include_self=True)):
+            positions[id(node)] = i
+            nodes.append(node)
+            if i == 0:
+                parents.append(-1)
+                depths.append(0)
+                root_distances.append(0.0)
+                missing_lengths.append(0)
+                continue
+
+            parent = positions[id(node.parent)]
+            parents.append(parent)
+            depths.append(depths[parent] + 1)
+            if node.length is None:
+                root_distances.append(root_distances[parent])
+                missing_lengths.append(missing_lengths[parent] + 1)
+            else:
+                root_distances.append(root_distances[parent] + node.length)
+                missing_lengths.append(missing_lengths[parent])
+
+        n = len(nodes)
+        dtype = np.int32 if n < np.iinfo(np.int32).max else np.intp
+        self.nodes = nodes
+        self.positions = positions
+        self._parents = np.array(parents, dtype=dtype)
+        self._depths = np.array(depths, dtype=dtype)
+        self._root_distances = np.array(root_distances)
+        self._missing_lengths = np.array(missing_lengths, dtype=dtype)
+
+        # self._table[k][i] is the shallowest node in [i, i + 2 ** k).
+        depths = self._depths
+        table = [np.arange(n, dtype=dtype)]
+        span = 1
+        while 2 * span <= n:
+            previous = table[-1]
+            first, second = previous[:-span], previous[span:]
+            table.append(np.where(depths[second] < depths[first], second,
+                                  first))
+            span *= 2
+        self._table = table
+
+    def is_valid(self):
+        """Whether the index has not been released."""
+        return self.nodes is not None
+
+    def release(self):
+        """Release the arrays of the index, which can no longer be used."""
+        self.nodes = None
+        self.positions = None
+        self._parents = None
+        self._depths = None
+        self._root_distances = None
+        self._missing_lengths = None
+        self._table = None
+
+    def lca(self, i, j):
+        """Return the position of the lowest common ancestor of two nodes."""
+        if i == j:
+            return i
+        if i > j:
+            i, j = j, i
+
+        # Shallowest node in (i, j], from two ranges which cover it.
+        k = (j - i).bit_length() - 1
+        level = self._table[k]
+        first = level[i + 1]
+        second = level[j - (1 << k) + 1]
+        if self._depths[second] < self._depths[first]:
+            first = second
+        return int(self._parents[first])
+
+    def lca_of(self, positions):
+        """Return the position of the lowest common ancestor of nodes.
+
+        The lowest common ancestor of a set of nodes is the one of the first
+        and the last of them in preorder.
+
+        """
+        return self.lca(min(positions), max(positions))
+
+    def distance(self, i, j):
+        """Return the distance between two nodes.
+
+        ``None`` is returned if a node on the path between them has no
+        length.
+
+        """
+        ancestor = self.lca(i, j)
+        missing = self._missing_lengths
+        if missing[i] + missing[j] - 2 * missing[ancestor]:
+            return None
+        root_distances = self._root_distances
+        return float((root_distances[i] - root_distances[ancestor]) +
+                     (root_distances[j] - root_distances[ancestor]))
@@ -6,84 +6,200 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
-from collections import defaultdict
-
 import numpy as np
 
-from skbio.tree import TreeNode
+from skbio.tree import TreeNode, CompactTree
 from skbio.util._decorator import experimental
 
 
-def _walk_clades(trees, weights):
+def _tree_clades(tree, tip_indices):
+    """Yield the clade and branch length of each node of a tree
+
+    Parameters
+    ----------
+    tree : TreeNode or CompactTree
+        The tree to walk
+    tip_indices : dict
+        The index of each tip name, keyed by name. Names which are not found
+        are added with the next index.
+
+    Yields
+    ------
+    int
+        The clade of the node, as a bitset of the indices of its tips.
+    float or None
+        The length of the node.
+
+    """
+    def tip_clade(name):
+        index = tip_indices.get(name)
+        if index is None:
+            index = tip_indices[name] = len(tip_indices)
+        return 1 << index
+
+    if isinstance(tree, CompactTree):
+        parents = tree.parents.tolist()
+        lengths = tree.lengths.tolist()
+        names = tree.names
+        clades = [0] * len(parents)
+        for i in np.flatnonzero(np.diff(tree.child_offsets) == 0):
+            clades[i] = tip_clade(names[i])
+        # nodes are in preorder, so children come after their parents
+        for i in range(len(parents) - 1, -1, -1):
+            if i:
+                clades[parents[i]] |= clades[i]
+            length = lengths[i]
+            yield clades[i], None if length != length else length
+    else:
+        clades = {}
+        for node in tree.postorder(include_self=True):
+            if node.children:
+                clade = 0
+                for child in node.children:
+                    clade |= clades.pop(id(child))
+            else:
+                clade = tip_clade(node.name)
+            clades[id(node)] = clade
+            yield clade, node.length
+
+
+def _walk_clades(trees, weights, cutoff=None):
     """Walk all the clades of all the trees
 
+    Clades are encoded as bitsets of tip indices, which are Python integers,
+    so that each clade is stored in a number of bytes proportional to the
+    number of tips instead of as a set of names.
+
     Parameters
     ----------
-    trees : list of TreeNode
-        The trees to walk
-    weights : np.array
-        Tree weights
+    trees : iterable of TreeNode or CompactTree
+        The trees to walk. They are consumed one at a time.
+    weights : np.array or None
+        Tree weights, in the order of `trees`. If ``None``, each tree has a
+        weight of 1.
+    cutoff : float, optional
+        If provided along with `weights` or if `trees` has a length, clades
+        whose support cannot exceed `cutoff` times the total weight are
+        dropped as soon as the weight of the remaining trees is not enough
+        to reach it. No clade is dropped if any weight is negative, as the
+        support of a clade may then decrease.
 
     Returns
     -------
     list of tuple
-        The clades and support values sorted by support value such that the
-        most supported clade is index 0. The tuples are of the form:
-        (frozenset, float).
-    defaultdict(float)
-        The edge lengths, keyed by frozenset of the clade, and valued by the
-        weighted average length of the clade by the trees the clade was
-        observed in.
+        The clades and support values sorted by clade size such that the
+        largest clade is index 0. The tuples are of the form: (int, float).
+    dict
+        The edge lengths, keyed by the clade, and valued by the weighted
+        average length of the clade by the trees the clade was observed in.
+    list
+        The tip names, in the order of their bits in the clades.
+    float
+        The total weight of the trees.
+
+    Raises
+    ------
+    ValueError
+        If the number of weights and trees differ.
 
     """
-    clade_counts = defaultdict(float)
-    edge_lengths = defaultdict(float)
-    total = weights.sum()
-
-    # get clade counts
-    def tipnames_f(n):
-        return [n.name] if n.is_tip() else []
-
-    for tree, weight in zip(trees, weights):
-        tree.cache_attr(tipnames_f, 'tip_names', frozenset)
+    clade_counts = {}
+    length_sums = {}
+    tip_indices = {}
+
+    total = None
+    if weights is not None:
+        total = weights.sum()
+    elif hasattr(trees, '__len__'):
+        total = float(len(trees))
+    # the remaining weight only bounds the support of a clade if no weight
+    # is negative
+    prune = (cutoff is not None and total is not None and
+             (weights is None or not (weights < 0).any()))
+    if prune:
+        threshold = cutoff * total
+        # allow for rounding when comparing sums of weights
+        margin = 1e-9 * abs(total)
+        next_purge = 1024
+
+    observed = 0.0
+    num_trees = 0
+    for tree in trees:
+        if weights is None:
+            weight = 1.0
+        elif num_trees < len(weights):
+            weight = weights[num_trees]
+        else:
+            raise ValueError("Number of weights and trees differ.")
+        num_trees += 1
+
+        # clades which are first observed when the weight of the remaining
+        # trees does not exceed the threshold cannot be supported
+        add_clades = not prune or total - observed + margin > threshold
+        observed += weight
+
+        for clade, length in _tree_clades(tree, tip_indices):
+            count = clade_counts.get(clade)
+            if count is None:
+                if not add_clades:
+                    continue
+                count = 0.0
+                length_sums[clade] = 0.0
+            clade_counts[clade] = count + weight
+
+            if length is None or length_sums[clade] is None:
+                length_sums[clade] = None
+            else:
+                length_sums[clade] += length * weight
 
-        for node in tree.postorder():
-            tip_names = node.tip_names
+        if prune and len(clade_counts) >= next_purge:
+            remaining = total - observed
+            for clade in [clade for clade, count in clade_counts.items()
+                          if count + remaining + margin <= threshold]:
+                del clade_counts[clade]
+                del length_sums[clade]
+            next_purge = max(1024, 2 * len(clade_counts))
 
-            # if node.length is not None, fetch it and weight it
-            length = node.length * weight if node.length is not None else None
+    if weights is not None and num_trees != len(weights):
+        raise ValueError("Number of weights and trees differ.")
+    if total is None:
+        total = observed
 
-            clade_counts[tip_names] += weight
+    edge_lengths = {clade: None if length is None else length / total
+                    for clade, length in length_sums.items()}
 
-            if length is None:
-                edge_lengths[tip_names] = None
-            else:
-                edge_lengths[tip_names] += length / total
+    # sort clades by size
+    clade_counts = sorted(clade_counts.items(),
+                          key=lambda x: bin(x[0]).count('1'), reverse=True)
 
-    # sort clades by number times observed
-    clade_counts = sorted(clade_counts.items(), key=lambda x: len(x[0]),
-                          reverse=True)
+    tip_names = [None] * len(tip_indices)
+    for name, index in tip_indices.items():
+        tip_names[index] = name
 
-    return clade_counts, edge_lengths
+    return clade_counts, edge_lengths, tip_names, total
 
 
-def _filter_clades(clade_counts, cutoff_threshold):
+def _filter_clades(clade_counts, cutoff_threshold, check_conflicts=True):
     """Filter clades that not well supported or are contradicted
 
     Parameters
     ----------
     clade_counts : list of tuple
-        Where the first element in each tuple is the frozenset of the clade,
+        Where the first element in each tuple is the bitset of the clade,
         and the second element is the support value. It is expected that this
         list is sorted by descending order by support.
     cutoff_threshold : float
         The minimum weighted observation count that a clade must have to be
         considered supported.
+    check_conflicts : bool, optional
+        Whether to check the clades for conflicts. If ``False``, the clades
+        are assumed to be compatible, which is the case if the threshold is at
+        least half of the total weight of the trees.
 
     Returns
     -------
     dict
-        A dict of the accepted clades, keyed by the frozenset of the clade and
+        A dict of the accepted clades, keyed by the bitset of the clade and
         valued by the support value.
     """
     accepted_clades = {}
@@ -94,18 +210,19 @@ def _filter_clades(clade_counts, cutoff_threshold):
         if count <= cutoff_threshold:
             continue
 
-        if len(clade) > 1:
+        if check_conflicts:
             # check the current clade against all the accepted clades to see if
             # it conflicts. A conflict is defined as:
             # 1. the clades are not disjoint
             # 2. neither clade is a subset of the other
             for accepted_clade in accepted_clades:
-                intersect = clade.intersection(accepted_clade)
-                subset = clade.issubset(accepted_clade)
-                superset = clade.issuperset(accepted_clade)
+                intersect = clade & accepted_clade
+                subset = intersect == clade
+                superset = intersect == accepted_clade
 
                 if intersect and not (subset or superset):
                     conflict = True
+                    break
 
         if conflict is False:
             accepted_clades[clade] = count
@@ -113,15 +230,27 @@ def _filter_clades(clade_counts, cutoff_threshold):
     return accepted_clades
 
 
-def _build_trees(clade_counts, edge_lengths, support_attr, tree_node_class):
+def _clade_tips(clade, num_tips):
+    """Return the indices of the tips of a clade"""
+    num_bytes = (num_tips + 7) // 8
+    bits = np.unpackbits(np.frombuffer(clade.to_bytes(num_bytes, 'little'),
+                                       dtype=np.uint8))
+    # unpackbits starts from the most significant bit of each byte
+    return np.flatnonzero(bits.reshape(-1, 8)[:, ::-1].ravel())
+
+
+def _build_trees(clade_counts, edge_lengths, tip_names, support_attr,
+                 tree_node_class):
     """Construct the trees with support
 
     Parameters
     ----------
     clade_counts : dict
-        Keyed by the frozenset of the clade and valued by the support
+        Keyed by the bitset of the clade and valued by the support
     edge_lengths : dict
-        Keyed by the frozenset of the clade and valued by the weighted length
+        Keyed by the bitset of the clade and valued by the weighted length
+    tip_names : list
+        The tip names, in the order of their bits in the clades
     support_attr : str
         The name of the attribute to hold the support value
     tree_node_class : type
@@ -133,50 +262,48 @@ def _build_trees(clade_counts, edge_lengths, support_attr, tree_node_class):
     -------
     list of tree_node_class instances
         A list of the constructed trees
-    """
-    nodes = {}
-    queue = [(len(clade), clade) for clade in clade_counts]
-    while queue:
-        # The values within the queue are updated on each iteration, so it
-        # doesn't look like an insertion sort will make sense unfortunately
-        queue.sort()
-        (clade_size, clade) = queue.pop(0)
-        new_queue = []
-
-        # search for ancestors of clade
-        for (_, ancestor) in queue:
-            if clade.issubset(ancestor):
-                # update ancestor such that, in the following example:
-                # ancestor == {1, 2, 3, 4}
-                # clade == {2, 3}
-                # new_ancestor == {1, {2, 3}, 4}
-                new_ancestor = (ancestor - clade) | frozenset([clade])
-
-                # update references for counts and lengths
-                clade_counts[new_ancestor] = clade_counts.pop(ancestor)
-                edge_lengths[new_ancestor] = edge_lengths.pop(ancestor)
-
-                ancestor = new_ancestor
-
-            new_queue.append((len(ancestor), ancestor))
 
-        # if the clade is a tip, then we have a name
-        if clade_size == 1:
-            name = list(clade)[0]
-        else:
-            name = None
-
-        # the clade will not be in nodes if it is a tip
-        children = [nodes.pop(c) for c in clade if c in nodes]
-        length = edge_lengths[clade]
+    Notes
+    -----
+    The clades must be compatible, i.e. any two clades are either disjoint or
+    one contains the other. The parent of a clade is then the smallest larger
+    clade containing any of its tips, which is found by visiting clades from
+    the largest and keeping the last visited clade containing each tip.
 
-        node = tree_node_class(children=children, length=length, name=name)
+    """
+    clades = sorted(clade_counts, key=lambda x: bin(x).count('1'),
+                    reverse=True)
+    smallest_clade = np.full(len(tip_names), -1, dtype=np.intp)
+    parents = []
+    first_tips = []
+    names = []
+    for i, clade in enumerate(clades):
+        tips = _clade_tips(clade, len(tip_names))
+        parents.append(smallest_clade[tips[0]])
+        smallest_clade[tips] = i
+        first_tips.append(tips[0])
+        # if the clade is a tip, then we have a name
+        names.append(tip_names[tips[0]] if len(tips) == 1 else None)
+
+    # create the nodes from the smallest clades, so that the children of each
+    # node exist when it is created. children are ordered by their first tip
+    # in the order in which tips were observed.
+    children = [[] for _ in clades]
+    roots = []
+    for i in range(len(clades) - 1, -1, -1):
+        clade = clades[i]
+        node = tree_node_class(
+            children=[child for _, child in sorted(children[i],
+                                                   key=lambda x: x[0])],
+            length=edge_lengths[clade], name=names[i])
         setattr(node, support_attr, clade_counts[clade])
-        nodes[clade] = node
-
-        queue = new_queue
+        if parents[i] >= 0:
+            children[parents[i]].append((first_tips[i], node))
+        else:
+            roots.append((first_tips[i], node))
+        children[i] = None
 
-    return list(nodes.values())
+    return [root for _, root in sorted(roots, key=lambda x: x[0])]
 
 
 @experimental(as_of="0.4.0")
@@ -186,8 +313,9 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support',
 
     Parameters
     ----------
-    trees : list of TreeNode
-        The trees to operate on
+    trees : iterable of TreeNode or CompactTree
+        The trees to operate on. They are consumed one at a time, so trees
+        can be streamed from a file (see Examples).
     weights : list or np.array of {int, float}, optional
         If provided, the list must be in index order with `trees`. Each tree
         will receive the corresponding weight. If omitted, all trees will be
@@ -223,6 +351,13 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support',
     clade was observed in. For instance, if {A, B, C} was observed in 5 trees
     all with a weight of 1, its support would then be 5.
 
+    Each clade is encoded as a bitset of the indices of its tips, so that the
+    memory used by the counts is proportional to the number of distinct
+    clades times the number of tips divided by 8 bytes. If `weights` is
+    provided or `trees` has a length, the total weight is known in advance,
+    and clades which can no longer exceed the cutoff are dropped while the
+    trees are read.
+
     References
     ----------
     .. [1] Margush T, McMorris FR. (1981) "Consensus n-trees." Bulletin for
@@ -273,19 +408,41 @@ def majority_rule(trees, weights=None, cutoff=0.5, support_attr='support',
     >>> len(consensus_trees)
     4
 
+    Trees can also be read one at a time from a newick file with one tree
+    per line, e.g. from a bootstrap analysis. Reading them as ``CompactTree``
+    objects avoids creating a ``TreeNode`` for each of their nodes.
+
+    >>> from skbio import read
+    >>> from skbio.tree import CompactTree
+    >>> fh = StringIO("((a,b),(c,d));\n((a,b),(c,e));\n((a,c),(b,d));\n")
+    >>> trees = read(fh, format='newick', constructor=CompactTree)
+    >>> consensus = majority_rule(trees, weights=[1, 1, 1])[0]
+    >>> print(consensus.ascii_art())
+                        /-a
+              /--------|
+             |          \-b
+    ---------|
+             |--c
+             |
+              \-d
+
     """
-    if weights is None:
-        weights = np.ones(len(trees), dtype=float)
-    else:
+    if weights is not None:
         weights = np.asarray(weights)
-        if len(weights) != len(trees):
+        if hasattr(trees, '__len__') and len(weights) != len(trees):
             raise ValueError("Number of weights and trees differ.")
 
-    cutoff_threshold = cutoff * weights.sum()
-
-    clade_counts, edge_lengths = _walk_clades(trees, weights)
-    clade_counts = _filter_clades(clade_counts, cutoff_threshold)
-    trees = _build_trees(clade_counts, edge_lengths, support_attr,
+    clade_counts, edge_lengths, tip_names, total = _walk_clades(
+        trees, weights, cutoff)
+    cutoff_threshold = cutoff * total
+
+    # clades supported by more than half of the weight of the trees are
+    # observed together in at least one tree, so they cannot conflict
+    check_conflicts = cutoff < 0.5 or (weights is not None and
+                                       (weights < 0).any())
+    clade_counts = _filter_clades(clade_counts, cutoff_threshold,
+                                  check_conflicts)
+    trees = _build_trees(clade_counts, edge_lengths, tip_names, support_attr,
                          tree_node_class)
 
     return trees
@@ -12,11 +12,13 @@ import numpy as np
 
 from skbio.stats.distance import DistanceMatrix
 from skbio.tree import TreeNode
+from skbio.tree._cutils import _nj_joins
 from skbio.util._decorator import experimental
 
 
 @experimental(as_of="0.4.0")
-def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
+def nj(dm, disallow_negative_branch_length=True, result_constructor=None,
+       rapid=False):
     """ Apply neighbor joining for phylogenetic reconstruction.
 
     Parameters
@@ -33,6 +35,14 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
         newick-formatted string as input. The result of applying this function
         to a newick-formatted string will be returned from this function. This
         defaults to ``lambda x: TreeNode.read(StringIO(x), format='newick')``.
+    rapid : bool, optional
+        If `True`, skip pairs of nodes which cannot be the next to be joined
+        as in RapidNJ [4]_. If `False` (the default), search all pairs of
+        nodes at each step. Both searches join the same pairs, so this only
+        affects speed and memory use. The rapid search allocates an ``n`` x
+        ``n`` array of 64-bit distances and one of 32-bit node indices in
+        addition to the copy of the distance matrix, so that it uses 2.5
+        times the memory of the copy.
 
     Returns
     -------
@@ -51,6 +61,22 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
     joining [2]_. The Phylip manual also describes the method [3]_ and Phylip
     itself provides an implementation which is useful for comparison.
 
+    The distance matrix is copied once and updated in place as nodes are
+    joined: the new node takes the row and column of one of the nodes it
+    joins, and the row sums used to compute Q are updated from the changed
+    distances instead of being recomputed. Ties between pairs of nodes with
+    the same Q are broken as in a distance matrix in which each new node is
+    inserted first, as they were when the matrix was rebuilt at each join.
+    However, as the row sums are updated rather than recomputed, Q values
+    which are only equal in exact arithmetic may be ordered differently by
+    rounding than in scikit-bio 0.5.0 and earlier. In particular, each pair
+    of the last four nodes has the same Q as the two other nodes, so the last
+    join, and so the node at which the tree is rooted and the order of its
+    children, may differ. The unrooted tree is the same, although its branch
+    lengths may differ if negative lengths are set to zero. With
+    ``rapid=True``, the distances of each node are additionally sorted, which
+    allows most pairs to be skipped.
+
     Neighbor joining, by definition, creates unrooted trees. One strategy for
     rooting the resulting trees is midpoint rooting, which is accessible as
     ``TreeNode.root_at_midpoint``.
@@ -62,6 +88,8 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
        Evolution. PMID: 3447015.
     .. [2] http://en.wikipedia.org/wiki/Neighbour_joining
     .. [3] http://evolution.genetics.washington.edu/phylip/doc/neighbor.html
+    .. [4] Simonsen M, Mailund T, Pedersen CNS. (2008) "Rapid neighbour-
+       joining." Algorithms in Bioinformatics, 113-122.
 
     Examples
     --------
@@ -113,36 +141,21 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
         def result_constructor(x):
             return TreeNode.read(io.StringIO(x), format='newick')
 
-    # initialize variables
-    node_definition = None
-
-    # while there are still more than three distances in the distance matrix,
-    # join neighboring nodes.
-    while(dm.shape[0] > 3):
-        # compute the Q matrix
-        q = _compute_q(dm)
-
-        # identify the pair of nodes that have the lowest Q value. if multiple
-        # pairs have equally low Q values, the first pair identified (closest
-        # to the top-left of the matrix) will be chosen. these will be joined
-        # in the current node.
-        idx1, idx2 = _lowest_index(q)
-        pair_member_1 = dm.ids[idx1]
-        pair_member_2 = dm.ids[idx2]
-        # determine the distance of each node to the new node connecting them.
-        pair_member_1_len, pair_member_2_len = _pair_members_to_new_node(
-            dm, idx1, idx2, disallow_negative_branch_length)
-        # define the new node in newick style
-        node_definition = "(%s:%f, %s:%f)" % (pair_member_1,
-                                              pair_member_1_len,
-                                              pair_member_2,
-                                              pair_member_2_len)
-        # compute the new distance matrix, which will contain distances of all
-        # other nodes to this new node
-        dm = _compute_collapsed_dm(
-            dm, pair_member_1, pair_member_2,
-            disallow_negative_branch_length=disallow_negative_branch_length,
-            new_node_id=node_definition)
+    # join neighboring nodes until three are left, updating a copy of the
+    # distance matrix in place. the definitions of the nodes are built in
+    # newick style as they are joined.
+    joins, lengths, last, last_distances = _nj_joins(
+        np.array(dm.data, dtype=np.float64, order='C'),
+        disallow_negative_branch_length, rapid)
+    node_definitions = list(dm.ids)
+    for (node_1, node_2), (length_1, length_2) in zip(joins, lengths):
+        node_definitions.append("(%s:%f, %s:%f)" % (node_definitions[node_1],
+                                                    length_1,
+                                                    node_definitions[node_2],
+                                                    length_2))
+    node_definition = node_definitions[-1] if len(joins) else None
+    dm = DistanceMatrix(last_distances,
+                        [node_definitions[node] for node in last])
 
     # When there are three distances left in the distance matrix, we have a
     # fully defined tree. The last node is internal, and its distances are
@@ -172,76 +185,6 @@ def nj(dm, disallow_negative_branch_length=True, result_constructor=None):
     return result_constructor(newick)
 
 
-def _compute_q(dm):
-    """Compute Q matrix, used to identify the next pair of nodes to join.
-
-    """
-    q = np.zeros(dm.shape)
-    n = dm.shape[0]
-    big_sum = np.array([dm.data.sum(1)] * dm.shape[0])
-    big_sum_diffs = big_sum + big_sum.T
-    q = (n - 2) * dm.data - big_sum_diffs
-    np.fill_diagonal(q, 0)
-    return DistanceMatrix(q, dm.ids)
-
-
-def _compute_collapsed_dm(dm, i, j, disallow_negative_branch_length,
-                          new_node_id):
-    """Return the distance matrix resulting from joining ids i and j in a node.
-
-    If the input distance matrix has shape ``(n, n)``, the result will have
-    shape ``(n-1, n-1)`` as the ids `i` and `j` are collapsed to a single new
-    ids.
-
-    """
-    in_n = dm.shape[0]
-    out_n = in_n - 1
-    out_ids = [new_node_id]
-    out_ids.extend([e for e in dm.ids if e not in (i, j)])
-    result = np.zeros((out_n, out_n))
-    # pre-populate the result array with known distances
-    ij_indexes = [dm.index(i), dm.index(j)]
-    result[1:, 1:] = np.delete(np.delete(dm.data, ij_indexes, axis=0),
-                               ij_indexes, axis=1)
-    # calculate the new distances from the current DistanceMatrix
-    k_to_u = 0.5 * (dm[i] + dm[j] - dm[i, j])
-    # set negative branches to 0 if specified
-    if disallow_negative_branch_length:
-        k_to_u[k_to_u < 0] = 0
-    # drop nodes being joined
-    k_to_u = np.delete(k_to_u, ij_indexes)
-    # assign the distances to the result array
-    result[0] = result[:, 0] = np.concatenate([[0], k_to_u])
-    return DistanceMatrix(result, out_ids)
-
-
-def _lowest_index(dm):
-    """Return the index of the lowest value in the input distance matrix.
-
-    If there are ties for the lowest value, the index of top-left most
-    occurrence of that value will be returned.
-
-    This should be ultimately be replaced with a new DistanceMatrix object
-    method (#228).
-
-    """
-    # get the positions of the lowest value
-    results = np.vstack(np.where(dm.data == np.amin(dm.condensed_form()))).T
-    # select results in the bottom-left of the array
-    results = results[results[:, 0] > results[:, 1]]
-    # calculate the distances of the results to [0, 0]
-    res_distances = np.sqrt(results[:, 0]**2 + results[:, 1]**2)
-    # detect distance ties & return the point which would have
-    # been produced by the original function
-    if np.count_nonzero(res_distances == np.amin(res_distances)) > 1:
-        eqdistres = results[res_distances == np.amin(res_distances)]
-        res_coords = eqdistres[np.argmin([r[0] for r in eqdistres])]
-    else:
-        res_coords = results[np.argmin(res_distances)]
-
-    return tuple([res_coords[0], res_coords[1]])
-
-
 def _pair_members_to_new_node(dm, i, j, disallow_negative_branch_length):
     """Return the distance between a new node and decendants of that new node.
 
@@ -7,9 +7,8 @@
 # ----------------------------------------------------------------------------
 
 import warnings
-from operator import or_, itemgetter
+from operator import or_
 from copy import deepcopy
-from itertools import combinations
 from functools import reduce
 from collections import defaultdict
 
@@ -22,6 +21,8 @@ from ._exception import (NoLengthError, DuplicateNodeError, NoParentError,
                          MissingNodeError, TreeError)
 from skbio.util import RepresentationWarning
 from skbio.util._decorator import experimental, classonlymethod
+from ._lca import LCAIndex
+from ._cutils import _max_distance
 
 
 def distance_from_r(m1, m2):
@@ -43,6 +44,158 @@ def distance_from_r(m1, m2):
     return (1-pearsonr(m1.data.flat, m2.data.flat)[0])/2
 
 
+# Types whose values are immutable, and so are shared by copies of a tree
+# rather than deep copied.
+_immutable_types = frozenset([str, int, float, bool, complex, bytes,
+                              type(None)])
+
+
+def _copy_value(value):
+    """Deep copy the value of an attribute of a node
+
+    Immutable values, and containers of them (such as the set of registered
+    caches of a node), are copied without ``deepcopy``, which is comparatively
+    slow.
+
+    """
+    value_type = type(value)
+    if value_type in _immutable_types:
+        return value
+    if value_type in (list, set, tuple, frozenset) and all(
+            type(item) in _immutable_types for item in value):
+        if value_type in (tuple, frozenset):
+            return value
+        return value_type(value)
+    return deepcopy(value)
+
+
+def _unpickle_tree(node_classes, parents, columns, position):
+    """Rebuild a tree pickled by ``TreeNode.__reduce__``
+
+    Parameters
+    ----------
+    node_classes : type or list of type
+        The class of every node, or of each node in preorder.
+    parents : np.ndarray of int
+        The index of the parent of each node in preorder, -1 for the root.
+    columns : dict
+        For each attribute, the indices of the nodes which have it (``None``
+        if all nodes do), its values, and the type to convert them to (or
+        ``None``).
+    position : int
+        The index of the node to return.
+
+    Returns
+    -------
+    TreeNode
+        The node at ``position`` in the rebuilt tree.
+
+    """
+    n = len(parents)
+    if isinstance(node_classes, type):
+        nodes = [node_classes() for _ in range(n)]
+    else:
+        nodes = [node_class() for node_class in node_classes]
+
+    for key, (indices, values, value_type) in columns.items():
+        if value_type is not None:
+            values = map(value_type, values)
+        if indices is None:
+            for node, value in zip(nodes, values):
+                node.__dict__[key] = value
+        else:
+            for i, value in zip(indices, values):
+                nodes[i].__dict__[key] = value
+
+    # children follow their parent in preorder, and siblings are in order
+    for node, parent_idx in zip(nodes[1:], parents[1:].tolist()):
+        parent = nodes[parent_idx]
+        node.parent = parent
+        parent.children.append(node)
+    return nodes[position]
+
+
+# Number of distances computed at once by _tip_tip_distances
+_TIP_DISTANCE_BLOCK_SIZE = 2 ** 20
+
+
+def _tip_tip_distances(parents, depths, root_distances, tips, out=None):
+    """Compute the condensed form of the distances between tips.
+
+    Parameters
+    ----------
+    parents : np.ndarray of int
+        Index of the parent of each node, in preorder, and -1 for the root.
+    depths : np.ndarray of int
+        Number of ancestors of each node.
+    root_distances : np.ndarray of float
+        Distance from each node to the root.
+    tips : np.ndarray of int
+        Indices of the tips, in the order of the result.
+    out : np.ndarray of float, optional
+        Array to write the condensed distances into.
+
+    Returns
+    -------
+    np.ndarray of float
+        The condensed distances, which is `out` if it was provided.
+
+    """
+    n = len(parents)
+    m = len(tips)
+    size = m * (m - 1) // 2
+    if out is None:
+        out = np.empty(size)
+    elif out.shape != (size,) or out.dtype != np.double:
+        raise ValueError("out must be a one-dimensional float64 array of "
+                         "length %d." % size)
+    if m < 2:
+        return out
+
+    # Going through the tips in preorder, the lowest common ancestor of two
+    # tips is the parent of the shallowest node after the first tip, up to
+    # the second tip. Nodes are compared by depth and then by index, so that
+    # the node can be recovered from the minimum of their keys.
+    order = np.argsort(tips, kind='mergesort')
+    sorted_tips = tips[order]
+    keys = depths[:sorted_tips[-1] + 1].astype(np.int64) * n
+    keys += np.arange(sorted_tips[-1] + 1)
+    keys = np.minimum.reduceat(keys, sorted_tips[:-1] + 1)
+    keys = np.append(keys, np.iinfo(np.int64).max)
+
+    tip_distances = root_distances[sorted_tips]
+    cols = np.arange(m)
+    in_order = (order == cols).all()
+    block_size = max(1, _TIP_DISTANCE_BLOCK_SIZE // m)
+    for start in range(0, m - 1, block_size):
+        rows = np.arange(start, min(start + block_size, m - 1))
+        block_cols = cols[start + 1:]
+        upper = block_cols > rows[:, None]
+        # keys[j - 1] is the key of the shallowest node between tips j - 1
+        # and j, so the cumulative minimum from row i is over tips i to j.
+        block = np.where(upper, keys[block_cols - 1], keys[-1])
+        np.minimum.accumulate(block, axis=1, out=block)
+        ancestor_distances = root_distances[parents[block[upper] % n]]
+        first, second = np.nonzero(upper)
+        first += start
+        second += start + 1
+        distances = ((tip_distances[first] - ancestor_distances) +
+                     (tip_distances[second] - ancestor_distances))
+
+        # Pairs are stored in condensed form by their order in the result,
+        # which, if the tips are in preorder, is the order of the block.
+        if in_order:
+            offset = m * start - start * (start + 1) // 2
+            out[offset:offset + len(distances)] = distances
+            continue
+        first = order[first]
+        second = order[second]
+        lo = np.minimum(first, second)
+        hi = np.maximum(first, second)
+        out[m * lo - lo * (lo + 1) // 2 + hi - lo - 1] = distances
+    return out
+
+
 class TreeNode(SkbioObject):
     r"""Representation of a node within a tree
 
@@ -78,7 +231,7 @@ class TreeNode(SkbioObject):
     """
     default_write_format = 'newick'
     _exclude_from_copy = set(['parent', 'children', '_tip_cache',
-                              '_non_tip_cache'])
+                              '_non_tip_cache', '_lca_index'])
 
     @experimental(as_of="0.4.0")
     def __init__(self, name=None, length=None, parent=None, children=None):
@@ -87,6 +240,7 @@ class TreeNode(SkbioObject):
         self.parent = parent
         self._tip_cache = {}
         self._non_tip_cache = {}
+        self._lca_index = None
         self._registered_caches = set()
 
         self.children = []
@@ -170,6 +324,9 @@ class TreeNode(SkbioObject):
         self.invalidate_caches()
         if node.parent is not None:
             node.parent.remove(node)
+        elif node._lca_index is not None:
+            # the nodes of an adopted tree are no longer in its index
+            node.invalidate_caches(attr=False)
         node.parent = self
         return node
 
@@ -500,40 +657,110 @@ class TreeNode(SkbioObject):
         0
 
         """
+        cls = self.__class__
+        efc = self._exclude_from_copy
+
         def __copy_node(node_to_copy):
             r"""Helper method to copy a node"""
             # this is _possibly_ dangerous, we're assuming the node to copy is
             # of the same class as self, and has the same exclusion criteria.
             # however, it is potentially dangerous to mix TreeNode subclasses
             # within a tree, so...
-            result = self.__class__()
-            efc = self._exclude_from_copy
-            for key in node_to_copy.__dict__:
+            result = cls()
+            attrs = result.__dict__
+            for key, value in node_to_copy.__dict__.items():
                 if key not in efc:
-                    result.__dict__[key] = deepcopy(node_to_copy.__dict__[key])
+                    if type(value) in _immutable_types:
+                        attrs[key] = value
+                    else:
+                        attrs[key] = _copy_value(value)
             return result
 
+        # the copies are new nodes, so that they are linked directly rather
+        # than with append, which checks for and invalidates existing parents
         root = __copy_node(self)
-        nodes_stack = [[root, self, len(self.children)]]
-
+        nodes_stack = [(self, root)]
         while nodes_stack:
-            # check the top node, any children left unvisited?
-            top = nodes_stack[-1]
-            new_top_node, old_top_node, unvisited_children = top
-
-            if unvisited_children:
-                top[2] -= 1
-                old_child = old_top_node.children[-unvisited_children]
+            old_node, new_node = nodes_stack.pop()
+            new_children = new_node.children
+            for old_child in old_node.children:
                 new_child = __copy_node(old_child)
-                new_top_node.append(new_child)
-                nodes_stack.append([new_child, old_child,
-                                    len(old_child.children)])
-            else:  # no unvisited children
-                nodes_stack.pop()
+                new_child.parent = new_node
+                new_children.append(new_child)
+                if old_child.children:
+                    nodes_stack.append((old_child, new_child))
         return root
 
     __copy__ = copy
-    __deepcopy__ = deepcopy = copy
+    deepcopy = copy
+
+    @experimental(as_of="0.5.1")
+    def __deepcopy__(self, memo):
+        r"""Returns a copy of self for ``copy.deepcopy``
+
+        Parameters
+        ----------
+        memo : dict
+            The objects already copied, keyed by their id.
+
+        Returns
+        -------
+        TreeNode
+            A new copy of self, as returned by ``copy``
+
+        """
+        result = self.copy()
+        memo[id(self)] = result
+        return result
+
+    @experimental(as_of="0.5.1")
+    def __reduce__(self):
+        r"""Returns the state of the whole tree as flat lists for pickling
+
+        The tree containing self is pickled as the index of the parent of
+        each node in preorder, and the values of the attributes of the nodes
+        as lists, so that pickling does not recurse into the tree and is not
+        limited by its depth. Attributes excluded from ``copy`` are not
+        pickled, except for the structure of the tree.
+
+        Returns
+        -------
+        tuple
+            ``_unpickle_tree`` and its arguments, which rebuild the tree and
+            return the node corresponding to self.
+
+        """
+        root = self.root()
+        efc = self._exclude_from_copy
+        nodes = list(root.preorder())
+        node_classes = [type(node) for node in nodes]
+        if all(node_class is node_classes[0] for node_class in node_classes):
+            node_classes = node_classes[0]
+
+        # the parent of the root is not in the tree
+        index = {id(node): i for i, node in enumerate(nodes)}
+        parents = np.array([index.get(id(node.parent), -1) for node in nodes],
+                           dtype=np.intp)
+
+        attrs = [node.__dict__ for node in nodes]
+        columns = {}
+        for key in set().union(*attrs) - efc:
+            try:
+                indices = None
+                values = [node_attrs[key] for node_attrs in attrs]
+            except KeyError:
+                indices = [i for i, node_attrs in enumerate(attrs)
+                           if key in node_attrs]
+                values = [attrs[i][key] for i in indices]
+            # sets, such as the registered caches of every node, are much
+            # faster to pickle as tuples
+            if all(type(value) is set for value in values):
+                columns[key] = (indices, [tuple(v) for v in values], set)
+            else:
+                columns[key] = (indices, values, None)
+
+        return (_unpickle_tree,
+                (node_classes, parents, columns, index[id(self)]))
 
     @experimental(as_of="0.4.0")
     def unrooted_deepcopy(self, parent=None):
@@ -543,7 +770,7 @@ class TreeNode(SkbioObject):
         unrooted copy. This is useful for defining new roots of the tree as
         the `TreeNode`.
 
-        This method calls `TreeNode.unrooted_copy` which is recursive.
+        This method calls `TreeNode.unrooted_copy`.
 
         Parameters
         ----------
@@ -588,7 +815,8 @@ class TreeNode(SkbioObject):
         unrooted copy. This is useful for defining new roots of the tree as
         the `TreeNode`.
 
-        This method is recursive.
+        The tree is walked iteratively, so that its depth is not limited by
+        the recursion limit.
 
         Warning, this is _NOT_ a deepcopy
 
@@ -618,9 +846,16 @@ class TreeNode(SkbioObject):
         <BLANKLINE>
 
         """
-        neighbors = self.neighbors(ignore=parent)
-        children = [c.unrooted_copy(parent=self) for c in neighbors]
+        result = self._unrooted_copy_edge(parent)
+        self._unrooted_copy_neighbors(result, parent)
+
+        if parent is None:
+            result.name = "root"
 
+        return result
+
+    def _unrooted_copy_edge(self, parent):
+        r"""Copy self reached from parent, with the edge to parent"""
         # we might be walking UP the tree, so:
         if parent is None:
             # base edge
@@ -634,14 +869,23 @@ class TreeNode(SkbioObject):
             assert parent is self.parent
             edgename = self.name
             length = self.length
+        return self.__class__(name=edgename, length=length)
 
-        result = self.__class__(name=edgename, children=children,
-                                length=length)
+    def _unrooted_copy_neighbors(self, result, parent):
+        r"""Add the unrooted copies of the neighbors of self to result
 
-        if parent is None:
-            result.name = "root"
+        The neighbors of self other than parent become the children of result,
+        the copy of self, and so on iteratively.
 
-        return result
+        """
+        nodes_stack = [(self, parent, result)]
+        while nodes_stack:
+            node, node_parent, new_node = nodes_stack.pop()
+            for neighbor in node.neighbors(ignore=node_parent):
+                new_child = neighbor._unrooted_copy_edge(node)
+                new_child.parent = new_node
+                new_node.children.append(new_child)
+                nodes_stack.append((neighbor, node, new_child))
 
     @experimental(as_of="0.4.0")
     def count(self, tips=False):
@@ -828,8 +1072,9 @@ class TreeNode(SkbioObject):
         r"""Return a new tree rooted at midpoint of the two tips farthest apart
 
         This method doesn't preserve the internal node naming or structure,
-        but does keep tip to tip distances correct. Uses `unrooted_copy` but
-        operates on a full copy of the tree.
+        but does keep tip to tip distances correct. Uses `unrooted_copy`, and
+        the branch on which the midpoint lies is split in the new tree rather
+        than in a copy of the tree.
 
         Raises
         ------
@@ -858,16 +1103,14 @@ class TreeNode(SkbioObject):
         <BLANKLINE>
 
         """
-        tree = self.copy()
-        max_dist, tips = tree.get_max_distance()
+        max_dist, tips = self.get_max_distance()
         half_max_dist = max_dist / 2.0
 
         if max_dist == 0.0:  # only pathological cases with no lengths
-            return tree
+            return self.copy()
 
-        tip1 = tree.find(tips[0])
-        tip2 = tree.find(tips[1])
-        lca = tree.lowest_common_ancestor([tip1, tip2])
+        tip1, tip2 = tips
+        lca = self.lowest_common_ancestor([tip1, tip2])
 
         if tip1.accumulate_to_ancestor(lca) > half_max_dist:
             climb_node = tip1
@@ -890,17 +1133,22 @@ class TreeNode(SkbioObject):
                 return climb_node.unrooted_copy()
 
         else:
-            # make a new node on climb_node's branch to its parent
-            old_br_len = climb_node.length
-
-            new_root = tree.__class__()
-            climb_node.parent.append(new_root)
-            new_root.append(climb_node)
-
-            climb_node.length = half_max_dist - dist_climbed
-            new_root.length = old_br_len - climb_node.length
-
-            return new_root.unrooted_copy()
+            # the new root splits climb_node's branch to its parent: its
+            # children are the copies of climb_node and of the parent, as if
+            # the root was reached from either of them
+            parent = climb_node.parent
+            new_root = self.__class__(name="root")
+
+            below = climb_node.__class__(name=climb_node.name,
+                                         length=half_max_dist - dist_climbed)
+            climb_node._unrooted_copy_neighbors(below, parent)
+            above = parent.__class__(length=climb_node.length - below.length)
+            parent._unrooted_copy_neighbors(above, climb_node)
+
+            for child in below, above:
+                child.parent = new_root
+                new_root.children.append(child)
+            return new_root
 
     @experimental(as_of="0.4.0")
     def is_tip(self):
@@ -1373,6 +1621,7 @@ class TreeNode(SkbioObject):
         See Also
         --------
         create_caches
+        create_lca_index
         cache_attr
         find
 
@@ -1382,6 +1631,9 @@ class TreeNode(SkbioObject):
         else:
             self._tip_cache = {}
             self._non_tip_cache = {}
+            if self._lca_index is not None:
+                self._lca_index.release()
+                self._lca_index = None
 
             if self._registered_caches and attr:
                 for n in self.traverse():
@@ -1418,7 +1670,8 @@ class TreeNode(SkbioObject):
             if self._tip_cache and self._non_tip_cache:
                 return
 
-            self.invalidate_caches(attr=False)
+            self._tip_cache = {}
+            self._non_tip_cache = {}
 
             tip_cache = {}
             non_tip_cache = defaultdict(list)
@@ -1441,6 +1694,73 @@ class TreeNode(SkbioObject):
             self._tip_cache = tip_cache
             self._non_tip_cache = non_tip_cache
 
+    @experimental(as_of="0.5.1")
+    def create_lca_index(self):
+        r"""Index the tree for constant-time lowest common ancestor queries
+
+        Once the tree is indexed, `lowest_common_ancestor` of ``k`` nodes
+        takes ``O(k)`` time, and `distance` and `accumulate_to_ancestor` take
+        constant time, instead of walking the ancestors of the nodes. The
+        index takes ``O(n log n)`` memory for a tree of ``n`` nodes.
+
+        The index is deleted by `invalidate_caches`, which is called whenever
+        nodes are added to or removed from the tree. Branch lengths are read
+        when the index is created, so `invalidate_caches` must be called if
+        they are changed afterwards.
+
+        See Also
+        --------
+        invalidate_caches
+        lowest_common_ancestor
+        distance
+
+        Notes
+        -----
+        Numbering the nodes in preorder, the lowest common ancestor of two
+        nodes is the parent of the shallowest node after the first one, up
+        to the second one. The shallowest node of any range is found in
+        constant time with a sparse table of the shallowest node of each
+        range whose length is a power of two [1]_. This is the same
+        range-minimum query as on the Euler tour of the tree, over half as
+        many entries.
+
+        References
+        ----------
+        .. [1] Bender, M. A. & Farach-Colton, M. The LCA Problem Revisited.
+           LATIN 2000: Theoretical Informatics, 88-94 (2000).
+
+        Examples
+        --------
+        >>> from skbio import TreeNode
+        >>> tree = TreeNode.read(["((a:1,b:2)c:3,(d:4,e:5)f:6)root;"])
+        >>> tree.create_lca_index()
+        >>> print(tree.lca(['a', 'b']).name)
+        c
+        >>> tree.find('a').distance(tree.find('e'))
+        15.0
+
+        """
+        if not self.is_root():
+            self.root().create_lca_index()
+        elif self._lca_index is None:
+            index = LCAIndex(self)
+            for node in index.nodes:
+                node._lca_index = index
+            self._lca_index = index
+
+    def _lca_positions(self, *nodes):
+        """Return the LCA index of self and the positions of `nodes` in it
+
+        ``None`` is returned if the nodes are not all in a valid index.
+        """
+        index = self._lca_index
+        if index is None or not index.is_valid():
+            return None
+        positions = [index.positions.get(id(node)) for node in nodes]
+        if None in positions:
+            return None
+        return index, positions
+
     @experimental(as_of="0.4.0")
     def find_all(self, name):
         r"""Find all nodes that match `name`
@@ -1789,6 +2109,15 @@ class TreeNode(SkbioObject):
             If no tips could be found in the tree, or if not all tips were
             found.
 
+        See Also
+        --------
+        create_lca_index
+
+        Notes
+        -----
+        If the tree has been indexed with `create_lca_index`, the lowest
+        common ancestor is found without walking the ancestors of the nodes.
+
         Examples
         --------
         >>> from skbio import TreeNode
@@ -1811,6 +2140,11 @@ class TreeNode(SkbioObject):
         if len(tips) == 0:
             raise ValueError("No tips found.")
 
+        indexed = self._lca_positions(*tips)
+        if indexed is not None:
+            index, positions = indexed
+            return index.nodes[index.lca_of(positions)]
+
         nodes_to_scrub = []
 
         for t in tips:
@@ -2260,6 +2594,7 @@ class TreeNode(SkbioObject):
         See Also
         --------
         distance
+        create_lca_index
 
         Examples
         --------
@@ -2269,6 +2604,17 @@ class TreeNode(SkbioObject):
         >>> tree.find('a').accumulate_to_ancestor(root)
         4.0
         """
+        indexed = self._lca_positions(self, ancestor)
+        if indexed is not None:
+            index, (position, ancestor_position) = indexed
+            if index.lca(position, ancestor_position) == ancestor_position:
+                distance = index.distance(position, ancestor_position)
+                if distance is not None:
+                    return distance
+            elif index.distance(position, 0) is not None:
+                # nodes without a length are reported first, as below
+                raise NoParentError("Provided ancestor is not in the path")
+
         accum = 0.0
         curr = self
         while curr is not ancestor:
@@ -2313,6 +2659,13 @@ class TreeNode(SkbioObject):
         accumulate_to_ancestor
         compare_tip_distances
         get_max_distance
+        create_lca_index
+
+        Notes
+        -----
+        If the tree has been indexed with `create_lca_index`, the distance is
+        computed in constant time from the distances of the nodes and their
+        lowest common ancestor to the root.
 
         Examples
         --------
@@ -2326,6 +2679,13 @@ class TreeNode(SkbioObject):
         if self is other:
             return 0.0
 
+        indexed = self._lca_positions(self, other)
+        if indexed is not None:
+            index, (position, other_position) = indexed
+            distance = index.distance(position, other_position)
+            if distance is not None:
+                return distance
+
         self_ancestors = [self] + list(self.ancestors())
         other_ancestors = [other] + list(other.ancestors())
 
@@ -2341,43 +2701,6 @@ class TreeNode(SkbioObject):
 
             return accum
 
-    def _set_max_distance(self):
-        """Propagate tip distance information up the tree
-
-        This method was originally implemented by Julia Goodrich with the
-        intent of being able to determine max tip to tip distances between
-        nodes on large trees efficiently. The code has been modified to track
-        the specific tips the distance is between
-        """
-        maxkey = itemgetter(0)
-
-        for n in self.postorder():
-            if n.is_tip():
-                n.MaxDistTips = ((0.0, n), (0.0, n))
-            else:
-                if len(n.children) == 1:
-                    raise TreeError("No support for single descedent nodes")
-                else:
-                    tip_info = [(max(c.MaxDistTips, key=maxkey), c)
-                                for c in n.children]
-
-                    dists = [i[0][0] for i in tip_info]
-                    best_idx = np.argsort(dists)[-2:]
-                    (tip_a_d, tip_a), child_a = tip_info[best_idx[0]]
-                    (tip_b_d, tip_b), child_b = tip_info[best_idx[1]]
-                    tip_a_d += child_a.length or 0.0
-                    tip_b_d += child_b.length or 0.0
-                n.MaxDistTips = ((tip_a_d, tip_a), (tip_b_d, tip_b))
-
-    def _get_max_distance_singledesc(self):
-        """returns the max distance between any pair of tips
-
-        Also returns the tip names  that it is between as a tuple"""
-        distmtx = self.tip_tip_distances()
-        idx_max = divmod(distmtx.data.argmax(), distmtx.shape[1])
-        max_pair = (distmtx.ids[idx_max[0]], distmtx.ids[idx_max[1]])
-        return distmtx[idx_max], max_pair
-
     @experimental(as_of="0.4.0")
     def get_max_distance(self):
         """Returns the max tip tip distance between any pair of tips
@@ -2411,27 +2734,22 @@ class TreeNode(SkbioObject):
         >>> [n.name for n in tips]
         ['b', 'e']
         """
-        if not hasattr(self, 'MaxDistTips'):
-            # _set_max_distance will throw a TreeError if a node with a single
-            # child is encountered
-            try:
-                self._set_max_distance()
-            except TreeError:  #
-                return self._get_max_distance_singledesc()
-
-        longest = 0.0
-        tips = [None, None]
-        for n in self.non_tips(include_self=True):
-            tip_a, tip_b = n.MaxDistTips
-            dist = (tip_a[0] + tip_b[0])
-
-            if dist > longest:
-                longest = dist
-                tips = [tip_a[1], tip_b[1]]
-        return longest, tips
+        # the nodes in preorder, with the index of their parent and the
+        # length of their branch, a missing length being 0
+        nodes = list(self.preorder(include_self=True))
+        index = {id(node): i for i, node in enumerate(nodes)}
+        parents = np.array([index.get(id(node.parent), -1) for node in nodes],
+                           dtype=np.int64)
+        lengths = np.array([node.length or 0.0 for node in nodes],
+                           dtype=float)
+
+        longest, tip_a, tip_b = _max_distance(parents, lengths)
+        if tip_a < 0:
+            return longest, [None, None]
+        return longest, [nodes[tip_a], nodes[tip_b]]
 
     @experimental(as_of="0.4.0")
-    def tip_tip_distances(self, endpoints=None):
+    def tip_tip_distances(self, endpoints=None, condensed=False, out=None):
         """Returns distance matrix between pairs of tips, and a tip order.
 
         By default, all pairwise distances are calculated in the tree. If
@@ -2442,6 +2760,16 @@ class TreeNode(SkbioObject):
         ----------
         endpoints : list of TreeNode or str, or None
             A list of TreeNode objects or names of TreeNode objects
+        condensed : bool, optional
+            If ``True``, return a ``DistanceMatrix`` which stores only the
+            condensed form of the distances.
+        out : 1-D np.ndarray of float64, optional
+            Array of length ``n * (n - 1) / 2``, where ``n`` is the number of
+            tips in the result, into which the condensed form of the
+            distances is written. This can be a ``np.memmap``, which allows
+            distance matrices larger than the available memory. The returned
+            ``DistanceMatrix`` stores `out` as its condensed form without a
+            copy. Implies ``condensed=True``.
 
         Returns
         -------
@@ -2452,17 +2780,29 @@ class TreeNode(SkbioObject):
         ------
         ValueError
             If any of the specified `endpoints` are not tips
+        ValueError
+            If `out` does not have the shape or dtype of the condensed form
+            of the result
 
         See Also
         --------
         distance
         compare_tip_distances
+        skbio.stats.distance.DistanceMatrix
 
         Notes
         -----
         If a node does not have an associated length, 0.0 will be used and a
         ``RepresentationWarning`` will be raised.
 
+        The distance between two tips is obtained from the distances of the
+        tips and their lowest common ancestor to the root. Ordering the tips
+        as in a preorder traversal, the lowest common ancestor of a pair of
+        tips is the parent of the shallowest node between them, so the lowest
+        common ancestors of a block of rows are found with a cumulative
+        minimum of the node depths. Memory use, besides the result, is
+        proportional to the number of nodes in the tree.
+
         Examples
         --------
         >>> from skbio import TreeNode
@@ -2478,10 +2818,42 @@ class TreeNode(SkbioObject):
          [ 14.  15.   0.   9.]
          [ 15.  16.   9.   0.]]
 
+        The distances between a subset of the tips can be stored in condensed
+        form only:
+
+        >>> mat = tree.tip_tip_distances(['e', 'a', 'b'], condensed=True)
+        >>> mat.condensed_form()
+        array([ 15.,  16.,   3.])
+
         """
-        all_tips = list(self.tips())
+        # Index the nodes in preorder, with their parent, depth and distance
+        # to self.
+        index = {}
+        parents = []
+        depths = []
+        root_distances = []
+        for i, node in enumerate(self.preorder(include_self=True)):
+            index[id(node)] = i
+            if i == 0:
+                parents.append(-1)
+                depths.append(0)
+                root_distances.append(0.0)
+                continue
+
+            parent = index[id(node.parent)]
+            length = node.length
+            if length is None:
+                warnings.warn(
+                    "`TreeNode.tip_tip_distances`: Node with name %r does "
+                    "not have an associated length, so a length of 0.0 "
+                    "will be used." % node.name, RepresentationWarning)
+                length = 0.0
+            parents.append(parent)
+            depths.append(depths[parent] + 1)
+            root_distances.append(root_distances[parent] + length)
+
         if endpoints is None:
-            tip_order = all_tips
+            tip_order = list(self.tips())
         else:
             tip_order = [self.find(n) for n in endpoints]
             for n in tip_order:
@@ -2489,57 +2861,12 @@ class TreeNode(SkbioObject):
                     raise ValueError("Node with name '%s' is not a tip." %
                                      n.name)
 
-        # linearize all tips in postorder
-        # .__start, .__stop compose the slice in tip_order.
-        for i, node in enumerate(all_tips):
-            node.__start, node.__stop = i, i + 1
-
-        # the result map provides index in the result matrix
-        result_map = {n.__start: i for i, n in enumerate(tip_order)}
-        num_all_tips = len(all_tips)  # total number of tips
-        num_tips = len(tip_order)  # total number of tips in result
-        result = np.zeros((num_tips, num_tips), float)  # tip by tip matrix
-        distances = np.zeros((num_all_tips), float)  # dist from tip to tip
-
-        def update_result():
-            # set tip_tip distance between tips of different child
-            for child1, child2 in combinations(node.children, 2):
-                for tip1 in range(child1.__start, child1.__stop):
-                    if tip1 not in result_map:
-                        continue
-                    t1idx = result_map[tip1]
-                    for tip2 in range(child2.__start, child2.__stop):
-                        if tip2 not in result_map:
-                            continue
-                        t2idx = result_map[tip2]
-                        result[t1idx, t2idx] = distances[
-                            tip1] + distances[tip2]
-
-        for node in self.postorder():
-            if not node.children:
-                continue
-            # subtree with solved child wedges
-            # can possibly use np.zeros
-            starts, stops = [], []  # to calc ._start and ._stop for curr node
-            for child in node.children:
-                length = child.length
-                if length is None:
-                    warnings.warn(
-                        "`TreeNode.tip_tip_distances`: Node with name %r does "
-                        "not have an associated length, so a length of 0.0 "
-                        "will be used." % child.name, RepresentationWarning)
-                    length = 0.0
-                distances[child.__start:child.__stop] += length
-
-                starts.append(child.__start)
-                stops.append(child.__stop)
-
-            node.__start, node.__stop = min(starts), max(stops)
-
-            if len(node.children) > 1:
-                update_result()
-
-        return DistanceMatrix(result + result.T, [n.name for n in tip_order])
+        tips = np.array([index[id(n)] for n in tip_order], dtype=np.intp)
+        result = _tip_tip_distances(np.array(parents, dtype=np.intp),
+                                    np.array(depths, dtype=np.intp),
+                                    np.array(root_distances), tips, out)
+        return DistanceMatrix(result, [n.name for n in tip_order],
+                              condensed=condensed or out is not None)
 
     @experimental(as_of="0.4.0")
     def compare_rfd(self, other, proportion=False):
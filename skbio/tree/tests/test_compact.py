@@ -0,0 +1,282 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import io
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import DistanceMatrix, TreeNode
+from skbio.tree import CompactTree, DuplicateNodeError, MissingNodeError
+from skbio.util import RepresentationWarning
+
+
+class CompactTreeTests(TestCase):
+
+    def setUp(self):
+        self.newick = "((a:1,b:2)c:3,(d:4,e:5)f:6,g:7)root;"
+        self.tree = TreeNode.read(io.StringIO(self.newick))
+        self.compact = CompactTree.from_tree_node(self.tree)
+        self.complex_tree = TreeNode.read(io.StringIO(
+            "(((a,b)int1,(x,y,(w,z)int2,(c,d)int3)int4),(e,f)int5);"))
+
+    def test_init(self):
+        obs = CompactTree([-1, 0, 1, 1, 0], [np.nan, 1, 2, 3, 4],
+                          [None, 'x', 'a', 'b', 'c'])
+        npt.assert_equal(obs.parents, [-1, 0, 1, 1, 0])
+        npt.assert_equal(obs.lengths, [np.nan, 1, 2, 3, 4])
+        npt.assert_equal(obs.names, [None, 'x', 'a', 'b', 'c'])
+        npt.assert_equal(obs.child_offsets, [0, 2, 4, 4, 4, 4])
+        npt.assert_equal(obs.child_indices, [1, 4, 2, 3])
+        npt.assert_equal(obs.preorder, [0, 1, 2, 3, 4])
+        npt.assert_equal(obs.postorder, [2, 3, 1, 4, 0])
+
+    def test_init_defaults(self):
+        obs = CompactTree([-1, 0, 0])
+        npt.assert_equal(obs.lengths, [np.nan, np.nan, np.nan])
+        npt.assert_equal(obs.names, [None, None, None])
+
+    def test_init_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'non-empty'):
+            CompactTree([])
+        with self.assertRaisesRegex(ValueError, 'root'):
+            CompactTree([0, 0])
+        with self.assertRaisesRegex(ValueError, 'after its parent'):
+            CompactTree([-1, 2, 0])
+        with self.assertRaisesRegex(ValueError, 'after its parent'):
+            CompactTree([-1, 0, -1])
+        with self.assertRaisesRegex(ValueError, 'preorder'):
+            # the second child of the root comes before the first child's
+            # child
+            CompactTree([-1, 0, 0, 1])
+        with self.assertRaisesRegex(ValueError, 'one entry per node'):
+            CompactTree([-1, 0], lengths=[1.0])
+        with self.assertRaisesRegex(ValueError, 'one entry per node'):
+            CompactTree([-1, 0], names=['a', 'b', 'c'])
+
+    def test_immutable(self):
+        for array in (self.compact.parents, self.compact.lengths,
+                      self.compact.names, self.compact.child_offsets,
+                      self.compact.child_indices, self.compact.postorder):
+            with self.assertRaises(ValueError):
+                array[0] = array[1]
+
+    def test_from_tree_node(self):
+        obs = self.compact
+        npt.assert_equal(obs.parents, [-1, 0, 1, 1, 0, 4, 4, 0])
+        npt.assert_equal(obs.lengths, [np.nan, 3, 1, 2, 6, 4, 5, 7])
+        npt.assert_equal(obs.names,
+                         ['root', 'c', 'a', 'b', 'f', 'd', 'e', 'g'])
+
+    def test_from_tree_node_subtree(self):
+        obs = CompactTree.from_tree_node(self.tree.find('f'))
+        npt.assert_equal(obs.parents, [-1, 0, 0])
+        npt.assert_equal(obs.names, ['f', 'd', 'e'])
+
+    def test_to_tree_node(self):
+        for tree in (self.tree, self.complex_tree, TreeNode(name='a')):
+            obs = CompactTree.from_tree_node(tree).to_tree_node()
+            self.assertEqual(str(obs), str(tree))
+            self.assertEqual([n.name for n in obs.postorder()],
+                             [n.name for n in tree.postorder()])
+
+    def test_str(self):
+        self.assertEqual(str(self.compact),
+                         "((a:1.0,b:2.0)c:3.0,(d:4.0,e:5.0)f:6.0,g:7.0)root;"
+                         "\n")
+
+    def test_repr(self):
+        self.assertEqual(
+            repr(self.compact),
+            "<CompactTree, name: root, internal node count: 2, "
+            "tips count: 5>")
+        obs = CompactTree.from_tree_node(self.complex_tree)
+        self.assertEqual(
+            repr(obs),
+            "<CompactTree, name: unnamed, internal node count: 6, "
+            "tips count: 10>")
+
+    def test_read_write(self):
+        obs = CompactTree.read(io.StringIO(self.newick))
+        npt.assert_equal(obs.parents, self.compact.parents)
+        npt.assert_equal(obs.lengths, self.compact.lengths)
+        npt.assert_equal(obs.names, self.compact.names)
+
+        fh = io.StringIO()
+        obs.write(fh)
+        self.assertEqual(fh.getvalue(), str(self.tree))
+
+    def test_preorder_postorder(self):
+        compact = CompactTree.from_tree_node(self.complex_tree)
+        nodes = list(self.complex_tree.preorder())
+        self.assertEqual([nodes[i] for i in compact.postorder],
+                         list(self.complex_tree.postorder()))
+        self.assertEqual([nodes[i] for i in compact.preorder], nodes)
+
+    def test_tips(self):
+        obs = self.compact.tips()
+        npt.assert_equal(obs, [2, 3, 5, 6, 7])
+        npt.assert_equal(self.compact.names[obs],
+                         [n.name for n in self.tree.tips()])
+
+        single = CompactTree([-1])
+        npt.assert_equal(single.tips(), [])
+        npt.assert_equal(single.tips(include_self=True), [0])
+
+    def test_find(self):
+        self.assertEqual(self.compact.find('a'), 2)
+        self.assertEqual(self.compact.find('f'), 4)
+        self.assertEqual(self.compact.find('root'), 0)
+        with self.assertRaises(MissingNodeError):
+            self.compact.find('missing')
+
+    def test_find_same_as_tree_node(self):
+        tree = TreeNode.read(io.StringIO("((a,(b)a)c,((d)c)a)a;"))
+        compact = CompactTree.from_tree_node(tree)
+        nodes = list(tree.preorder())
+        for name in 'abcd':
+            self.assertIs(nodes[compact.find(name)], tree.find(name))
+
+    def test_find_duplicate_tips(self):
+        compact = CompactTree.read(io.StringIO("((a,b),a);"))
+        with self.assertRaises(DuplicateNodeError):
+            compact.find('b')
+
+    def test_to_array(self):
+        exp = self.complex_tree.to_array(nan_length_value=0.0)
+        obs = CompactTree.from_tree_node(self.complex_tree).to_array(
+            nan_length_value=0.0)
+        npt.assert_equal(obs['child_index'], exp['child_index'])
+        npt.assert_equal(obs['name'], exp['name'])
+        npt.assert_equal(obs['length'], exp['length'])
+        npt.assert_equal(obs['id'], exp['id'])
+        nodes = list(self.complex_tree.preorder())
+        self.assertEqual([nodes[i] for i in obs['id_index']],
+                         [exp['id_index'][i] for i in exp['id']])
+
+    def test_to_array_nan_length_value(self):
+        obs = self.compact.to_array()
+        self.assertTrue(np.isnan(obs['length'][-1]))
+        obs = self.compact.to_array(nan_length_value=2.0)
+        self.assertEqual(obs['length'][-1], 2.0)
+
+    def test_to_array_single_node(self):
+        obs = CompactTree([-1], names=['a']).to_array()
+        self.assertEqual(obs['child_index'].size, 0)
+        npt.assert_equal(obs['name'], ['a'])
+
+    def test_shear(self):
+        compact = CompactTree.read(
+            io.StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        self.assertEqual(str(compact.shear(['G', 'M'])), '(G:3.0,M:3.7);\n')
+
+    def test_shear_keeps_sibling_order(self):
+        obs = self.compact.shear(['a', 'b', 'e', 'g'])
+        self.assertEqual(str(obs),
+                         "((a:1.0,b:2.0)c:3.0,e:11.0,g:7.0)root;\n")
+
+    def test_shear_root_single_child(self):
+        obs = self.compact.shear(['a', 'b'])
+        self.assertEqual(str(obs), "(a:1.0,b:2.0)c:3.0;\n")
+
+    def test_shear_missing_lengths(self):
+        compact = CompactTree.read(io.StringIO("((a,(b,c)d:2)e,f);"))
+        self.assertEqual(str(compact.shear(['a', 'b', 'f'])),
+                         "((a,b:2.0)e,f);\n")
+
+    def test_shear_same_as_tree_node(self):
+        names = ['a', 'x', 'y', 'w', 'f']
+        exp = self.complex_tree.shear(names)
+        obs = CompactTree.from_tree_node(self.complex_tree).shear(names)
+        self.assertEqual(obs.to_tree_node().subsets(), exp.subsets())
+
+    def test_shear_invalid(self):
+        with self.assertRaisesRegex(ValueError, 'subset'):
+            self.compact.shear(['a', 'c'])
+
+    def test_tip_tip_distances(self):
+        compact = CompactTree.read(
+            io.StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        exp = DistanceMatrix(np.array([[0, 2.0, 6.5, 6.7],
+                                       [2.0, 0, 6.5, 6.7],
+                                       [6.5, 6.5, 0, 1.2],
+                                       [6.7, 6.7, 1.2, 0]]),
+                             ['H', 'G', 'R', 'M'])
+        obs = compact.tip_tip_distances()
+        self.assertEqual(obs.ids, exp.ids)
+        npt.assert_almost_equal(obs.data, exp.data)
+
+    def test_tip_tip_distances_endpoints(self):
+        compact = CompactTree.read(
+            io.StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        exp = DistanceMatrix(np.array([[0, 6.7, 2.0],
+                                       [6.7, 0, 6.7],
+                                       [2.0, 6.7, 0.0]]), ['H', 'M', 'G'])
+        self.assertEqual(compact.tip_tip_distances(['H', 'M', 'G']), exp)
+
+    def test_tip_tip_distances_same_as_tree_node(self):
+        tree = TreeNode.read(io.StringIO(
+            "(((a:1,b:2)int1:3,(x:4,y:5,(w:6,z:7)int2:8,(c:9,d:1)int3:2)"
+            "int4:3),(e:4,f:5)int5:6);"))
+        compact = CompactTree.from_tree_node(tree)
+        self.assertEqual(compact.tip_tip_distances(),
+                         tree.tip_tip_distances())
+        endpoints = ['z', 'a', 'f', 'x', 'd']
+        self.assertEqual(compact.tip_tip_distances(endpoints),
+                         tree.tip_tip_distances(endpoints))
+
+    def test_tip_tip_distances_condensed(self):
+        exp = self.compact.tip_tip_distances(['g', 'a', 'e'])
+        obs = self.compact.tip_tip_distances(['g', 'a', 'e'], condensed=True)
+        self.assertEqual(obs, exp)
+        npt.assert_equal(obs.condensed_form(), [11, 18, 15])
+
+        out = np.empty(3)
+        obs = self.compact.tip_tip_distances(['g', 'a', 'e'], out=out)
+        self.assertIs(obs.condensed_form(), out)
+        npt.assert_equal(out, [11, 18, 15])
+
+    def test_tip_tip_distances_non_tip_endpoints(self):
+        with self.assertRaises(ValueError):
+            self.compact.tip_tip_distances(['a', 'c'])
+
+    def test_tip_tip_distances_no_length(self):
+        compact = CompactTree.read(io.StringIO("((a,b)c,(d,e)f);"))
+        obs = npt.assert_warns(RepresentationWarning,
+                               compact.tip_tip_distances)
+        npt.assert_equal(obs.data, np.zeros((4, 4)))
+
+    def test_descending_branch_length(self):
+        self.assertEqual(self.compact.descending_branch_length(), 28)
+        self.assertEqual(
+            self.compact.descending_branch_length(['a', 'b']), 3)
+        self.assertEqual(
+            self.compact.descending_branch_length(['a', 'd']), 14)
+        self.assertEqual(
+            self.compact.descending_branch_length(['a', 'b', 'g']), 13)
+        self.assertEqual(self.compact.descending_branch_length(['a']), 0)
+
+    def test_descending_branch_length_same_as_tree_node(self):
+        tree = TreeNode.read(io.StringIO(
+            "(((a:1,b:2)int1:3,(x:4,y:5,(w:6,z:7)int2:8,(c,d:1)int3:2)"
+            "int4:3),(e:4,f:5)int5:6):1;"))
+        compact = CompactTree.from_tree_node(tree)
+        self.assertEqual(compact.descending_branch_length(),
+                         tree.descending_branch_length())
+        for subset in (['a', 'b'], ['w', 'c', 'd'], ['a', 'z', 'e']):
+            self.assertEqual(compact.descending_branch_length(subset),
+                             tree.descending_branch_length(subset))
+
+    def test_descending_branch_length_invalid(self):
+        with self.assertRaises(ValueError):
+            self.compact.descending_branch_length(['a', 'c'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2013--, scikit-bio development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import itertools
+from unittest import TestCase, main
+
+import numpy as np
+import numpy.testing as npt
+
+from skbio import TreeNode, DistanceMatrix
+from skbio.tree import (rf_dists, subset_dists, CompactTree,
+                        DuplicateNodeError)
+
+
+class CompareTests(TestCase):
+    def setUp(self):
+        self.same_tips = [
+            TreeNode.read(["((a,b),(c,d),(e,f));"]),
+            TreeNode.read(["(((a,b),c),d,(e,f));"]),
+            TreeNode.read(["(((a,c),b),(d,e),f);"]),
+            TreeNode.read(["((f,e),(d,c),(b,a));"])]
+        # the tips of each tree are a subset of those of the next tree
+        self.nested_tips = [
+            TreeNode.read(["((a,b),c,d);"]),
+            TreeNode.read(["(((a,b),(c,d)),e);"]),
+            TreeNode.read(["(((a,c),b),(d,e),f);"]),
+            TreeNode.read(["((a,(b,g)),(c,(d,e)),f);"])]
+        self.overlapping_tips = [
+            TreeNode.read(["((a,b),(c,d),e);"]),
+            TreeNode.read(["((a,c),(b,f),(d,g));"]),
+            TreeNode.read(["(((a,b),(x,y)),d);"])]
+
+    def assert_pairwise(self, dm, trees, func):
+        self.assertIsInstance(dm, DistanceMatrix)
+        self.assertEqual(dm.shape, (len(trees), len(trees)))
+        for i, j in itertools.combinations(range(len(trees)), 2):
+            self.assertAlmostEqual(dm[str(i), str(j)],
+                                   func(trees[i], trees[j]))
+
+    def test_rf_dists(self):
+        for trees in self.same_tips, self.nested_tips:
+            self.assert_pairwise(rf_dists(trees), trees,
+                                 lambda a, b: a.compare_rfd(b))
+
+    def test_rf_dists_proportion(self):
+        for trees in self.same_tips, self.nested_tips:
+            self.assert_pairwise(
+                rf_dists(trees, proportion=True), trees,
+                lambda a, b: a.compare_rfd(b, proportion=True))
+
+    def test_rf_dists_overlapping_tips(self):
+        # trees are compared on the tips they share, e.g. ((a,b),d) for the
+        # first and last tree
+        dm = rf_dists(self.overlapping_tips)
+        npt.assert_array_equal(dm.data, [[0, 3, 0],
+                                         [3, 0, 1],
+                                         [0, 1, 0]])
+
+    def test_rf_dists_ids(self):
+        dm = rf_dists(self.same_tips, ids=list('wxyz'))
+        self.assertEqual(dm.ids, ('w', 'x', 'y', 'z'))
+        self.assertEqual(dm['w', 'z'], 0)
+
+    def test_rf_dists_compact_tree(self):
+        for trees in self.same_tips, self.nested_tips:
+            compact = [CompactTree.from_tree_node(t) for t in trees]
+            npt.assert_array_equal(rf_dists(compact).data,
+                                   rf_dists(trees).data)
+        # tree types can be mixed
+        mixed = [self.same_tips[0], CompactTree.from_tree_node(
+                 self.same_tips[1])]
+        self.assertEqual(rf_dists(mixed)['0', '1'],
+                         self.same_tips[0].compare_rfd(self.same_tips[1]))
+
+    def test_rf_dists_n_jobs(self):
+        for trees in self.nested_tips, self.overlapping_tips:
+            npt.assert_array_equal(rf_dists(trees, n_jobs=3).data,
+                                   rf_dists(trees).data)
+
+    def test_rf_dists_generator(self):
+        dm = rf_dists(tree for tree in self.same_tips)
+        npt.assert_array_equal(dm.data, rf_dists(self.same_tips).data)
+
+    def test_rf_dists_single_tree(self):
+        dm = rf_dists(self.same_tips[:1])
+        npt.assert_array_equal(dm.data, [[0]])
+
+    def test_rf_dists_duplicate_tips(self):
+        trees = [TreeNode.read(["((a,b),(a,c));"]),
+                 TreeNode.read(["((a,b),c);"])]
+        with self.assertRaises(DuplicateNodeError):
+            rf_dists(trees)
+
+    def test_subset_dists(self):
+        for trees in (self.same_tips, self.nested_tips,
+                      self.overlapping_tips):
+            self.assert_pairwise(subset_dists(trees), trees,
+                                 lambda a, b: a.compare_subsets(b))
+
+    def test_subset_dists_exclude_absent_taxa(self):
+        for trees in (self.same_tips, self.nested_tips,
+                      self.overlapping_tips):
+            self.assert_pairwise(
+                subset_dists(trees, exclude_absent_taxa=True), trees,
+                lambda a, b: a.compare_subsets(b, exclude_absent_taxa=True))
+
+    def test_subset_dists_no_clades(self):
+        trees = [TreeNode.read(["(a,b,c);"]), TreeNode.read(["(a,b,c);"]),
+                 TreeNode.read(["((a,b),c);"])]
+        dm = subset_dists(trees)
+        npt.assert_array_equal(dm.data, [[0, 1, 1],
+                                         [1, 0, 1],
+                                         [1, 1, 0]])
+
+    def test_random_trees(self):
+        rng = np.random.RandomState(42)
+        names = [str(i) for i in range(20)]
+
+        def random_tree(tips):
+            nodes = [TreeNode(name=name) for name in tips]
+            while len(nodes) > 3:
+                first, second = sorted(rng.choice(len(nodes), 2,
+                                                  replace=False))
+                children = [nodes.pop(second), nodes.pop(first)]
+                nodes.append(TreeNode(children=children))
+            return TreeNode(children=nodes)
+
+        trees = [random_tree(names[:rng.randint(5, 21)]) for _ in range(10)]
+        self.assert_pairwise(rf_dists(trees), trees,
+                             lambda a, b: a.compare_rfd(b))
+        self.assert_pairwise(
+            subset_dists(trees, exclude_absent_taxa=True), trees,
+            lambda a, b: a.compare_subsets(b, exclude_absent_taxa=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,9 +12,13 @@ from unittest import TestCase, main
 import numpy as np
 
 from skbio import TreeNode
-from skbio.tree import majority_rule
+from skbio.tree import majority_rule, CompactTree
 from skbio.tree._majority_rule import (_walk_clades, _filter_clades,
-                                       _build_trees)
+                                       _build_trees, _clade_tips)
+
+
+def _clade_names(clade, tip_names):
+    return frozenset(tip_names[i] for i in _clade_tips(clade, len(tip_names)))
 
 
 class MajorityRuleTests(TestCase):
@@ -60,6 +64,45 @@ class MajorityRuleTests(TestCase):
         with self.assertRaises(ValueError):
             majority_rule(trees, weights=[1, 2])
 
+    def test_majority_rule_streaming(self):
+        newicks = ["(A,(B,(H,(D,(J,(((G,E),(F,I)),C))))));",
+                   "(A,(B,(D,((J,H),(((G,E),(F,I)),C)))));",
+                   "(A,(B,(D,(H,(J,(((G,E),(F,I)),C))))));",
+                   "(A,(B,(E,(G,((F,I),((J,(H,D)),C))))));",
+                   "(A,(B,(E,(G,((F,I),(((J,H),D),C))))));"]
+        trees = [TreeNode.read(io.StringIO(n)) for n in newicks]
+        exp = majority_rule(trees)
+        self.assertEqual(len(exp), 1)
+
+        def supports(tree):
+            return sorted((node.count(tips=True), node.support)
+                          for node in tree.non_tips(include_self=True))
+
+        for weights in None, [1, 1, 1, 1, 1]:
+            compact_trees = [CompactTree.from_tree_node(t) for t in trees]
+            for stream in (iter(trees), compact_trees, iter(compact_trees)):
+                obs = majority_rule(stream, weights=weights)
+                self.assertEqual(len(obs), 1)
+                self.assertEqual(exp[0].compare_subsets(obs[0]), 0.0)
+                self.assertEqual(supports(obs[0]), supports(exp[0]))
+
+        with self.assertRaises(ValueError):
+            majority_rule(iter(trees), weights=[1, 2])
+
+    def test_majority_rule_negative_weights(self):
+        # a negative weight lowers the support of a clade, so clades which
+        # seem unable to reach the cutoff must not be dropped early
+        trees = [TreeNode.read(io.StringIO(n)) for n in
+                 ["((a,b),(c,d));", "((a,b),(c,d));", "((a,c),(b,d));",
+                  "((a,b),(c,d));"]]
+        exp = TreeNode.read(io.StringIO("((a,c),(b,d));"))
+        for stream in (trees, iter(trees)):
+            obs = majority_rule(stream, weights=[1, 1, 1, -2])
+            self.assertEqual(len(obs), 1)
+            self.assertEqual(exp.compare_subsets(obs[0]), 0.0)
+            self.assertEqual([n.support for n in obs[0].non_tips()],
+                             [1.0, 1.0])
+
     def test_majority_rule_multiple_trees(self):
         trees = [
             TreeNode.read(io.StringIO("((a,b),(c,d),(e,f));")),
@@ -149,7 +192,25 @@ class MajorityRuleTests(TestCase):
             frozenset(['D', 'E', 'X']): 1.0,
             frozenset(['A', 'B', 'D', 'E', 'X']): 1.0}
 
-        obs_clades, obs_lengths = _walk_clades(trees, np.ones(len(trees)))
+        def walk(trees):
+            clades, lengths, tip_names, total = _walk_clades(
+                trees, np.ones(len(trees)))
+            self.assertEqual(total, 2.0)
+            clades = [(_clade_names(clade, tip_names), count)
+                      for clade, count in clades]
+            lengths = {_clade_names(clade, tip_names): length
+                       for clade, length in lengths.items()}
+            return clades, lengths
+
+        obs_clades, obs_lengths = walk(trees)
+        self.assertEqual(set(obs_clades), set(exp_clades))
+        self.assertEqual(obs_lengths, exp_lengths_nolength)
+        # clades are sorted by size
+        sizes = [len(clade) for clade, _ in obs_clades]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+        compact_trees = [CompactTree.from_tree_node(t) for t in trees]
+        obs_clades, obs_lengths = walk(compact_trees)
         self.assertEqual(set(obs_clades), set(exp_clades))
         self.assertEqual(obs_lengths, exp_lengths_nolength)
 
@@ -157,11 +218,41 @@ class MajorityRuleTests(TestCase):
             for n in t.traverse(include_self=True):
                 n.length = 2.0
 
-        obs_clades, obs_lengths = _walk_clades(trees, np.ones(len(trees)))
+        obs_clades, obs_lengths = walk(trees)
 
         self.assertEqual(set(obs_clades), set(exp_clades))
         self.assertEqual(obs_lengths, exp_lengths)
 
+    def test_walk_clades_weights(self):
+        trees = [TreeNode.read(io.StringIO("((A,B),(D,E));")),
+                 TreeNode.read(io.StringIO("((A,B),(D,(E,X)));"))]
+        with self.assertRaises(ValueError):
+            _walk_clades(iter(trees), np.ones(3))
+        with self.assertRaises(ValueError):
+            _walk_clades(iter(trees), np.ones(1))
+
+        clades, _, tip_names, total = _walk_clades(iter(trees), None)
+        self.assertEqual(total, 2.0)
+        self.assertEqual(len(clades), 11)
+
+    def test_walk_clades_cutoff(self):
+        # clades which cannot be supported by more than the cutoff are
+        # dropped, and the others are counted as without a cutoff
+        trees = [TreeNode.read(io.StringIO("((A,B),(D,E));")),
+                 TreeNode.read(io.StringIO("((A,B),(D,(E,X)));")),
+                 TreeNode.read(io.StringIO("((A,D),(B,(E,X)));"))]
+        weights = np.array([1.0, 1.0, 1.0])
+        clades, _, tip_names, _ = _walk_clades(trees, weights)
+        exp = {_clade_names(clade, tip_names): count
+               for clade, count in clades if count > 1.5}
+        clades, lengths, tip_names, _ = _walk_clades(trees, weights, 0.5)
+        obs = {_clade_names(clade, tip_names): count
+               for clade, count in clades}
+        self.assertEqual({k: v for k, v in obs.items() if v > 1.5}, exp)
+        # clades first observed in the last tree are not counted
+        self.assertNotIn(frozenset(['A', 'D']), obs)
+        self.assertEqual(len(lengths), len(clades))
+
     def test_filter_clades(self):
         clade_counts = [(frozenset(['A', 'B']), 8),
                         (frozenset(['A', 'C']), 7),
@@ -187,19 +278,37 @@ class MajorityRuleTests(TestCase):
                frozenset(['A', 'B', 'C']): 5}
         self.assertEqual(obs, exp)
 
+    def test_filter_clades_bitsets(self):
+        # A = 1, B = 2, C = 4
+        clade_counts = [(3, 8), (5, 7), (1, 6), (2, 5)]
+        self.assertEqual(_filter_clades(clade_counts, 2),
+                         {3: 8, 1: 6, 2: 5})
+        self.assertEqual(_filter_clades(clade_counts, 2, False),
+                         {3: 8, 5: 7, 1: 6, 2: 5})
+
     def test_build_trees(self):
-        clade_counts = {frozenset(['A', 'B']): 6,
-                        frozenset(['A']): 7,
-                        frozenset(['B']): 8}
-        edge_lengths = {frozenset(['A', 'B']): 1,
-                        frozenset(['A']): 2,
-                        frozenset(['B']): 3}
-        tree = _build_trees(clade_counts, edge_lengths, 'foo', TreeNode)[0]
+        # A = 1, B = 2
+        clade_counts = {3: 6, 1: 7, 2: 8}
+        edge_lengths = {3: 1, 1: 2, 2: 3}
+        tree = _build_trees(clade_counts, edge_lengths, ['A', 'B'], 'foo',
+                            TreeNode)[0]
         self.assertEqual(tree.foo, 6)
         tree_foos = set([c.foo for c in tree.children])
         tree_lens = set([c.length for c in tree.children])
         self.assertEqual(tree_foos, set([7, 8]))
         self.assertEqual(tree_lens, set([2, 3]))
+        self.assertEqual([c.name for c in tree.children], ['A', 'B'])
+
+    def test_build_trees_missing_tips(self):
+        # the tips of a clade whose own clades are not supported are dropped,
+        # and the clade is not named after any of them
+        clade_counts = {7: 6, 1: 7, 6: 8}
+        edge_lengths = {7: 1, 1: 2, 6: 3}
+        trees = _build_trees(clade_counts, edge_lengths, ['A', 'B', 'C'],
+                             'foo', TreeNode)
+        self.assertEqual(len(trees), 1)
+        self.assertEqual([c.name for c in trees[0].children], ['A', None])
+        self.assertEqual(trees[0].children[1].foo, 8)
 
 
 if __name__ == '__main__':
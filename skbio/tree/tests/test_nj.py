@@ -9,10 +9,116 @@
 import io
 from unittest import TestCase, main
 
+import numpy as np
+
 from skbio import DistanceMatrix, TreeNode, nj
-from skbio.tree._nj import (
-    _compute_q, _compute_collapsed_dm, _lowest_index,
-    _pair_members_to_new_node)
+from skbio.tree._nj import _pair_members_to_new_node
+
+
+# nj used to rebuild the Q and distance matrices at each join with the
+# following functions, which are kept as a reference for its results
+
+
+def _compute_q(dm):
+    """Compute Q matrix, used to identify the next pair of nodes to join.
+
+    """
+    q = np.zeros(dm.shape)
+    n = dm.shape[0]
+    big_sum = np.array([dm.data.sum(1)] * dm.shape[0])
+    big_sum_diffs = big_sum + big_sum.T
+    q = (n - 2) * dm.data - big_sum_diffs
+    np.fill_diagonal(q, 0)
+    return DistanceMatrix(q, dm.ids)
+
+
+def _compute_collapsed_dm(dm, i, j, disallow_negative_branch_length,
+                          new_node_id):
+    """Return the distance matrix resulting from joining ids i and j in a node.
+
+    If the input distance matrix has shape ``(n, n)``, the result will have
+    shape ``(n-1, n-1)`` as the ids `i` and `j` are collapsed to a single new
+    ids.
+
+    """
+    in_n = dm.shape[0]
+    out_n = in_n - 1
+    out_ids = [new_node_id]
+    out_ids.extend([e for e in dm.ids if e not in (i, j)])
+    result = np.zeros((out_n, out_n))
+    # pre-populate the result array with known distances
+    ij_indexes = [dm.index(i), dm.index(j)]
+    result[1:, 1:] = np.delete(np.delete(dm.data, ij_indexes, axis=0),
+                               ij_indexes, axis=1)
+    # calculate the new distances from the current DistanceMatrix
+    k_to_u = 0.5 * (dm[i] + dm[j] - dm[i, j])
+    # set negative branches to 0 if specified
+    if disallow_negative_branch_length:
+        k_to_u[k_to_u < 0] = 0
+    # drop nodes being joined
+    k_to_u = np.delete(k_to_u, ij_indexes)
+    # assign the distances to the result array
+    result[0] = result[:, 0] = np.concatenate([[0], k_to_u])
+    return DistanceMatrix(result, out_ids)
+
+
+def _lowest_index(dm):
+    """Return the index of the lowest value in the input distance matrix.
+
+    If there are ties for the lowest value, the index of top-left most
+    occurrence of that value will be returned.
+
+    This should be ultimately be replaced with a new DistanceMatrix object
+    method (#228).
+
+    """
+    # get the positions of the lowest value
+    results = np.vstack(np.where(dm.data == np.amin(dm.condensed_form()))).T
+    # select results in the bottom-left of the array
+    results = results[results[:, 0] > results[:, 1]]
+    # calculate the distances of the results to [0, 0]
+    res_distances = np.sqrt(results[:, 0]**2 + results[:, 1]**2)
+    # detect distance ties & return the point which would have
+    # been produced by the original function
+    if np.count_nonzero(res_distances == np.amin(res_distances)) > 1:
+        eqdistres = results[res_distances == np.amin(res_distances)]
+        res_coords = eqdistres[np.argmin([r[0] for r in eqdistres])]
+    else:
+        res_coords = results[np.argmin(res_distances)]
+
+    return tuple([res_coords[0], res_coords[1]])
+
+
+def _nj_collapsing(dm, disallow_negative_branch_length=True):
+    """Neighbor joining which rebuilds the Q and distance matrices at each
+    join, as nj did in scikit-bio 0.5.0 and earlier"""
+    node_definition = None
+    while dm.shape[0] > 3:
+        idx1, idx2 = _lowest_index(_compute_q(dm))
+        pair_member_1 = dm.ids[idx1]
+        pair_member_2 = dm.ids[idx2]
+        pair_member_1_len, pair_member_2_len = _pair_members_to_new_node(
+            dm, idx1, idx2, disallow_negative_branch_length)
+        node_definition = "(%s:%f, %s:%f)" % (pair_member_1,
+                                              pair_member_1_len,
+                                              pair_member_2,
+                                              pair_member_2_len)
+        dm = _compute_collapsed_dm(dm, pair_member_1, pair_member_2,
+                                   disallow_negative_branch_length,
+                                   node_definition)
+    pair_member_1 = dm.ids[1]
+    pair_member_2 = dm.ids[2]
+    pair_member_1_len, pair_member_2_len = _pair_members_to_new_node(
+        dm, pair_member_1, pair_member_2, disallow_negative_branch_length)
+    node_definition = node_definition or dm.ids[0]
+    internal_len = 0.5 * (dm[pair_member_1, node_definition] +
+                          dm[pair_member_2, node_definition] -
+                          dm[pair_member_1, pair_member_2])
+    if disallow_negative_branch_length and internal_len < 0:
+        internal_len = 0
+    return "(%s:%f, %s:%f, %s:%f);" % (pair_member_1, pair_member_1_len,
+                                       node_definition, internal_len,
+                                       pair_member_2, pair_member_2_len)
 
 
 class NjTests(TestCase):
@@ -109,6 +215,64 @@ class NjTests(TestCase):
         self.assertTrue(tree.find('d').length < 0)
         self.assertTrue(tree.find('e').length > 0)
 
+    def test_nj_canonical(self):
+        self.assertEqual(nj(self.dm1, result_constructor=str, rapid=True),
+                         self.expected1_str)
+        for dm in self.dm1, self.dm2, self.dm3, self.dm4:
+            for disallow in True, False:
+                self.assertEqual(
+                    nj(dm, disallow, result_constructor=str),
+                    nj(dm, disallow, result_constructor=str, rapid=True))
+
+    def test_nj_rapid_ties(self):
+        # small integer distances give many pairs with the same Q, which must
+        # be broken in the same way by both searches
+        rng = np.random.RandomState(42)
+        for n in range(4, 30):
+            data = rng.randint(0, 4, size=(n, n)).astype(float)
+            data = data + data.T
+            np.fill_diagonal(data, 0)
+            dm = DistanceMatrix(data)
+            self.assertEqual(nj(dm, result_constructor=str),
+                             nj(dm, result_constructor=str, rapid=True))
+
+    def test_nj_matches_collapsing(self):
+        # with small integer distances, the row sums and Q values are exact,
+        # so that ties are broken, and the tree written, exactly as by
+        # rebuilding the matrices at each join
+        rng = np.random.RandomState(0)
+        for n in range(3, 20):
+            data = rng.randint(0, 5, size=(n, n)).astype(float)
+            data = data + data.T
+            np.fill_diagonal(data, 0)
+            dm = DistanceMatrix(data)
+            for disallow in True, False:
+                exp = _nj_collapsing(dm, disallow)
+                for rapid in True, False:
+                    self.assertEqual(nj(dm, disallow, result_constructor=str,
+                                        rapid=rapid), exp)
+
+    def test_nj_matches_collapsing_unrooted(self):
+        # Q values which are only equal in exact arithmetic may be ordered
+        # differently by rounding, but the unrooted tree is the same
+        rng = np.random.RandomState(0)
+        for n in range(3, 20):
+            data = rng.rand(n, n)
+            data = data + data.T
+            np.fill_diagonal(data, 0)
+            dm = DistanceMatrix(data)
+            exp = TreeNode.read(io.StringIO(_nj_collapsing(dm, False)))
+            exp = exp.tip_tip_distances(dm.ids)
+            for rapid in True, False:
+                obs = nj(dm, False, rapid=rapid).tip_tip_distances(dm.ids)
+                np.testing.assert_almost_equal(obs.data, exp.data)
+
+    def test_nj_does_not_modify_dm(self):
+        data = self.dm2.data.copy()
+        nj(self.dm2)
+        nj(self.dm2, rapid=True)
+        np.testing.assert_array_equal(self.dm2.data, data)
+
     def test_nj_trivial(self):
         data = [[0, 3, 2],
                 [3, 0, 3],
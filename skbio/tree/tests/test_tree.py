@@ -6,7 +6,9 @@
 # The full license is in the file COPYING.txt, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import copy
 import io
+import pickle
 from unittest import TestCase, main
 from collections import defaultdict
 
@@ -24,6 +26,17 @@ class TreeNodeSubclass(TreeNode):
     pass
 
 
+def _ladder_tree(depth):
+    """A tree in which each internal node has a tip and an internal child"""
+    root = node = TreeNode(name='n0')
+    for i in range(1, depth):
+        tip = TreeNode(name='t%d' % i, length=1.0)
+        child = TreeNode(name='n%d' % i, length=float(i))
+        node.extend([tip, child])
+        node = child
+    return root
+
+
 class TreeTests(TestCase):
 
     def setUp(self):
@@ -180,6 +193,82 @@ class TreeTests(TestCase):
             self.assertEqual(a.name, b.name)
             self.assertEqual(a.length, b.length)
 
+    def test_copy_attributes(self):
+        """copy attributes of nodes deeply"""
+        self.simple_t.children[0].data = {'x': [1, 2]}
+        self.simple_t.children[0].tags = ['a', 'b']
+        cp = self.simple_t.copy()
+        node = cp.children[0]
+        self.assertEqual(node.data, {'x': [1, 2]})
+        self.assertIsNot(node.data, self.simple_t.children[0].data)
+        self.assertIsNot(node.data['x'], self.simple_t.children[0].data['x'])
+        self.assertEqual(node.tags, ['a', 'b'])
+        self.assertIsNot(node.tags, self.simple_t.children[0].tags)
+        self.assertFalse(hasattr(cp.children[1], 'data'))
+        self.assertIs(node.parent, cp)
+
+    def test_copy_deep_tree(self):
+        """copy a tree deeper than the recursion limit"""
+        tree = _ladder_tree(5000)
+        cp = tree.copy()
+        self.assertEqual([n.name for n in cp.preorder()],
+                         [n.name for n in tree.preorder()])
+
+    def test_copy_module(self):
+        """copy a tree with the copy module"""
+        for func in copy.copy, copy.deepcopy:
+            cp = func(self.simple_t)
+            self.assertEqual(str(cp), str(self.simple_t))
+            self.assertIsNot(cp, self.simple_t)
+            self.assertIsNot(cp.children[0], self.simple_t.children[0])
+
+        # nodes are copied once when deep copying a container
+        obs = copy.deepcopy([self.simple_t, self.simple_t])
+        self.assertIs(obs[0], obs[1])
+
+    def test_pickle(self):
+        """pickle and unpickle a tree"""
+        tree = TreeNode.read(["((a:1,b:2)c:3,(d,e)f:4.5)root;"])
+        tree.find('a').data = [1, 2]
+        tree.assign_ids()
+        obs = pickle.loads(pickle.dumps(tree))
+        self.assertEqual(str(obs), str(tree))
+        for a, b in zip(obs.preorder(), tree.preorder()):
+            self.assertEqual(a.name, b.name)
+            self.assertEqual(a.length, b.length)
+            self.assertEqual(a.id, b.id)
+            self.assertEqual(a._registered_caches, b._registered_caches)
+            self.assertIsInstance(a._registered_caches, set)
+        self.assertEqual(obs.find('a').data, [1, 2])
+        self.assertFalse(hasattr(obs.find('b'), 'data'))
+        self.assertIsNone(obs.parent)
+
+    def test_pickle_node(self):
+        """pickle a node along with the tree containing it"""
+        tree = TreeNode.read(["((a,b)c,(d,e)f)root;"])
+        obs = pickle.loads(pickle.dumps(tree.find('f')))
+        self.assertEqual(obs.name, 'f')
+        self.assertEqual(str(obs.root()), str(tree))
+
+    def test_pickle_subclass(self):
+        """pickle a tree of a subclass of TreeNode"""
+        tree = TreeNodeSubclass(name='root', children=[
+            TreeNodeSubclass(name='c', children=[TreeNodeSubclass('a'),
+                                                 TreeNodeSubclass('b')]),
+            TreeNodeSubclass(name='d')])
+        obs = pickle.loads(pickle.dumps(tree))
+        self.assertEqual([n.name for n in obs.preorder()],
+                         ['root', 'c', 'a', 'b', 'd'])
+        for node in obs.preorder():
+            self.assertIsInstance(node, TreeNodeSubclass)
+
+    def test_pickle_deep_tree(self):
+        """pickle a tree deeper than the recursion limit"""
+        tree = _ladder_tree(5000)
+        obs = pickle.loads(pickle.dumps(tree))
+        self.assertEqual([(n.name, n.length) for n in obs.preorder()],
+                         [(n.name, n.length) for n in tree.preorder()])
+
     def test_append(self):
         """Append a node to a tree"""
         second_tree = TreeNode.read(io.StringIO("(x,y)z;"))
@@ -654,6 +743,77 @@ class TreeTests(TestCase):
         with self.assertRaises(ValueError):
             t1.lowest_common_ancestor([])
 
+    def test_lowest_common_ancestor_lca_index(self):
+        t = TreeNode.read(io.StringIO("(((a,(b,c)d)e,f,(g,h)i)j)k;"))
+        t.create_lca_index()
+        self.assertIs(t.lca(['a']), t.find('a'))
+        self.assertIs(t.lca(['a', 'b']), t.find('e'))
+        self.assertIs(t.lca(['c', 'b']), t.find('d'))
+        self.assertIs(t.lca(['a', 'h', 'g']), t.find('j'))
+        self.assertIs(t.lca(['d', 'b']), t.find('d'))
+        self.assertIs(t.lca(['b', 'k', 'g']), t)
+        self.assertIs(t.lca([t.find('h'), 'i']), t.find('i'))
+
+    def test_create_lca_index(self):
+        t = TreeNode.read(io.StringIO(
+            "((a:0.1,b:0.2)c:0.3,(d:0.4,e)f:0.5)root;"))
+        a = t.find('a')
+        a.create_lca_index()
+        index = t._lca_index
+        self.assertIsNotNone(index)
+        for node in t.traverse(include_self=True):
+            self.assertIs(node._lca_index, index)
+
+        # an existing index is kept
+        t.create_lca_index()
+        self.assertIs(t._lca_index, index)
+
+        npt.assert_almost_equal(a.distance(t.find('d')), 1.3)
+        npt.assert_almost_equal(t.find('d').distance(t.find('b')), 1.4)
+        self.assertEqual(a.distance(a), 0.0)
+        with self.assertRaises(NoLengthError):
+            a.distance(t.find('e'))
+        npt.assert_almost_equal(a.accumulate_to_ancestor(t), 0.4)
+        self.assertEqual(a.accumulate_to_ancestor(a), 0.0)
+        with self.assertRaises(NoParentError):
+            a.accumulate_to_ancestor(t.find('b'))
+        with self.assertRaises(NoLengthError):
+            t.find('e').accumulate_to_ancestor(t.find('c'))
+
+    def test_create_lca_index_invalidate_caches(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        t.create_lca_index()
+        index = t._lca_index
+        t.invalidate_caches()
+        self.assertIsNone(t._lca_index)
+        self.assertFalse(index.is_valid())
+        self.assertEqual(t.find('a').distance(t.find('e')), 15.0)
+
+        # changes to the tree invalidate the index
+        t.create_lca_index()
+        t.find('f').append(TreeNode('g', length=1.0))
+        self.assertIsNone(t._lca_index)
+        self.assertIs(t.lca(['g', 'd']), t.find('f'))
+        self.assertEqual(t.find('a').distance(t.find('g')), 11.0)
+
+    def test_create_lca_index_adopted_tree(self):
+        t1 = TreeNode.read(io.StringIO("((a:1,b:2)c:3,d:4)root;"))
+        t2 = TreeNode.read(io.StringIO("((x:1,y:2)z:3,w:4)u:5;"))
+        t2.create_lca_index()
+        t1.append(t2)
+        self.assertIsNone(t2._lca_index)
+        t2.find('z').append(TreeNode('v', length=1.0))
+        self.assertIs(t1.lca(['x', 'v']), t1.find('z'))
+        self.assertEqual(t1.find('a').distance(t1.find('x')), 13.0)
+
+    def test_create_lca_index_copy(self):
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        t.create_lca_index()
+        copied = t.copy()
+        for node in copied.traverse(include_self=True):
+            self.assertIsNone(node._lca_index)
+        self.assertEqual(copied.find('a').distance(copied.find('e')), 15.0)
+
     def test_get_max_distance(self):
         """get_max_distance should get max tip distance across tree"""
         tree = TreeNode.read(io.StringIO(
@@ -662,47 +822,43 @@ class TreeTests(TestCase):
         npt.assert_almost_equal(dist, 1.6)
         self.assertEqual(sorted([n.name for n in nodes]), ['b', 'e'])
 
-    def test_set_max_distance(self):
-        """set_max_distance sets MaxDistTips across tree"""
-        tree = TreeNode.read(io.StringIO(
-            "((a:0.1,b:0.2)c:0.3,(d:0.4,e:0.5)f:0.6)root;"))
-        tree._set_max_distance()
-        tip_a, tip_b = tree.MaxDistTips
-        self.assertEqual(tip_a[0] + tip_b[0], 1.6)
-        self.assertEqual(sorted([tip_a[1].name, tip_b[1].name]), ['b', 'e'])
-
-    def test_set_max_distance_tie_bug(self):
+    def test_get_max_distance_tie_bug(self):
         """Corresponds to #1077"""
-        s = io.StringIO("((a:1,b:1)c:2,(d:3,e:4)f:5)root;")
-        t = TreeNode.read(s)
-
-        exp = ((3.0, t.find('a')), (9.0, t.find('e')))
-
-        # the above tree would trigger an exception in max. The central issue
-        # was that the data being passed to max were a tuple of tuple:
-        # ((left_d, left_n), (right_d, right_n))
-        # the call to max would break in this scenario as it would fall onto
-        # idx 1 of each tuple to assess the "max".
-        t._set_max_distance()
-
-        self.assertEqual(t.MaxDistTips, exp)
-
-    def test_set_max_distance_inplace_modification_bug(self):
-        """Corresponds to #1223"""
-        s = io.StringIO("((a:1,b:1)c:2,(d:3,e:4)f:5)root;")
-        t = TreeNode.read(s)
-
-        exp = [((0.0, t.find('a')), (0.0, t.find('a'))),
-               ((0.0, t.find('b')), (0.0, t.find('b'))),
-               ((1.0, t.find('a')), (1.0, t.find('b'))),
-               ((0.0, t.find('d')), (0.0, t.find('d'))),
-               ((0.0, t.find('e')), (0.0, t.find('e'))),
-               ((3.0, t.find('d')), (4.0, t.find('e'))),
-               ((3.0, t.find('a')), (9.0, t.find('e')))]
-
-        t._set_max_distance()
-
-        self.assertEqual([n.MaxDistTips for n in t.postorder()], exp)
+        t = TreeNode.read(io.StringIO("((a:1,b:1)c:2,(d:3,e:4)f:5)root;"))
+        dist, nodes = t.get_max_distance()
+        self.assertEqual(dist, 12.0)
+        self.assertEqual(nodes, [t.find('a'), t.find('e')])
+
+    def test_get_max_distance_multifurcating(self):
+        """the lengths of the children are compared with their paths"""
+        t = TreeNode.read(io.StringIO("((a:1,b:1)c:5,d:1,(e:2,f:3)g:1)root;"))
+        dist, nodes = t.get_max_distance()
+        self.assertEqual(dist, 10.0)
+        self.assertEqual(sorted(n.name for n in nodes), ['a', 'f'])
+        npt.assert_almost_equal(dist, t.tip_tip_distances().data.max())
+
+    def test_get_max_distance_single_descendant(self):
+        """nodes with a single child are supported"""
+        t = TreeNode.read(io.StringIO("(((a:1,b:2)c:3)d:4,e:5)root;"))
+        dist, nodes = t.get_max_distance()
+        self.assertEqual(dist, 14.0)
+        self.assertEqual(sorted(n.name for n in nodes), ['b', 'e'])
+
+    def test_get_max_distance_deep_tree(self):
+        """a tree deeper than the recursion limit"""
+        t = _ladder_tree(5000)
+        dist, nodes = t.get_max_distance()
+        # the last node is at sum(range(5000)) from the root, and the first
+        # tip at 1
+        self.assertEqual(dist, sum(range(5000)) + 1.0)
+        self.assertEqual(sorted(n.name for n in nodes), ['n4999', 't1'])
+
+    def test_get_max_distance_does_not_modify(self):
+        """no attributes are added to the nodes"""
+        t = TreeNode.read(io.StringIO("((a:1,b:2)c:3,(d:4,e:5)f:6)root;"))
+        exp = [sorted(n.__dict__) for n in t.preorder()]
+        t.get_max_distance()
+        self.assertEqual([sorted(n.__dict__) for n in t.preorder()], exp)
 
     def test_shear(self):
         """Shear the nodes"""
@@ -767,6 +923,40 @@ class TreeTests(TestCase):
         obs = t.tip_tip_distances(endpoints=nodes)
         self.assertEqual(obs, exp)
 
+    def test_tip_tip_distances_endpoints_out_of_order(self):
+        t = TreeNode.read(io.StringIO(
+            '(((a:1,b:2)c:3,(d:4,e:5)f:6):1,(g:2,(h:1,i:3):2):4)root;'))
+        names = ['i', 'a', 'e', 'g', 'b']
+        obs = t.tip_tip_distances(endpoints=names)
+        self.assertEqual(obs.ids, tuple(names))
+        for i, name1 in enumerate(names):
+            for j, name2 in enumerate(names):
+                exp = 0.0 if i == j else t.find(name1).distance(
+                    t.find(name2))
+                self.assertAlmostEqual(obs[i, j], exp)
+
+    def test_tip_tip_distances_condensed(self):
+        t = TreeNode.read(io.StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        obs = t.tip_tip_distances(endpoints=['M', 'H', 'G'], condensed=True)
+        self.assertEqual(obs.ids, ('M', 'H', 'G'))
+        npt.assert_almost_equal(obs.condensed_form(), [6.7, 6.7, 2.0])
+
+        exp = t.tip_tip_distances()
+        obs = t.tip_tip_distances(condensed=True)
+        self.assertEqual(obs, exp)
+
+    def test_tip_tip_distances_out(self):
+        t = TreeNode.read(io.StringIO('((H:1,G:1):2,(R:0.5,M:0.7):3);'))
+        out = np.zeros(6)
+        obs = t.tip_tip_distances(out=out)
+        self.assertIs(obs.condensed_form(), out)
+        npt.assert_almost_equal(out, [2.0, 6.5, 6.7, 6.5, 6.7, 1.2])
+
+        with self.assertRaisesRegex(ValueError, 'length 6'):
+            t.tip_tip_distances(out=np.zeros(5))
+        with self.assertRaisesRegex(ValueError, 'float64'):
+            t.tip_tip_distances(out=np.zeros(6, dtype=np.float32))
+
     def test_tip_tip_distances_non_tip_endpoints(self):
         t = TreeNode.read(io.StringIO('((H:1,G:1)foo:2,(R:0.5,M:0.7):3);'))
         with self.assertRaises(ValueError):
@@ -951,6 +1141,28 @@ class TreeTests(TestCase):
         obs_dist = result.tip_tip_distances()
         self.assertEqual(obs_dist, exp_dist)
 
+    def test_root_at_midpoint_does_not_modify(self):
+        """the tree is not modified, including by get_max_distance"""
+        t = TreeNode.read(io.StringIO(
+            "(((a:1,b:1)c:2,(d:3,e:4)f:5),g:1)root;"))
+        exp = str(t)
+        t.get_max_distance()
+        obs = t.root_at_midpoint()
+        self.assertEqual(str(t), exp)
+        exp_dist = t.tip_tip_distances()
+        self.assertEqual(obs.tip_tip_distances().filter(exp_dist.ids),
+                         exp_dist)
+        t_ids = {id(n) for n in t.traverse(include_self=True)}
+        obs_ids = {id(n) for n in obs.traverse(include_self=True)}
+        self.assertEqual(t_ids & obs_ids, set())
+
+    def test_root_at_midpoint_at_node(self):
+        """the midpoint is on a node"""
+        t = TreeNode.read(io.StringIO("((a:1,b:1)c:1,(d:1,e:3)f:1)root;"))
+        obs = t.root_at_midpoint()
+        self.assertEqual(str(obs),
+                         "(d:1.0,e:3.0,((a:1.0,b:1.0)c:1.0)f:1.0)root;\n")
+
     def test_root_at_midpoint_no_lengths(self):
         # should get same tree back (a copy)
         nwk = '(a,b)c;\n'
@@ -1070,6 +1282,18 @@ class TreeTests(TestCase):
 
         self.assertEqual(t_ids.intersection(obs_ids), set())
 
+    def test_unrooted_copy_deep_tree(self):
+        """Do an unrooted_copy of a tree deeper than the recursion limit"""
+        tree = _ladder_tree(5000)
+        tips = list(tree.tips())
+        obs = tips[-1].unrooted_copy()
+        self.assertEqual(obs.count(), tree.count())
+        # the tip becomes the root
+        self.assertEqual(obs.count(tips=True), tree.count(tips=True) - 1)
+        self.assertEqual(obs.name, 'root')
+        # edges are named after the node below them in the original tree
+        self.assertEqual(obs.children[0].name, 'n4999')
+
     def test_descending_branch_length(self):
         """Calculate descending branch_length"""
         tr = TreeNode.read(io.StringIO(